@@ -9,9 +9,12 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
 import logging
 import uuid
 import os
@@ -20,17 +23,19 @@ import time
 from datetime import datetime
 
 from api.models import (
-    CrawlRequest, CrawlStatus, ContentSearchRequest, ContentResponse,
+    CrawlRequest, CrawlStatus, CrawlState, ContentSearchRequest, ContentResponse,
     ChunkSearchRequest, ChunkResponse, GenerateContentRequest, GeneratedContent,
     MarketingTemplateCreate, MarketingTemplateResponse, TemplateSearchRequest
 )
 from api.dependencies import get_crawler_service, get_processor_service, get_rag_service, get_db
 from services.enhanced_rag_service import create_hybrid_rag_service
 from crawler.service import CrawlerService
+from crawler.progress_events import events_enabled, get_async_redis, progress_channel, merge_progress
 from processor.service import ProcessorService
 from processor.rag_service import RAGService
 from database.session import get_db_session
 from auth.clerk_auth import get_current_user, get_current_user_with_org, require_org_admin, AuthUser, get_org_id_from_user, security, clerk_auth
+from auth.clerk_auth import create_stream_token, verify_stream_token, STREAM_TOKEN_TTL
 
 # 🆕 ADD: Import automated RAG endpoints
 from api.rag_endpoints import rag_router
@@ -368,6 +373,131 @@ async def get_crawl_status(
             detail=f"Failed to get crawl status: {str(e)}"
         )
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _events_resource(crawl_id: str) -> str:
+    return f"crawl-events:{crawl_id}"
+
+@app.post("/crawl/{crawl_id}/events/token")
+async def create_crawl_events_token(
+    crawl_id: str,
+    current_user: AuthUser = Depends(get_current_user_with_org),
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
+    """
+    Issue a short-lived token for GET /crawl/{crawl_id}/events.
+    
+    A browser EventSource cannot send the Authorization header, so it passes
+    this token as the "token" query parameter instead.
+    """
+    org_id = get_org_id_from_user(current_user)
+    if not await run_in_threadpool(crawler_service.get_crawl_status, crawl_id, org_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Crawl job with ID {crawl_id} not found"
+        )
+    return {"token": create_stream_token(current_user, _events_resource(crawl_id)), "expires_in": STREAM_TOKEN_TTL}
+
+async def get_events_user(
+    crawl_id: str,
+    request: Request,
+    token: Optional[str] = Query(None, description="Token from POST /crawl/{crawl_id}/events/token"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+) -> AuthUser:
+    """User of an events stream: the query-string token if given, else the usual bearer or session auth."""
+    if token:
+        return verify_stream_token(token, _events_resource(crawl_id))
+    return await get_current_user_with_org(await get_current_user(request, credentials))
+
+@app.get("/crawl/{crawl_id}/events")
+async def stream_crawl_events(
+    crawl_id: str,
+    request: Request,
+    current_user: AuthUser = Depends(get_events_user),
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
+    """
+    Stream crawl progress as Server-Sent Events.
+    
+    Sends a "snapshot" event with the current status, then a "progress" event
+    with the updated progress for every delta the crawler publishes, and a
+    "state" event on state changes. The stream ends once the crawl is
+    completed, failed or cancelled.
+    
+    Authenticates with the bearer header, or with a short-lived "token" query
+    parameter from POST /crawl/{crawl_id}/events/token (for EventSource).
+    """
+    if not events_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Crawl progress events are not available; poll GET /crawl/{crawl_id} instead"
+        )
+    
+    # Get organization ID for multi-tenant isolation
+    org_id = get_org_id_from_user(current_user)
+    
+    if not await run_in_threadpool(crawler_service.get_crawl_status, crawl_id, org_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Crawl job with ID {crawl_id} not found"
+        )
+    
+    finished_states = ("completed", "failed", "cancelled")
+    
+    async def event_stream():
+        client = get_async_redis()
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reading the snapshot so no delta or state change falls in between
+            await pubsub.subscribe(progress_channel(crawl_id))
+            # The confirmation comes back once Redis delivers the channel's messages to this stream
+            await pubsub.get_message(timeout=5.0)
+            crawl_status = await run_in_threadpool(crawler_service.get_crawl_status, crawl_id, org_id)
+            if not crawl_status:
+                return
+            
+            snapshot = crawl_status.progress.dict()
+            sources = {}
+            yield _sse("snapshot", json.loads(crawl_status.json()))
+            if crawl_status.state.value in finished_states:
+                return
+            
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=15.0)
+                if message is None:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                
+                event = json.loads(message["data"])
+                if event.get("org_id") != org_id:
+                    continue
+                
+                if event["type"] == "progress":
+                    sources[event.get("source", "crawler")] = event
+                    yield _sse("progress", {
+                        "crawl_id": crawl_id,
+                        "progress": merge_progress(snapshot, sources),
+                        "delta": event.get("delta", {}),
+                        "max": event.get("max", {})
+                    })
+                elif event["type"] == "state":
+                    yield _sse("state", {"crawl_id": crawl_id, "state": event["state"], "error": event.get("error")})
+                    if event["state"] in finished_states:
+                        return
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.reset()
+            await client.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.delete("/crawl/{crawl_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_crawl(
     crawl_id: str,
@@ -422,6 +552,49 @@ async def cancel_crawl(
             detail=f"Failed to cancel crawl: {str(e)}"
         )
 
+@app.post("/crawl/{crawl_id}/reextract", status_code=status.HTTP_202_ACCEPTED)
+async def reextract_crawl(
+    crawl_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: AuthUser = Depends(get_current_user_with_org),
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
+    """
+    Rebuild a crawl's contents from its archived raw pages.
+    
+    Runs the current extractor over the pages stored at crawl time, so
+    extraction changes apply without crawling the site again.
+    """
+    try:
+        org_id = get_org_id_from_user(current_user)
+        
+        crawl_status = crawler_service.get_crawl_status(crawl_id, org_id)
+        if not crawl_status:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Crawl job with ID {crawl_id} not found"
+            )
+        if crawl_status.state == CrawlState.RUNNING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Crawl job with ID {crawl_id} is still running"
+            )
+        
+        if crawler_service.use_celery:
+            crawler_service.reextract_task.delay(crawl_id, org_id)
+        else:
+            background_tasks.add_task(crawler_service.reextract_crawl, crawl_id, org_id)
+        
+        return {"crawl_id": crawl_id, "status": "queued"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to start re-extraction: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start re-extraction: {str(e)}"
+        )
+
 @app.get("/crawl", response_model=List[CrawlStatus])
 async def list_crawls(
     limit: int = Query(10, ge=1, le=100),
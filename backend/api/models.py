@@ -38,6 +38,75 @@ class CrawlConfig(BaseModel):
     exclude_patterns: List[str] = Field(default_factory=list, description="URL patterns to exclude")
     include_patterns: List[str] = Field(default_factory=list, description="URL patterns to include (others will be excluded)")
     
+    # Concurrency (values above 1 switch Playwright to the async crawl mode)
+    concurrency: int = Field(1, ge=1, le=32, description="Maximum pages fetched concurrently across the whole crawl")
+    per_host_concurrency: int = Field(2, ge=1, le=16, description="Maximum pages fetched concurrently from a single host")
+    
+    # Fetch strategy (stealth mode always renders in the browser)
+    fetch_mode: str = Field("auto", description="Fetch mode: auto (plain HTTP first, browser when rendering is needed), browser (always render)")
+    http_min_text_chars: int = Field(200, ge=0, description="Minimum extracted text for an HTTP response to be used without rendering")
+    
+    # Request interception (resources ContentExtractor never reads)
+    block_resource_types: List[str] = Field(default_factory=lambda: ["image", "media", "font"], description="Playwright resource types to abort during page loads")
+    block_trackers: bool = Field(True, description="Abort requests to known analytics and advertising hosts")
+    blocked_hosts: List[str] = Field(default_factory=list, description="Additional hosts to abort requests to (subdomains included)")
+    
+    # Frontier seeding from robots.txt sitemaps (or /sitemap.xml), ordered by lastmod
+    use_sitemaps: bool = Field(True, description="Seed the frontier with URLs from the site's sitemaps")
+    sitemap_max_urls: int = Field(50000, ge=1, description="Maximum sitemap URLs to seed the frontier with")
+    
+    # Adaptive per-host rate limiting (token bucket with AIMD; starts at 1/delay)
+    adaptive_rate_limit: bool = Field(True, description="Pace each host with an adaptive token bucket instead of fixed sleeps")
+    min_host_rate: float = Field(0.05, gt=0, description="Lowest request rate per host (requests/second)")
+    max_host_rate: float = Field(5.0, gt=0, description="Highest request rate per host (requests/second)")
+    throttle_retries: int = Field(3, ge=0, le=10, description="Times a page answered with 429/503 is queued again before it counts as failed")
+    max_retry_after: float = Field(300, gt=0, description="Longest Retry-After honored (seconds); hosts asking for more are given up on")
+    
+    # Firecrawl engine (job mode streams pages into storage while the crawl runs)
+    firecrawl_job_mode: bool = Field(True, description="Run Firecrawl as an async job polled for pages instead of one blocking crawl")
+    firecrawl_poll_interval: float = Field(5.0, gt=0, description="Seconds between Firecrawl job status polls")
+    
+    # Near-duplicate suppression (SimHash of extracted text; duplicates are linked, not stored)
+    suppress_near_duplicates: bool = Field(False, description="Skip pages whose text nearly matches an already stored page")
+    near_duplicate_distance: int = Field(6, ge=0, le=16, description="Largest SimHash bit difference treated as a near-duplicate")
+    near_duplicate_scope: str = Field("org", description="Compare against: org (all stored pages of the organization), crawl (this crawl only)")
+    
+    # Boilerplate templates (text blocks repeated across a domain's pages are stripped)
+    learn_boilerplate: bool = Field(False, description="Learn the domain's repeated blocks and strip them from extracted text")
+    boilerplate_min_pages: int = Field(5, ge=2, description="Pages a block must appear on before it is treated as boilerplate")
+    boilerplate_min_ratio: float = Field(0.6, gt=0, le=1, description="Share of the domain's pages a block must appear on")
+    
+    # Raw-page archive (compressed WARC records, for re-extraction without re-crawling)
+    archive_pages: bool = Field(False, description="Archive each fetched page so the crawl can be re-extracted later (needs PAGE_ARCHIVE_URL)")
+    store_html: bool = Field(True, description="Also keep page HTML in the contents table (archived pages can drop it)")
+    
+    # Off-thread extraction (pages are parsed in worker processes while fetching continues)
+    extraction_workers: int = Field(0, ge=0, le=32, description="Processes extracting fetched pages (0 extracts on the crawl thread)")
+    extraction_max_in_flight: int = Field(8, ge=1, le=256, description="Pages waiting for extraction before fetching is held back")
+    
+    # Streaming to RAG (saved pages are chunked and embedded while the crawl runs)
+    stream_to_rag: bool = Field(False, description="Chunk and embed pages as they are saved instead of after the crawl (loads the embedding model in the crawl worker)")
+    rag_stream_queue_size: int = Field(64, ge=1, le=1000, description="Pages buffered between pipeline stages before the crawl is held back")
+    rag_embed_batch_size: int = Field(32, ge=1, le=512, description="Chunks per embedding model call")
+    
+    # Incremental re-crawl (conditional requests and text hashes from the previous crawl)
+    incremental: bool = Field(False, description="Skip pages unchanged since the last crawl of this domain")
+    
+    # Sharded mode: several Celery tasks crawl the domain through a shared Redis frontier
+    shards: int = Field(1, ge=1, le=64, description="Worker tasks crawling the domain together (1 disables sharding)")
+    shard_lease_size: int = Field(10, ge=1, le=500, description="URLs a shard leases from the shared frontier at a time")
+    
+    # Buffered content writes (multi-row inserts on a background thread)
+    write_batch_size: int = Field(50, ge=1, le=1000, description="Pages per batched content insert")
+    write_flush_interval: float = Field(5.0, gt=0, description="Maximum seconds extracted content waits before being written")
+    
+    # Checkpoints for resuming a crawl whose worker died (0 disables)
+    checkpoint_every: int = Field(25, ge=0, description="Save crawl state every N finished pages")
+    
+    # Frontier seen-set (Bloom filter keeps memory bounded on very large sites)
+    frontier_bloom_filter: bool = Field(False, description="Track seen URLs in a Bloom filter instead of an exact set")
+    frontier_bloom_capacity: int = Field(1_000_000, ge=1000, description="Expected distinct URLs when the Bloom filter is enabled")
+    
     # Enhanced user agent configuration for whitelisting
     user_agent_mode: str = Field("default", description="User agent mode: default, custom, stealth")
     custom_user_agent: Optional[str] = Field(None, description="Custom user agent string for whitelisting")
@@ -66,6 +135,11 @@ class CrawlProgress(BaseModel):
     pages_failed: int = Field(0, description="Number of pages that failed to crawl")
     current_depth: int = Field(0, description="Current crawl depth")
     content_extracted: int = Field(0, description="Number of content pieces extracted")
+    pages_unchanged: int = Field(0, description="Number of pages skipped because they were unchanged since the last crawl")
+    pages_near_duplicate: int = Field(0, description="Number of pages not stored because they nearly duplicate stored content")
+    content_indexed: int = Field(0, description="Number of content pieces chunked and embedded while the crawl ran")
+    requests_blocked: int = Field(0, description="Number of sub-resource requests aborted by request interception")
+    bytes_saved: int = Field(0, description="Estimated bytes not downloaded because of request interception")
 
 class CrawlStatus(BaseModel):
     """Status of a crawl job."""
@@ -6,6 +6,7 @@ with Clerk.dev for multi-tenant applications.
 """
 
 import os
+import time
 import jwt
 import httpx
 import logging
@@ -288,6 +289,55 @@ def get_org_id_from_user(user: AuthUser) -> str:
         )
     return user.org_id
 
+# Short-lived tokens for clients that cannot send an Authorization header
+# (e.g. a browser EventSource), passed in the query string instead. They are
+# signed with STREAM_TOKEN_SECRET, a key of their own.
+
+STREAM_TOKEN_TTL = 60
+
+def _stream_token_secret() -> str:
+    secret = os.getenv("STREAM_TOKEN_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Stream tokens are not configured (STREAM_TOKEN_SECRET is not set)")
+    return secret
+
+def create_stream_token(user: AuthUser, resource: str, ttl: int = STREAM_TOKEN_TTL) -> str:
+    """
+    Sign a token that grants the user access to one resource for ttl seconds.
+    
+    Args:
+        user: The authenticated user
+        resource: What the token is valid for, e.g. "crawl-events:<crawl_id>"
+        ttl: Seconds until the token expires
+    """
+    now = int(time.time())
+    payload = {
+        "sub": user.user_id,
+        "org_id": user.org_id,
+        "org_role": user.org_role,
+        "res": resource,
+        "iat": now,
+        "exp": now + ttl
+    }
+    return jwt.encode(payload, _stream_token_secret(), algorithm="HS256")
+
+def verify_stream_token(token: str, resource: str) -> AuthUser:
+    """
+    User of a token from create_stream_token, if it is valid for the resource.
+    
+    Raises HTTPException (401) for invalid, expired or other resources' tokens.
+    """
+    try:
+        payload = jwt.decode(token, _stream_token_secret(), algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Stream token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid stream token")
+    
+    if payload.get("res") != resource or not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid stream token")
+    return AuthUser(user_id=payload["sub"], org_id=payload.get("org_id"), org_role=payload.get("org_role"))
+
 def verify_org_access(user: AuthUser, required_org_id: str) -> bool:
     """
     Verify that the user has access to the specified organization.
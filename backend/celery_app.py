@@ -41,6 +41,12 @@ celery_app.conf.update(
     # Worker configuration
     worker_prefetch_multiplier=1,
     
+    # Late-acked tasks (crawls) are re-delivered if not acknowledged within this
+    # window, so it must exceed the longest crawl
+    broker_transport_options={
+        "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT", str(12 * 3600)))
+    },
+    
     # Disable all result-related features
     task_ignore_result=True,
     result_backend=None,
@@ -0,0 +1,146 @@
+"""
+Per-domain boilerplate learning.
+
+The extractor's fixed tag, class and id rules miss site-specific marketing
+blocks inside the main content (calls to action, newsletter boxes, "related
+posts" lists, footers rendered in <main>). These end up in every page's text
+and in every chunk built from it.
+
+BoilerplateLearner counts on how many of a domain's pages each text block
+(a paragraph, heading or list item, hashed with its tag by the extractor)
+appears. Blocks found on most pages form the domain's template and are
+stripped from later pages during extraction. Counts are saved per domain, so
+the next crawl (and re-extraction) starts with the template already learned.
+
+Learning only runs for crawls that set learn_boilerplate. Incremental crawls
+compare the page text from before stripping, so a change to the learned
+template alone does not make pages look changed.
+"""
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+from urllib.parse import urlparse
+
+from api.models import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+def domain_key(domain: str) -> str:
+    """Host a template is stored under ("example.com", "docs.example.com")."""
+    if "://" not in domain:
+        domain = "https://" + domain
+    return urlparse(domain).netloc.lower()
+
+class BoilerplateLearner:
+    """Learns which text blocks repeat across a domain's pages."""
+    
+    def __init__(self,
+                 domain: str,
+                 db=None,
+                 org_id: Optional[str] = None,
+                 min_pages: int = 5,
+                 min_ratio: float = 0.6,
+                 counts: Optional[Dict[int, int]] = None,
+                 pages_seen: int = 0,
+                 history_pages: int = 200,
+                 max_tracked: int = 50000):
+        """
+        Initialize the learner.
+        
+        Args:
+            domain: Host the template belongs to
+            db: Database wrapper the template is saved with (None to never save)
+            org_id: Organization ID for multi-tenant isolation
+            min_pages: Pages a block must appear on before it counts as boilerplate
+            min_ratio: Share of the pages seen a block must appear on
+            counts: Pages each block hash appeared on, from earlier crawls
+            pages_seen: Pages the saved counts were collected from
+            history_pages: Saved counts are scaled down to this many pages, so the
+                current crawl can outvote a template the site no longer uses
+            max_tracked: Block hashes kept in memory (rare blocks are pruned first)
+        """
+        self.domain = domain
+        self.db = db
+        self.org_id = org_id
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+        self.max_tracked = max_tracked
+        
+        self.counts: Dict[int, int] = {}
+        self.pages_seen = 0
+        if counts and pages_seen:
+            scale = min(1.0, history_pages / pages_seen)
+            self.pages_seen = max(1, round(pages_seen * scale))
+            for block, count in counts.items():
+                scaled = round(count * scale)
+                if scaled > 0:
+                    self.counts[block] = scaled
+        
+        self.blocks: FrozenSet[int] = frozenset()
+        self.blocks_stripped = 0
+        self._refresh()
+    
+    @classmethod
+    def from_config(cls, config: CrawlConfig, db, domain: str, org_id: str) -> Optional["BoilerplateLearner"]:
+        """Learner for a crawl, seeded with the domain's saved template, or None if disabled."""
+        if not config.learn_boilerplate:
+            return None
+        return cls.load(db, domain, org_id,
+                        min_pages=config.boilerplate_min_pages,
+                        min_ratio=config.boilerplate_min_ratio)
+    
+    @classmethod
+    def load(cls, db, domain: str, org_id: str, **kwargs) -> "BoilerplateLearner":
+        """Learner with the counts saved for a domain by earlier crawls."""
+        domain = domain_key(domain)
+        saved = db.get_boilerplate_template(domain, org_id) or {}
+        learner = cls(domain, db, org_id, counts=saved.get("counts"), pages_seen=saved.get("pages_seen", 0), **kwargs)
+        if learner.blocks:
+            logger.info(f"🧱 Boilerplate template for {domain}: {len(learner.blocks)} blocks "
+                        f"(learned from {saved.get('pages_seen')} pages)")
+        return learner
+    
+    def observe(self, block_hashes: Iterable[int]):
+        """Count the blocks of one extracted page (hashes of all blocks, before stripping)."""
+        page_blocks = set(block_hashes)
+        if not page_blocks:
+            return
+        
+        self.pages_seen += 1
+        self.blocks_stripped += len(page_blocks & self.blocks)
+        for block in page_blocks:
+            self.counts[block] = self.counts.get(block, 0) + 1
+        
+        if len(self.counts) > self.max_tracked:
+            self._prune()
+        
+        # The template settles quickly; after the first pages refresh it periodically
+        if self.pages_seen <= 50 or self.pages_seen % 10 == 0:
+            self._refresh()
+    
+    def _refresh(self):
+        threshold = max(self.min_pages, self.min_ratio * self.pages_seen)
+        self.blocks = frozenset(block for block, count in self.counts.items() if count >= threshold)
+    
+    def _prune(self):
+        """Keep only the most frequent half of the tracked blocks, to bound memory."""
+        keep = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.max_tracked // 2]
+        self.counts = dict(keep)
+    
+    def to_template(self) -> Dict[str, Any]:
+        """Counts worth saving: blocks seen on a single page can never become boilerplate alone."""
+        return {
+            "counts": {block: count for block, count in self.counts.items() if count > 1},
+            "pages_seen": self.pages_seen
+        }
+    
+    def summary(self) -> Dict[str, int]:
+        return {
+            "pages_seen": self.pages_seen,
+            "template_blocks": len(self.blocks),
+            "blocks_stripped": self.blocks_stripped
+        }
+    
+    def flush(self):
+        """Save the domain's template for later crawls."""
+        if self.db is not None and self.pages_seen:
+            self.db.save_boilerplate_template(self.domain, self.to_template(), self.org_id)
@@ -0,0 +1,179 @@
+"""
+Warm Chromium pool for crawl workers.
+
+Launching Playwright and Chromium dominates short crawls, so each worker
+process keeps its browsers running between crawl tasks. A crawl leases a
+fresh, isolated browser context and closes it when done; the browser itself
+is recycled once it has served max_pages pages, passes max_age seconds or
+fails a health check.
+
+The pool uses the sync Playwright API, whose objects belong to the thread
+that started it, so only that thread can lease contexts from the pool.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+
+logger = logging.getLogger(__name__)
+
+class PooledBrowser:
+    """A launched browser and its usage counters."""
+    
+    def __init__(self, browser):
+        self.browser = browser
+        self.launched_at = time.monotonic()
+        self.pages = 0
+        self.leases = 0
+    
+    def count_page(self, _page=None):
+        self.pages += 1
+
+class BrowserPool:
+    """Browsers kept warm for the life of a worker process, keyed by launch options."""
+    
+    def __init__(self, max_pages: int = 500, max_age: float = 3600.0):
+        """
+        Initialize the pool.
+        
+        Args:
+            max_pages: Pages a browser may open before it is replaced
+            max_age: Seconds a browser may run before it is replaced
+        """
+        self.max_pages = max_pages
+        self.max_age = max_age
+        
+        self.playwright = None
+        self.browsers: Dict[str, PooledBrowser] = {}
+        self.owner_thread: Optional[int] = None
+        self.pid = os.getpid()
+        
+        self.launches = 0
+        self.leases = 0
+        self.recycled = 0
+    
+    def usable(self) -> bool:
+        """Whether the calling thread may lease from this pool."""
+        if self.pid != os.getpid():
+            # Inherited across fork: the browsers belong to the parent process
+            self.playwright = None
+            self.browsers = {}
+            self.owner_thread = None
+            self.pid = os.getpid()
+        return self.owner_thread is None or self.owner_thread == threading.get_ident()
+    
+    def running_here(self) -> bool:
+        """Whether the pool's sync Playwright is running on the calling thread."""
+        return self.playwright is not None and self.owner_thread == threading.get_ident()
+    
+    def _healthy(self, pooled: PooledBrowser) -> bool:
+        return (pooled.browser.is_connected() and
+                pooled.pages < self.max_pages and
+                time.monotonic() - pooled.launched_at < self.max_age)
+    
+    def _retire(self, key: str, reason: str):
+        pooled = self.browsers.pop(key, None)
+        if pooled is None:
+            return
+        self.recycled += 1
+        logger.info(f"♻️ Recycling browser after {pooled.leases} leases and {pooled.pages} pages ({reason})")
+        try:
+            pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close pooled browser: {str(e)}")
+    
+    def _browser(self, launch_options: Dict) -> PooledBrowser:
+        """A healthy browser for the launch options, launching one if needed."""
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+            self.owner_thread = threading.get_ident()
+        
+        key = json.dumps(launch_options, sort_keys=True)
+        pooled = self.browsers.get(key)
+        if pooled is not None and not self._healthy(pooled):
+            self._retire(key, "health check")
+            pooled = None
+        
+        if pooled is None:
+            pooled = PooledBrowser(self.playwright.chromium.launch(**launch_options))
+            self.browsers[key] = pooled
+            self.launches += 1
+            logger.info(f"🚀 Launched pooled browser ({len(self.browsers)} warm)")
+        return pooled
+    
+    @contextmanager
+    def lease(self, launch_options: Dict, context_options: Dict) -> Iterator:
+        """
+        Lease a fresh browser context; it is closed when the block exits.
+        
+        Args:
+            launch_options: Chromium launch options (browsers are shared per distinct options)
+            context_options: Options for the new context
+        """
+        if not self.usable():
+            raise RuntimeError("BrowserPool can only be used from the thread that started it")
+        
+        key = json.dumps(launch_options, sort_keys=True)
+        pooled = self._browser(launch_options)
+        try:
+            context = pooled.browser.new_context(**context_options)
+        except PlaywrightError as e:
+            # Browser died between health check and use: replace it once
+            logger.warning(f"Pooled browser failed to open a context: {str(e)}")
+            self._retire(key, "context error")
+            pooled = self._browser(launch_options)
+            context = pooled.browser.new_context(**context_options)
+        
+        context.on("page", pooled.count_page)
+        pooled.leases += 1
+        self.leases += 1
+        
+        try:
+            yield context
+        finally:
+            try:
+                context.close()
+            except PlaywrightError as e:
+                logger.warning(f"Failed to close leased context: {str(e)}")
+            if key in self.browsers and not self._healthy(pooled):
+                self._retire(key, "page or age limit")
+    
+    def close(self):
+        """Close every browser and stop Playwright."""
+        if not self.usable() or self.playwright is None:
+            return
+        for key in list(self.browsers):
+            self._retire(key, "pool closed")
+        try:
+            self.playwright.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop Playwright: {str(e)}")
+        self.playwright = None
+        self.owner_thread = None
+        logger.info(f"🧹 Browser pool closed: {self.launches} launches served {self.leases} leases")
+
+_pool: Optional[BrowserPool] = None
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """The calling worker process's browser pool (None when BROWSER_POOL=false)."""
+    global _pool
+    if os.getenv("BROWSER_POOL", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _pool is None:
+        _pool = BrowserPool(
+            max_pages=int(os.getenv("BROWSER_POOL_MAX_PAGES", "500")),
+            max_age=float(os.getenv("BROWSER_POOL_MAX_AGE", "3600"))
+        )
+    return _pool
+
+def close_browser_pool():
+    """Shut down the process's browser pool, if one was started."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
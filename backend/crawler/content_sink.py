@@ -0,0 +1,194 @@
+"""
+Buffered content writer for crawler engines.
+
+Crawlers hand extracted pages to a ContentSink instead of calling
+Database.save_content once per page. A background thread with its own
+database session writes them in multi-row inserts every batch_size pages or
+flush_interval seconds, whichever comes first. Written pages can be handed
+on to an on_written callback (the streaming RAG pipeline).
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from database.db import Database
+from database.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class ContentSink:
+    """Batches extracted content and writes it to Postgres on a background thread."""
+    
+    def __init__(self,
+                 db: Database,
+                 org_id: str,
+                 batch_size: int = 50,
+                 flush_interval: float = 5.0,
+                 session_factory: Callable = get_db_session,
+                 on_written: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Initialize the content sink.
+        
+        Args:
+            db: The crawler's database wrapper, used if the writer thread is unavailable
+            org_id: Organization ID for multi-tenant isolation
+            batch_size: Pages per multi-row insert
+            flush_interval: Maximum seconds a page waits in the buffer
+            session_factory: Creates the writer thread's own session
+            on_written: Called with each group of pages once they are saved; it may
+                block, which holds back the writer and, through the queue, the crawl
+        """
+        self.db = db
+        self.org_id = org_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self.on_written = on_written
+        
+        # Bounded so a slow database applies backpressure to the crawl
+        self._queue: queue.Queue = queue.Queue(maxsize=batch_size * 4)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._orphaned: List[Dict[str, Any]] = []  # left behind by a failed writer thread
+        
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches_written = 0
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="content-sink", daemon=True)
+                self._thread.start()
+    
+    def put(self, content_data: Dict[str, Any]):
+        """Queue one page of extracted content for writing."""
+        self._start()
+        if not self._thread.is_alive():
+            # Writer thread failed; fall back to direct writes on the caller's session
+            self._write_orphaned()
+            self._write(self.db, [content_data])
+            return
+        self._queue.put(content_data)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything queued so far has been written.
+        
+        Returns:
+            False if the timeout expired first
+        """
+        if self._thread is None:
+            return True
+        if not self._thread.is_alive():
+            self._write_orphaned()
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self):
+        """Write what is buffered and stop the writer thread."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._write_orphaned()
+        logger.info(f"💾 Content sink closed: {self.rows_written} rows in {self.batches_written} batches, "
+                    f"{self.rows_failed} failed")
+    
+    def _run(self):
+        session = self.session_factory()
+        db = Database(session)
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+                
+                if item is _STOP:
+                    self._write(db, batch)
+                    return
+                
+                if isinstance(item, threading.Event):
+                    self._write(db, batch)
+                    batch = []
+                    deadline = time.monotonic() + self.flush_interval
+                    item.set()
+                    continue
+                
+                if item is not None:
+                    batch.append(item)
+                
+                if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                    self._write(db, batch)
+                    batch = []
+                    deadline = time.monotonic() + self.flush_interval
+        except Exception as e:
+            logger.error(f"❌ Content sink writer stopped: {str(e)}", exc_info=True)
+            # Hand what the thread was holding back to the crawler thread
+            with self._lock:
+                self._orphaned.extend(batch)
+            self._drain_queue()
+        finally:
+            session.close()
+    
+    def _drain_queue(self):
+        """Move queued pages to the orphaned list, releasing any flush() waiters."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not _STOP:
+                with self._lock:
+                    self._orphaned.append(item)
+    
+    def _write_orphaned(self):
+        """Write pages left behind by a failed writer thread (called on the crawler thread)."""
+        self._drain_queue()
+        with self._lock:
+            orphaned, self._orphaned = self._orphaned, []
+        self._write(self.db, orphaned)
+    
+    def _write(self, db: Database, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        
+        if db.save_contents(batch, self.org_id):
+            self.rows_written += len(batch)
+            self.batches_written += 1
+            self._written(batch)
+            return
+        
+        # Retry row by row so one bad page does not lose the whole batch
+        logger.warning(f"⚠️ Batch insert of {len(batch)} pages failed, retrying one by one")
+        saved = []
+        for content_data in batch:
+            if db.save_content(content_data, self.org_id):
+                self.rows_written += 1
+                saved.append(content_data)
+            else:
+                self.rows_failed += 1
+                logger.error(f"❌ Failed to save content from {content_data.get('url')}")
+        self._written(saved)
+    
+    def _written(self, batch: List[Dict[str, Any]]):
+        if not self.on_written or not batch:
+            return
+        try:
+            self.on_written(batch)
+        except Exception as e:
+            # The pages are saved; downstream processing catches up later
+            logger.warning(f"⚠️ on_written callback failed for {len(batch)} pages: {str(e)}")
@@ -0,0 +1,531 @@
+"""
+Sharded crawl mode.
+
+One domain is crawled by several Celery tasks (shards) that share a frontier
+and seen-set in Redis. Shards lease URLs in batches, take turns on a shared
+per-host politeness slot and publish their progress, which CrawlerService
+combines into a single CrawlStatus. With adaptive rate limiting, shards also
+share each host's learned rate, so they back off and speed up together.
+"""
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from api.models import CrawlConfig, CrawlProgress
+from crawler.engine import PlaywrightCrawler
+from crawler.browser_pool import BrowserPool
+from crawler.frontier import RETRY_PRIORITY, canonicalize_url, url_priority
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Keeps the score bands of different depths apart (lastmod priorities are about -2e9)
+DEPTH_SCORE_STEP = 1e10
+
+# Shared crawl keys are dropped this long after the last write
+KEY_TTL = 7 * 24 * 3600
+
+# Atomically move a batch from the queue into the lease set
+LEASE_SCRIPT = """
+local entries = redis.call('ZPOPMIN', KEYS[1], ARGV[1])
+for i = 1, #entries, 2 do
+    redis.call('ZADD', KEYS[2], ARGV[2], entries[i])
+    redis.call('HSET', KEYS[3], entries[i], entries[i + 1])
+end
+return entries
+"""
+
+# Put leases whose shard stopped renewing them back on the queue and return
+# their page budget (ARGV[2] is 1 when the crawl has one)
+REQUEUE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, member in ipairs(expired) do
+    local score = redis.call('HGET', KEYS[2], member)
+    redis.call('ZREM', KEYS[1], member)
+    redis.call('HDEL', KEYS[2], member)
+    if score then
+        redis.call('ZADD', KEYS[3], score, member)
+    end
+end
+if #expired > 0 and ARGV[2] == '1' then
+    redis.call('DECRBY', KEYS[4], #expired)
+end
+return #expired
+"""
+
+# Renew the leases that are still the ones this shard took (same expiry); a
+# lease that expired was requeued and may have been taken by another shard
+RENEW_SCRIPT = """
+local renewed = {}
+for i = 3, #ARGV do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) == tonumber(ARGV[1]) then
+        redis.call('ZADD', KEYS[1], ARGV[2], ARGV[i])
+        renewed[#renewed + 1] = ARGV[i]
+    end
+end
+return renewed
+"""
+
+# Drop a lease only while it is still the one this shard took (same expiry)
+COMPLETE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if score and tonumber(score) == tonumber(ARGV[2]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+def get_redis():
+    """Redis client for crawl coordination."""
+    if not REDIS_AVAILABLE:
+        raise RuntimeError("The redis package is required for sharded crawls")
+    return redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+class ShardCoordinator:
+    """Shared Redis state of one sharded crawl."""
+    
+    def __init__(self, crawl_id: str, client=None):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            crawl_id: Crawl the shards belong to
+            client: Redis client (defaults to REDIS_URL)
+        """
+        self.crawl_id = crawl_id
+        self.redis = client or get_redis()
+        self.prefix = f"voiceforge:crawl:{crawl_id}"
+    
+    def key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+    
+    def start(self, shards: int):
+        """Reset shared state for a new sharded crawl."""
+        keys = [self.key(name) for name in
+                ("queue", "seen", "leased", "lease_scores", "reserved", "progress", "finished", "failed",
+                 "seeded", "cancelled", "host_rates")]
+        pipe = self.redis.pipeline()
+        pipe.delete(*keys)
+        pipe.set(self.key("shards"), shards, ex=KEY_TTL)
+        pipe.execute()
+    
+    @property
+    def shards(self) -> int:
+        return int(self.redis.get(self.key("shards")) or 1)
+    
+    @property
+    def seeded(self) -> bool:
+        return bool(self.redis.exists(self.key("seeded")))
+    
+    def mark_seeded(self):
+        self.redis.set(self.key("seeded"), 1, ex=KEY_TTL)
+    
+    @property
+    def cancelled(self) -> bool:
+        return bool(self.redis.exists(self.key("cancelled")))
+    
+    def cancel(self):
+        """Ask every shard to stop after its current page."""
+        self.redis.set(self.key("cancelled"), 1, ex=KEY_TTL)
+    
+    def acquire_host_slot(self, host: str, interval: float):
+        """
+        Wait for the host's shared politeness slot.
+        
+        At most one shard starts a request to the host per interval.
+        """
+        if interval <= 0:
+            return
+        slot_key = self.key(f"host:{host}")
+        while not self.redis.set(slot_key, 1, nx=True, px=int(interval * 1000)):
+            wait_ms = self.redis.pttl(slot_key)
+            time.sleep(max(wait_ms, 10) / 1000)
+    
+    def hold_host_slot(self, host: str, seconds: float):
+        """Keep every shard from requesting the host for a while (e.g. its Retry-After)."""
+        if seconds > 0:
+            self.redis.set(self.key(f"host:{host}"), 1, px=int(seconds * 1000))
+    
+    def host_rate(self, host: str) -> Optional[float]:
+        """Rate the shards learned for a host, if any has published one."""
+        rate = self.redis.hget(self.key("host_rates"), host)
+        return float(rate) if rate else None
+    
+    def publish_host_rate(self, host: str, rate: float):
+        """Share a host's learned rate with the other shards."""
+        pipe = self.redis.pipeline()
+        pipe.hset(self.key("host_rates"), host, rate)
+        pipe.expire(self.key("host_rates"), KEY_TTL)
+        pipe.execute()
+    
+    def publish_progress(self, shard: int, progress: CrawlProgress, finished: bool = False):
+        """Store one shard's progress."""
+        entry = progress.dict()
+        entry["finished"] = finished
+        pipe = self.redis.pipeline()
+        pipe.hset(self.key("progress"), str(shard), json.dumps(entry))
+        pipe.expire(self.key("progress"), KEY_TTL)
+        pipe.execute()
+    
+    def aggregate_progress(self) -> CrawlProgress:
+        """Combine the progress of all shards into one CrawlProgress."""
+        entries = [json.loads(value) for value in self.redis.hvals(self.key("progress"))]
+        totals = {}
+        for field in CrawlProgress.__fields__:
+            values = [entry.get(field, 0) for entry in entries]
+            totals[field] = max(values, default=0) if field == "current_depth" else sum(values)
+        
+        # Every shard reports the shared seen-set size
+        totals["pages_discovered"] = self.redis.scard(self.key("seen"))
+        return CrawlProgress(**totals)
+    
+    def finish_shard(self, shard: int, progress: CrawlProgress, failed: bool = False) -> bool:
+        """
+        Record that a shard has finished (or failed).
+        
+        Returns:
+            True for the last shard to finish, which finalizes the crawl
+        """
+        self.publish_progress(shard, progress, finished=True)
+        pipe = self.redis.pipeline()
+        pipe.incr(self.key("finished"))
+        pipe.expire(self.key("finished"), KEY_TTL)
+        if failed:
+            pipe.incr(self.key("failed"))
+            pipe.expire(self.key("failed"), KEY_TTL)
+        finished = pipe.execute()[0]
+        return finished >= self.shards
+    
+    @property
+    def failed_shards(self) -> int:
+        return int(self.redis.get(self.key("failed")) or 0)
+    
+    def cleanup(self):
+        """Drop the shared crawl state once the crawl is over (progress is kept until it expires)."""
+        self.redis.delete(*[self.key(name) for name in
+                            ("queue", "seen", "leased", "lease_scores", "reserved", "finished", "failed",
+                             "seeded", "cancelled", "host_rates")])
+
+class RedisFrontier:
+    """
+    Frontier shared by the shards of a crawl.
+    
+    Drop-in for CrawlFrontier in PlaywrightCrawler's sync loop. The queue is a
+    Redis sorted set ordered by depth and priority, and the seen-set is a Redis
+    set, so push() deduplicates across shards. URLs are leased in batches;
+    leases not renewed within lease_timeout are put back on the queue, so the
+    pages of a shard that died are crawled by the others.
+    """
+    
+    def __init__(self,
+                 coordinator: ShardCoordinator,
+                 batch_size: int = 10,
+                 lease_timeout: float = 300,
+                 max_pages: Optional[int] = None,
+                 idle_wait: float = 1.0):
+        """
+        Initialize the frontier.
+        
+        Args:
+            coordinator: Shared crawl state
+            batch_size: URLs leased per round trip
+            lease_timeout: Seconds before an unrenewed lease is requeued
+            max_pages: Page budget shared by all shards (unlimited if None)
+            idle_wait: Seconds to wait while other shards may still add URLs
+        """
+        self.coordinator = coordinator
+        self.redis = coordinator.redis
+        self.batch_size = batch_size
+        self.lease_timeout = lease_timeout
+        self.max_pages = max_pages
+        self.idle_wait = idle_wait
+        
+        self.queue_key = coordinator.key("queue")
+        self.seen_key = coordinator.key("seen")
+        self.leased_key = coordinator.key("leased")
+        self.lease_scores_key = coordinator.key("lease_scores")
+        self.reserved_key = coordinator.key("reserved")
+        
+        self._lease = self.redis.register_script(LEASE_SCRIPT)
+        self._requeue = self.redis.register_script(REQUEUE_SCRIPT)
+        self._renew = self.redis.register_script(RENEW_SCRIPT)
+        self._complete = self.redis.register_script(COMPLETE_SCRIPT)
+        self._batch: List[str] = []
+        self._current: Optional[str] = None
+        self._lease_expiry = 0.0  # Score of the leases this shard holds
+        self._known = set()  # URLs this shard pushed or popped
+        self.budget_exhausted = False
+    
+    @staticmethod
+    def _member(url: str, depth: int) -> str:
+        return f"{depth} {url}"
+    
+    def _score(self, url: str, depth: int, priority: Optional[float]) -> float:
+        return depth * DEPTH_SCORE_STEP + (url_priority(url) if priority is None else priority)
+    
+    def push(self, url: str, depth: int, priority: Optional[float] = None) -> bool:
+        """Enqueue a URL unless any shard has already seen it."""
+        return bool(self.push_many([url], depth, priority))
+    
+    def push_many(self, urls: List[str], depth: int, priority: Optional[float] = None) -> int:
+        """Enqueue URLs in two round trips; returns how many were new."""
+        urls = [canonicalize_url(url) for url in urls]
+        if not urls:
+            return 0
+        
+        pipe = self.redis.pipeline()
+        for url in urls:
+            pipe.sadd(self.seen_key, url)
+        added = pipe.execute()
+        
+        new_urls = [url for url, is_new in zip(urls, added) if is_new]
+        self._known.update(urls)
+        if new_urls:
+            pipe = self.redis.pipeline()
+            pipe.zadd(self.queue_key, {self._member(url, depth): self._score(url, depth, priority) for url in new_urls})
+            pipe.expire(self.queue_key, KEY_TTL)
+            pipe.expire(self.seen_key, KEY_TTL)
+            pipe.execute()
+        return len(new_urls)
+    
+    def _reserve(self, count: int) -> int:
+        """Reserve up to count pages of the shared page budget."""
+        if self.max_pages is None:
+            return count
+        reserved = self.redis.incrby(self.reserved_key, count)
+        over = min(max(reserved - self.max_pages, 0), count)
+        if over:
+            self.redis.decrby(self.reserved_key, over)
+        return count - over
+    
+    def _lease_batch(self) -> int:
+        self._requeue(keys=[self.leased_key, self.lease_scores_key, self.queue_key, self.reserved_key],
+                      args=[time.time(), int(self.max_pages is not None)])
+        
+        count = self._reserve(self.batch_size)
+        if count <= 0:
+            self.budget_exhausted = True
+            return 0
+        
+        self._lease_expiry = time.time() + self.lease_timeout
+        entries = self._lease(
+            keys=[self.queue_key, self.leased_key, self.lease_scores_key],
+            args=[count, repr(self._lease_expiry)]
+        )
+        members = entries[0::2]
+        if self.max_pages is not None and len(members) < count:
+            # Give back the budget that was not needed
+            self.redis.decrby(self.reserved_key, count - len(members))
+        self._batch.extend(members)
+        return len(members)
+    
+    def _complete_current(self):
+        if self._current is None:
+            return
+        # A lease that expired meanwhile may belong to another shard now
+        self._complete(keys=[self.leased_key, self.lease_scores_key], args=[self._current, repr(self._lease_expiry)])
+        self._current = None
+    
+    def has_work(self) -> bool:
+        """
+        Whether this shard has a URL to crawl.
+        
+        Waits while the queue is empty but seeding is unfinished or other
+        shards hold leases, since their pages may still add URLs.
+        """
+        if self._batch:
+            return True
+        self._complete_current()
+        
+        while not self.coordinator.cancelled and not self.budget_exhausted:
+            if self._lease_batch():
+                return True
+            if (self.coordinator.seeded and
+                    not self.redis.zcard(self.leased_key) and
+                    not self.redis.zcard(self.queue_key)):
+                return False
+            time.sleep(self.idle_wait)
+        return False
+    
+    def _renew_leases(self):
+        """Renew the leases this shard holds and drop the ones it lost (requeued after expiring)."""
+        if not self._batch:
+            return
+        expiry = time.time() + self.lease_timeout
+        renewed = set(self._renew(keys=[self.leased_key],
+                                  args=[repr(self._lease_expiry), repr(expiry)] + self._batch))
+        self._lease_expiry = expiry
+        if len(renewed) < len(self._batch):
+            logger.warning(f"⚠️ Lost {len(self._batch) - len(renewed)} expired leases to other shards")
+            self._batch = [member for member in self._batch if member in renewed]
+    
+    def pop(self) -> Tuple[str, int]:
+        """Take the next leased URL."""
+        self._complete_current()
+        self._renew_leases()
+        while not self._batch:
+            if not self.has_work():
+                raise IndexError("pop from an empty frontier")
+            self._renew_leases()
+        
+        member = self._batch.pop(0)
+        self._current = member
+        depth, url = member.split(' ', 1)
+        self._known.add(url)
+        return url, int(depth)
+    
+    def requeue(self, url: str, depth: int, priority: float = RETRY_PRIORITY):
+        """Queue the current URL again for any shard (e.g. after a 429) and return its page budget."""
+        pipe = self.redis.pipeline()
+        pipe.zadd(self.queue_key, {self._member(canonicalize_url(url), depth): self._score(url, depth, priority)})
+        if self.max_pages is not None:
+            pipe.decrby(self.reserved_key, 1)
+        pipe.execute()
+    
+    def release(self):
+        """Put this shard's leased URLs back on the queue and return their page budget (shard failed)."""
+        self._renew_leases()
+        members = ([self._current] if self._current is not None else []) + self._batch
+        self._batch = []
+        self._current = None
+        if not members:
+            return
+        
+        scores = self.redis.hmget(self.lease_scores_key, members)
+        requeued = {member: float(score) for member, score in zip(members, scores) if score is not None}
+        pipe = self.redis.pipeline()
+        pipe.zrem(self.leased_key, *members)
+        pipe.hdel(self.lease_scores_key, *members)
+        if requeued:
+            pipe.zadd(self.queue_key, requeued)
+        if self.max_pages is not None:
+            pipe.decrby(self.reserved_key, len(members))
+        pipe.execute()
+    
+    def mark_seen(self, url: str):
+        url = canonicalize_url(url)
+        self.redis.sadd(self.seen_key, url)
+        self._known.add(url)
+    
+    def __contains__(self, url: str) -> bool:
+        # Shard-local view only; push() deduplicates against the shared seen-set
+        return canonicalize_url(url) in self._known
+    
+    def __len__(self) -> int:
+        return len(self._batch) + self.redis.zcard(self.queue_key)
+    
+    def __bool__(self) -> bool:
+        return self.has_work()
+    
+    @property
+    def seen_count(self) -> int:
+        return self.redis.scard(self.seen_key)
+
+class ShardedCrawler(PlaywrightCrawler):
+    """PlaywrightCrawler running as one shard of a Redis-coordinated crawl."""
+    
+    def __init__(self, domain: str, config: CrawlConfig, db, crawl_id: str, org_id: str,
+                 shard: int, coordinator: Optional[ShardCoordinator] = None,
+                 browser_pool: Optional[BrowserPool] = None):
+        """
+        Initialize a crawl shard.
+        
+        Args:
+            domain: Domain to crawl
+            config: Crawl configuration shared by all shards
+            db: Database wrapper
+            crawl_id: Crawl the shard belongs to
+            org_id: Organization ID for multi-tenant isolation
+            shard: Shard number; shard 0 seeds the frontier from sitemaps
+            coordinator: Shared crawl state
+            browser_pool: The worker's warm browsers, if any
+        """
+        # Each shard crawls one page at a time; the shared Redis frontier
+        # replaces both the async mode and per-crawl checkpoints. Shards
+        # extract inline: a leased URL is completed on the next pop, so its
+        # links must be pushed before then for other shards to see them.
+        config = config.copy(update={"concurrency": 1, "checkpoint_every": 0, "extraction_workers": 0})
+        super().__init__(domain, config, db, crawl_id, org_id, browser_pool=browser_pool)
+        
+        self.shard = shard
+        self.coordinator = coordinator or ShardCoordinator(crawl_id)
+        self.host_interval = config.delay
+        self.frontier = RedisFrontier(
+            self.coordinator,
+            batch_size=config.shard_lease_size,
+            max_pages=config.max_pages
+        )
+        if self.progress_events:
+            # Every shard reports the shared seen-set size, so it must not be summed
+            self.progress_events.source = f"shard-{shard}"
+            self.progress_events.absolute_fields += ("pages_discovered",)
+    
+    def _seed_frontier(self, user_agent: str, use_sitemaps: bool = True):
+        """Shard 0 seeds from sitemaps; every shard loads robots.txt rules."""
+        try:
+            super()._seed_frontier(user_agent, use_sitemaps=use_sitemaps and self.shard == 0)
+        finally:
+            if self.shard == 0:
+                self.coordinator.mark_seeded()
+        
+        # Without adaptive rate limiting the shared host slot enforces the fixed delay
+        crawl_delay = self.robots.crawl_delay if self.robots and self.robots.crawl_delay else 0
+        self.host_interval = max(self.config.delay, crawl_delay)
+    
+    def _throttle(self, url: str):
+        """
+        Wait for the host's shared politeness slot.
+        
+        With adaptive rate limiting the slot is spaced by the host's rate as
+        learned by all shards together (robots.txt crawl-delay caps it).
+        """
+        host = urlparse(url).netloc.lower()
+        interval = self.host_interval
+        if self.rate_limits:
+            limiter = self.rate_limits.limiter(url)
+            shared_rate = self.coordinator.host_rate(host)
+            if shared_rate:
+                limiter.adopt_rate(shared_rate)
+            interval = 1.0 / limiter.rate
+        self.coordinator.acquire_host_slot(host, interval)
+    
+    def _record_response(self, url: str, status: Optional[int], started: float, headers: Optional[Dict] = None):
+        """Adapt the host's rate and publish it (and any Retry-After) to the other shards."""
+        super()._record_response(url, status, started, headers)
+        if not self.rate_limits:
+            return
+        host = urlparse(url).netloc.lower()
+        self.coordinator.publish_host_rate(host, self.rate_limits.limiter(url).rate)
+        retry_after = self.rate_limits.retry_after(headers)
+        if retry_after:
+            self.coordinator.hold_host_slot(host, retry_after)
+    
+    def _politeness_delay(self) -> float:
+        # Taken by _throttle() through the shared host slot instead
+        return 0.0
+    
+    def _enqueue_links(self, links: List[str], depth: int) -> int:
+        if depth > self.config.max_depth:
+            return 0
+        return self.frontier.push_many(links, depth)
+    
+    def _reached_max_pages(self) -> bool:
+        # The shared page budget is enforced when URLs are leased
+        return False
+    
+    def _maybe_checkpoint(self):
+        """Publish this shard's progress (the Redis frontier needs no checkpoint)."""
+        self.coordinator.publish_progress(self.shard, self.get_progress())
@@ -6,18 +6,90 @@ import time
 import re
 import asyncio
 import random
-from urllib.parse import urljoin, urlparse
-from typing import Set, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from typing import Set, Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime
 import playwright
 from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright
 
 from api.models import CrawlConfig, CrawlProgress
 from processor.extractor import ContentExtractor
+from crawler.frontier import CrawlFrontier, canonicalize_url, url_priority
+from crawler.fetch_tier import HttpFetchTier
+from crawler.request_blocking import RequestBlocker
+from crawler.incremental import IncrementalCrawlState
+from crawler.sitemap import SitemapSeeder
+from crawler.content_sink import ContentSink
+from crawler.rate_limiter import RateLimiterRegistry, THROTTLE_STATUSES
+from crawler.near_duplicates import NearDuplicateDetector
+from crawler.browser_pool import BrowserPool
+from crawler.progress_events import ProgressPublisher
+from crawler.page_archive import PageArchive
+from crawler.extraction_pool import ExtractionPool, parse_links
+from crawler.boilerplate import BoilerplateLearner
+from processor.rag_stream import RAGStreamPipeline
+from database.db import Database
 
 logger = logging.getLogger(__name__)
 
+# Browser flags used when crawling in stealth (demo/testing) mode
+STEALTH_BROWSER_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-features=TranslateUI",
+    "--disable-extensions",
+    "--no-sandbox",
+    "--disable-setuid-sandbox"
+]
+
+# Init script that hides automation indicators in stealth mode
+STEALTH_INIT_SCRIPT = """
+    // Hide webdriver property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Hide automation indicators
+    delete window.__playwright;
+    delete window.__pwInitScript;
+    
+    // Add realistic chrome object
+    window.chrome = {
+        runtime: {}
+    };
+    
+    // Realistic plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+"""
+
+# Simulated human scrolling used in stealth mode
+SCROLL_SCRIPT = """
+    new Promise((resolve) => {
+        let totalHeight = 0;
+        const distance = 100;
+        const timer = setInterval(() => {
+            const scrollHeight = document.body.scrollHeight;
+            window.scrollBy(0, distance);
+            totalHeight += distance;
+            
+            if(totalHeight >= scrollHeight){
+                clearInterval(timer);
+                resolve();
+            }
+        }, 100);
+    })
+"""
+
 class UserAgentGenerator:
     """Generates appropriate user agents for different crawling scenarios."""
     
@@ -59,8 +131,9 @@ class UserAgentGenerator:
 class PlaywrightCrawler:
     """Crawler implementation using Playwright for JavaScript rendering."""
     
-    def __init__(self, domain: str, config: CrawlConfig, db, crawl_id: str, org_id: str):
-        """Initialize the crawler."""
+    def __init__(self, domain: str, config: CrawlConfig, db, crawl_id: str, org_id: str,
+                 browser_pool: Optional[BrowserPool] = None):
+        """Initialize the crawler (browser_pool: the worker's warm browsers, if any)."""
         self.domain = self._normalize_domain(domain)
         self.config = config
         self.db = db
@@ -68,16 +141,44 @@ class PlaywrightCrawler:
         self.org_id = org_id  # Add org_id for multi-tenant isolation
         
         self.visited_urls = set()
-        self.queue = []
-        self.discovered_urls = set()
+        self.frontier = CrawlFrontier(
+            use_bloom_filter=config.frontier_bloom_filter,
+            bloom_capacity=config.frontier_bloom_capacity,
+            randomize=config.user_agent_mode == "stealth"
+        )
         self.failed_urls = set()
+        self.skipped_urls = set()  # non-HTML responses, kept so a resumed crawl does not fetch them again
         self.current_depth = 0
         self.content_extracted = 0
         
         self.running = False
         self.playwright = None
         self.browser = None
+        self.browser_pool = browser_pool
         self.extractor = ContentExtractor()
+        self.extraction_pool = ExtractionPool.from_config(config)
+        self.pending_extractions = deque()  # pages handed to the extraction pool in sync mode
+        self.fetch_tier = None
+        self.request_blocker = RequestBlocker.from_config(config)
+        self.incremental = None
+        self.near_duplicates: Optional[NearDuplicateDetector] = None
+        self.boilerplate: Optional[BoilerplateLearner] = None
+        self.page_archive = PageArchive.from_config(config, org_id, crawl_id)
+        self.rag_stream = RAGStreamPipeline.from_config(config, org_id)
+        self.content_sink = ContentSink(
+            db, org_id,
+            batch_size=config.write_batch_size,
+            flush_interval=config.write_flush_interval,
+            on_written=self.rag_stream.submit if self.rag_stream else None
+        )
+        self.rate_limits: Optional[RateLimiterRegistry] = None
+        self.robots = None
+        self.sitemap_urls_seeded = 0
+        self.in_flight: Dict[str, Tuple[int, float]] = {}  # url -> (depth, score), pages being fetched in async mode
+        self.throttle_retries: Dict[str, int] = {}  # url -> times requeued after 429/503
+        self.last_checkpoint = 0
+        self.checkpoint_writing = False
+        self.progress_events = ProgressPublisher.for_crawl(crawl_id, org_id)
     
     def _normalize_domain(self, domain: str) -> str:
         """Normalize domain URL."""
@@ -109,8 +210,12 @@ class PlaywrightCrawler:
         if not url.startswith(('http://', 'https://')):
             return False
         
-        # Skip already visited URLs
-        if url in self.visited_urls or url in self.discovered_urls:
+        # Skip URLs already queued or visited
+        if url in self.visited_urls or url in self.frontier:
+            return False
+        
+        # Apply robots.txt disallow rules
+        if self.robots and not self.robots.allowed(url):
             return False
         
         # Check if URL is from the same domain
@@ -134,43 +239,528 @@ class PlaywrightCrawler:
         
         return True
     
+    def _parse_links(self, html: str, base_url: str) -> List[str]:
+        """Parse all HTTP(S) links from HTML, canonicalized and deduplicated."""
+        return parse_links(html, base_url)
+    
     def _extract_links(self, html: str, base_url: str) -> List[str]:
-        """Extract and normalize links from HTML."""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-        
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            # Normalize URL
-            try:
-                absolute_url = urljoin(base_url, href)
-                # Remove fragments
-                absolute_url = absolute_url.split('#')[0]
-                # Remove trailing slash for consistency
-                absolute_url = absolute_url.rstrip('/')
-                
-                if self._should_crawl_url(absolute_url):
-                    links.append(absolute_url)
-                    self.discovered_urls.add(absolute_url)
-            except Exception as e:
-                logger.warning(f"Failed to process URL {href}: {str(e)}")
-        
-        return links
+        """Extract and normalize links from HTML that should be crawled."""
+        return [link for link in self._parse_links(html, base_url) if self._should_crawl_url(link)]
     
     def get_progress(self) -> CrawlProgress:
         """Get the current progress of the crawl."""
         return CrawlProgress(
             pages_crawled=len(self.visited_urls),
-            pages_discovered=len(self.discovered_urls),
+            pages_discovered=self.frontier.seen_count,
             pages_failed=len(self.failed_urls),
             current_depth=self.current_depth,
-            content_extracted=self.content_extracted
+            content_extracted=self.content_extracted,
+            pages_unchanged=self.incremental.pages_skipped if self.incremental else 0,
+            pages_near_duplicate=self.near_duplicates.pages_suppressed if self.near_duplicates else 0,
+            content_indexed=self.rag_stream.contents_indexed if self.rag_stream else 0,
+            requests_blocked=self.request_blocker.requests_blocked,
+            bytes_saved=self.request_blocker.bytes_saved
         )
     
     def stop(self):
         """Stop the crawler."""
         self.running = False
     
+    def _launch_options(self) -> Dict:
+        """Browser launch options for the configured user agent mode."""
+        if self.config.user_agent_mode == "stealth":
+            return {"headless": True, "args": STEALTH_BROWSER_ARGS}
+        return {"headless": True}
+    
+    def _context_options(self, user_agent: str) -> Dict:
+        """Browser context options for the configured user agent mode."""
+        if self.config.user_agent_mode == "stealth":
+            return {
+                "viewport": {'width': 1366, 'height': 768},
+                "user_agent": user_agent,
+                "locale": 'en-US',
+                "timezone_id": 'America/New_York'
+            }
+        return {"user_agent": user_agent}
+    
+    @contextmanager
+    def _browser_context(self, user_agent: str):
+        """Fresh browser context, leased from the worker's warm pool when there is one."""
+        if self.browser_pool and self.browser_pool.usable():
+            with self.browser_pool.lease(self._launch_options(), self._context_options(user_agent)) as context:
+                yield context
+            return
+        
+        with sync_playwright() as self.playwright:
+            self.browser = self.playwright.chromium.launch(**self._launch_options())
+            context = self.browser.new_context(**self._context_options(user_agent))
+            try:
+                yield context
+            finally:
+                context.close()
+                self.browser.close()
+    
+    def _request_headers(self, depth: int) -> Dict[str, str]:
+        """Extra HTTP headers sent with each page request."""
+        if self.config.user_agent_mode == "stealth":
+            # Stealth mode headers for demo purposes
+            return {
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept-Encoding": "gzip, deflate, br",
+                "DNT": "1",
+                "Connection": "keep-alive",
+                "Upgrade-Insecure-Requests": "1",
+                "Sec-Fetch-Dest": "document",
+                "Sec-Fetch-Mode": "navigate",
+                "Sec-Fetch-Site": "none" if depth == 0 else "same-origin",
+                "Sec-Fetch-User": "?1" if depth == 0 else "?0",
+                "Cache-Control": "max-age=0"
+            }
+        
+        # Standard crawler headers for legitimate crawling
+        return {
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        }
+    
+    def _politeness_delay(self) -> float:
+        """Randomized delay to wait after a successful page fetch."""
+        if self.rate_limits and self.config.user_agent_mode != "stealth":
+            # The per-host rate limiter spaces requests before they are sent
+            return 0.0
+        
+        base_delay = self.config.delay
+        if self.config.user_agent_mode == "stealth":
+            # More aggressive randomization for stealth mode
+            delay = base_delay + random.uniform(0.5, 3.0)
+        else:
+            # Randomize delay between 50% and 150% of base delay
+            delay = random.uniform(base_delay * 0.5, base_delay * 1.5)
+        
+        # Never go below the robots.txt crawl-delay
+        if self.robots and self.robots.crawl_delay:
+            delay = max(delay, self.robots.crawl_delay)
+        return delay
+    
+    def _error_delay(self) -> float:
+        """Randomized delay to wait after a failed page fetch."""
+        if self.rate_limits and self.config.user_agent_mode != "stealth":
+            # Failures already slowed the host's rate limiter down
+            return 0.0
+        if self.config.user_agent_mode == "stealth":
+            return random.uniform(5.0, 15.0)
+        return random.uniform(1.0, 4.0)
+    
+    def _process_html(self, url: str, html: str, content_data: Optional[Dict] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      page_links: Optional[List[str]] = None) -> List[str]:
+        """
+        Extract and store content from a fetched page.
+        
+        Args:
+            url: The page URL
+            html: The page HTML
+            content_data: Already extracted content (HTTP tier), if any
+            headers: Response headers, used for incremental crawl validators
+            page_links: Links already parsed with content_data (extraction pool), if any
+        
+        Returns:
+            Newly discovered links to enqueue one level deeper
+        """
+        # Mark as visited
+        self.visited_urls.add(url)
+        
+        # Keep the raw page so it can be re-extracted without re-crawling
+        archive_key = self.page_archive.write(url, html, headers) if self.page_archive else None
+        
+        # Extract content
+        if content_data is None:
+            content_data = self.extractor.extract(
+                url=url,
+                html=html,
+                domain=self._get_base_domain(url),
+                boilerplate=self._boilerplate_blocks()
+            )
+        
+        if page_links is None:
+            page_links = self._parse_links(html, url)
+        return self._store_extracted(url, content_data, page_links, headers, archive_key)
+    
+    def _store_extracted(self, url: str, content_data: Optional[Dict], page_links: List[str],
+                         headers: Optional[Dict[str, str]], archive_key: Optional[str]) -> List[str]:
+        """Store an extracted page and return its links that should be crawled."""
+        if content_data and self.boilerplate:
+            self.boilerplate.observe(content_data.pop("block_hashes", ()))
+        content_id = None
+        # The incremental key is the text before boilerplate stripping
+        page_text = (content_data.pop("unstripped_text", None) or content_data['text']) if content_data else None
+        
+        if content_data and self.incremental and self.incremental.is_unchanged(url, page_text):
+            # Same text as last crawl: skip saving so it is not re-chunked or re-embedded
+            logger.info(f"♻️ Unchanged since last crawl: {url}")
+        elif content_data and self.near_duplicates and self.near_duplicates.suppress(url, content_data):
+            # Linked to the page it duplicates instead of being stored, chunked and embedded
+            pass
+        elif content_data:
+            # Save content to database with org_id
+            content_data['crawl_id'] = self.crawl_id
+            content_data['org_id'] = self.org_id  # Add org_id for multi-tenant isolation
+            content_data['extracted_at'] = datetime.now()
+            if self.page_archive:
+                self.page_archive.attach(content_data, archive_key)
+            self.content_sink.put(content_data)
+            self.content_extracted += 1
+            content_id = content_data['content_id']
+            logger.info(f"✅ Content extracted from {url}")
+        
+        if self.incremental:
+            self.incremental.record(url, headers, page_text, page_links, content_id)
+        
+        # Links for further crawling
+        return [link for link in page_links if self._should_crawl_url(link)]
+    
+    def _boilerplate_blocks(self) -> Optional[FrozenSet[int]]:
+        """Block hashes of the domain's boilerplate template, or None when not learning."""
+        return self.boilerplate.blocks if self.boilerplate else None
+    
+    def _extraction_failed(self, url: str, html: str, error: Exception) -> Tuple[Optional[Dict], List[str]]:
+        """Extract inline a page the extraction pool failed on."""
+        logger.warning(f"⚠️ Extraction pool failed on {url}, extracting inline: {str(error)}")
+        content_data = self.extractor.extract(url=url, html=html, domain=self._get_base_domain(url),
+                                              boilerplate=self._boilerplate_blocks())
+        return content_data, self._parse_links(html, url)
+    
+    def _submit_extraction(self, url: str, html: str, headers: Optional[Dict[str, str]], depth: int):
+        """
+        Hand a rendered page to the extraction pool (sync mode).
+        
+        The page is stored and its links are enqueued by _collect_extractions.
+        Blocks while the pool already has its maximum of pages in flight.
+        """
+        self.visited_urls.add(url)
+        archive_key = self.page_archive.write(url, html, headers) if self.page_archive else None
+        future = self.extraction_pool.submit(url, html, self._get_base_domain(url), self._boilerplate_blocks())
+        self.pending_extractions.append((future, url, html, headers, depth, archive_key))
+    
+    def _collect_extractions(self, wait: bool = False):
+        """
+        Store pages the extraction pool has finished, in submission order.
+        
+        Args:
+            wait: Wait until every pending page is extracted
+        """
+        while self.pending_extractions:
+            future, url, html, headers, depth, archive_key = self.pending_extractions[0]
+            if not wait and not future.done():
+                return
+            self.pending_extractions.popleft()
+            
+            try:
+                content_data, page_links = future.result()
+            except Exception as e:
+                content_data, page_links = self._extraction_failed(url, html, e)
+            
+            links = self._store_extracted(url, content_data, page_links, headers, archive_key)
+            self._enqueue_links(links, depth + 1)
+    
+    async def _process_html_async(self, url: str, html: str, headers: Optional[Dict[str, str]] = None) -> List[str]:
+        """_process_html with extraction in the pool, so other pages are fetched meanwhile."""
+        if not (self.extraction_pool and self.extraction_pool.running):
+            return self._process_html(url, html, headers=headers)
+        
+        self.visited_urls.add(url)
+        archive_key = self.page_archive.write(url, html, headers) if self.page_archive else None
+        try:
+            content_data, page_links = await self.extraction_pool.extract_async(
+                url, html, self._get_base_domain(url), self._boilerplate_blocks()
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            content_data, page_links = self._extraction_failed(url, html, e)
+        
+        return self._store_extracted(url, content_data, page_links, headers, archive_key)
+    
+    def _create_fetch_tier(self, user_agent: str) -> Optional[HttpFetchTier]:
+        """Create the HTTP-first fetch tier unless every page must be rendered."""
+        if self.config.fetch_mode != "auto" or self.config.user_agent_mode == "stealth":
+            return None
+        return HttpFetchTier(
+            user_agent=user_agent,
+            headers=self._request_headers(depth=1),
+            timeout=self.config.timeout,
+            extractor=self.extractor,
+            min_text_chars=self.config.http_min_text_chars,
+            max_connections=max(self.config.concurrency * 2, 4),
+            boilerplate=self.boilerplate,
+            extraction_pool=self.extraction_pool
+        )
+    
+    def _conditional_headers(self, url: str) -> Optional[Dict[str, str]]:
+        """Validators from the previous crawl for an incremental re-crawl."""
+        if not self.incremental:
+            return None
+        return self.incremental.conditional_headers(url)
+    
+    def _handle_http_result(self, url: str, result: Dict, depth: int = 0) -> Optional[List[str]]:
+        """
+        Apply an HTTP tier result.
+        
+        A page reached through redirects is stored under its final URL, and
+        skipped if that URL is outside the crawl's scope. A throttled page
+        (429/503) is queued again.
+        
+        Returns:
+            Links discovered on the page, or None if the browser must render it
+        """
+        if result["status"] in THROTTLE_STATUSES:
+            self._retry_throttled(url, depth, result["status"])
+            return []
+        
+        if result["render"]:
+            return None
+        
+        if result["status"] == 304 and self.incremental:
+            # Not modified: reuse the links stored on the previous crawl
+            logger.info(f"♻️ Not modified since last crawl: {url}")
+            self.visited_urls.add(url)
+            return [link for link in self.incremental.not_modified(url) if self._should_crawl_url(link)]
+        
+        if result["html"] is None:
+            # 404/410 or non-HTML response: nothing to render
+            if result["status"] and result["status"] >= 400:
+                logger.warning(f"HTTP {result['status']} for {url}")
+                self.failed_urls.add(url)
+            elif result["reason"] == "not_html":
+                self.skipped_urls.add(url)
+            return []
+        
+        final_url = canonicalize_url(result.get("url") or url)
+        if final_url != url:
+            self.visited_urls.add(url)
+            if not self._should_crawl_url(final_url):
+                # Redirected out of the crawl's scope, or to a page already queued or crawled
+                logger.info(f"↪️ {url} redirects to {final_url}, skipped")
+                return []
+            url = final_url
+        
+        logger.info(f"⚡ Fetched without rendering: {url}")
+        return self._process_html(url, result["html"], result["content_data"], result.get("headers"),
+                                  page_links=result.get("links"))
+    
+    def _retry_throttled(self, url: str, depth: int, status: int):
+        """
+        Queue a page the host throttled (429/503) to be fetched again.
+        
+        It goes after the other pages of its depth, and the host's limiter
+        holds it until any Retry-After has passed. After throttle_retries
+        attempts, or once the host is given up on, the page counts as failed.
+        """
+        attempts = self.throttle_retries.get(url, 0)
+        if attempts >= self.config.throttle_retries or self._host_given_up(url):
+            logger.warning(f"HTTP {status} for {url}, giving up after {attempts} retries")
+            self.failed_urls.add(url)
+            return
+        self.throttle_retries[url] = attempts + 1
+        logger.info(f"🐢 HTTP {status} for {url}, retrying later ({attempts + 1}/{self.config.throttle_retries})")
+        self.frontier.requeue(url, depth)
+    
+    def _host_given_up(self, url: str) -> bool:
+        """Whether the URL's host asked to wait longer than max_retry_after."""
+        return bool(self.rate_limits and self.rate_limits.gave_up(url))
+    
+    def _seed_frontier(self, user_agent: str, use_sitemaps: bool = True):
+        """
+        Load robots.txt rules and seed the frontier from the site's sitemaps.
+        
+        Sitemap URLs are queued as depth-0 seeds, most recently modified first,
+        so a crawl capped by max_pages reaches content pages before navigation.
+        """
+        use_sitemaps = use_sitemaps and self.config.use_sitemaps
+        if not (self.config.respect_robots_txt or use_sitemaps):
+            return
+        
+        seeder = SitemapSeeder(user_agent, timeout=self.config.timeout, max_urls=self.config.sitemap_max_urls)
+        try:
+            rules = seeder.fetch_robots(self.domain)
+            if self.config.respect_robots_txt:
+                self.robots = rules
+                if rules and self.rate_limits:
+                    self.rate_limits.set_crawl_delay(rules.crawl_delay)
+            
+            if not use_sitemaps:
+                return
+            
+            sitemap_urls = rules.sitemaps if rules and rules.sitemaps else [f"{self.domain}/sitemap.xml"]
+            for url, lastmod in seeder.iter_urls(sitemap_urls):
+                url = canonicalize_url(url)
+                if not self._should_crawl_url(url):
+                    continue
+                # Dated pages sort before undated ones, newest first
+                priority = -lastmod.timestamp() if lastmod else url_priority(url)
+                if self.frontier.push(url, 0, priority):
+                    self.sitemap_urls_seeded += 1
+            
+            logger.info(f"🗺️ Seeded {self.sitemap_urls_seeded} URLs from {seeder.sitemaps_fetched} sitemaps")
+        finally:
+            seeder.close()
+    
+    def _create_rate_limits(self) -> Optional[RateLimiterRegistry]:
+        """Per-host rate limiters, starting from rates learned on earlier crawls."""
+        if not self.config.adaptive_rate_limit:
+            return None
+        
+        root_host = urlparse(self._get_base_domain(self.domain)).netloc
+        initial_rate = 1.0 / self.config.delay if self.config.delay > 0 else self.config.max_host_rate
+        return RateLimiterRegistry(
+            initial_rate=min(initial_rate, self.config.max_host_rate),
+            min_rate=self.config.min_host_rate,
+            max_rate=self.config.max_host_rate,
+            burst=self.config.per_host_concurrency if self.config.concurrency > 1 else 1,
+            learned_rates=self.db.get_host_rates(root_host, self.org_id),
+            max_retry_after=self.config.max_retry_after
+        )
+    
+    def _throttle(self, url: str):
+        """Wait until the URL's host may receive another request."""
+        if self.rate_limits:
+            self.rate_limits.acquire(url)
+    
+    async def _throttle_async(self, url: str):
+        if self.rate_limits:
+            await self.rate_limits.acquire_async(url)
+    
+    def _record_response(self, url: str, status: Optional[int], started: float, headers: Optional[Dict] = None):
+        """Feed a response (status None for a failed request) to the host's rate limiter."""
+        if self.rate_limits:
+            self.rate_limits.record(url, status, time.monotonic() - started, headers)
+    
+    def _pages_done(self) -> int:
+        return len(self.visited_urls) + len(self.failed_urls)
+    
+    def _checkpoint_state(self) -> Dict:
+        """Serializable crawl state: frontier, visited, failed and skipped URLs, counters."""
+        frontier = [list(entry) for entry in self.frontier.snapshot()]
+        # Pages still being fetched are queued again on resume, with the score they were popped with
+        frontier.extend([url, depth, score] for url, (depth, score) in self.in_flight.items())
+        return {
+            "frontier": frontier,
+            "visited": list(self.visited_urls),
+            "failed": list(self.failed_urls),
+            "skipped": list(self.skipped_urls),
+            "counters": {
+                "content_extracted": self.content_extracted,
+                "current_depth": self.current_depth,
+                "sitemap_urls_seeded": self.sitemap_urls_seeded
+            }
+        }
+    
+    def _checkpoint_due(self) -> Optional[int]:
+        """Pages done if config.checkpoint_every pages finished since the last checkpoint, else None."""
+        if not self.config.checkpoint_every:
+            return None
+        pages_done = self._pages_done()
+        if pages_done - self.last_checkpoint < self.config.checkpoint_every:
+            return None
+        return pages_done
+    
+    def _maybe_checkpoint(self):
+        """Save a checkpoint every config.checkpoint_every finished pages."""
+        pages_done = self._checkpoint_due()
+        if pages_done is None:
+            return
+        
+        # Content and validators must not lag behind the pages the checkpoint marks as done
+        self._collect_extractions(wait=True)
+        self.content_sink.flush()
+        if self.incremental:
+            self.incremental.flush()
+        self.db.save_crawl_checkpoint(self.crawl_id, self._checkpoint_state(), pages_done, self.org_id)
+        self.last_checkpoint = pages_done
+        logger.info(f"💾 Checkpoint saved after {pages_done} pages ({len(self.frontier)} queued)")
+    
+    async def _maybe_checkpoint_async(self):
+        """
+        _maybe_checkpoint for the async workers.
+        
+        The state is snapshotted on the event loop, where it is consistent,
+        and written from a thread on its own session, so fetching continues
+        while Postgres is written. One checkpoint is written at a time.
+        """
+        pages_done = self._checkpoint_due()
+        if pages_done is None or self.checkpoint_writing:
+            return
+        
+        self.checkpoint_writing = True
+        self.last_checkpoint = pages_done
+        try:
+            state = self._checkpoint_state()
+            validators = self.incremental.take_pending() if self.incremental else []
+            await asyncio.to_thread(self._write_checkpoint, state, validators, pages_done)
+            logger.info(f"💾 Checkpoint saved after {pages_done} pages ({len(state['frontier'])} queued)")
+        finally:
+            self.checkpoint_writing = False
+    
+    def _write_checkpoint(self, state: Dict, validators: List[Dict], pages_done: int):
+        """Write a checkpoint snapshot after the content and validators it covers (worker thread)."""
+        self.content_sink.flush()
+        session = self.content_sink.session_factory()
+        try:
+            db = Database(session)
+            if validators:
+                db.save_page_validators(validators, self.org_id)
+            db.save_crawl_checkpoint(self.crawl_id, state, pages_done, self.org_id)
+        finally:
+            session.close()
+    
+    def _publish_progress(self, force: bool = False):
+        """Push a progress delta to subscribers of the crawl's event channel."""
+        if self.progress_events:
+            self.progress_events.publish(self.get_progress(), force=force)
+    
+    def _restore_checkpoint(self, checkpoint: Dict) -> bool:
+        """
+        Restore crawl state saved by an earlier run of the same crawl.
+        
+        Returns:
+            True if there was a checkpoint to resume from
+        """
+        if not checkpoint or not checkpoint.get("state"):
+            return False
+        
+        state = checkpoint["state"]
+        self.visited_urls = set(state.get("visited", []))
+        self.failed_urls = set(state.get("failed", []))
+        self.skipped_urls = set(state.get("skipped", []))
+        self.frontier.restore(
+            [(url, depth, score) for url, depth, score in state.get("frontier", [])],
+            seen_urls=self.visited_urls | self.failed_urls | self.skipped_urls
+        )
+        
+        counters = state.get("counters", {})
+        self.content_extracted = counters.get("content_extracted", 0)
+        self.current_depth = counters.get("current_depth", 0)
+        self.sitemap_urls_seeded = counters.get("sitemap_urls_seeded", 0)
+        self.last_checkpoint = self._pages_done()
+        
+        logger.warning(f"♻️ Resuming crawl {self.crawl_id} from checkpoint: "
+                       f"{len(self.visited_urls)} pages done, {len(self.frontier)} queued")
+        return True
+    
+    def _enqueue_links(self, links: List[str], depth: int) -> int:
+        """Push links onto the frontier unless they exceed max_depth."""
+        if depth > self.config.max_depth:
+            return 0
+        return sum(1 for link in links if self.frontier.push(link, depth))
+    
+    def _reached_max_pages(self) -> bool:
+        """Whether the crawl has used up its max_pages budget."""
+        return (self.config.max_pages is not None and
+                len(self.visited_urls) >= self.config.max_pages)
+    
     def crawl(self):
         """Run the crawler with configurable user agent and enhanced capabilities."""
         self.running = True
@@ -185,67 +775,129 @@ class PlaywrightCrawler:
         logger.warning(f"  max_pages: {self.config.max_pages}")
         logger.warning(f"  max_depth: {self.config.max_depth}")
         logger.warning(f"  delay: {self.config.delay}")
+        logger.warning(f"  concurrency: {self.config.concurrency} (per host: {self.config.per_host_concurrency})")
+        
+        self.rate_limits = self._create_rate_limits()
         
-        # Start with the domain URL
-        self.queue = [(self.domain, 0)]  # (url, depth)
-        self.discovered_urls.add(self.domain)
+        # Resume from a checkpoint of an interrupted run of this crawl, if any
+        checkpoint = None
+        if self.config.checkpoint_every:
+            checkpoint = self.db.get_crawl_checkpoint(self.crawl_id, self.org_id)
+        
+        if self._restore_checkpoint(checkpoint):
+            # Robots rules are not checkpointed; the frontier already holds the sitemap seeds
+            self._seed_frontier(user_agent, use_sitemaps=False)
+        else:
+            # Start with the domain URL plus anything its sitemaps list
+            self.frontier.push(self.domain, 0)
+            self._seed_frontier(user_agent)
         
         # Add randomized initial delay to avoid detection patterns
         initial_delay = random.uniform(1.0, 3.0)
         logger.info(f"⏳ Initial delay: {initial_delay:.2f}s before starting crawl")
         time.sleep(initial_delay)
         
-        with sync_playwright() as self.playwright:
-            # Choose browser launch mode based on user agent type
-            if self.config.user_agent_mode == "stealth":
-                # Use stealth mode for demo/testing purposes
-                browser_args = [
-                    "--no-first-run",
-                    "--no-default-browser-check",
-                    "--disable-background-timer-throttling",
-                    "--disable-renderer-backgrounding",
-                    "--disable-backgrounding-occluded-windows",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-features=TranslateUI",
-                    "--disable-extensions",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox"
-                ]
-                
-                self.browser = self.playwright.chromium.launch(
-                    headless=True,
-                    args=browser_args
-                )
-                
-                context = self.browser.new_context(
-                    viewport={'width': 1366, 'height': 768},
-                    user_agent=user_agent,
-                    locale='en-US',
-                    timezone_id='America/New_York'
-                )
+        if self.config.incremental:
+            self.incremental = IncrementalCrawlState(self.db, self.domain, self.org_id)
+        
+        self.near_duplicates = NearDuplicateDetector.from_config(self.config, self.db, self.crawl_id, self.org_id)
+        self.boilerplate = BoilerplateLearner.from_config(self.config, self.db, self.domain, self.org_id)
+        
+        try:
+            if self.config.concurrency > 1 and self.browser_pool and self.browser_pool.running_here():
+                # The pool's sync Playwright owns this thread's event loop slot,
+                # so the async crawl runs its own loop on a separate thread
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    executor.submit(asyncio.run, self._crawl_async(user_agent)).result()
+            elif self.config.concurrency > 1:
+                # Concurrent pages sharing one browser context
+                asyncio.run(self._crawl_async(user_agent))
             else:
-                # Standard crawler mode for legitimate crawling
-                self.browser = self.playwright.chromium.launch(headless=True)
-                
-                context = self.browser.new_context(
-                    user_agent=user_agent
-                )
+                self._crawl_sync(user_agent)
+        finally:
+            if self.extraction_pool:
+                self.extraction_pool.close()
+            # Write buffered content, also when the crawl was stopped or cancelled
+            self.content_sink.close()
+            if self.rag_stream:
+                # Finish indexing what was saved so the crawl ends fully searchable
+                self.rag_stream.close()
+            if self.rate_limits:
+                # Next crawl of these hosts starts at the rate they settled on
+                self.db.save_host_rates(self.rate_limits.settled_rates(), self.org_id)
+            if self.incremental:
+                self.incremental.flush()
+            if self.near_duplicates:
+                self.near_duplicates.flush()
+            if self.boilerplate:
+                # Later crawls of the domain start with the learned template
+                self.boilerplate.flush()
+            self._publish_progress(force=True)
+        
+        # Finished (or cancelled): nothing left to resume
+        if self.config.checkpoint_every:
+            self.db.delete_crawl_checkpoint(self.crawl_id, self.org_id)
+        
+        # 🔍 DEBUG: Final status
+        logger.warning(f"🎉 VOICEFORGE CRAWLER: Crawl completed - Final status:")
+        logger.warning(f"  Pages crawled: {len(self.visited_urls)}")
+        logger.warning(f"  Pages discovered: {self.frontier.seen_count}")
+        logger.warning(f"  Pages failed: {len(self.failed_urls)}")
+        logger.warning(f"  Content extracted: {self.content_extracted}")
+        if self.incremental:
+            logger.warning(f"  Unchanged pages skipped: {self.incremental.pages_skipped}")
+        if self.near_duplicates:
+            logger.warning(f"  Near-duplicates suppressed: {self.near_duplicates.pages_suppressed}")
+        if self.page_archive:
+            logger.warning(f"  Page archive: {self.page_archive.summary()}")
+        if self.extraction_pool:
+            logger.warning(f"  Extraction pool: {self.extraction_pool.summary()}")
+        if self.boilerplate:
+            logger.warning(f"  Boilerplate: {self.boilerplate.summary()}")
+        logger.warning(f"  Requests blocked: {self.request_blocker.requests_blocked} (~{self.request_blocker.bytes_saved // 1024} KB saved)")
+        if self.rate_limits:
+            rates = ", ".join(f"{host} {rate:.2f}/s" for host, rate in self.rate_limits.settled_rates().items())
+            logger.warning(f"  Settled host rates: {rates}")
+        if self.fetch_tier:
+            logger.warning(f"  Served over HTTP: {self.fetch_tier.http_pages}, browser fallbacks: {self.fetch_tier.browser_fallbacks}")
+        logger.warning(f"  User Agent Used: {user_agent}")
+        
+        logger.info(f"Crawl completed: {len(self.visited_urls)} pages crawled, "
+                   f"{len(self.failed_urls)} failed, {self.content_extracted} content extracted")
+    
+    def _crawl_sync(self, user_agent: str):
+        """Crawl the queue one page at a time with the sync Playwright API."""
+        self.fetch_tier = self._create_fetch_tier(user_agent)
+        # Pages are parsed in the pool while the next page loads
+        use_pool = self.extraction_pool is not None and self.extraction_pool.start()
+        
+        with self._browser_context(user_agent) as context:
+            if self.request_blocker.enabled:
+                context.route("**/*", self.request_blocker.handle)
             
             try:
                 # Process queue until empty or max pages reached
-                while self.queue and self.running:
+                while (self.frontier or self.pending_extractions) and self.running:
+                    if self.pending_extractions:
+                        # Nothing else queued: wait for the links of pages still being parsed
+                        self._collect_extractions(wait=not self.frontier)
+                        if not self.frontier:
+                            continue
+                    
+                    self._maybe_checkpoint()
+                    self._publish_progress()
+                    
                     # 🔍 DEBUG: Log progress every 5 pages
                     if len(self.visited_urls) % 5 == 0 and len(self.visited_urls) > 0:
-                        logger.warning(f"🔍 CRAWLER: Progress - Visited: {len(self.visited_urls)}, Queue: {len(self.queue)}")
+                        logger.warning(f"🔍 CRAWLER: Progress - Visited: {len(self.visited_urls)}, Queue: {len(self.frontier)}")
                     
                     # Check if max pages limit reached
-                    if (self.config.max_pages is not None and 
-                        len(self.visited_urls) >= self.config.max_pages):
+                    if self._reached_max_pages():
                         logger.warning(f"🔍 CRAWLER: STOPPED - Reached max_pages limit!")
                         break
                     
-                    # Get next URL from queue
-                    url, depth = self.queue.pop(0)
+                    # Get next URL from the frontier
+                    url, depth = self.frontier.pop()
                     
                     # Skip if already visited
                     if url in self.visited_urls:
@@ -255,62 +907,42 @@ class PlaywrightCrawler:
                     if depth > self.config.max_depth:
                         continue
                     
+                    if self._host_given_up(url):
+                        self.failed_urls.add(url)
+                        continue
+                    
                     # Update current depth
                     self.current_depth = max(self.current_depth, depth)
                     
                     # Visit URL
                     logger.info(f"📄 Crawling: {url} (depth: {depth})")
                     
+                    # Try the HTTP tier before rendering in Chromium
+                    if self.fetch_tier and self.fetch_tier.should_try_http(url):
+                        self._throttle(url)
+                        started = time.monotonic()
+                        try:
+                            result = self.fetch_tier.fetch(url, self._get_base_domain(url), self._conditional_headers(url))
+                            self._record_response(url, result["status"], started, result.get("headers"))
+                            links = self._handle_http_result(url, result, depth)
+                        except Exception as e:
+                            logger.warning(f"HTTP tier error for {url}: {str(e)}")
+                            links = None
+                        
+                        if links is not None:
+                            self._enqueue_links(links, depth + 1)
+                            time.sleep(self._politeness_delay())
+                            continue
+                    
                     try:
                         # Create a new page for each request
                         page = context.new_page()
                         
                         # Set appropriate headers based on mode
+                        page.set_extra_http_headers(self._request_headers(depth))
                         if self.config.user_agent_mode == "stealth":
-                            # Stealth mode headers for demo purposes
-                            page.set_extra_http_headers({
-                                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                                "Accept-Language": "en-US,en;q=0.9",
-                                "Accept-Encoding": "gzip, deflate, br",
-                                "DNT": "1",
-                                "Connection": "keep-alive",
-                                "Upgrade-Insecure-Requests": "1",
-                                "Sec-Fetch-Dest": "document",
-                                "Sec-Fetch-Mode": "navigate",
-                                "Sec-Fetch-Site": "none" if depth == 0 else "same-origin",
-                                "Sec-Fetch-User": "?1" if depth == 0 else "?0",
-                                "Cache-Control": "max-age=0"
-                            })
-                            
                             # Hide automation for demo purposes
-                            page.add_init_script("""
-                                // Hide webdriver property
-                                Object.defineProperty(navigator, 'webdriver', {
-                                    get: () => undefined
-                                });
-                                
-                                // Hide automation indicators
-                                delete window.__playwright;
-                                delete window.__pwInitScript;
-                                
-                                // Add realistic chrome object
-                                window.chrome = {
-                                    runtime: {}
-                                };
-                                
-                                // Realistic plugins
-                                Object.defineProperty(navigator, 'plugins', {
-                                    get: () => [1, 2, 3, 4, 5]
-                                });
-                            """)
-                        else:
-                            # Standard crawler headers for legitimate crawling
-                            page.set_extra_http_headers({
-                                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                                "Accept-Language": "en-US,en;q=0.5",
-                                "Accept-Encoding": "gzip, deflate",
-                                "Connection": "keep-alive"
-                            })
+                            page.add_init_script(STEALTH_INIT_SCRIPT)
                         
                         # Set timeout
                         page.set_default_timeout(self.config.timeout * 1000)
@@ -324,6 +956,8 @@ class PlaywrightCrawler:
                         response = None
                         max_attempts = 3 if self.config.user_agent_mode == "stealth" else 1
                         
+                        self._throttle(url)
+                        started = time.monotonic()
                         for attempt in range(max_attempts):
                             try:
                                 wait_until = 'networkidle' if self.config.user_agent_mode == "stealth" else 'load'
@@ -334,19 +968,27 @@ class PlaywrightCrawler:
                                     logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
                                     time.sleep(random.uniform(1, 3))
                                 else:
+                                    self._record_response(url, None, started)
                                     raise e
                         
+                        self._record_response(url, response.status if response else None, started,
+                                              response.headers if response else None)
+                        
                         if not response:
                             logger.error(f"Failed to get response for {url}")
                             page.close()
                             continue
                         
                         # Check response status
+                        if response.status in THROTTLE_STATUSES:
+                            page.close()
+                            self._retry_throttled(url, depth, response.status)
+                            continue
                         if response.status >= 400:
                             logger.warning(f"HTTP {response.status} for {url}")
-                            if response.status == 403 or response.status == 429:
-                                logger.warning("🚨 Possible bot detection or rate limiting!")
-                                if self.config.user_agent_mode == "stealth":
+                            if response.status == 403:
+                                logger.warning("🚨 Possible bot detection!")
+                                if self.config.user_agent_mode == "stealth" and not self.rate_limits:
                                     time.sleep(random.uniform(10, 20))
                             page.close()
                             self.failed_urls.add(url)
@@ -356,32 +998,18 @@ class PlaywrightCrawler:
                         content_type = response.headers.get('content-type', '')
                         if not content_type.startswith('text/html'):
                             page.close()
+                            self.skipped_urls.add(url)
                             continue
                         
                         # Additional page load handling for stealth mode
                         if self.config.user_agent_mode == "stealth":
                             try:
                                 # Simulate human scrolling behavior
-                                page.evaluate("""
-                                    new Promise((resolve) => {
-                                        let totalHeight = 0;
-                                        const distance = 100;
-                                        const timer = setInterval(() => {
-                                            const scrollHeight = document.body.scrollHeight;
-                                            window.scrollBy(0, distance);
-                                            totalHeight += distance;
-                                            
-                                            if(totalHeight >= scrollHeight){
-                                                clearInterval(timer);
-                                                resolve();
-                                            }
-                                        }, 100);
-                                    })
-                                """)
+                                page.evaluate(SCROLL_SCRIPT)
                                 
                                 # Small delay after scrolling
                                 time.sleep(random.uniform(0.5, 1.5))
-                                
+                            
                             except Exception as e:
                                 logger.warning(f"Page load timeout for {url}: {str(e)}")
                         else:
@@ -394,55 +1022,24 @@ class PlaywrightCrawler:
                         # Get HTML content
                         html = page.content()
                         
-                        # Mark as visited
-                        self.visited_urls.add(url)
-                        
-                        # Extract content
-                        content_data = self.extractor.extract(
-                            url=url,
-                            html=html,
-                            domain=self._get_base_domain(url)
-                        )
-                        
-                        if content_data:
-                            # Save content to database with org_id
-                            content_data['crawl_id'] = self.crawl_id
-                            content_data['org_id'] = self.org_id  # Add org_id for multi-tenant isolation
-                            content_data['extracted_at'] = datetime.now()
-                            self.db.save_content(content_data, self.org_id)
-                            self.content_extracted += 1
-                            logger.info(f"✅ Content extracted from {url}")
-                        
-                        # Extract links for further crawling
-                        links = self._extract_links(html, url)
-                        
-                        # Add links to queue
-                        for link in links:
-                            if link not in self.visited_urls:
-                                self.queue.append((link, depth + 1))
-                        
-                        # Shuffle queue for stealth mode to avoid predictable patterns
-                        if self.config.user_agent_mode == "stealth":
-                            random.shuffle(self.queue)
+                        if use_pool:
+                            # Extracted off-thread; links are enqueued when the page is collected
+                            self._submit_extraction(url, html, response.headers, depth)
+                        else:
+                            # Extract content and links
+                            links = self._process_html(url, html, headers=response.headers)
+                            
+                            # Add links to the frontier (stealth mode randomizes order within a depth)
+                            self._enqueue_links(links, depth + 1)
                         
                         # Close page
                         page.close()
                         
                         # Enhanced delay with randomization for all modes
-                        base_delay = self.config.delay
-                        if self.config.user_agent_mode == "stealth":
-                            # More aggressive randomization for stealth mode
-                            random_delay = base_delay + random.uniform(0.5, 3.0)
-                        else:
-                            # Standard randomization for legitimate crawling
-                            # Randomize delay between 50% and 150% of base delay
-                            min_delay = base_delay * 0.5
-                            max_delay = base_delay * 1.5
-                            random_delay = random.uniform(min_delay, max_delay)
-                        
-                        logger.debug(f"⏱️ Waiting {random_delay:.2f}s (base: {base_delay}s)")
+                        random_delay = self._politeness_delay()
+                        logger.debug(f"⏱️ Waiting {random_delay:.2f}s (base: {self.config.delay}s)")
                         time.sleep(random_delay)
-                        
+                    
                     except Exception as e:
                         logger.error(f"❌ Failed to crawl {url}: {str(e)}")
                         self.failed_urls.add(url)
@@ -454,26 +1051,205 @@ class PlaywrightCrawler:
                             pass
                         
                         # Error delay with randomization
-                        if self.config.user_agent_mode == "stealth":
-                            error_delay = random.uniform(5.0, 15.0)
-                        else:
-                            error_delay = random.uniform(1.0, 4.0)
-                        
+                        error_delay = self._error_delay()
                         logger.debug(f"❌ Error delay: {error_delay:.2f}s")
                         time.sleep(error_delay)
             
             finally:
-                # Close context and browser
-                context.close()
-                self.browser.close()
+                # Store pages already fetched, also when the crawl was stopped
+                self._collect_extractions(wait=True)
+                if self.fetch_tier:
+                    self.fetch_tier.close()
+    
+    async def _crawl_async(self, user_agent: str):
+        """
+        Crawl with several concurrent pages sharing one browser context.
         
-        # 🔍 DEBUG: Final status
-        logger.warning(f"🎉 VOICEFORGE CRAWLER: Crawl completed - Final status:")
-        logger.warning(f"  Pages crawled: {len(self.visited_urls)}")
-        logger.warning(f"  Pages discovered: {len(self.discovered_urls)}")
-        logger.warning(f"  Pages failed: {len(self.failed_urls)}")
-        logger.warning(f"  Content extracted: {self.content_extracted}")
-        logger.warning(f"  User Agent Used: {user_agent}")
+        Runs config.concurrency workers over the shared frontier. Each host
+        is additionally capped at config.per_host_concurrency in-flight
+        pages, and the politeness delay is taken while holding the host slot
+        so the per-host request rate stays bounded. A robots.txt crawl-delay
+        limits each host to one page at a time.
+        """
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+        per_host = 1 if self.robots and self.robots.crawl_delay else self.config.per_host_concurrency
+        in_flight = self.in_flight
+        changed = asyncio.Condition()
         
-        logger.info(f"Crawl completed: {len(self.visited_urls)} pages crawled, "
-                   f"{len(self.failed_urls)} failed, {self.content_extracted} content extracted")
+        def budget_left() -> bool:
+            # In-flight pages count against max_pages so it is never overshot
+            return (self.config.max_pages is None or
+                    len(self.visited_urls) + len(in_flight) < self.config.max_pages)
+        
+        def finished() -> bool:
+            return (not self.running or self._reached_max_pages() or
+                    (not self.frontier and not in_flight))
+        
+        self.fetch_tier = self._create_fetch_tier(user_agent)
+        if self.extraction_pool:
+            # Workers await their page's extraction while the others keep fetching
+            self.extraction_pool.start()
+        
+        async with async_playwright() as pw:
+            browser = await pw.chromium.launch(**self._launch_options())
+            context = await browser.new_context(**self._context_options(user_agent))
+            if self.request_blocker.enabled:
+                await context.route("**/*", self.request_blocker.handle_async)
+            
+            async def worker(worker_id: int):
+                while True:
+                    async with changed:
+                        # Wait for queued work and a free page slot, or the end of the crawl
+                        await changed.wait_for(lambda: finished() or (self.frontier and budget_left()))
+                        if finished():
+                            changed.notify_all()
+                            return
+                        
+                        url, depth, score = self.frontier.pop_entry()
+                        if url in self.visited_urls:
+                            continue
+                        in_flight[url] = (depth, score)
+                    
+                    try:
+                        host = urlparse(url).netloc
+                        slot = host_slots.setdefault(
+                            host, asyncio.Semaphore(per_host)
+                        )
+                        async with slot:
+                            links = await self._fetch_async(context, url, depth, worker_id)
+                        self._enqueue_links(links, depth + 1)
+                    finally:
+                        async with changed:
+                            in_flight.pop(url, None)
+                            changed.notify_all()
+                        await self._maybe_checkpoint_async()
+                        self._publish_progress()
+            
+            workers = [
+                asyncio.create_task(worker(i))
+                for i in range(self.config.concurrency)
+            ]
+            
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await context.close()
+                await browser.close()
+                if self.fetch_tier:
+                    await self.fetch_tier.aclose()
+    
+    async def _fetch_async(self, context, url: str, depth: int, worker_id: int) -> List[str]:
+        """Fetch, extract and store one page, then wait out the politeness delay."""
+        self.current_depth = max(self.current_depth, depth)
+        logger.info(f"📄 [{worker_id}] Crawling: {url} (depth: {depth})")
+        
+        if self._host_given_up(url):
+            self.failed_urls.add(url)
+            return []
+        
+        # Try the HTTP tier before rendering in Chromium
+        if self.fetch_tier and self.fetch_tier.should_try_http(url):
+            await self._throttle_async(url)
+            started = time.monotonic()
+            try:
+                result = await self.fetch_tier.fetch_async(url, self._get_base_domain(url), self._conditional_headers(url))
+                self._record_response(url, result["status"], started, result.get("headers"))
+                links = self._handle_http_result(url, result, depth)
+            except Exception as e:
+                logger.warning(f"HTTP tier error for {url}: {str(e)}")
+                links = None
+            
+            if links is not None:
+                await asyncio.sleep(self._politeness_delay())
+                return links
+        
+        page = None
+        try:
+            page = await context.new_page()
+            await page.set_extra_http_headers(self._request_headers(depth))
+            if self.config.user_agent_mode == "stealth":
+                await page.add_init_script(STEALTH_INIT_SCRIPT)
+            page.set_default_timeout(self.config.timeout * 1000)
+            
+            response = None
+            max_attempts = 3 if self.config.user_agent_mode == "stealth" else 1
+            wait_until = 'networkidle' if self.config.user_agent_mode == "stealth" else 'load'
+            
+            await self._throttle_async(url)
+            started = time.monotonic()
+            for attempt in range(max_attempts):
+                try:
+                    response = await page.goto(url, wait_until=wait_until, timeout=30000)
+                    break
+                except Exception as e:
+                    if attempt < max_attempts - 1:
+                        logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
+                        await asyncio.sleep(random.uniform(1, 3))
+                    else:
+                        self._record_response(url, None, started)
+                        raise e
+            
+            self._record_response(url, response.status if response else None, started,
+                                  response.headers if response else None)
+            
+            if not response:
+                logger.error(f"Failed to get response for {url}")
+                return []
+            
+            if response.status in THROTTLE_STATUSES:
+                self._retry_throttled(url, depth, response.status)
+                return []
+            if response.status >= 400:
+                logger.warning(f"HTTP {response.status} for {url}")
+                if response.status == 403:
+                    logger.warning("🚨 Possible bot detection!")
+                    if self.config.user_agent_mode == "stealth" and not self.rate_limits:
+                        await asyncio.sleep(random.uniform(10, 20))
+                self.failed_urls.add(url)
+                return []
+            
+            content_type = response.headers.get('content-type', '')
+            if not content_type.startswith('text/html'):
+                self.skipped_urls.add(url)
+                return []
+            
+            if self.config.user_agent_mode == "stealth":
+                try:
+                    await page.evaluate(SCROLL_SCRIPT)
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+                except Exception as e:
+                    logger.warning(f"Page load timeout for {url}: {str(e)}")
+            else:
+                try:
+                    await page.wait_for_load_state('networkidle', timeout=15000)
+                except Exception:
+                    pass  # Continue if timeout
+            
+            html = await page.content()
+            await page.close()
+            page = None
+            
+            links = await self._process_html_async(url, html, headers=response.headers)
+            
+            # 🔍 DEBUG: Log progress every 5 pages
+            if len(self.visited_urls) % 5 == 0:
+                logger.warning(f"🔍 CRAWLER: Progress - Visited: {len(self.visited_urls)}")
+            
+            await asyncio.sleep(self._politeness_delay())
+            return links
+        
+        except Exception as e:
+            logger.error(f"❌ Failed to crawl {url}: {str(e)}")
+            self.failed_urls.add(url)
+            await asyncio.sleep(self._error_delay())
+            return []
+        
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
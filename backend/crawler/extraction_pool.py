@@ -0,0 +1,171 @@
+"""
+Off-thread page extraction for the crawler engine.
+
+Parsing a fetched page (content extraction and link parsing) is CPU-bound.
+Run on the crawl thread, it stops all fetching while a large page is parsed.
+ExtractionPool runs it in worker processes instead: the crawler hands over
+the raw HTML and picks up the extracted record and links when they are
+ready, so network waits overlap with parsing and parsing uses more than one
+core.
+
+Submissions block once max_in_flight pages are being parsed, so a pool that
+falls behind holds the fetchers back instead of buffering pages.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from api.models import CrawlConfig
+from processor.extractor import ContentExtractor
+from crawler.frontier import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Per worker process, set by _init_worker
+_extractor = None
+
+def parse_links(html: str, base_url: str) -> List[str]:
+    """Parse all HTTP(S) links from HTML, canonicalized and deduplicated."""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = {}
+    
+    for a_tag in soup.find_all('a', href=True):
+        href = a_tag['href']
+        # Normalize URL
+        try:
+            # Canonicalize (fragments, tracking params, trailing slash)
+            absolute_url = canonicalize_url(urljoin(base_url, href))
+            if absolute_url.startswith(('http://', 'https://')):
+                links[absolute_url] = None
+        except Exception as e:
+            logger.warning(f"Failed to process URL {href}: {str(e)}")
+    
+    return list(links)
+
+def _init_worker():
+    global _extractor
+    _extractor = ContentExtractor()
+
+def _extract_page(url: str, html: str, domain: str,
+                  boilerplate: Optional[AbstractSet[int]]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Extract one page in a worker process: (content_data or None, links)."""
+    content_data = _extractor.extract(url=url, html=html, domain=domain, boilerplate=boilerplate)
+    return content_data, parse_links(html, url)
+
+class ExtractionPool:
+    """Process pool extracting content and links from fetched pages."""
+    
+    def __init__(self, workers: int = 2, max_in_flight: Optional[int] = None):
+        """
+        Initialize the pool (worker processes start on start()).
+        
+        Args:
+            workers: Extraction processes
+            max_in_flight: Pages submitted but not yet extracted before submit() blocks
+        """
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.unavailable = False
+        
+        self.pages_extracted = 0
+        self.pages_failed = 0
+    
+    @classmethod
+    def from_config(cls, config: CrawlConfig) -> Optional["ExtractionPool"]:
+        """Pool for a crawl, or None if pages are extracted on the crawl thread."""
+        if not config.extraction_workers:
+            return None
+        return cls(config.extraction_workers, config.extraction_max_in_flight)
+    
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+    
+    def start(self) -> bool:
+        """
+        Start the worker processes.
+        
+        Returns:
+            False if processes cannot be started here (e.g. inside a daemonic
+            Celery prefork worker); the crawler then extracts inline
+        """
+        with self._lock:
+            if self._executor is not None or self.unavailable:
+                return self.running
+            
+            executor = None
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                # Processes are spawned on the first submit, so failures show up here
+                executor.submit(int).result(timeout=60)
+            except Exception as e:
+                logger.warning(f"⚠️ Extraction pool unavailable, extracting on the crawl thread: {str(e)}")
+                if executor is not None:
+                    executor.shutdown(wait=False)
+                self.unavailable = True
+                return False
+            
+            self._executor = executor
+            logger.info(f"🧵 Extraction pool started: {self.workers} processes, {self.max_in_flight} pages in flight")
+            return True
+    
+    def _submit(self, url: str, html: str, domain: str, boilerplate: Optional[AbstractSet[int]]) -> Future:
+        future = self._executor.submit(_extract_page, url, html, domain, boilerplate)
+        future.add_done_callback(self._count)
+        return future
+    
+    def _count(self, future: Future):
+        with self._lock:
+            if future.cancelled() or future.exception() is not None:
+                self.pages_failed += 1
+            else:
+                self.pages_extracted += 1
+    
+    def submit(self, url: str, html: str, domain: str,
+               boilerplate: Optional[AbstractSet[int]] = None) -> Future:
+        """
+        Queue a page for extraction (boilerplate: block hashes to strip, see ContentExtractor.extract).
+        
+        Blocks while max_in_flight pages are being parsed (backpressure on the
+        fetcher). The future's result is (content_data or None, links).
+        """
+        self._slots.acquire()
+        try:
+            future = self._submit(url, html, domain, boilerplate)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    async def extract_async(self, url: str, html: str, domain: str,
+                            boilerplate: Optional[AbstractSet[int]] = None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        Extract a page while the event loop keeps fetching.
+        
+        Not bounded by max_in_flight: each async crawl worker awaits its own
+        page, so the crawl's concurrency already bounds the pages in flight.
+        """
+        return await asyncio.wrap_future(self._submit(url, html, domain, boilerplate))
+    
+    def summary(self) -> Dict[str, int]:
+        return {
+            "workers": 0 if self.unavailable else self.workers,
+            "pages_extracted": self.pages_extracted,
+            "pages_failed": self.pages_failed
+        }
+    
+    def close(self):
+        """Wait for submitted pages and stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
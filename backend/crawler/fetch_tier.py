@@ -0,0 +1,348 @@
+"""
+HTTP-first fetch tier for the Playwright crawler.
+
+Fetches pages with a pooled keep-alive HTTP client and only hands a URL to
+the headless browser when the response looks like it needs JavaScript
+rendering. Decisions are remembered per domain and per path pattern so
+later pages of the same kind skip the step that does not work for them.
+"""
+import asyncio
+import logging
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse
+
+import httpx
+
+from processor.extractor import ContentExtractor
+from crawler.boilerplate import BoilerplateLearner
+from crawler.extraction_pool import ExtractionPool
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Markup that indicates a client-side rendered application shell
+SPA_MARKERS = [
+    re.compile(r'<div[^>]+id=["\'](root|app|__next|__nuxt|svelte|gatsby-focus-wrapper)["\'][^>]*>\s*</div>', re.IGNORECASE),
+    re.compile(r'<[^>]+\bng-(app|version)\b', re.IGNORECASE),
+    re.compile(r'<noscript>[^<]*(enable|requires?|turn on)[^<]*javascript', re.IGNORECASE),
+]
+CONTAINER_PATTERN = re.compile(r'<(main|article)\b[^>]*>(.*?)</\1>', re.IGNORECASE | re.DOTALL)
+SCRIPT_PATTERN = re.compile(r'<(script|style|template)\b[^>]*>.*?</\1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+# Containers with less text than this are placeholders waiting for JavaScript
+EMPTY_CONTAINER_CHARS = 10
+
+def needs_rendering(html: str, content_data: Optional[Dict[str, Any]], min_text_chars: int = 200) -> Optional[str]:
+    """
+    Decide whether a page fetched over plain HTTP needs browser rendering.
+    
+    Returns:
+        The reason rendering is required, or None if the HTTP response is usable
+    """
+    for marker in SPA_MARKERS:
+        if marker.search(html):
+            return "spa_marker"
+    
+    # A tag counts as empty only if all its containers are (short article cards are not)
+    container_text: Dict[str, int] = {}
+    for match in CONTAINER_PATTERN.finditer(html):
+        inner_text = TAG_PATTERN.sub(' ', SCRIPT_PATTERN.sub(' ', match.group(2)))
+        tag = match.group(1).lower()
+        container_text[tag] = max(container_text.get(tag, 0), len(''.join(inner_text.split())))
+    for tag, longest in container_text.items():
+        if longest < EMPTY_CONTAINER_CHARS:
+            return f"empty_{tag}"
+    
+    if not content_data:
+        return "no_content"
+    
+    if len(content_data.get("text") or "") < min_text_chars:
+        return "too_little_text"
+    
+    return None
+
+def path_pattern(url: str) -> str:
+    """Group URLs by their first path segment, e.g. /docs/a/b -> /docs/*."""
+    segments = [s for s in urlparse(url).path.split('/') if s]
+    if not segments:
+        return '/'
+    first = ':id' if segments[0].isdigit() else segments[0].lower()
+    return f"/{first}/*" if len(segments) > 1 else f"/{first}"
+
+class RenderDecisionMemory:
+    """
+    Remembers whether pages needed rendering, per domain and path pattern.
+    
+    Shared by every crawl in the worker process so later crawls of the same
+    site start with what earlier crawls learned. Keys are kept in an LRU, and
+    counts are halved once a key has max_count decisions so recent ones
+    weigh more. A pattern that prefers the browser still sends a sample of
+    its URLs (probe_rate) through the HTTP tier, so a site that starts
+    serving static HTML is noticed.
+    """
+    
+    def __init__(self, min_samples: int = 3, max_keys: int = 10000, max_count: int = 50,
+                 probe_rate: float = 0.05):
+        """
+        Initialize the decision memory.
+        
+        Args:
+            min_samples: Decisions needed before a pattern or domain is trusted
+            max_keys: Domains and path patterns remembered (least recently used are dropped)
+            max_count: Decisions per key before its counts are halved
+            probe_rate: Share of browser-bound URLs still tried over HTTP
+        """
+        self.min_samples = min_samples
+        self.max_keys = max_keys
+        self.max_count = max_count
+        self.probe_rate = probe_rate
+        self._stats: "OrderedDict[str, List[int]]" = OrderedDict()  # key -> [http_ok, rendered]
+        self._lock = threading.Lock()
+    
+    def _keys(self, url: str):
+        domain = urlparse(url).netloc.lower()
+        return f"{domain}{path_pattern(url)}", domain
+    
+    def record(self, url: str, rendered: bool):
+        """Record whether a URL needed rendering."""
+        with self._lock:
+            for key in self._keys(url):
+                stats = self._stats.setdefault(key, [0, 0])
+                self._stats.move_to_end(key)
+                stats[1 if rendered else 0] += 1
+                if stats[0] + stats[1] >= self.max_count:
+                    stats[0] //= 2
+                    stats[1] //= 2
+            while len(self._stats) > self.max_keys:
+                self._stats.popitem(last=False)
+    
+    def prefers_browser(self, url: str) -> bool:
+        """Whether past decisions say this URL should go straight to the browser."""
+        with self._lock:
+            for key in self._keys(url):
+                http_ok, rendered = self._stats.get(key, (0, 0))
+                if http_ok + rendered >= self.min_samples:
+                    return rendered > http_ok and random.random() >= self.probe_rate
+        return False
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Copy of the recorded statistics."""
+        with self._lock:
+            return {key: {"http_ok": s[0], "rendered": s[1]} for key, s in self._stats.items()}
+
+# Process-wide memory shared across crawls
+render_memory = RenderDecisionMemory()
+
+class HttpFetchTier:
+    """Pooled keep-alive HTTP client that serves pages not needing rendering."""
+    
+    def __init__(self,
+                 user_agent: str,
+                 headers: Dict[str, str],
+                 timeout: float,
+                 extractor: ContentExtractor,
+                 min_text_chars: int = 200,
+                 max_connections: int = 20,
+                 memory: Optional[RenderDecisionMemory] = None,
+                 boilerplate: Optional[BoilerplateLearner] = None,
+                 extraction_pool: Optional[ExtractionPool] = None):
+        """
+        Initialize the fetch tier.
+        
+        Args:
+            user_agent: User agent sent with every request
+            headers: Extra request headers
+            timeout: Request timeout in seconds
+            extractor: Extractor used to judge the HTTP response
+            min_text_chars: Minimum extracted text to accept without rendering
+            max_connections: Connection pool size
+            memory: Decision memory (defaults to the process-wide one)
+            boilerplate: The crawl's boilerplate learner, whose template is stripped from responses
+            extraction_pool: The crawl's extraction pool; while it runs, responses are
+                extracted (and their links parsed) in it instead of inline
+        """
+        # Connection-specific headers are not allowed over HTTP/2
+        self.headers = {k: v for k, v in headers.items() if k.lower() != "connection"}
+        self.headers["User-Agent"] = user_agent
+        self.timeout = timeout
+        self.extractor = extractor
+        self.min_text_chars = min_text_chars
+        self.memory = memory or render_memory
+        self.boilerplate = boilerplate
+        self.extraction_pool = extraction_pool
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
+        self.http_pages = 0
+        self.browser_fallbacks = 0
+    
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                follow_redirects=True
+            )
+        return self._client
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                follow_redirects=True
+            )
+        return self._async_client
+    
+    def should_try_http(self, url: str) -> bool:
+        """Whether to attempt the HTTP tier for this URL."""
+        return not self.memory.prefers_browser(url)
+    
+    def fetch(self, url: str, domain: str, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Fetch a URL over HTTP and judge whether it needs rendering.
+        
+        Args:
+            url: URL to fetch
+            domain: Domain passed to the extractor
+            extra_headers: Per-request headers (e.g. conditional request validators)
+        """
+        try:
+            response = self.client.get(url, headers=extra_headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP tier failed for {url}: {str(e)}")
+            return self._fallback(url, "http_error")
+        
+        result = self._check_response(url, response)
+        if result is not None:
+            return result
+        # Extract under the URL the redirects ended at, so relative links resolve against it
+        url = str(response.url)
+        html = response.text
+        if self._pool_running():
+            try:
+                content_data, links = self.extraction_pool.submit(url, html, domain, self._boilerplate_blocks()).result()
+                return self._evaluate(url, response, html, content_data, links)
+            except Exception as e:
+                logger.warning(f"⚠️ Extraction pool failed on {url}, extracting inline: {str(e)}")
+        return self._evaluate(url, response, html, self._extract(url, html, domain))
+    
+    async def fetch_async(self, url: str, domain: str, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Async version of fetch(); pooled extraction does not block the event loop."""
+        try:
+            response = await self.async_client.get(url, headers=extra_headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP tier failed for {url}: {str(e)}")
+            return self._fallback(url, "http_error")
+        
+        result = self._check_response(url, response)
+        if result is not None:
+            return result
+        url = str(response.url)
+        html = response.text
+        if self._pool_running():
+            try:
+                content_data, links = await self.extraction_pool.extract_async(url, html, domain, self._boilerplate_blocks())
+                return self._evaluate(url, response, html, content_data, links)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Extraction pool failed on {url}, extracting inline: {str(e)}")
+        return self._evaluate(url, response, html, self._extract(url, html, domain))
+    
+    def _pool_running(self) -> bool:
+        return self.extraction_pool is not None and self.extraction_pool.running
+    
+    def _boilerplate_blocks(self):
+        return self.boilerplate.blocks if self.boilerplate else None
+    
+    def _extract(self, url: str, html: str, domain: str) -> Optional[Dict[str, Any]]:
+        return self.extractor.extract(url=url, html=html, domain=domain, boilerplate=self._boilerplate_blocks())
+    
+    def _fallback(self, url: str, reason: str, record: bool = False, status: Optional[int] = None) -> Dict[str, Any]:
+        self.browser_fallbacks += 1
+        if record:
+            self.memory.record(url, rendered=True)
+        return {"render": True, "reason": reason, "status": status, "html": None, "content_data": None}
+    
+    def _check_response(self, url: str, response: httpx.Response) -> Optional[Dict[str, Any]]:
+        """Result for a response that is not an HTML page to extract, or None if it is one."""
+        status = response.status_code
+        
+        if status == 304:
+            return {"render": False, "reason": "not_modified", "status": status, "html": None, "content_data": None}
+        
+        # Definitive errors do not improve with a browser; blocks (403) might
+        if status in (404, 410):
+            return {"render": False, "reason": f"http_{status}", "status": status, "html": None, "content_data": None}
+        if status in (429, 503):
+            # Throttled: retrying in a browser would only add load (headers carry Retry-After)
+            return {"render": False, "reason": f"http_{status}", "status": status, "html": None,
+                    "content_data": None, "headers": dict(response.headers)}
+        if status >= 400:
+            return self._fallback(url, f"http_{status}", status=status)
+        
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith('text/html'):
+            return {"render": False, "reason": "not_html", "status": status, "html": None, "content_data": None}
+        return None
+    
+    def _evaluate(self, url: str, response: httpx.Response, html: str,
+                  content_data: Optional[Dict[str, Any]], links: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Judge an extracted HTML response.
+        
+        Args:
+            url: Final URL of the response (after redirects)
+            links: Links parsed by the extraction pool, if it ran
+        """
+        status = response.status_code
+        reason = needs_rendering(html, content_data, self.min_text_chars)
+        if reason:
+            logger.debug(f"🖥️ {url} needs rendering ({reason})")
+            return self._fallback(url, reason, record=True, status=status)
+        
+        self.memory.record(url, rendered=False)
+        self.http_pages += 1
+        return {
+            "render": False,
+            "reason": "ok",
+            "url": url,
+            "status": status,
+            "html": html,
+            "content_data": content_data,
+            "links": links,
+            "headers": dict(response.headers)
+        }
+    
+    def close(self):
+        """Close the sync client (the async client is closed by aclose())."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    async def aclose(self):
+        """Close both clients."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
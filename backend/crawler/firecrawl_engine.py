@@ -4,12 +4,21 @@ Replaces the complex Playwright crawler with a simple API service.
 """
 import os
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
+import time
 import uuid
+from urllib.parse import urlparse
+
+import httpx
 
 from api.models import CrawlConfig, CrawlProgress
 from processor.extractor import ContentExtractor
+from crawler.content_sink import ContentSink
+from crawler.near_duplicates import NearDuplicateDetector
+from crawler.progress_events import ProgressPublisher
+from crawler.page_archive import PageArchive
+from processor.rag_stream import RAGStreamPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +34,11 @@ except Exception as e:
 
 logger = logging.getLogger(__name__)
 
+# Consecutive job status polls that may fail before the crawl gives up
+MAX_POLL_ERRORS = 5
+
+DEFAULT_API_URL = "https://api.firecrawl.dev"
+
 class FirecrawlCrawler:
     """Firecrawl-based crawler for VoiceForge."""
     
@@ -45,7 +59,17 @@ class FirecrawlCrawler:
             raise ValueError("FIRECRAWL_API_KEY environment variable is required")
         
         self.firecrawl = FirecrawlApp(api_key=api_key)
+        # Job status is polled over the REST API directly, one page of results at a time
+        self.api_url = (getattr(self.firecrawl, 'api_url', None) or os.getenv('FIRECRAWL_API_URL', DEFAULT_API_URL)).rstrip('/')
+        self.status_client = httpx.Client(headers={"Authorization": f"Bearer {api_key}"}, timeout=60)
         self.extractor = ContentExtractor()
+        self.rag_stream = RAGStreamPipeline.from_config(config, org_id)
+        self.content_sink = ContentSink(
+            db, org_id,
+            batch_size=config.write_batch_size,
+            flush_interval=config.write_flush_interval,
+            on_written=self.rag_stream.submit if self.rag_stream else None
+        )
         
         # Progress tracking
         self.pages_crawled = 0
@@ -54,6 +78,14 @@ class FirecrawlCrawler:
         self.content_extracted = 0
         self.current_depth = 0
         
+        self.near_duplicates: Optional[NearDuplicateDetector] = None
+        self.page_archive = PageArchive.from_config(config, org_id, crawl_id)
+        self.progress_events = ProgressPublisher.for_crawl(crawl_id, org_id)
+        
+        # Async job state
+        self.running = False
+        self.job_id = None
+        
         logger.info(f"🔥 Firecrawl crawler initialized for {domain}")
     
     def _normalize_domain(self, domain: str) -> str:
@@ -69,7 +101,9 @@ class FirecrawlCrawler:
             pages_discovered=self.pages_discovered,
             pages_failed=self.pages_failed,
             current_depth=self.current_depth,
-            content_extracted=self.content_extracted
+            content_extracted=self.content_extracted,
+            pages_near_duplicate=self.near_duplicates.pages_suppressed if self.near_duplicates else 0,
+            content_indexed=self.rag_stream.contents_indexed if self.rag_stream else 0
         )
     
     def crawl(self):
@@ -77,16 +111,229 @@ class FirecrawlCrawler:
         logger.info(f"🚀 Starting Firecrawl crawl for {self.domain}")
         logger.info(f"📋 Config: max_pages={self.config.max_pages}, max_depth={self.config.max_depth}")
         
-        # Try multiple URL patterns for better success rate
-        url_patterns = [
+        self.running = True
+        successful_url = None
+        self.near_duplicates = NearDuplicateDetector.from_config(self.config, self.db, self.crawl_id, self.org_id)
+        
+        try:
+            if self.config.firecrawl_job_mode:
+                successful_url = self._crawl_job()
+            else:
+                successful_url = self._crawl_blocking()
+            
+            if not successful_url:
+                logger.error("❌ All crawl attempts failed - no data returned")
+                
+                # Try fallback to direct HTTP scraping
+                logger.info("🔄 Attempting fallback to direct scraping...")
+                fallback_result = self._fallback_scrape(self.domain)
+                if fallback_result:
+                    self._process_fallback_content(fallback_result)
+                    return
+                
+                logger.error("❌ All crawl methods failed")
+                return
+            
+            logger.info(f"🎉 Firecrawl crawl completed using {successful_url}!")
+            logger.info(f"📊 Results: {self.pages_crawled} crawled, {self.content_extracted} extracted, {self.pages_failed} failed")
+            if self.near_duplicates:
+                logger.info(f"🧬 Near-duplicates suppressed: {self.near_duplicates.pages_suppressed}")
+            if self.page_archive:
+                logger.info(f"🗄️ Page archive: {self.page_archive.summary()}")
+        
+        except Exception as e:
+            logger.error(f"❌ Firecrawl crawl processing failed: {str(e)}")
+            raise
+        
+        finally:
+            # Write buffered content before the crawl is reported complete
+            self.content_sink.close()
+            if self.rag_stream:
+                # Finish indexing what was saved so the crawl ends fully searchable
+                self.rag_stream.close()
+            if self.near_duplicates:
+                self.near_duplicates.flush()
+            self.status_client.close()
+            if self.progress_events:
+                self.progress_events.publish(self.get_progress(), force=True)
+    
+    def _candidate_urls(self) -> List[str]:
+        """Seed URLs to try, most valuable content first."""
+        host = urlparse(self.domain).netloc
+        candidates = [
             f"{self.domain}/docs",      # Documentation first
             f"{self.domain}/blog",      # Blog content
-            f"docs.{self.domain.replace('https://', '').replace('http://', '')}",  # Docs subdomain
+            f"https://docs.{host}",     # Docs subdomain
             self.domain                 # Original URL last
         ]
+        return list(dict.fromkeys(candidates))
+    
+    def _limit_options(self) -> Dict[str, Any]:
+        """Page cap for a Firecrawl crawl (Firecrawl's own default applies when unlimited)."""
+        if self.config.max_pages:
+            return {"limit": self.config.max_pages}
+        return {}
+    
+    def _probe_seeds(self, urls: List[str]) -> Iterator[str]:
+        """
+        Reachable candidate seeds, in order.
+        
+        Each seed is probed (one billed scrape) only when the previous ones
+        did not produce a crawl, so a working first seed costs one probe.
+        """
+        for url in urls:
+            if self._test_single_page_access(url):
+                yield url
+            else:
+                logger.warning(f"⚠️ Single page test failed for: {url}")
+    
+    def _crawl_job(self) -> Optional[str]:
+        """
+        Start an asynchronous Firecrawl job and store its pages as they arrive.
+        
+        Returns:
+            The seed URL whose job produced content, or None
+        """
+        for seed_url in self._probe_seeds(self._candidate_urls()):
+            if not self.running:
+                return None
+            
+            try:
+                logger.info(f"🌐 Starting Firecrawl job for {seed_url}...")
+                job_id = self._start_job(seed_url)
+            except Exception as e:
+                logger.error(f"❌ Failed to start crawl job for {seed_url}: {str(e)}")
+                continue
+            
+            if not job_id:
+                logger.warning(f"⚠️ No job ID returned for: {seed_url}")
+                continue
+            
+            self.job_id = job_id
+            logger.info(f"🔥 Firecrawl job {job_id} started for {seed_url}")
+            
+            pages_seen = self._stream_job(job_id)
+            self.job_id = None
+            
+            if pages_seen:
+                logger.info(f"✅ Success with URL: {seed_url}")
+                return seed_url
+            
+            logger.warning(f"⚠️ No data from job for: {seed_url}")
+        
+        return None
+    
+    def _start_job(self, url: str) -> Optional[str]:
+        """Submit a crawl job and return its ID."""
+        try:
+            response = self.firecrawl.async_crawl_url(
+                url,
+                scrapeOptions={
+                    "formats": ["markdown", "html"]
+                },
+                **self._limit_options()
+            )
+        except Exception as v1_error:
+            logger.warning(f"⚠️ V1 crawl job format failed: {v1_error}")
+            logger.info("🔄 Trying alternative crawl job format...")
+            response = self.firecrawl.async_crawl_url(url, **self._limit_options())
+        
+        return self._field(response, 'id')
+    
+    def _stream_job(self, job_id: str) -> int:
+        """
+        Poll a crawl job and process each page the first time it shows up.
+        
+        Returns:
+            Number of distinct pages the job returned
+        """
+        seen_urls = set()
+        offset = 0
+        poll_errors = 0
+        
+        while self.running:
+            try:
+                status, pages = self._poll_job(job_id, offset)
+                poll_errors = 0
+            except Exception as e:
+                poll_errors += 1
+                logger.warning(f"⚠️ Polling job {job_id} failed ({poll_errors}/{MAX_POLL_ERRORS}): {str(e)}")
+                if poll_errors >= MAX_POLL_ERRORS:
+                    raise
+                time.sleep(self.config.firecrawl_poll_interval)
+                continue
+            
+            total = self._field(status, 'total') or 0
+            self.pages_discovered = max(self.pages_discovered, total, len(seen_urls))
+            
+            # Only pages after the offset are fetched; URLs are still deduplicated
+            offset += len(pages)
+            for page in pages:
+                url = self._page_url(page)
+                if not url or url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                self._process_page(page, len(seen_urls))
+                if self.progress_events:
+                    self.progress_events.publish(self.get_progress())
+            
+            job_state = self._field(status, 'status')
+            logger.info(f"📡 Job {job_id}: {job_state}, {self._field(status, 'completed') or 0}/{total} pages, "
+                        f"{self.content_extracted} extracted")
+            
+            if job_state in ('completed', 'failed', 'cancelled'):
+                if job_state != 'completed':
+                    logger.warning(f"⚠️ Firecrawl job {job_id} ended with status {job_state}")
+                break
+            
+            if self.config.max_pages and len(seen_urls) >= self.config.max_pages:
+                logger.info(f"🛑 Reached max_pages limit ({self.config.max_pages}), cancelling job {job_id}")
+                self._cancel_job(job_id)
+                break
+            
+            time.sleep(self.config.firecrawl_poll_interval)
+        
+        if not self.running:
+            self._cancel_job(job_id)
+        
+        return len(seen_urls)
+    
+    def _poll_job(self, job_id: str, skip: int):
+        """
+        Job status and the pages it returned after the first skip ones.
+        
+        Follows the response's next links, which page through results too
+        large for one response, so each poll transfers only new pages.
+        """
+        response = self.status_client.get(f"{self.api_url}/v1/crawl/{job_id}", params={"skip": skip})
+        response.raise_for_status()
+        status = response.json()
+        pages = list(status.get('data') or [])
         
+        next_url = status.get('next')
+        while next_url and self.running:
+            response = self.status_client.get(next_url)
+            response.raise_for_status()
+            batch = response.json()
+            pages.extend(batch.get('data') or [])
+            next_url = batch.get('next')
+        return status, pages
+    
+    def _cancel_job(self, job_id: str):
+        try:
+            self.firecrawl.cancel_crawl(job_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to cancel Firecrawl job {job_id}: {str(e)}")
+    
+    def _crawl_blocking(self) -> Optional[str]:
+        """
+        Run a blocking crawl_url on each seed in turn until one returns pages.
+        
+        Returns:
+            The seed URL whose crawl produced content, or None
+        """
+        url_patterns = self._candidate_urls()
         crawl_result = None
-        successful_url = None
         
         for attempt_url in url_patterns:
             try:
@@ -98,9 +345,6 @@ class FirecrawlCrawler:
                     logger.warning(f"⚠️ Single page test failed for: {attempt_url}")
                     continue
                 
-                # Build enhanced Firecrawl options for v1 API
-                logger.info(f"🔥 Using Firecrawl v1 API format")
-                
                 # Start the crawl with current URL using v1 API format
                 logger.info(f"🌐 Crawling {attempt_url}...")
                 
@@ -108,20 +352,17 @@ class FirecrawlCrawler:
                 try:
                     crawl_result = self.firecrawl.crawl_url(
                         attempt_url,
-                        limit=min(self.config.max_pages, 25),
                         scrapeOptions={
                             "formats": ["markdown", "html"]
-                        }
+                        },
+                        **self._limit_options()
                     )
                 except Exception as v1_error:
                     logger.warning(f"⚠️ V1 crawl format failed: {v1_error}")
                     logger.info("🔄 Trying alternative crawl format...")
                     
                     # Try alternative format
-                    crawl_result = self.firecrawl.crawl_url(
-                        attempt_url,
-                        limit=min(self.config.max_pages, 25)
-                    )
+                    crawl_result = self.firecrawl.crawl_url(attempt_url, **self._limit_options())
                 
                 # Check if we got actual data
                 if (crawl_result and 
@@ -131,167 +372,163 @@ class FirecrawlCrawler:
                     
                     logger.info(f"✅ Success with URL: {attempt_url}")
                     logger.info(f"📄 Found {len(crawl_result.data)} pages")
-                    successful_url = attempt_url
                     break
                 else:
                     logger.warning(f"⚠️ No data from: {attempt_url}")
                     self._log_crawl_details(crawl_result)
+                    crawl_result = None
                     if attempt_url == url_patterns[-1]:  # Last attempt
                         logger.error("❌ All URL patterns failed")
                     continue
-                    
+            
             except Exception as e:
                 logger.error(f"❌ Failed {attempt_url}: {str(e)}")
                 if attempt_url == url_patterns[-1]:  # Last attempt
                     raise
                 continue
         
-        # Process results
+        if not crawl_result:
+            return None
+        
+        pages = crawl_result.data
+        self.pages_discovered = len(pages)
+        
+        logger.info(f"📄 Firecrawl discovered {len(pages)} pages from {attempt_url}")
+        
+        for i, page in enumerate(pages, 1):
+            self._process_page(page, i)
+        
+        return attempt_url
+    
+    @staticmethod
+    def _field(obj: Any, name: str) -> Any:
+        """Read a field from a Firecrawl response object or dict."""
+        if isinstance(obj, dict):
+            return obj.get(name)
+        return getattr(obj, name, None)
+    
+    def _page_url(self, page: Any) -> Optional[str]:
+        """Source URL of a Firecrawl page."""
+        url = self._field(page, 'url')
+        if url:
+            return url
+        metadata = self._field(page, 'metadata')
+        if metadata:
+            # Extract URL from metadata object
+            return self._field(metadata, 'sourceURL') or self._field(metadata, 'url')
+        return None
+    
+    def _process_page(self, page: Any, i: int) -> bool:
+        """
+        Convert one Firecrawl page to content and queue it for storage.
+        
+        Returns:
+            True if the page was queued
+        """
         try:
+            logger.info(f"📝 Processing page {i}: {self._field(page, 'title') or 'Untitled'}")
             
-            if not crawl_result or not hasattr(crawl_result, 'data') or not crawl_result.data:
-                logger.error("❌ All crawl attempts failed - no data returned")
-                self._log_crawl_details(crawl_result)
+            # Extract page data - handle FirecrawlDocument objects and dicts
+            try:
+                url = self._page_url(page)
+                metadata_obj = self._field(page, 'metadata')
                 
-                # Try fallback to direct HTTP scraping
-                logger.info("🔄 Attempting fallback to direct scraping...")
-                fallback_result = self._fallback_scrape(self.domain)
-                if fallback_result:
-                    self._process_fallback_content(fallback_result)
-                    return
-                    
-                logger.error("❌ All crawl methods failed")
-                return
+                # Extract title
+                title = self._field(page, 'title') or ''
+                if not title and metadata_obj:
+                    title = self._field(metadata_obj, 'title') or ''
+                
+                # Extract content
+                markdown_content = self._field(page, 'markdown') or ''
+                html_content = self._field(page, 'html') or ''
+                
+                # Convert metadata to dict for storage
+                metadata = {}
+                if metadata_obj:
+                    if isinstance(metadata_obj, dict):
+                        metadata = metadata_obj
+                    elif hasattr(metadata_obj, '__dict__'):
+                        metadata = metadata_obj.__dict__
+                    else:
+                        # Try to convert pydantic model to dict
+                        try:
+                            metadata = metadata_obj.dict() if hasattr(metadata_obj, 'dict') else {}
+                        except:
+                            metadata = {}
             
-            pages = crawl_result.data
-            self.pages_discovered = len(pages)
+            except Exception as e:
+                logger.error(f"❌ Error extracting data from page {i}: {e}")
+                logger.info(f"🔍 Page {i} type: {type(page)}, attributes: {dir(page)}")
+                return False
             
-            logger.info(f"📄 Firecrawl discovered {len(pages)} pages from {successful_url}")
+            # Debug: Log the page structure to understand what we're getting
+            if i <= 3:  # Only log first 3 pages to avoid spam
+                logger.info(f"🔍 DEBUG Page {i} structure: {list(page.__dict__.keys()) if hasattr(page, '__dict__') else list(page.keys())}")
+                logger.info(f"🔍 DEBUG Page {i} URL: {url}, metadata: {metadata_obj}")
             
-            # Process each page
-            for i, page in enumerate(pages, 1):
-                try:
-                    logger.info(f"📝 Processing {i}/{len(pages)}: {getattr(page, 'title', 'Untitled')}")
-                    
-                    # Extract page data - handle FirecrawlDocument objects properly
-                    try:
-                        # All data is in the object attributes, not dict methods
-                        url = None
-                        if hasattr(page, 'url') and page.url:
-                            url = page.url
-                        elif hasattr(page, 'metadata') and page.metadata:
-                            # Extract URL from metadata object
-                            if hasattr(page.metadata, 'sourceURL'):
-                                url = page.metadata.sourceURL
-                            elif hasattr(page.metadata, 'url'):
-                                url = page.metadata.url
-                            elif isinstance(page.metadata, dict):
-                                url = page.metadata.get('sourceURL') or page.metadata.get('url')
-                        
-                        # Extract title
-                        title = ''
-                        if hasattr(page, 'title') and page.title:
-                            title = page.title
-                        elif hasattr(page, 'metadata') and page.metadata:
-                            if hasattr(page.metadata, 'title'):
-                                title = page.metadata.title or ''
-                            elif isinstance(page.metadata, dict):
-                                title = page.metadata.get('title', '')
-                        
-                        # Extract content
-                        markdown_content = getattr(page, 'markdown', '') or ''
-                        html_content = getattr(page, 'html', '') or ''
-                        
-                        # Convert metadata to dict for storage
-                        metadata = {}
-                        if hasattr(page, 'metadata') and page.metadata:
-                            if isinstance(page.metadata, dict):
-                                metadata = page.metadata
-                            elif hasattr(page.metadata, '__dict__'):
-                                metadata = page.metadata.__dict__
-                            else:
-                                # Try to convert pydantic model to dict
-                                try:
-                                    metadata = page.metadata.dict() if hasattr(page.metadata, 'dict') else {}
-                                except:
-                                    metadata = {}
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Error extracting data from page {i}: {e}")
-                        logger.info(f"🔍 Page {i} type: {type(page)}, attributes: {dir(page)}")
-                        continue
-                    
-                    # Debug: Log the page structure to understand what we're getting
-                    if i <= 3:  # Only log first 3 pages to avoid spam
-                        logger.info(f"🔍 DEBUG Page {i} structure: {list(page.__dict__.keys()) if hasattr(page, '__dict__') else list(page.keys())}")
-                        logger.info(f"🔍 DEBUG Page {i} URL candidates: url={getattr(page, 'url', None)}, sourceURL={getattr(page, 'sourceURL', None)}")
-                        if hasattr(page, 'metadata'):
-                            logger.info(f"🔍 DEBUG Page {i} metadata: {page.metadata}")
-                        elif isinstance(page, dict) and 'metadata' in page:
-                            logger.info(f"🔍 DEBUG Page {i} metadata: {page['metadata']}")
-                    
-                    if not url:
-                        logger.warning(f"⚠️ Skipping page {i}: no URL")
-                        continue
-                    
-                    if not markdown_content and not html_content:
-                        logger.warning(f"⚠️ Skipping page {i}: no content")
-                        continue
-                    
-                    # Create content data structure
-                    content_data = {
-                        'content_id': str(uuid.uuid4()),
-                        'url': url,
-                        'domain': self._get_domain_from_url(url),
-                        'text': markdown_content or self._html_to_text(html_content),
-                        'html': html_content,
-                        'crawl_id': self.crawl_id,
-                        'extracted_at': datetime.utcnow(),
-                        'metadata': {
-                            'title': title,
-                            'author': metadata.get('author') if isinstance(metadata, dict) else None,
-                            'description': metadata.get('description') or metadata.get('ogDescription') if isinstance(metadata, dict) else None,
-                            'keywords': metadata.get('keywords', []) if isinstance(metadata, dict) else [],
-                            'language': metadata.get('language', 'en') if isinstance(metadata, dict) else 'en',
-                            'content_type': self._determine_content_type(url, title),
-                            'publication_date': self._parse_date(metadata.get('publishedTime') if isinstance(metadata, dict) else None),
-                            'last_modified': self._parse_date(metadata.get('modifiedTime') if isinstance(metadata, dict) else None),
-                            'categories': [],
-                            'tags': metadata.get('keywords', []) if isinstance(metadata, dict) else [],
-                            'source_url': url,
-                            'crawl_metadata': metadata if isinstance(metadata, dict) else {}
-                        }
-                    }
-                    
-                    # Save to database
-                    try:
-                        self.db.save_content(content_data, self.org_id)
-                        self.content_extracted += 1
-                        self.pages_crawled += 1
-                        
-                        logger.info(f"✅ Saved content from {url}")
-                    except Exception as db_error:
-                        logger.error(f"❌ Failed to save content from {url}: {str(db_error)}")
-                        logger.error(f"❌ Content data structure: {type(content_data)}")
-                        logger.error(f"❌ Metadata type: {type(content_data.get('metadata', 'missing'))}")
-                        self.pages_failed += 1
-                        continue
-                    
-                except Exception as e:
-                    logger.error(f"❌ Failed to process page {i}: {str(e)}")
-                    self.pages_failed += 1
-                    continue
+            if not url:
+                logger.warning(f"⚠️ Skipping page {i}: no URL")
+                return False
             
-            logger.info(f"🎉 Firecrawl crawl completed using {successful_url}!")
-            logger.info(f"📊 Results: {self.pages_crawled} crawled, {self.content_extracted} extracted, {self.pages_failed} failed")
+            if not markdown_content and not html_content:
+                logger.warning(f"⚠️ Skipping page {i}: no content")
+                return False
             
+            # Create content data structure
+            content_data = {
+                'content_id': str(uuid.uuid4()),
+                'url': url,
+                'domain': self._get_domain_from_url(url),
+                'text': markdown_content or self._html_to_text(html_content),
+                'html': html_content,
+                'crawl_id': self.crawl_id,
+                'extracted_at': datetime.utcnow(),
+                'metadata': {
+                    'title': title,
+                    'author': metadata.get('author') if isinstance(metadata, dict) else None,
+                    'description': metadata.get('description') or metadata.get('ogDescription') if isinstance(metadata, dict) else None,
+                    'keywords': metadata.get('keywords', []) if isinstance(metadata, dict) else [],
+                    'language': metadata.get('language', 'en') if isinstance(metadata, dict) else 'en',
+                    'content_type': self._determine_content_type(url, title),
+                    'publication_date': self._parse_date(metadata.get('publishedTime') if isinstance(metadata, dict) else None),
+                    'last_modified': self._parse_date(metadata.get('modifiedTime') if isinstance(metadata, dict) else None),
+                    'categories': [],
+                    'tags': metadata.get('keywords', []) if isinstance(metadata, dict) else [],
+                    'source_url': url,
+                    'crawl_metadata': metadata if isinstance(metadata, dict) else {}
+                }
+            }
+            
+            if self.near_duplicates and self.near_duplicates.suppress(url, content_data):
+                # Linked to the page it duplicates instead of being stored
+                self.pages_crawled += 1
+                return False
+            
+            if self.page_archive and html_content:
+                self.page_archive.attach(content_data, self.page_archive.write(url, html_content))
+            
+            # Queue for the batched database writer
+            try:
+                self.content_sink.put(content_data)
+                self.content_extracted += 1
+                self.pages_crawled += 1
+                
+                logger.info(f"✅ Queued content from {url}")
+                return True
+            except Exception as db_error:
+                logger.error(f"❌ Failed to save content from {url}: {str(db_error)}")
+                logger.error(f"❌ Content data structure: {type(content_data)}")
+                logger.error(f"❌ Metadata type: {type(content_data.get('metadata', 'missing'))}")
+                self.pages_failed += 1
+                return False
+        
         except Exception as e:
-            logger.error(f"❌ Firecrawl crawl processing failed: {str(e)}")
-            raise
+            logger.error(f"❌ Failed to process page {i}: {str(e)}")
+            self.pages_failed += 1
+            return False
     
     def _get_domain_from_url(self, url: str) -> str:
         """Extract domain from URL."""
-        from urllib.parse import urlparse
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
     
@@ -368,7 +605,7 @@ class FirecrawlCrawler:
                 logger.warning("⚠️ Single page access failed - no content")
                 logger.info(f"🔍 Result type: {type(result)}, attributes: {dir(result) if result else 'None'}")
                 return False
-                
+        
         except Exception as e:
             logger.warning(f"⚠️ Single page access error: {str(e)}")
             # Try fallback format
@@ -391,7 +628,7 @@ class FirecrawlCrawler:
         if not result:
             logger.info("   Result: None")
             return
-            
+        
         logger.info(f"   Success: {getattr(result, 'success', 'unknown')}")
         logger.info(f"   Status: {getattr(result, 'status', 'unknown')}")
         logger.info(f"   Total: {getattr(result, 'total', 0)}")
@@ -447,7 +684,7 @@ class FirecrawlCrawler:
             else:
                 logger.warning("⚠️ Direct scrape found no main content")
                 return None
-                
+        
         except Exception as e:
             logger.error(f"❌ Direct scrape failed: {str(e)}")
             return None
@@ -485,18 +722,19 @@ class FirecrawlCrawler:
                 }
             }
             
-            # Save to database
-            self.db.save_content(processed_content, self.org_id)
+            # Queue for the batched database writer
+            self.content_sink.put(processed_content)
             self.content_extracted += 1
             self.pages_crawled += 1
             
             logger.info(f"✅ Saved fallback content from {content_data['url']}")
             logger.info(f"📊 Fallback Results: 1 page crawled and extracted")
-            
+        
         except Exception as e:
             logger.error(f"❌ Failed to process fallback content: {str(e)}")
             self.pages_failed += 1
     
     def stop(self):
-        """Stop the crawler (not applicable for Firecrawl)."""
+        """Stop the crawler, cancelling a running Firecrawl job."""
         logger.info("🛑 Firecrawl crawl stop requested")
+        self.running = False
@@ -0,0 +1,223 @@
+"""
+Crawl frontier shared by the crawler engines.
+
+Provides URL canonicalization, a priority queue ordered by depth and URL
+priority with deduplication at enqueue time, and an optional Bloom filter
+seen-set for very large crawls.
+"""
+import hashlib
+import heapq
+import itertools
+import math
+import random
+import re
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only carry tracking information
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'ref_src',
+    '_hsenc', '_hsmi', 'hsctatracking', 'mkt_tok', 'vero_id', 'trk',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Lower scores are crawled first within the same depth
+URL_PRIORITIES = [
+    (re.compile(r'/(docs?|documentation|guides?|reference|api|tutorials?)(/|$)', re.IGNORECASE), 0),
+    (re.compile(r'/(blog|news|articles?|posts?|insights|resources)(/|$)', re.IGNORECASE), 1),
+    (re.compile(r'/(products?|features?|solutions?|pricing|platform|use-cases?)(/|$)', re.IGNORECASE), 2),
+    (re.compile(r'/(tags?|categor(y|ies)|authors?|page/\d+|search|login|signin|signup|register|cart|privacy|terms|legal)(/|$)', re.IGNORECASE), 9),
+]
+DEFAULT_PRIORITY = 5
+
+# Pages queued again (e.g. after a 429) go after everything else at their depth
+RETRY_PRIORITY = 1e9
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a URL for deduplication.
+    
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the remaining query string and removes
+    trailing slashes from the path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else '')
+        netloc = f"{userinfo}@{netloc}"
+    
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    
+    query_pairs = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(query_pairs))
+    
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def url_priority(url: str) -> int:
+    """Priority score for a URL; docs, blog and product paths come first."""
+    path = urlsplit(url).path
+    for pattern, score in URL_PRIORITIES:
+        if pattern.search(path):
+            return score
+    return DEFAULT_PRIORITY
+
+class BloomFilter:
+    """
+    Compact probabilistic set for the frontier seen-set.
+    
+    Never reports a false negative; false positives occur at roughly
+    error_rate once capacity items have been added.
+    """
+    
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        """
+        Initialize the Bloom filter.
+        
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false positive rate at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str) -> bool:
+        """Add an item. Returns True if it was not (probably) present before."""
+        added = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+    
+    def __contains__(self, item: str) -> bool:
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+    
+    def __len__(self) -> int:
+        return self.count
+
+class CrawlFrontier:
+    """
+    Priority crawl frontier with deduplication on enqueue.
+    
+    URLs are canonicalized and recorded in the seen-set when they are
+    pushed, so each URL is queued at most once. Pops are ordered by depth
+    first, then URL priority, then insertion order.
+    """
+    
+    def __init__(self,
+                 use_bloom_filter: bool = False,
+                 bloom_capacity: int = 1_000_000,
+                 bloom_error_rate: float = 0.001,
+                 randomize: bool = False):
+        """
+        Initialize the frontier.
+        
+        Args:
+            use_bloom_filter: Keep the seen-set in a Bloom filter instead of a set
+            bloom_capacity: Expected number of distinct URLs for the Bloom filter
+            bloom_error_rate: Target false positive rate for the Bloom filter
+            randomize: Randomize order within a depth level (stealth mode)
+        """
+        self.seen = BloomFilter(bloom_capacity, bloom_error_rate) if use_bloom_filter else set()
+        self.randomize = randomize
+        self._heap: List[Tuple[int, float, int, str]] = []
+        self._counter = itertools.count()
+    
+    def push(self, url: str, depth: int, priority: Optional[float] = None) -> bool:
+        """
+        Enqueue a URL unless it has already been seen.
+        
+        Returns:
+            True if the URL was added to the frontier
+        """
+        url = canonicalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        
+        score = url_priority(url) if priority is None else priority
+        if self.randomize:
+            score = score + random.random()
+        heapq.heappush(self._heap, (depth, score, next(self._counter), url))
+        return True
+    
+    def requeue(self, url: str, depth: int, priority: float = RETRY_PRIORITY):
+        """Queue an already seen URL again, e.g. a page the host asked us to retry later."""
+        heapq.heappush(self._heap, (depth, priority, next(self._counter), canonicalize_url(url)))
+    
+    def pop(self) -> Tuple[str, int]:
+        """Remove and return the next (url, depth) to crawl."""
+        url, depth, _ = self.pop_entry()
+        return url, depth
+    
+    def pop_entry(self) -> Tuple[str, int, float]:
+        """Remove and return the next (url, depth, score), e.g. to re-queue it unchanged."""
+        depth, score, _, url = heapq.heappop(self._heap)
+        return url, depth, score
+    
+    def snapshot(self) -> List[Tuple[str, int, float]]:
+        """Queued entries as (url, depth, score), for checkpointing."""
+        return [(url, depth, score) for depth, score, _, url in self._heap]
+    
+    def restore(self, entries: List[Tuple[str, int, float]], seen_urls: Iterable[str] = ()):
+        """
+        Re-queue entries from snapshot() and mark other URLs as seen.
+        
+        Args:
+            entries: Queued (url, depth, score) entries
+            seen_urls: URLs already crawled, which must not be queued again
+        """
+        for url in seen_urls:
+            self.seen.add(url)
+        for url, depth, score in entries:
+            self.seen.add(url)
+            heapq.heappush(self._heap, (depth, score, next(self._counter), url))
+    
+    def mark_seen(self, url: str):
+        """Record a URL as seen without queueing it."""
+        self.seen.add(canonicalize_url(url))
+    
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self.seen
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+    
+    @property
+    def seen_count(self) -> int:
+        """Number of distinct URLs ever pushed."""
+        return len(self.seen)
@@ -0,0 +1,132 @@
+"""
+Incremental re-crawl support.
+
+Keeps per-URL validators (ETag, Last-Modified and a hash of the normalized
+extracted text) between crawls of the same domain. Pages that answer a
+conditional request with 304, or whose text hash has not changed, are not
+saved again, so they are not re-chunked or re-embedded downstream.
+
+A page is only skipped while the content saved for it still exists; pages
+whose content was deleted are fetched and saved again.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+def text_hash(text: str) -> str:
+    """Hash of extracted text with whitespace normalized."""
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class IncrementalCrawlState:
+    """Validators loaded at crawl start and updated as pages are fetched."""
+    
+    def __init__(self, db, domain: str, org_id: str, flush_every: int = 50):
+        """
+        Initialize incremental state for a crawl.
+        
+        Args:
+            db: Database wrapper
+            domain: Crawl seed domain validators are stored under
+            org_id: Organization ID for multi-tenant isolation
+            flush_every: Pending validator updates before writing them out
+        """
+        self.db = db
+        self.domain = domain
+        self.org_id = org_id
+        self.flush_every = flush_every
+        
+        self.previous: Dict[str, Dict[str, Any]] = db.get_page_validators(domain, org_id) or {}
+        self.pending: List[Dict[str, Any]] = []
+        
+        self.pages_not_modified = 0
+        self.pages_unchanged = 0
+        
+        logger.info(f"♻️ Incremental crawl: {len(self.previous)} known pages for {domain}")
+    
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously seen URL."""
+        previous = self.previous.get(url)
+        if not previous or not previous.get("content_id"):
+            # A 304 would leave the page without stored content
+            return {}
+        
+        headers = {}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        return headers
+    
+    def not_modified(self, url: str) -> List[str]:
+        """
+        Record a 304 response.
+        
+        Returns:
+            The links stored for the page on the previous crawl
+        """
+        self.pages_not_modified += 1
+        previous = self.previous.get(url, {})
+        self._queue_update(url, previous, previous.get("links", []))
+        return list(previous.get("links", []))
+    
+    def is_unchanged(self, url: str, text: str) -> bool:
+        """Whether the page text matches the hash stored on the previous crawl."""
+        previous = self.previous.get(url)
+        if not previous or not previous.get("text_hash") or not previous.get("content_id"):
+            return False
+        if previous["text_hash"] != text_hash(text):
+            return False
+        self.pages_unchanged += 1
+        return True
+    
+    def record(self,
+               url: str,
+               headers: Optional[Dict[str, str]],
+               text: Optional[str],
+               links: List[str],
+               content_id: Optional[str] = None):
+        """Record validators for a page fetched on this crawl."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        previous = self.previous.get(url, {})
+        validator = {
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "text_hash": text_hash(text) if text else None,
+            "content_id": content_id or previous.get("content_id")
+        }
+        self._queue_update(url, validator, links)
+    
+    def _queue_update(self, url: str, validator: Dict[str, Any], links: List[str]):
+        self.pending.append({
+            "url": url,
+            "domain": self.domain,
+            "etag": validator.get("etag"),
+            "last_modified": validator.get("last_modified"),
+            "text_hash": validator.get("text_hash"),
+            "content_id": validator.get("content_id"),
+            "links": list(links),
+            "last_crawled_at": datetime.utcnow()
+        })
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+    
+    def take_pending(self) -> List[Dict[str, Any]]:
+        """Remove and return the pending validator updates, for a caller that writes them itself."""
+        pending, self.pending = self.pending, []
+        return pending
+    
+    def flush(self):
+        """Write pending validator updates to the database."""
+        if not self.pending:
+            return
+        self.db.save_page_validators(self.pending, self.org_id)
+        self.pending = []
+    
+    @property
+    def pages_skipped(self) -> int:
+        """Pages not saved again because they did not change."""
+        return self.pages_not_modified + self.pages_unchanged
@@ -0,0 +1,202 @@
+"""
+Near-duplicate page suppression.
+
+Tag archives, pagination, locale variants and pages sharing one template
+differ by a few words. Each page's extracted text gets a 64-bit SimHash over
+word shingles; a page whose fingerprint is within a few bits of a page
+already stored for the crawl (or, by default, anywhere in the organization)
+is not saved. It is linked to the original instead, so it is never chunked
+or embedded.
+
+Suppression changes what a crawl stores, so it only runs for crawls that
+enable suppress_near_duplicates.
+"""
+import hashlib
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.models import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def simhash(text: str, shingle_size: int = 3) -> Tuple[int, int]:
+    """
+    64-bit SimHash of text over overlapping word shingles.
+    
+    Returns:
+        (fingerprint, number of words in the text)
+    """
+    words = WORD_RE.findall((text or "").lower())
+    if len(words) < shingle_size:
+        shingles = Counter([" ".join(words)]) if words else Counter()
+    else:
+        shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+    
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint, len(words)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto a Postgres BIGINT."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+class SimHashIndex:
+    """
+    Finds fingerprints within max_distance bits of a query.
+    
+    Fingerprints are split into max_distance + 1 bands; two fingerprints that
+    differ in at most max_distance bits agree exactly on at least one band, so
+    only entries sharing a band value have to be compared.
+    """
+    
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width, extra = divmod(FINGERPRINT_BITS, bands)
+        self.bands: List[Tuple[int, int]] = []  # (shift, mask)
+        shift = 0
+        for band in range(bands):
+            bits = width + (1 if band < extra else 0)
+            self.bands.append((shift, (1 << bits) - 1))
+            shift += bits
+        self.buckets: Dict[Tuple[int, int], List[Tuple[int, str, str]]] = {}
+        self.size = 0
+    
+    def _keys(self, fingerprint: int):
+        for band, (shift, mask) in enumerate(self.bands):
+            yield band, fingerprint >> shift & mask
+    
+    def add(self, fingerprint: int, content_id: str, url: str):
+        for key in self._keys(fingerprint):
+            self.buckets.setdefault(key, []).append((fingerprint, content_id, url))
+        self.size += 1
+    
+    def find(self, fingerprint: int, exclude_url: Optional[str] = None) -> Optional[Tuple[str, str, int]]:
+        """
+        Closest indexed page within max_distance bits.
+        
+        Returns:
+            (content_id, url, distance), or None
+        """
+        best = None
+        for key in self._keys(fingerprint):
+            for other, content_id, url in self.buckets.get(key, ()):
+                if url == exclude_url:
+                    # An earlier version of the same page is a re-crawl, not a duplicate
+                    continue
+                distance = hamming_distance(fingerprint, other)
+                if distance <= self.max_distance and (best is None or distance < best[2]):
+                    best = (content_id, url, distance)
+        return best
+
+class NearDuplicateDetector:
+    """Per-crawl near-duplicate check, seeded with the organization's stored pages."""
+    
+    def __init__(self,
+                 db,
+                 crawl_id: str,
+                 org_id: str,
+                 max_distance: int = 6,
+                 min_words: int = 50,
+                 scope: str = "org",
+                 flush_every: int = 50):
+        """
+        Initialize the detector.
+        
+        Args:
+            db: Database wrapper
+            crawl_id: Crawl the suppressed pages are recorded under
+            org_id: Organization ID for multi-tenant isolation
+            max_distance: Largest Hamming distance counted as a near-duplicate
+            min_words: Pages with fewer words are never suppressed (fingerprints are unreliable)
+            scope: "org" to compare against all stored pages of the organization, "crawl" for this crawl only
+            flush_every: Pending duplicate links before writing them out
+        """
+        self.db = db
+        self.crawl_id = crawl_id
+        self.org_id = org_id
+        self.min_words = min_words
+        self.flush_every = flush_every
+        
+        self.index = SimHashIndex(max_distance)
+        self.pending: List[Dict[str, Any]] = []
+        self.pages_suppressed = 0
+        
+        if scope == "org":
+            for row in db.get_content_fingerprints(org_id) or []:
+                self.index.add(to_unsigned(row["simhash"]), row["content_id"], row["url"])
+            logger.info(f"🧬 Near-duplicate index loaded with {self.index.size} stored pages")
+    
+    def suppress(self, url: str, content_data: Dict[str, Any]) -> bool:
+        """
+        Fingerprint a page and decide whether to drop it.
+        
+        The fingerprint is stored on content_data (as "simhash") so it is saved
+        with the page. Pages that are kept are added to the index.
+        
+        Returns:
+            True if the page is a near-duplicate and must not be saved
+        """
+        fingerprint, words = simhash(content_data.get("text", ""))
+        content_data["simhash"] = to_signed(fingerprint)
+        
+        if words >= self.min_words:
+            match = self.index.find(fingerprint, exclude_url=url)
+            if match:
+                content_id, original_url, distance = match
+                self.pages_suppressed += 1
+                logger.info(f"🧬 Near-duplicate of {original_url} ({distance} bits): {url}")
+                self.pending.append({
+                    "url": url,
+                    "duplicate_of": content_id,
+                    "crawl_id": self.crawl_id,
+                    "distance": distance,
+                    "detected_at": datetime.utcnow()
+                })
+                if len(self.pending) >= self.flush_every:
+                    self.flush()
+                return True
+        
+        self.index.add(fingerprint, content_data["content_id"], url)
+        return False
+    
+    @classmethod
+    def from_config(cls, config: CrawlConfig, db, crawl_id: str, org_id: str) -> Optional["NearDuplicateDetector"]:
+        """Create a detector for a crawl, or None if suppression is disabled."""
+        if not config.suppress_near_duplicates:
+            return None
+        return cls(
+            db, crawl_id, org_id,
+            max_distance=config.near_duplicate_distance,
+            scope=config.near_duplicate_scope
+        )
+    
+    def flush(self):
+        """Write pending duplicate links."""
+        if not self.pending:
+            return
+        self.db.save_content_duplicates(self.pending, self.org_id)
+        self.pending = []
@@ -0,0 +1,251 @@
+"""
+Compressed raw-page archive.
+
+Every fetched page is written at crawl time as a WARC-style response record
+(WARC/1.1 headers, then the HTTP status line, headers and body), compressed
+with zstd (gzip when the zstandard package is not installed), to a pluggable
+blob store. Contents rows point at their record through archive_key, so a
+changed extractor can rebuild them from the archive (see crawler/reextract.py)
+instead of crawling the site again, and HTML no longer has to be kept in the
+contents table.
+
+Archiving is opt-in per crawl (archive_pages) and needs a store configured
+with PAGE_ARCHIVE_URL (file://, s3://, ...); there is no default location,
+since the archive grows with every crawl and needs its own retention.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from api.models import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Describe the stored (decoded) body, not the original transfer
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+class BlobStore:
+    """Minimal key/value blob storage interface used by the page archive."""
+    
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+    
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+    
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        raise NotImplementedError
+    
+    def delete_prefix(self, prefix: str) -> int:
+        raise NotImplementedError
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory."""
+    
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+    
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+    
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial record
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+    
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        base = self._path(prefix.rstrip("/")) if prefix else self.root
+        for directory, _, files in os.walk(base):
+            for name in files:
+                if not name.endswith(".tmp"):
+                    yield os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/")
+    
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        for key in list(self.iter_keys(prefix)):
+            os.remove(self._path(key))
+            deleted += 1
+        return deleted
+
+# URL scheme -> store factory taking the parsed URL; register other stores here
+BLOB_STORES = {
+    "file": lambda parsed: LocalBlobStore(parsed.netloc + parsed.path)
+}
+
+def get_blob_store(url: Optional[str] = None) -> BlobStore:
+    """Blob store for an archive URL (defaults to PAGE_ARCHIVE_URL)."""
+    url = url or os.getenv("PAGE_ARCHIVE_URL")
+    if not url:
+        raise ValueError("No page archive store configured (set PAGE_ARCHIVE_URL)")
+    parsed = urlparse(url)
+    factory = BLOB_STORES.get(parsed.scheme)
+    if factory is None:
+        raise ValueError(f"Unsupported page archive store: {url}")
+    return factory(parsed)
+
+def _compress(data: bytes) -> bytes:
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _decompress(data: bytes) -> bytes:
+    if data[:2] == b"\x1f\x8b":
+        return gzip.decompress(data)
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("The zstandard package is required to read zstd archive records")
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+def build_warc_record(url: str, html: str, status: int = 200,
+                      headers: Optional[Dict[str, str]] = None,
+                      fetched_at: Optional[datetime] = None) -> bytes:
+    """Serialize a fetched page as an uncompressed WARC/1.1 response record."""
+    body = html.encode("utf-8")
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    
+    http_lines = [f"HTTP/1.1 {status} {reason}".rstrip()]
+    for name, value in (headers or {}).items():
+        if name.lower() not in DROPPED_HEADERS:
+            http_lines.append(f"{name}: {value}")
+    http_lines.append(f"Content-Length: {len(body)}")
+    block = ("\r\n".join(http_lines) + "\r\n\r\n").encode("utf-8") + body
+    
+    warc_lines = [
+        "WARC/1.1",
+        "WARC-Type: response",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {(fetched_at or datetime.utcnow()).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"WARC-Target-URI: {url}",
+        "Content-Type: application/http; msgtype=response",
+        f"Content-Length: {len(block)}"
+    ]
+    return ("\r\n".join(warc_lines) + "\r\n\r\n").encode("utf-8") + block + b"\r\n\r\n"
+
+def parse_warc_record(data: bytes) -> Dict[str, Any]:
+    """
+    Parse a record written by build_warc_record.
+    
+    Returns:
+        Dict with url, fetched_at, status, headers and html
+    """
+    warc_head, _, rest = data.partition(b"\r\n\r\n")
+    warc_headers = dict(
+        line.split(": ", 1) for line in warc_head.decode("utf-8").split("\r\n")[1:] if ": " in line
+    )
+    block = rest[:int(warc_headers["Content-Length"])]
+    
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    http_lines = http_head.decode("utf-8").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in http_lines[1:] if ": " in line)
+    
+    return {
+        "url": warc_headers.get("WARC-Target-URI"),
+        "fetched_at": datetime.strptime(warc_headers["WARC-Date"], "%Y-%m-%dT%H:%M:%SZ"),
+        "status": int(http_lines[0].split(" ")[1]),
+        "headers": headers,
+        "html": body.decode("utf-8")
+    }
+
+class PageArchive:
+    """Writes and reads one crawl's archived pages."""
+    
+    def __init__(self, store: BlobStore, org_id: str, crawl_id: str, store_html: bool = True):
+        """
+        Initialize the archive.
+        
+        Args:
+            store: Blob store records are written to
+            org_id: Organization ID (first key segment, for multi-tenant isolation)
+            crawl_id: Crawl the records belong to
+            store_html: Keep HTML in the contents table for archived pages too
+        """
+        self.store = store
+        self.org_id = org_id
+        self.crawl_id = crawl_id
+        self.store_html = store_html
+        self.extension = ".warc.zst" if ZSTD_AVAILABLE else ".warc.gz"
+        
+        self.records_written = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+    
+    @classmethod
+    def from_config(cls, config: CrawlConfig, org_id: str, crawl_id: str) -> Optional["PageArchive"]:
+        """Archive for a crawl, or None if archiving is disabled."""
+        if not config.archive_pages:
+            return None
+        if not os.getenv("PAGE_ARCHIVE_URL"):
+            logger.warning("⚠️ archive_pages is set but PAGE_ARCHIVE_URL is not, pages are not archived")
+            return None
+        return cls(get_blob_store(), org_id, crawl_id, store_html=config.store_html)
+    
+    def key_for(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:40]
+        return f"{self.org_id}/{self.crawl_id}/{digest[:2]}/{digest}{self.extension}"
+    
+    def write(self, url: str, html: str, headers: Optional[Dict[str, str]] = None, status: int = 200) -> Optional[str]:
+        """
+        Archive a fetched page.
+        
+        Returns:
+            The record's key, or None if it could not be written
+        """
+        record = build_warc_record(url, html, status, headers)
+        data = _compress(record)
+        key = self.key_for(url)
+        try:
+            self.store.put(key, data)
+        except Exception as e:
+            # The crawl goes on; the page just cannot be re-extracted later
+            logger.warning(f"Failed to archive {url}: {str(e)}")
+            return None
+        
+        self.records_written += 1
+        self.bytes_raw += len(record)
+        self.bytes_stored += len(data)
+        return key
+    
+    def attach(self, content_data: Dict[str, Any], key: Optional[str]):
+        """Point extracted content at its archive record, dropping its HTML if configured."""
+        if not key:
+            return
+        content_data["archive_key"] = key
+        if not self.store_html:
+            content_data["html"] = None
+    
+    def read(self, key: str) -> Dict[str, Any]:
+        return read_record(self.store, key)
+    
+    def summary(self) -> str:
+        ratio = self.bytes_raw / self.bytes_stored if self.bytes_stored else 0
+        return (f"{self.records_written} pages archived, {self.bytes_stored // 1024} KB stored "
+                f"({ratio:.1f}x compression)")
+
+def read_record(store: BlobStore, key: str) -> Dict[str, Any]:
+    """Read and parse one archived page."""
+    return parse_warc_record(_decompress(store.get(key)))
@@ -0,0 +1,175 @@
+"""
+Push-based crawl progress.
+
+Crawler engines publish CrawlProgress deltas to a Redis pub/sub channel per
+crawl, and CrawlerService publishes state changes to the same channel. The
+API fans the channel out to Server-Sent Events subscribers, so dashboards
+get sub-second updates without polling the database.
+
+Each progress message carries the increase of every counter since the
+previous message under "delta". Values that are not per-crawler counters
+(current_depth, and the shared seen-set size of sharded crawls) are sent as
+new values under "max". The message also holds the sender's running totals,
+so a subscriber that joins mid-crawl converges on the exact progress as soon
+as every crawler (or shard) has published once.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from api.models import CrawlProgress
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Fields sent as their new value instead of an increase
+ABSOLUTE_FIELDS = ("current_depth",)
+
+def progress_channel(crawl_id: str) -> str:
+    return f"voiceforge:crawl:{crawl_id}:events"
+
+def events_enabled() -> bool:
+    return REDIS_AVAILABLE and os.getenv("CRAWL_PROGRESS_EVENTS", "true").lower() in ("1", "true", "yes")
+
+def progress_delta(previous: Dict[str, int], current: Dict[str, int],
+                   absolute_fields: Tuple[str, ...] = ABSOLUTE_FIELDS) -> Dict[str, Dict[str, int]]:
+    """
+    Changes between two progress dicts.
+    
+    Returns:
+        {"delta": increases of counters, "max": new values of absolute_fields}
+    """
+    changes = {"delta": {}, "max": {}}
+    for field, value in current.items():
+        old = previous.get(field, 0)
+        if value == old:
+            continue
+        if field in absolute_fields:
+            changes["max"][field] = value
+        else:
+            changes["delta"][field] = value - old
+    return changes
+
+def merge_progress(snapshot: Dict[str, int], sources: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Combine the latest message of each source with a status snapshot.
+    
+    Args:
+        snapshot: Progress read when the subscriber joined
+        sources: Last progress message per source
+    
+    Returns:
+        Progress with counters summed over sources, never below the snapshot
+    """
+    progress = dict(snapshot)
+    for field in snapshot:
+        values = [message["totals"].get(field, 0) for message in sources.values()]
+        if any(field in message.get("absolute", ()) for message in sources.values()):
+            combined = max(values, default=0)
+        else:
+            combined = sum(values)
+        progress[field] = max(snapshot[field], combined)
+    return progress
+
+class ProgressPublisher:
+    """Publishes one crawler's progress deltas, at most every min_interval seconds."""
+    
+    def __init__(self, crawl_id: str, org_id: str, source: str = "crawler",
+                 min_interval: float = 0.5, client=None):
+        """
+        Initialize the publisher.
+        
+        Args:
+            crawl_id: Crawl whose channel is published to
+            org_id: Organization ID, included in every message
+            source: Name of this crawler among those publishing for the crawl (e.g. a shard)
+            min_interval: Minimum seconds between progress messages
+            client: Redis client (defaults to REDIS_URL)
+        """
+        self.crawl_id = crawl_id
+        self.org_id = org_id
+        self.source = source
+        self.min_interval = min_interval
+        self.absolute_fields = ABSOLUTE_FIELDS
+        self.channel = progress_channel(crawl_id)
+        self.redis = client
+        
+        self.published: Dict[str, int] = {}
+        self.last_publish = 0.0
+        self.failed = False
+    
+    @classmethod
+    def for_crawl(cls, crawl_id: str, org_id: str) -> Optional["ProgressPublisher"]:
+        """A publisher for the crawl, or None when progress events are disabled."""
+        if not events_enabled():
+            return None
+        return cls(crawl_id, org_id)
+    
+    def _send(self, message: Dict[str, Any]):
+        if self.failed:
+            return
+        try:
+            if self.redis is None:
+                self.redis = redis.Redis.from_url(REDIS_URL)
+            self.redis.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            # Progress is still available from the status endpoint
+            logger.warning(f"Disabling progress events for crawl {self.crawl_id}: {str(e)}")
+            self.failed = True
+    
+    def publish(self, progress: CrawlProgress, force: bool = False):
+        """Publish what changed since the last message (throttled unless force)."""
+        now = time.monotonic()
+        if not force and now - self.last_publish < self.min_interval:
+            return
+        
+        current = progress.dict()
+        changes = progress_delta(self.published, current, self.absolute_fields)
+        if not changes["delta"] and not changes["max"]:
+            return
+        
+        self._send({
+            "type": "progress",
+            "crawl_id": self.crawl_id,
+            "org_id": self.org_id,
+            "source": self.source,
+            **changes,
+            "totals": current,
+            "absolute": list(self.absolute_fields)
+        })
+        self.published = current
+        self.last_publish = now
+
+_state_client = None
+
+def publish_crawl_state(crawl_id: str, org_id: str, state: str, error: Optional[str] = None):
+    """Publish a crawl state change (running, completed, failed, cancelled)."""
+    global _state_client
+    if not events_enabled():
+        return
+    message = {"type": "state", "crawl_id": crawl_id, "org_id": org_id, "state": state}
+    if error:
+        message["error"] = error
+    try:
+        # One client (and connection pool) per process, like ProgressPublisher's
+        if _state_client is None:
+            _state_client = redis.Redis.from_url(REDIS_URL)
+        _state_client.publish(progress_channel(crawl_id), json.dumps(message))
+    except Exception as e:
+        logger.warning(f"Could not publish state of crawl {crawl_id}: {str(e)}")
+
+def get_async_redis():
+    """asyncio Redis client for subscribing to progress channels."""
+    if not REDIS_AVAILABLE:
+        raise RuntimeError("The redis package is required for crawl progress events")
+    return redis_asyncio.Redis.from_url(REDIS_URL, decode_responses=True)
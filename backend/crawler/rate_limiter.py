@@ -0,0 +1,223 @@
+"""
+Adaptive per-host rate limiting.
+
+Each host gets a token bucket whose refill rate follows AIMD: it grows by a
+small step after every healthy, fast response and is cut multiplicatively on
+429/503, server errors and slow or failed requests. Retry-After and the
+robots.txt crawl-delay are honored, and the rate each host settles on is
+stored so the next crawl of the domain starts from it. A host that asks to
+wait longer than max_retry_after is given up on for the rest of the crawl.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean the host wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class HostRateLimiter:
+    """Token bucket for one host with an AIMD-adjusted refill rate."""
+    
+    def __init__(self,
+                 rate: float,
+                 min_rate: float,
+                 max_rate: float,
+                 burst: int = 1,
+                 increase_step: float = 0.05,
+                 decrease_factor: float = 0.5,
+                 slow_latency: float = 5.0):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rate: Starting rate in requests per second
+            min_rate: Lowest rate AIMD may reach
+            max_rate: Highest rate AIMD may reach (crawl-delay lowers it)
+            burst: Bucket capacity, i.e. requests allowed back to back
+            increase_step: Requests per second added after a healthy response
+            decrease_factor: Multiplier applied when the host pushes back
+            slow_latency: Response time in seconds treated as a sign of strain
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.slow_latency = slow_latency
+        
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.gave_up = False  # Asked to wait longer than the crawl will
+        self._lock = threading.Lock()
+        
+        self.throttled = 0
+    
+    def set_crawl_delay(self, crawl_delay: float):
+        """Cap the rate at one request per crawl-delay seconds."""
+        if crawl_delay and crawl_delay > 0:
+            with self._lock:
+                self.max_rate = min(self.max_rate, 1.0 / crawl_delay)
+                self.min_rate = min(self.min_rate, self.max_rate)
+                self.rate = min(self.rate, self.max_rate)
+    
+    def adopt_rate(self, rate: float):
+        """Continue from a rate learned elsewhere (e.g. by other shards of the crawl), within the bounds."""
+        with self._lock:
+            self.rate = min(max(rate, self.min_rate), self.max_rate)
+    
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if none is available.
+        
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+    
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """
+        Adjust the rate from the outcome of a request.
+        
+        Args:
+            status: HTTP status, or None if the request failed outright
+            latency: Seconds the request took
+            retry_after: Parsed Retry-After header, if any
+        """
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif status is None or status >= 500 or latency > self.slow_latency:
+                # Milder cut for errors and slow responses
+                self.rate = max(self.min_rate, self.rate * (1 + self.decrease_factor) / 2)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+class RateLimiterRegistry:
+    """Per-host limiters for one crawl, seeded from rates learned on earlier crawls."""
+    
+    def __init__(self,
+                 initial_rate: float,
+                 min_rate: float,
+                 max_rate: float,
+                 burst: int = 1,
+                 learned_rates: Optional[Dict[str, float]] = None,
+                 max_retry_after: float = 300):
+        """
+        Initialize the registry.
+        
+        Args:
+            initial_rate: Starting rate for hosts with no learned rate
+            min_rate: Lowest rate any host may reach
+            max_rate: Highest rate any host may reach
+            burst: Bucket capacity per host
+            learned_rates: Settled rates from earlier crawls, keyed by host
+            max_retry_after: Longest Retry-After honored; hosts asking for more are given up on
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.learned_rates = learned_rates or {}
+        self.max_retry_after = max_retry_after
+        self.crawl_delay: Optional[float] = None
+        self.limiters: Dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def set_crawl_delay(self, crawl_delay: Optional[float]):
+        """Apply a robots.txt crawl-delay to every host of the crawl."""
+        self.crawl_delay = crawl_delay
+        with self._lock:
+            for limiter in self.limiters.values():
+                limiter.set_crawl_delay(crawl_delay)
+    
+    def limiter(self, url: str) -> HostRateLimiter:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            limiter = self.limiters.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(
+                    self.learned_rates.get(host, self.initial_rate),
+                    self.min_rate,
+                    self.max_rate,
+                    burst=self.burst
+                )
+                limiter.set_crawl_delay(self.crawl_delay)
+                self.limiters[host] = limiter
+            return limiter
+    
+    def acquire(self, url: str):
+        """Block until a request to the URL's host is allowed."""
+        wait = self.limiter(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self, url: str):
+        """Async version of acquire()."""
+        wait = self.limiter(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def retry_after(self, headers: Optional[Dict[str, str]]) -> Optional[float]:
+        """Retry-After of a response, clamped to max_retry_after."""
+        if not headers:
+            return None
+        retry_after = parse_retry_after({k.lower(): v for k, v in headers.items()}.get("retry-after"))
+        return min(retry_after, self.max_retry_after) if retry_after else retry_after
+    
+    def gave_up(self, url: str) -> bool:
+        """Whether the URL's host asked to wait longer than max_retry_after."""
+        return self.limiter(url).gave_up
+    
+    def record(self, url: str, status: Optional[int], latency: float, headers: Optional[Dict[str, str]] = None):
+        """Feed a response back into the URL's host limiter."""
+        retry_after = None
+        if headers:
+            retry_after = parse_retry_after({k.lower(): v for k, v in headers.items()}.get("retry-after"))
+        limiter = self.limiter(url)
+        if retry_after and retry_after > self.max_retry_after:
+            logger.error(f"🛑 {urlparse(url).netloc} asked to retry after {retry_after:.0f}s "
+                         f"(more than {self.max_retry_after:.0f}s), giving up on the host")
+            limiter.gave_up = True
+            retry_after = self.max_retry_after
+        limiter.record(status, latency, retry_after)
+        if status in THROTTLE_STATUSES:
+            logger.warning(f"🐢 {urlparse(url).netloc} throttled us (HTTP {status}); "
+                           f"rate now {limiter.rate:.2f}/s" + (f", retry after {retry_after:.0f}s" if retry_after else ""))
+    
+    def settled_rates(self) -> Dict[str, float]:
+        """Current rate of every host seen during the crawl."""
+        with self._lock:
+            return {host: limiter.rate for host, limiter in self.limiters.items()}
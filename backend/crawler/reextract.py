@@ -0,0 +1,105 @@
+"""
+Re-extraction of crawled pages from the page archive.
+
+When the extractor changes, a crawl's contents are rebuilt from their
+archived raw pages instead of crawling the site again. Pages are read,
+decompressed and parsed in a process pool (extraction is CPU-bound), and the
+new text is written back in bulk updates. Re-extracted contents are marked
+unprocessed, so the RAG pipeline picks them up again; their chunks are kept
+until it reconciles them with the new text.
+The domain's learned boilerplate template is stripped, so pages crawled
+before the template settled are cleaned up as well.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AbstractSet, Any, Dict, Optional
+
+from processor.extractor import ContentExtractor
+from crawler.page_archive import get_blob_store, read_record
+from crawler.near_duplicates import simhash, to_signed
+
+logger = logging.getLogger(__name__)
+
+# Per worker process, set by _init_worker
+_store = None
+_extractor = None
+_boilerplate = None
+
+def _init_worker(store_url: Optional[str], boilerplate: Optional[AbstractSet[int]]):
+    global _store, _extractor, _boilerplate
+    _store = get_blob_store(store_url)
+    _extractor = ContentExtractor()
+    _boilerplate = boilerplate
+
+def _reextract_page(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extract one archived page again, keeping its content ID."""
+    try:
+        record = read_record(_store, row["archive_key"])
+        content_data = _extractor.extract(url=row["url"], html=record["html"], domain=row["domain"],
+                                          boilerplate=_boilerplate)
+    except Exception as e:
+        logger.warning(f"Failed to re-extract {row['url']}: {str(e)}")
+        return None
+    
+    if not content_data:
+        return None
+    content_data.pop("block_hashes", None)
+    content_data.pop("unstripped_text", None)
+    content_data["content_id"] = row["content_id"]
+    content_data["simhash"] = to_signed(simhash(content_data["text"])[0])
+    return content_data
+
+def reextract_crawl(db, crawl_id: str, org_id: str,
+                    store_html: bool = True,
+                    workers: Optional[int] = None,
+                    batch_size: int = 100,
+                    store_url: Optional[str] = None,
+                    boilerplate: Optional[AbstractSet[int]] = None) -> Dict[str, Any]:
+    """
+    Rebuild a crawl's contents from their archived pages.
+    
+    Args:
+        db: Database wrapper
+        crawl_id: Crawl to re-extract
+        org_id: Organization ID for multi-tenant isolation
+        store_html: Keep the HTML in the contents table
+        workers: Extraction processes (defaults to REEXTRACT_WORKERS or the CPU count)
+        batch_size: Contents per bulk update
+        store_url: Page archive URL (defaults to PAGE_ARCHIVE_URL)
+        boilerplate: Hashes of the domain's boilerplate blocks to strip
+    
+    Returns:
+        Summary with the number of archived, updated and failed pages
+    """
+    rows = db.get_archived_contents(crawl_id, org_id)
+    summary = {"crawl_id": crawl_id, "archived": len(rows), "updated": 0, "failed": 0}
+    if not rows:
+        logger.info(f"No archived pages to re-extract for crawl {crawl_id}")
+        return summary
+    
+    workers = workers or int(os.getenv("REEXTRACT_WORKERS", "0")) or os.cpu_count() or 1
+    logger.info(f"🔁 Re-extracting {len(rows)} archived pages of crawl {crawl_id} with {workers} processes")
+    
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store_url, boilerplate)) as executor:
+        for content_data in executor.map(_reextract_page, rows, chunksize=16):
+            if content_data is None:
+                summary["failed"] += 1
+                continue
+            content_data["crawl_id"] = crawl_id
+            content_data["extracted_at"] = datetime.utcnow()
+            if not store_html:
+                content_data["html"] = None
+            pending.append(content_data)
+            
+            if len(pending) >= batch_size:
+                summary["updated"] += db.update_contents_extraction(pending, org_id) or 0
+                pending = []
+    
+    if pending:
+        summary["updated"] += db.update_contents_extraction(pending, org_id) or 0
+    
+    logger.info(f"✅ Re-extracted crawl {crawl_id}: {summary['updated']} updated, {summary['failed']} failed")
+    return summary
@@ -12,6 +12,13 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from api.models import CrawlConfig, CrawlProgress
 from processor.extractor import ContentExtractor
+from crawler.frontier import CrawlFrontier, canonicalize_url
+from crawler.content_sink import ContentSink
+from crawler.near_duplicates import NearDuplicateDetector
+from crawler.progress_events import ProgressPublisher
+from crawler.page_archive import PageArchive
+from crawler.boilerplate import BoilerplateLearner
+from processor.rag_stream import RAGStreamPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +40,13 @@ class ScrapingBeeCrawler:
         
         self.base_url = "https://app.scrapingbee.com/api/v1/"
         self.extractor = ContentExtractor()
+        self.rag_stream = RAGStreamPipeline.from_config(config, org_id)
+        self.content_sink = ContentSink(
+            db, org_id,
+            batch_size=config.write_batch_size,
+            flush_interval=config.write_flush_interval,
+            on_written=self.rag_stream.submit if self.rag_stream else None
+        )
         
         # Progress tracking
         self.pages_crawled = 0
@@ -41,7 +55,14 @@ class ScrapingBeeCrawler:
         self.content_extracted = 0
         self.current_depth = 0
         self.visited_urls = set()
-        self.queue = []
+        self.frontier = CrawlFrontier(
+            use_bloom_filter=config.frontier_bloom_filter,
+            bloom_capacity=config.frontier_bloom_capacity
+        )
+        self.near_duplicates: Optional[NearDuplicateDetector] = None
+        self.boilerplate: Optional[BoilerplateLearner] = None
+        self.page_archive = PageArchive.from_config(config, org_id, crawl_id)
+        self.progress_events = ProgressPublisher.for_crawl(crawl_id, org_id)
         
         logger.info(f"🐝 ScrapingBee crawler initialized for {domain}")
     
@@ -58,7 +79,9 @@ class ScrapingBeeCrawler:
             pages_discovered=self.pages_discovered,
             pages_failed=self.pages_failed,
             current_depth=self.current_depth,
-            content_extracted=self.content_extracted
+            content_extracted=self.content_extracted,
+            pages_near_duplicate=self.near_duplicates.pages_suppressed if self.near_duplicates else 0,
+            content_indexed=self.rag_stream.contents_indexed if self.rag_stream else 0
         )
     
     def _scrape_page(self, url: str) -> Optional[Dict[str, Any]]:
@@ -108,9 +131,8 @@ class ScrapingBeeCrawler:
             for a_tag in soup.find_all('a', href=True):
                 href = a_tag['href']
                 try:
-                    absolute_url = urljoin(base_url, href)
-                    # Remove fragments and normalize
-                    absolute_url = absolute_url.split('#')[0].rstrip('/')
+                    # Canonicalize (fragments, tracking params, trailing slash)
+                    absolute_url = canonicalize_url(urljoin(base_url, href))
                     
                     if self._should_crawl_url(absolute_url):
                         links.append(absolute_url)
@@ -130,8 +152,8 @@ class ScrapingBeeCrawler:
         if not url.startswith(('http://', 'https://')):
             return False
         
-        # Skip already visited URLs
-        if url in self.visited_urls:
+        # Skip URLs already queued or visited
+        if url in self.visited_urls or url in self.frontier:
             return False
         
         # Check domain restrictions
@@ -162,13 +184,16 @@ class ScrapingBeeCrawler:
         logger.info(f"🚀 Starting ScrapingBee crawl for {self.domain}")
         logger.info(f"📋 Config: max_pages={self.config.max_pages}, max_depth={self.config.max_depth}")
         
+        self.near_duplicates = NearDuplicateDetector.from_config(self.config, self.db, self.crawl_id, self.org_id)
+        self.boilerplate = BoilerplateLearner.from_config(self.config, self.db, self.domain, self.org_id)
+        
         try:
-            # Initialize queue with starting URL
-            self.queue = [(self.domain, 0)]  # (url, depth)
+            # Initialize frontier with starting URL
+            self.frontier.push(self.domain, 0)
             
-            while self.queue and len(self.visited_urls) < self.config.max_pages:
+            while self.frontier and len(self.visited_urls) < self.config.max_pages:
                 # Get next URL
-                url, depth = self.queue.pop(0)
+                url, depth = self.frontier.pop()
                 
                 # Check depth limit
                 if depth > self.config.max_depth:
@@ -195,40 +220,67 @@ class ScrapingBeeCrawler:
                 
                 # Extract content
                 html = result['html']
+                archive_key = self.page_archive.write(url, html) if self.page_archive else None
                 content_data = self.extractor.extract(
                     url=url,
                     html=html,
-                    domain=self._get_domain_from_url(url)
+                    domain=self._get_domain_from_url(url),
+                    boilerplate=self.boilerplate.blocks if self.boilerplate else None
                 )
+                if content_data and self.boilerplate:
+                    self.boilerplate.observe(content_data.pop("block_hashes", ()))
+                    content_data.pop("unstripped_text", None)
                 
-                if content_data:
+                if content_data and self.near_duplicates and self.near_duplicates.suppress(url, content_data):
+                    # Linked to the page it duplicates instead of being stored
+                    pass
+                elif content_data:
                     # Save content to database
                     content_data['crawl_id'] = self.crawl_id
                     content_data['org_id'] = self.org_id
                     content_data['extracted_at'] = datetime.utcnow()
+                    if self.page_archive:
+                        self.page_archive.attach(content_data, archive_key)
                     
-                    self.db.save_content(content_data, self.org_id)
+                    self.content_sink.put(content_data)
                     self.content_extracted += 1
-                    logger.info(f"✅ Saved content from {url}")
+                    logger.info(f"✅ Queued content from {url}")
                 
                 # Extract links for next depth level
                 if depth < self.config.max_depth:
                     links = self._extract_links(html, url)
                     for link in links:
-                        if link not in self.visited_urls:
-                            self.queue.append((link, depth + 1))
+                        if self.frontier.push(link, depth + 1):
                             self.pages_discovered += 1
                 
+                if self.progress_events:
+                    self.progress_events.publish(self.get_progress())
+                
                 # Rate limiting delay
                 import time
                 time.sleep(self.config.delay)
             
             logger.info(f"🎉 ScrapingBee crawl completed!")
             logger.info(f"📊 Results: {self.pages_crawled} crawled, {self.content_extracted} extracted, {self.pages_failed} failed")
+            if self.page_archive:
+                logger.info(f"🗄️ Page archive: {self.page_archive.summary()}")
             
         except Exception as e:
             logger.error(f"❌ ScrapingBee crawl failed: {str(e)}")
             raise
+        
+        finally:
+            # Write buffered content, also when the crawl failed part-way
+            self.content_sink.close()
+            if self.rag_stream:
+                # Finish indexing what was saved so the crawl ends fully searchable
+                self.rag_stream.close()
+            if self.near_duplicates:
+                self.near_duplicates.flush()
+            if self.boilerplate:
+                self.boilerplate.flush()
+            if self.progress_events:
+                self.progress_events.publish(self.get_progress(), force=True)
     
     def _get_domain_from_url(self, url: str) -> str:
         """Extract domain from URL."""
@@ -12,6 +12,12 @@ from concurrent.futures import ThreadPoolExecutor
 
 from crawler.engine import PlaywrightCrawler
 from crawler.scrapingbee_engine import ScrapingBeeCrawler
+from crawler.distributed import ShardedCrawler, ShardCoordinator
+from crawler.browser_pool import BrowserPool
+from crawler.progress_events import publish_crawl_state
+from crawler.page_archive import get_blob_store
+from crawler.reextract import reextract_crawl
+from crawler.boilerplate import BoilerplateLearner
 from api.models import CrawlRequest, CrawlStatus, CrawlState, CrawlConfig, CrawlProgress
 
 logger = logging.getLogger(__name__)
@@ -46,9 +52,11 @@ class CrawlerService:
         """Initialize Celery if available."""
         try:
             from celery_app import celery_app
-            from crawler.tasks import crawl_website_task
+            from crawler.tasks import crawl_website_task, crawl_shard_task, reextract_crawl_task
             self.celery_app = celery_app
             self.crawl_task = crawl_website_task
+            self.shard_task = crawl_shard_task
+            self.reextract_task = reextract_crawl_task
             logger.info("✅ Celery initialized for distributed crawling")
             return True
         except ImportError:
@@ -91,10 +99,13 @@ class CrawlerService:
             if status:
                 status.state = CrawlState.RUNNING
                 status.start_time = datetime.now()
-                self.db.update_crawl_status(status, org_id)
+                self._update_status(status, org_id)
             
             # Submit to Celery
             try:
+                if config.shards > 1:
+                    return self._start_sharded_crawl(crawl_id, domain, config, org_id, status)
+                
                 task_result = self.crawl_task.delay(
                     crawl_id=crawl_id,
                     domain=domain,
@@ -107,7 +118,7 @@ class CrawlerService:
                 # Store task ID for monitoring
                 if status:
                     status.task_id = task_result.id
-                    self.db.update_crawl_status(status, org_id)
+                    self._update_status(status, org_id)
                     
                 return task_result
                 
@@ -119,6 +130,57 @@ class CrawlerService:
             # Run synchronously
             return await self._run_crawl_sync(crawl_id, domain, config, org_id)
     
+    def _update_status(self, status: CrawlStatus, org_id: str):
+        """Save a crawl status and push its state to progress subscribers."""
+        self.db.update_crawl_status(status, org_id)
+        publish_crawl_state(status.crawl_id, org_id, status.state.value, status.error)
+    
+    def _start_sharded_crawl(self, crawl_id: str, domain: str, config: CrawlConfig, org_id: str,
+                             status: Optional[CrawlStatus]):
+        """Submit one Celery task per shard of a sharded crawl."""
+        ShardCoordinator(crawl_id).start(config.shards)
+        
+        task_results = [
+            self.shard_task.delay(
+                crawl_id=crawl_id,
+                domain=domain,
+                config=config.dict(),
+                org_id=org_id,
+                shard=shard
+            )
+            for shard in range(config.shards)
+        ]
+        
+        logger.info(f"✅ Sharded crawl {crawl_id} submitted to Celery as {len(task_results)} shard tasks")
+        
+        if status:
+            status.task_id = task_results[0].id
+            self._update_status(status, org_id)
+        
+        return task_results[0]
+    
+    def _trigger_rag_optimization(self, crawl_id: str, org_id: str, progress: CrawlProgress,
+                                  task_callback: Optional[Callable] = None):
+        """Run the automated RAG optimization hooks for a completed crawl."""
+        try:
+            from automated_rag_integration import RAGIntegrationHooks
+            
+            crawl_results = {
+                'pages_crawled': progress.pages_crawled,
+                'content_extracted': progress.content_extracted,
+                'pages_failed': progress.pages_failed,
+                'pages_discovered': progress.pages_discovered
+            }
+            
+            if task_callback:
+                task_callback("PROGRESS", {"status": "Optimizing for AI", "progress": 95})
+            
+            rag_result = RAGIntegrationHooks.on_crawl_completed(crawl_id, org_id, crawl_results)
+            logger.info(f"🧠 RAG optimization result: {rag_result['status']}")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ RAG optimization failed: {e}")
+    
     async def _run_crawl_sync(self, crawl_id: str, domain: str, config: CrawlConfig, org_id: str):
         """
         Run a crawl job. This method is intended to be run in a background task.
@@ -135,7 +197,7 @@ class CrawlerService:
                 
             status.state = CrawlState.RUNNING
             status.start_time = datetime.now()
-            self.db.update_crawl_status(status, org_id)
+            self._update_status(status, org_id)
             
             logger.info(f"✅ Updated crawl {crawl_id} status to RUNNING at {status.start_time}")
             
@@ -235,10 +297,11 @@ class CrawlerService:
                 del self.active_crawls[crawl_id]
             
             if status:
-                self.db.update_crawl_status(status, org_id)
+                self._update_status(status, org_id)
                 logger.info(f"📊 Final status for crawl {crawl_id}: {status.state}")
     
-    def run_crawl_sync(self, crawl_id: str, domain: str, config: Dict, org_id: str, task_callback: Optional[Callable] = None):
+    def run_crawl_sync(self, crawl_id: str, domain: str, config: Dict, org_id: str, task_callback: Optional[Callable] = None,
+                       browser_pool: Optional[BrowserPool] = None):
         """
         Synchronous version of crawl for Celery tasks.
         
@@ -248,6 +311,7 @@ class CrawlerService:
             config: Crawl configuration dictionary
             org_id: Organization ID
             task_callback: Optional callback for task state updates
+            browser_pool: Worker's warm browser pool for the Playwright engine
         
         Returns:
             Crawl results dictionary
@@ -278,7 +342,7 @@ class CrawlerService:
             
             status.state = CrawlState.RUNNING
             status.start_time = datetime.now()
-            self.db.update_crawl_status(status, org_id)
+            self._update_status(status, org_id)
             
             if task_callback:
                 task_callback("PROGRESS", {"status": "Starting crawler", "progress": 20})
@@ -322,7 +386,8 @@ class CrawlerService:
                     config=config_obj,
                     db=self.db,
                     crawl_id=crawl_id,
-                    org_id=org_id
+                    org_id=org_id,
+                    browser_pool=browser_pool
                 )
             
             # Store crawler reference
@@ -343,27 +408,10 @@ class CrawlerService:
             status.progress = crawler.get_progress()
             
             # Trigger RAG optimization
-            try:
-                from automated_rag_integration import RAGIntegrationHooks
-                
-                crawl_results = {
-                    'pages_crawled': status.progress.pages_crawled,
-                    'content_extracted': status.progress.content_extracted,
-                    'pages_failed': status.progress.pages_failed,
-                    'pages_discovered': status.progress.pages_discovered
-                }
-                
-                if task_callback:
-                    task_callback("PROGRESS", {"status": "Optimizing for AI", "progress": 95})
-                
-                rag_result = RAGIntegrationHooks.on_crawl_completed(crawl_id, org_id, crawl_results)
-                logger.info(f"🧠 RAG optimization result: {rag_result['status']}")
-                
-            except Exception as e:
-                logger.warning(f"⚠️ RAG optimization failed: {e}")
+            self._trigger_rag_optimization(crawl_id, org_id, status.progress, task_callback)
             
             # Final status update
-            self.db.update_crawl_status(status, org_id)
+            self._update_status(status, org_id)
             
             if task_callback:
                 task_callback("SUCCESS", {"status": "Crawl completed successfully", "progress": 100})
@@ -387,7 +435,7 @@ class CrawlerService:
                 status.state = CrawlState.FAILED
                 status.end_time = datetime.now()
                 status.error = str(e)
-                self.db.update_crawl_status(status, org_id)
+                self._update_status(status, org_id)
             
             if task_callback:
                 task_callback("FAILURE", {"status": f"Crawl failed: {str(e)}", "error": str(e)})
@@ -399,6 +447,129 @@ class CrawlerService:
             if crawl_id in self.active_crawls:
                 del self.active_crawls[crawl_id]
     
+    def run_crawl_shard(self, crawl_id: str, domain: str, config: Dict, org_id: str, shard: int,
+                        browser_pool: Optional[BrowserPool] = None):
+        """
+        Run one shard of a sharded crawl (Celery task body).
+        
+        The last shard to finish marks the crawl completed with the combined
+        progress of all shards and triggers RAG optimization.
+        
+        Args:
+            crawl_id: Unique crawl identifier
+            domain: Domain to crawl
+            config: Crawl configuration dictionary
+            org_id: Organization ID
+            shard: Shard number
+            browser_pool: Worker's warm browser pool
+        
+        Returns:
+            Shard results dictionary
+        """
+        config_obj = CrawlConfig(**config) if isinstance(config, dict) else config
+        coordinator = ShardCoordinator(crawl_id)
+        
+        crawler = ShardedCrawler(
+            domain=domain,
+            config=config_obj,
+            db=self.db,
+            crawl_id=crawl_id,
+            org_id=org_id,
+            shard=shard,
+            coordinator=coordinator,
+            browser_pool=browser_pool
+        )
+        self.active_crawls[crawl_id] = crawler
+        
+        error = None
+        try:
+            logger.info(f"🕷️ Running shard {shard} of crawl {crawl_id} for domain {domain}")
+            crawler.crawl()
+        except Exception as e:
+            error = e
+            logger.error(f"💥 Shard {shard} of crawl {crawl_id} failed: {str(e)}")
+            raise
+        finally:
+            if crawl_id in self.active_crawls:
+                del self.active_crawls[crawl_id]
+            # Also for a failed shard, so the last shard still finalizes the crawl
+            self._finish_shard(crawler, coordinator, org_id, error)
+        
+        progress = crawler.get_progress()
+        return {
+            "crawl_id": crawl_id,
+            "shard": shard,
+            "status": "completed",
+            "pages_crawled": progress.pages_crawled,
+            "content_extracted": progress.content_extracted
+        }
+    
+    def _finish_shard(self, crawler: ShardedCrawler, coordinator: ShardCoordinator, org_id: str,
+                      error: Optional[Exception] = None):
+        """
+        Record a shard as finished; the last shard finalizes the crawl and drops its shared state.
+        
+        A failed shard's leased URLs go back to the queue for the shards still
+        running. The crawl fails only if every shard failed.
+        """
+        crawl_id = crawler.crawl_id
+        try:
+            if error is not None:
+                crawler.frontier.release()
+            if not coordinator.finish_shard(crawler.shard, crawler.get_progress(), failed=error is not None):
+                return
+        except Exception as e:
+            logger.error(f"Failed to record shard {crawler.shard} of crawl {crawl_id} as finished: {str(e)}")
+            return
+        
+        try:
+            status = self.db.get_crawl_status(crawl_id, org_id)
+            if status:
+                status.progress = coordinator.aggregate_progress()
+                status.end_time = datetime.now()
+                if coordinator.cancelled:
+                    status.state = CrawlState.CANCELLED
+                elif coordinator.failed_shards >= coordinator.shards:
+                    status.state = CrawlState.FAILED
+                    status.error = str(error) if error is not None else "All shards failed"
+                else:
+                    status.state = CrawlState.COMPLETED
+                    self._trigger_rag_optimization(crawl_id, org_id, status.progress)
+                self._update_status(status, org_id)
+                logger.info(f"🏁 Sharded crawl {crawl_id} finished: {status.state.value}")
+        finally:
+            coordinator.cleanup()
+    
+    def reextract_crawl(self, crawl_id: str, org_id: str, workers: Optional[int] = None) -> Dict:
+        """
+        Rebuild a finished crawl's contents from its archived raw pages.
+        
+        Args:
+            crawl_id: Crawl to re-extract
+            org_id: Organization ID
+            workers: Extraction processes (defaults to the CPU count)
+        
+        Returns:
+            Re-extraction summary dictionary
+        """
+        status = self.db.get_crawl_status(crawl_id, org_id)
+        if not status:
+            raise ValueError(f"Crawl {crawl_id} not found")
+        if crawl_id in self.active_crawls or status.state == CrawlState.RUNNING:
+            raise ValueError(f"Crawl {crawl_id} is still running")
+        
+        boilerplate = None
+        if status.config.learn_boilerplate:
+            # Strip the template learned since, also from pages crawled before it settled
+            boilerplate = BoilerplateLearner.load(
+                self.db, status.domain, org_id,
+                min_pages=status.config.boilerplate_min_pages,
+                min_ratio=status.config.boilerplate_min_ratio
+            ).blocks
+        
+        return reextract_crawl(self.db, crawl_id, org_id, store_html=status.config.store_html,
+                               workers=workers, boilerplate=boilerplate)
+    
     def get_crawl_status(self, crawl_id: str, org_id: str) -> Optional[CrawlStatus]:
         """Get the current status of a crawl job."""
         # Try in-memory cache first
@@ -408,18 +579,36 @@ class CrawlerService:
             # For active crawls, update the progress
             if crawl_id in self.active_crawls:
                 status.progress = self.active_crawls[crawl_id].get_progress()
-            
-            return status
+        else:
+            # Otherwise fetch from database
+            status = self.db.get_crawl_status(crawl_id, org_id)
+            if status:
+                self.crawl_statuses[crawl_id] = status
         
-        # Otherwise fetch from database
-        status = self.db.get_crawl_status(crawl_id, org_id)
-        if status:
-            self.crawl_statuses[crawl_id] = status
+        # Sharded crawls report the combined progress of all shards
+        if status and status.config.shards > 1 and status.state == CrawlState.RUNNING:
+            try:
+                status.progress = ShardCoordinator(crawl_id).aggregate_progress()
+            except Exception as e:
+                logger.warning(f"Could not read shard progress for crawl {crawl_id}: {e}")
         
         return status
     
     def cancel_crawl(self, crawl_id: str, org_id: str) -> bool:
         """Cancel an ongoing crawl job."""
+        status = self.get_crawl_status(crawl_id, org_id)
+        if status and status.config.shards > 1 and status.state == CrawlState.RUNNING:
+            # Shards run in Celery workers; they stop when they see the flag
+            try:
+                ShardCoordinator(crawl_id).cancel()
+                status.state = CrawlState.CANCELLED
+                status.end_time = datetime.now()
+                self._update_status(status, org_id)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to cancel sharded crawl {crawl_id}: {str(e)}")
+                return False
+        
         if crawl_id not in self.active_crawls:
             return False
         
@@ -436,7 +625,7 @@ class CrawlerService:
             del self.active_crawls[crawl_id]
             
             # Save updated status
-            self.db.update_crawl_status(status, org_id)
+            self._update_status(status, org_id)
             
             return True
         
@@ -459,7 +648,7 @@ class CrawlerService:
                 del self.crawl_statuses[crawl_id]
             
             # Delete from database
-            from database.models import ContentChunk, Content, Crawl
+            from database.models import ContentChunk, Content, Crawl, CrawlCheckpoint, ContentDuplicate, PageValidator
             session = self.db.session
             
             # Find the crawl record
@@ -485,6 +674,14 @@ class CrawlerService:
                 ).delete()
                 logger.info(f"Deleted {chunk_count} chunks for content {content_item.id}")
             
+            # Validators pointing at the deleted content would make a re-crawl skip those pages
+            session.query(PageValidator).filter(
+                PageValidator.org_id == org_id,
+                PageValidator.content_id.in_(
+                    session.query(Content.id).filter(Content.crawl_id == crawl_id, Content.org_id == org_id)
+                )
+            ).delete(synchronize_session=False)
+            
             # Delete content items
             content_count = session.query(Content).filter(
                 Content.crawl_id == crawl_id,
@@ -492,10 +689,23 @@ class CrawlerService:
             ).delete()
             logger.info(f"Deleted {content_count} content items for crawl {crawl_id}")
             
+            # Delete any resume checkpoint
+            session.query(CrawlCheckpoint).filter(
+                CrawlCheckpoint.crawl_id == crawl_id
+            ).delete()
+            
+            # Delete near-duplicate links recorded by this crawl
+            session.query(ContentDuplicate).filter(
+                ContentDuplicate.crawl_id == crawl_id,
+                ContentDuplicate.org_id == org_id
+            ).delete()
+            
             # Delete the crawl record
             session.delete(crawl_record)
             session.commit()
             
+            self._delete_archived_pages(f"{org_id}/{crawl_id}/")
+            
             logger.info(f"Successfully deleted crawl {crawl_id} and associated content")
             return True
             
@@ -504,6 +714,17 @@ class CrawlerService:
             session.rollback()
             return False
     
+    def _delete_archived_pages(self, prefix: str):
+        """Delete raw pages archived under a key prefix."""
+        if not os.getenv("PAGE_ARCHIVE_URL"):
+            return
+        try:
+            deleted = get_blob_store().delete_prefix(prefix)
+            logger.info(f"Deleted {deleted} archived pages under {prefix}")
+        except Exception as e:
+            # Orphaned archive records are harmless; they are never read again
+            logger.warning(f"Failed to delete archived pages under {prefix}: {str(e)}")
+    
     def list_crawls(self, limit: int, offset: int, org_id: str) -> List[CrawlStatus]:
         """List all crawl jobs with pagination."""
         return self.db.list_crawl_statuses(limit, offset, org_id)
@@ -523,7 +744,7 @@ class CrawlerService:
             self.crawl_statuses = {}
             
             # Delete from database
-            from database.models import ContentChunk, Content, Crawl
+            from database.models import ContentChunk, Content, Crawl, CrawlCheckpoint, ContentDuplicate, PageValidator
             session = self.db.session
             
             # Delete chunks first (foreign key constraint)
@@ -536,6 +757,15 @@ class CrawlerService:
             content_count = session.query(Content).filter(Content.org_id == org_id).delete()
             logger.info(f"Deleted {content_count} content items")
             
+            # Delete resume checkpoints
+            session.query(CrawlCheckpoint).filter(CrawlCheckpoint.org_id == org_id).delete()
+            
+            # Delete incremental crawl validators (their content is gone)
+            session.query(PageValidator).filter(PageValidator.org_id == org_id).delete()
+            
+            # Delete near-duplicate links
+            session.query(ContentDuplicate).filter(ContentDuplicate.org_id == org_id).delete()
+            
             # Delete crawls
             logger.info("Deleting crawl records...")
             crawl_count = session.query(Crawl).filter(Crawl.org_id == org_id).delete()
@@ -544,6 +774,8 @@ class CrawlerService:
             # Commit the changes
             session.commit()
             
+            self._delete_archived_pages(f"{org_id}/")
+            
             logger.info(f"Successfully deleted all crawls and associated content for organization {org_id}")
             return True
             
@@ -0,0 +1,260 @@
+"""
+robots.txt and sitemap support for frontier seeding.
+
+robots.txt is read line by line and sitemaps are parsed incrementally while
+they download (sitemap index files and gzipped sitemaps included), so large
+sites can be seeded without holding whole documents in memory.
+"""
+import logging
+import re
+import zlib
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def _pattern_to_regex(pattern: str):
+    """Translate a robots.txt path pattern (* and $ wildcards) to a regex."""
+    anchored = pattern.endswith('$')
+    if anchored:
+        pattern = pattern[:-1]
+    regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+class RobotsRules:
+    """Allow/disallow rules and crawl-delay for one user agent."""
+    
+    def __init__(self,
+                 rules: Optional[List[Tuple[bool, str]]] = None,
+                 crawl_delay: Optional[float] = None,
+                 sitemaps: Optional[List[str]] = None):
+        """
+        Initialize robots rules.
+        
+        Args:
+            rules: (allowed, path pattern) pairs from the matching group
+            crawl_delay: Crawl-delay in seconds, if given
+            sitemaps: Sitemap URLs listed in the file
+        """
+        self.rules = [(allowed, pattern, _pattern_to_regex(pattern)) for allowed, pattern in (rules or []) if pattern]
+        self.crawl_delay = crawl_delay
+        self.sitemaps = sitemaps or []
+    
+    def allowed(self, url: str) -> bool:
+        """Whether a URL may be crawled (longest matching rule wins, allow on ties)."""
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        
+        best_length = -1
+        best_allowed = True
+        for allowed, pattern, regex in self.rules:
+            if regex.match(path) and (len(pattern) > best_length or (len(pattern) == best_length and allowed)):
+                best_length = len(pattern)
+                best_allowed = allowed
+        return best_allowed
+
+def parse_robots(lines: Iterable[str], user_agent: str) -> RobotsRules:
+    """
+    Parse robots.txt lines into the rules that apply to a user agent.
+    
+    The most specific group whose product token appears in the user agent is
+    used; the * group applies when none match.
+    """
+    agent = user_agent.lower()
+    groups: Dict[str, Dict] = {}
+    current: List[str] = []
+    in_rules = False
+    sitemaps: List[str] = []
+    
+    for raw_line in lines:
+        line = raw_line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        field, value = line.split(':', 1)
+        field = field.strip().lower()
+        value = value.strip()
+        
+        if field == 'sitemap':
+            if value:
+                sitemaps.append(value)
+        elif field == 'user-agent':
+            if in_rules:
+                current = []
+                in_rules = False
+            token = value.lower()
+            current.append(token)
+            groups.setdefault(token, {"rules": [], "crawl_delay": None})
+        elif field in ('allow', 'disallow', 'crawl-delay') and current:
+            in_rules = True
+            for token in current:
+                if field == 'crawl-delay':
+                    try:
+                        groups[token]["crawl_delay"] = float(value)
+                    except ValueError:
+                        pass
+                else:
+                    groups[token]["rules"].append((field == 'allow', value))
+    
+    matching = [token for token in groups if token != '*' and token in agent]
+    if matching:
+        group = groups[max(matching, key=len)]
+    else:
+        group = groups.get('*', {"rules": [], "crawl_delay": None})
+    
+    return RobotsRules(group["rules"], group["crawl_delay"], sitemaps)
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime lastmod value into an aware UTC datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], '%Y-%m-%d')
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def iter_sitemap(chunks: Iterable[bytes]) -> Iterator[Tuple[str, str, Optional[datetime]]]:
+    """
+    Incrementally parse a sitemap or sitemap index from byte chunks.
+    
+    Gzipped input is detected from its magic bytes and decompressed on the fly.
+    
+    Yields:
+        (kind, loc, lastmod) where kind is "url" or "sitemap"
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    decompressor = None
+    first = True
+    loc = None
+    lastmod = None
+    
+    def drain():
+        nonlocal loc, lastmod
+        for _, elem in parser.read_events():
+            name = _local_name(elem.tag)
+            if name == 'loc':
+                loc = (elem.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = parse_lastmod(elem.text)
+            elif name in ('url', 'sitemap'):
+                if loc:
+                    yield name, loc, lastmod
+                loc = None
+                lastmod = None
+                # Drop finished entries so memory stays flat on large sitemaps
+                elem.clear()
+    
+    for chunk in chunks:
+        if first:
+            first = False
+            if chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        parser.feed(chunk)
+        yield from drain()
+    
+    if decompressor is not None:
+        parser.feed(decompressor.flush())
+    parser.close()
+    yield from drain()
+
+class SitemapSeeder:
+    """Reads robots.txt and the site's sitemaps to seed a crawl frontier."""
+    
+    def __init__(self,
+                 user_agent: str,
+                 timeout: float = 30,
+                 max_urls: int = 50000,
+                 max_sitemaps: int = 50):
+        """
+        Initialize the seeder.
+        
+        Args:
+            user_agent: User agent sent with requests and matched against robots groups
+            timeout: Request timeout in seconds
+            max_urls: Maximum page URLs to collect across all sitemaps
+            max_sitemaps: Maximum sitemap documents to download
+        """
+        self.user_agent = user_agent
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.client = httpx.Client(
+            headers={"User-Agent": user_agent},
+            timeout=timeout,
+            follow_redirects=True
+        )
+        
+        self.sitemaps_fetched = 0
+    
+    def fetch_robots(self, site_url: str) -> Optional[RobotsRules]:
+        """Fetch and parse robots.txt; None if it is missing or unreachable."""
+        robots_url = urljoin(site_url + '/', '/robots.txt')
+        try:
+            with self.client.stream("GET", robots_url) as response:
+                if response.status_code != 200:
+                    logger.info(f"🤖 No robots.txt at {robots_url} (HTTP {response.status_code})")
+                    return None
+                rules = parse_robots(response.iter_lines(), self.user_agent)
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to fetch {robots_url}: {str(e)}")
+            return None
+        
+        logger.info(f"🤖 robots.txt: {len(rules.rules)} rules, crawl-delay {rules.crawl_delay}, {len(rules.sitemaps)} sitemaps")
+        return rules
+    
+    def iter_urls(self, sitemap_urls: List[str]) -> Iterator[Tuple[str, Optional[datetime]]]:
+        """
+        Stream page URLs from sitemaps, following sitemap index files.
+        
+        Yields:
+            (url, lastmod) pairs
+        """
+        pending = list(sitemap_urls)
+        seen_sitemaps = set()
+        found = 0
+        
+        while pending and self.sitemaps_fetched < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+            self.sitemaps_fetched += 1
+            
+            try:
+                with self.client.stream("GET", sitemap_url) as response:
+                    if response.status_code != 200:
+                        logger.info(f"🗺️ Sitemap {sitemap_url} returned HTTP {response.status_code}")
+                        continue
+                    for kind, loc, lastmod in iter_sitemap(response.iter_bytes()):
+                        if kind == "sitemap":
+                            pending.append(loc)
+                            continue
+                        yield loc, lastmod
+                        found += 1
+                        if found >= self.max_urls:
+                            return
+            except (httpx.HTTPError, ET.ParseError, zlib.error) as e:
+                logger.warning(f"Failed to read sitemap {sitemap_url}: {str(e)}")
+    
+    def close(self):
+        self.client.close()
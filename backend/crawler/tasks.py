@@ -7,17 +7,29 @@ operations that can run asynchronously across multiple workers.
 import logging
 from typing import Dict, Any
 from celery import current_task
+from celery.signals import worker_process_shutdown
 from celery_app import celery_app  # Remove RETRY_KWARGS import
 from crawler.service import CrawlerService
+from crawler.browser_pool import get_browser_pool, close_browser_pool
 from database.session import get_db_session
 
 logger = logging.getLogger(__name__)
 
-@celery_app.task(bind=True)  # Remove RETRY_KWARGS to avoid serialization issues
+@worker_process_shutdown.connect
+def shutdown_browser_pool(**kwargs):
+    """Close the worker process's warm browsers when it exits."""
+    close_browser_pool()
+
+# Acknowledged only after the crawl returns, so a task whose worker dies is
+# re-delivered and the crawler resumes it from its last checkpoint
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)  # Remove RETRY_KWARGS to avoid serialization issues
 def crawl_website_task(self, crawl_id: str, domain: str, config: Dict[str, Any], org_id: str):
     """
     Celery task to crawl a website.
     
+    Re-delivery with the same crawl_id resumes from the crawler's last
+    checkpoint instead of starting over.
+    
     Args:
         crawl_id: Unique identifier for the crawl
         domain: Domain to crawl
@@ -47,7 +59,8 @@ def crawl_website_task(self, crawl_id: str, domain: str, config: Dict[str, Any],
                 domain=domain,
                 config=config,
                 org_id=org_id,
-                task_callback=None  # Disable callback to avoid serialization issues
+                task_callback=None,  # Disable callback to avoid serialization issues
+                browser_pool=get_browser_pool()  # Warm browsers shared by this worker's crawls
             )
             
             logger.info(f"✅ Crawl task completed for {domain} (ID: {crawl_id})")
@@ -67,6 +80,94 @@ def crawl_website_task(self, crawl_id: str, domain: str, config: Dict[str, Any],
             "crawl_id": crawl_id
         }
 
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def crawl_shard_task(self, crawl_id: str, domain: str, config: Dict[str, Any], org_id: str, shard: int):
+    """
+    Celery task running one shard of a sharded crawl.
+    
+    Args:
+        crawl_id: Unique identifier for the crawl
+        domain: Domain to crawl
+        config: Crawl configuration
+        org_id: Organization ID for multi-tenant isolation
+        shard: Shard number
+    
+    Returns:
+        Shard result dictionary
+    """
+    try:
+        logger.info(f"🚀 Starting crawl shard {shard} for {domain} (ID: {crawl_id})")
+        
+        db_session = get_db_session()
+        
+        try:
+            from database.db import Database
+            db = Database(db_session)
+            
+            crawler_service = CrawlerService(db)
+            result = crawler_service.run_crawl_shard(
+                crawl_id=crawl_id,
+                domain=domain,
+                config=config,
+                org_id=org_id,
+                shard=shard,
+                browser_pool=get_browser_pool()
+            )
+            
+            logger.info(f"✅ Crawl shard {shard} completed for {domain} (ID: {crawl_id})")
+            return result
+            
+        finally:
+            db_session.close()
+            
+    except Exception as exc:
+        error_msg = str(exc)
+        logger.error(f"❌ Crawl shard {shard} failed for {domain} (ID: {crawl_id}): {error_msg}", exc_info=True)
+        
+        return {
+            "status": "failed",
+            "error": error_msg,
+            "crawl_id": crawl_id,
+            "shard": shard
+        }
+
+@celery_app.task(bind=True)
+def reextract_crawl_task(self, crawl_id: str, org_id: str):
+    """
+    Celery task rebuilding a crawl's contents from its archived raw pages.
+    
+    Args:
+        crawl_id: Crawl to re-extract
+        org_id: Organization ID for multi-tenant isolation
+    
+    Returns:
+        Re-extraction summary dictionary
+    """
+    try:
+        logger.info(f"🔁 Starting re-extraction task for crawl {crawl_id}")
+        
+        db_session = get_db_session()
+        
+        try:
+            from database.db import Database
+            db = Database(db_session)
+            
+            crawler_service = CrawlerService(db)
+            return crawler_service.reextract_crawl(crawl_id, org_id)
+            
+        finally:
+            db_session.close()
+            
+    except Exception as exc:
+        error_msg = str(exc)
+        logger.error(f"❌ Re-extraction failed for crawl {crawl_id}: {error_msg}", exc_info=True)
+        
+        return {
+            "status": "failed",
+            "error": error_msg,
+            "crawl_id": crawl_id
+        }
+
 @celery_app.task(bind=True)  # Remove RETRY_KWARGS
 def process_crawled_content_task(self, crawl_id: str, org_id: str):
     """
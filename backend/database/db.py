@@ -10,7 +10,7 @@ from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
 import uuid
 
-from database.models import Crawl, Content, ContentChunk, MarketingTemplate, RedditSignal, SignalResponse
+from database.models import Crawl, Content, ContentChunk, MarketingTemplate, RedditSignal, SignalResponse, PageValidator, CrawlCheckpoint, HostCrawlRate, ContentDuplicate, BoilerplateTemplate, CachedEmbedding
 from api.models import CrawlStatus, CrawlState, CrawlProgress, ContentType, ContentMetadata
 
 logger = logging.getLogger(__name__)
@@ -207,42 +207,415 @@ class Database:
         result = self._safe_execute("list_crawl_statuses", _list_operation)
         return result if result is not None else []
     
+    @staticmethod
+    def _content_row(content_data: Dict[str, Any], org_id: str) -> Dict[str, Any]:
+        """Map extracted content to contents table columns."""
+        metadata = content_data["metadata"]
+        
+        # Handle metadata as either dict or object with proper fallbacks
+        def get_metadata_value(key, default=None):
+            if isinstance(metadata, dict):
+                return metadata.get(key, default)
+            else:
+                return getattr(metadata, key, default)
+        
+        return {
+            "id": content_data["content_id"],
+            "org_id": org_id,
+            "url": content_data["url"],
+            "domain": content_data["domain"],
+            "text": content_data["text"],
+            "html": content_data.get("html"),
+            "crawl_id": content_data["crawl_id"],
+            "extracted_at": content_data["extracted_at"],
+            "title": get_metadata_value("title", ""),
+            "author": get_metadata_value("author"),
+            "publication_date": get_metadata_value("publication_date"),
+            "last_modified": get_metadata_value("last_modified"),
+            "categories": get_metadata_value("categories", []),
+            "tags": get_metadata_value("tags", []),
+            "language": get_metadata_value("language", "en"),
+            "content_type": get_metadata_value("content_type", "webpage"),
+            "simhash": content_data.get("simhash"),
+            "archive_key": content_data.get("archive_key")
+        }
+    
     def save_content(self, content_data: Dict[str, Any], org_id: str):
         """Save content to the database."""
         def _save_content_operation():
-            metadata = content_data["metadata"]
+            content = Content(**self._content_row(content_data, org_id))
             
-            # Handle metadata as either dict or object with proper fallbacks
-            def get_metadata_value(key, default=None):
-                if isinstance(metadata, dict):
-                    return metadata.get(key, default)
-                else:
-                    return getattr(metadata, key, default)
+            self.session.add(content)
+            self.session.commit()
+            return True
+        
+        return self._safe_execute("save_content", _save_content_operation)
+    
+    def save_contents(self, contents: List[Dict[str, Any]], org_id: str):
+        """Save several pieces of content in one multi-row insert and one commit."""
+        def _save_contents_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            rows = [self._content_row(content_data, org_id) for content_data in contents]
+            
+            # Rows already written by an earlier, interrupted flush are skipped
+            statement = insert(Content).values(rows).on_conflict_do_nothing(index_elements=["id"])
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        if not contents:
+            return True
+        return self._safe_execute("save_contents", _save_contents_operation)
+    
+    def get_page_validators(self, domain: str, org_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get stored page validators for a crawl domain, keyed by URL.
+        
+        content_id is None when the content the validator points to no longer
+        exists (e.g. its crawl was deleted), so the page must be fetched again.
+        """
+        def _get_validators_operation():
+            rows = self.session.query(PageValidator, Content.id).outerjoin(
+                Content,
+                and_(Content.id == PageValidator.content_id, Content.org_id == PageValidator.org_id)
+            ).filter(
+                PageValidator.org_id == org_id,
+                PageValidator.domain == domain
+            ).all()
+            
+            return {
+                validator.url: {
+                    "etag": validator.etag,
+                    "last_modified": validator.last_modified,
+                    "text_hash": validator.text_hash,
+                    "links": validator.links or [],
+                    "content_id": content_id
+                }
+                for validator, content_id in rows
+            }
+        
+        result = self._safe_execute("get_page_validators", _get_validators_operation)
+        return result if result is not None else {}
+    
+    def save_page_validators(self, validators: List[Dict[str, Any]], org_id: str):
+        """Insert or update page validators in one statement."""
+        def _save_validators_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            rows = [
+                {
+                    "org_id": org_id,
+                    "url": validator["url"],
+                    "domain": validator["domain"],
+                    "etag": validator.get("etag"),
+                    "last_modified": validator.get("last_modified"),
+                    "text_hash": validator.get("text_hash"),
+                    "links": validator.get("links", []),
+                    "content_id": validator.get("content_id"),
+                    "last_crawled_at": validator.get("last_crawled_at") or datetime.utcnow()
+                }
+                for validator in validators
+            ]
+            
+            statement = insert(PageValidator).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["org_id", "url"],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("domain", "etag", "last_modified", "text_hash", "links", "content_id", "last_crawled_at")
+                }
+            )
+            
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        if not validators:
+            return True
+        return self._safe_execute("save_page_validators", _save_validators_operation)
+    
+    def get_host_rates(self, domain: str, org_id: str) -> Dict[str, float]:
+        """Get learned crawl rates for a domain and its subdomains, keyed by host."""
+        def _get_rates_operation():
+            rates = self.session.query(HostCrawlRate).filter(
+                HostCrawlRate.org_id == org_id,
+                or_(HostCrawlRate.host == domain, HostCrawlRate.host.like(f"%.{domain}"))
+            ).all()
+            return {rate.host: rate.rate for rate in rates}
+        
+        result = self._safe_execute("get_host_rates", _get_rates_operation)
+        return result if result is not None else {}
+    
+    def save_host_rates(self, rates: Dict[str, float], org_id: str):
+        """Insert or update learned crawl rates in one statement."""
+        def _save_rates_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            now = datetime.utcnow()
+            statement = insert(HostCrawlRate).values([
+                {"org_id": org_id, "host": host, "rate": rate, "updated_at": now}
+                for host, rate in rates.items()
+            ])
+            statement = statement.on_conflict_do_update(
+                index_elements=["org_id", "host"],
+                set_={"rate": statement.excluded.rate, "updated_at": statement.excluded.updated_at}
+            )
+            
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        if not rates:
+            return True
+        return self._safe_execute("save_host_rates", _save_rates_operation)
+    
+    def get_boilerplate_template(self, domain: str, org_id: str) -> Optional[Dict[str, Any]]:
+        """Get the block counts learned for a domain, as {"counts": {hash: pages}, "pages_seen": n}."""
+        def _get_template_operation():
+            template = self.session.query(BoilerplateTemplate).filter(
+                BoilerplateTemplate.org_id == org_id,
+                BoilerplateTemplate.domain == domain
+            ).first()
+            if not template:
+                return None
+            return {
+                "counts": {block: count for block, count in template.counts},
+                "pages_seen": template.pages_seen
+            }
+        
+        return self._safe_execute("get_boilerplate_template", _get_template_operation)
+    
+    def save_boilerplate_template(self, domain: str, template: Dict[str, Any], org_id: str):
+        """Insert or replace the block counts learned for a domain."""
+        def _save_template_operation():
+            from sqlalchemy.dialects.postgresql import insert
             
-            content = Content(
-                id=content_data["content_id"],
+            statement = insert(BoilerplateTemplate).values(
                 org_id=org_id,
-                url=content_data["url"],
-                domain=content_data["domain"],
-                text=content_data["text"],
-                html=content_data.get("html"),
-                crawl_id=content_data["crawl_id"],
-                extracted_at=content_data["extracted_at"],
-                title=get_metadata_value("title", ""),
-                author=get_metadata_value("author"),
-                publication_date=get_metadata_value("publication_date"),
-                last_modified=get_metadata_value("last_modified"),
-                categories=get_metadata_value("categories", []),
-                tags=get_metadata_value("tags", []),
-                language=get_metadata_value("language", "en"),
-                content_type=get_metadata_value("content_type", "webpage")
+                domain=domain,
+                # JSON object keys are strings, so the hashes are stored as pairs
+                counts=[[block, count] for block, count in template["counts"].items()],
+                pages_seen=template["pages_seen"],
+                updated_at=datetime.utcnow()
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=["org_id", "domain"],
+                set_={
+                    "counts": statement.excluded.counts,
+                    "pages_seen": statement.excluded.pages_seen,
+                    "updated_at": statement.excluded.updated_at
+                }
             )
             
-            self.session.add(content)
+            self.session.execute(statement)
             self.session.commit()
             return True
         
-        return self._safe_execute("save_content", _save_content_operation)
+        return self._safe_execute("save_boilerplate_template", _save_template_operation)
+    
+    def get_cached_embeddings(self, model_id: str, text_hashes: List[str]) -> Dict[str, List[float]]:
+        """Get cached embeddings of a model by text hash ({text_hash: embedding} for the hashes found)."""
+        def _get_embeddings_operation():
+            rows = self.session.query(CachedEmbedding.text_hash, CachedEmbedding.embedding).filter(
+                CachedEmbedding.model_id == model_id,
+                CachedEmbedding.text_hash.in_(text_hashes)
+            ).all()
+            return {text_hash: embedding for text_hash, embedding in rows}
+        
+        if not text_hashes:
+            return {}
+        return self._safe_execute("get_cached_embeddings", _get_embeddings_operation)
+    
+    def store_cached_embeddings(self, model_id: str, embeddings: Dict[str, List[float]]):
+        """Add embeddings of a model to the cache by text hash (existing entries are kept)."""
+        def _store_embeddings_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            now = datetime.utcnow()
+            statement = insert(CachedEmbedding).values([
+                {"model_id": model_id, "text_hash": text_hash, "embedding": embedding, "created_at": now}
+                for text_hash, embedding in embeddings.items()
+            ]).on_conflict_do_nothing(index_elements=["model_id", "text_hash"])
+            
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        if not embeddings:
+            return True
+        return self._safe_execute("store_cached_embeddings", _store_embeddings_operation)
+    
+    def update_content_embeddings(self, embeddings: Dict[str, List[float]], org_id: str):
+        """Set the embeddings of contents ({content_id: embedding})."""
+        def _update_embeddings_operation():
+            owned = {
+                content_id for (content_id,) in self.session.query(Content.id).filter(
+                    Content.org_id == org_id,
+                    Content.id.in_(list(embeddings))
+                )
+            }
+            self.session.bulk_update_mappings(Content, [
+                {"id": content_id, "embedding": embedding}
+                for content_id, embedding in embeddings.items()
+                if content_id in owned
+            ])
+            self.session.commit()
+            return len(owned)
+        
+        if not embeddings:
+            return 0
+        return self._safe_execute("update_content_embeddings", _update_embeddings_operation)
+    
+    def get_content_fingerprints(self, org_id: str) -> List[Dict[str, Any]]:
+        """Get the SimHash fingerprints of all stored content of an organization."""
+        def _get_fingerprints_operation():
+            rows = self.session.query(Content.id, Content.url, Content.simhash).filter(
+                Content.org_id == org_id,
+                Content.simhash.isnot(None)
+            ).all()
+            
+            return [
+                {"content_id": content_id, "url": url, "simhash": simhash}
+                for content_id, url, simhash in rows
+            ]
+        
+        result = self._safe_execute("get_content_fingerprints", _get_fingerprints_operation)
+        return result if result is not None else []
+    
+    def save_content_duplicates(self, duplicates: List[Dict[str, Any]], org_id: str):
+        """Insert or update near-duplicate links in one statement."""
+        def _save_duplicates_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            rows = [dict(duplicate, org_id=org_id) for duplicate in duplicates]
+            statement = insert(ContentDuplicate).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["org_id", "url"],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("duplicate_of", "crawl_id", "distance", "detected_at")
+                }
+            )
+            
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        if not duplicates:
+            return True
+        return self._safe_execute("save_content_duplicates", _save_duplicates_operation)
+    
+    def get_archived_contents(self, crawl_id: str, org_id: str) -> List[Dict[str, Any]]:
+        """Get the contents of a crawl that have an archived raw page."""
+        def _get_archived_operation():
+            rows = self.session.query(Content.id, Content.url, Content.domain, Content.archive_key).filter(
+                Content.org_id == org_id,
+                Content.crawl_id == crawl_id,
+                Content.archive_key.isnot(None)
+            ).all()
+            
+            return [
+                {"content_id": content_id, "url": url, "domain": domain, "archive_key": archive_key}
+                for content_id, url, domain, archive_key in rows
+            ]
+        
+        result = self._safe_execute("get_archived_contents", _get_archived_operation)
+        return result if result is not None else []
+    
+    def update_contents_extraction(self, contents: List[Dict[str, Any]], org_id: str):
+        """
+        Replace the extracted fields of existing contents in one bulk update.
+        
+        They are marked unprocessed, so they are chunked again from the new
+        text. Their chunks are kept until then: RAG processing reconciles them
+        by chunk ID, so unchanged chunks keep their embeddings and the others
+        are replaced.
+        """
+        def _update_extraction_operation():
+            ids = [content_data["content_id"] for content_data in contents]
+            owned = {
+                content_id for (content_id,) in self.session.query(Content.id).filter(
+                    Content.org_id == org_id,
+                    Content.id.in_(ids)
+                ).all()
+            }
+            
+            mappings = []
+            for content_data in contents:
+                if content_data["content_id"] not in owned:
+                    continue
+                row = self._content_row(content_data, org_id)
+                for column in ("org_id", "url", "domain", "crawl_id", "archive_key"):
+                    row.pop(column)
+                row["is_processed"] = False
+                mappings.append(row)
+            
+            self.session.bulk_update_mappings(Content, mappings)
+            self.session.commit()
+            return len(mappings)
+        
+        if not contents:
+            return 0
+        return self._safe_execute("update_contents_extraction", _update_extraction_operation)
+    
+    def save_crawl_checkpoint(self, crawl_id: str, state: Dict[str, Any], pages_done: int, org_id: str):
+        """Insert or replace the checkpoint of a running crawl."""
+        def _save_checkpoint_operation():
+            from sqlalchemy.dialects.postgresql import insert
+            
+            statement = insert(CrawlCheckpoint).values(
+                crawl_id=crawl_id,
+                org_id=org_id,
+                state=state,
+                pages_done=pages_done,
+                updated_at=datetime.utcnow()
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=["crawl_id"],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("state", "pages_done", "updated_at")
+                }
+            )
+            
+            self.session.execute(statement)
+            self.session.commit()
+            return True
+        
+        return self._safe_execute("save_crawl_checkpoint", _save_checkpoint_operation)
+    
+    def get_crawl_checkpoint(self, crawl_id: str, org_id: str) -> Optional[Dict[str, Any]]:
+        """Get the last checkpoint of a crawl, if any."""
+        def _get_checkpoint_operation():
+            checkpoint = self.session.query(CrawlCheckpoint).filter(
+                CrawlCheckpoint.crawl_id == crawl_id,
+                CrawlCheckpoint.org_id == org_id
+            ).first()
+            
+            if not checkpoint:
+                return None
+            
+            return {
+                "crawl_id": checkpoint.crawl_id,
+                "state": checkpoint.state,
+                "pages_done": checkpoint.pages_done,
+                "updated_at": checkpoint.updated_at
+            }
+        
+        return self._safe_execute("get_crawl_checkpoint", _get_checkpoint_operation)
+    
+    def delete_crawl_checkpoint(self, crawl_id: str, org_id: str):
+        """Delete the checkpoint of a crawl once it no longer needs resuming."""
+        def _delete_checkpoint_operation():
+            self.session.query(CrawlCheckpoint).filter(
+                CrawlCheckpoint.crawl_id == crawl_id,
+                CrawlCheckpoint.org_id == org_id
+            ).delete()
+            self.session.commit()
+            return True
+        
+        return self._safe_execute("delete_crawl_checkpoint", _delete_checkpoint_operation)
     
     def get_content(self, content_id: str, org_id: str) -> Optional[Dict[str, Any]]:
         """Get content by ID."""
@@ -410,6 +783,125 @@ class Database:
         
         return self._safe_execute("store_content_chunks", _store_chunks_operation)
     
+    def mark_contents_processed(self, content_ids: List[str], org_id: str):
+        """Mark contents as chunked and embedded."""
+        def _mark_processed_operation():
+            self.session.query(Content).filter(
+                Content.org_id == org_id,
+                Content.id.in_(content_ids)
+            ).update({Content.is_processed: True}, synchronize_session=False)
+            self.session.commit()
+            return True
+        
+        if not content_ids:
+            return True
+        return self._safe_execute("mark_contents_processed", _mark_processed_operation)
+    
+    def get_chunk_positions(self, content_ids: List[str], org_id: str) -> Dict[str, Dict[str, tuple]]:
+        """Stored chunks of contents: {content_id: {chunk_id: (chunk_index, start_char, end_char)}}."""
+        def _get_positions_operation():
+            rows = self.session.query(
+                ContentChunk.content_id, ContentChunk.id, ContentChunk.chunk_index,
+                ContentChunk.start_char, ContentChunk.end_char
+            ).filter(
+                ContentChunk.org_id == org_id,
+                ContentChunk.content_id.in_(content_ids)
+            ).all()
+            
+            positions: Dict[str, Dict[str, tuple]] = {}
+            for content_id, chunk_id, chunk_index, start_char, end_char in rows:
+                positions.setdefault(content_id, {})[chunk_id] = (chunk_index, start_char, end_char)
+            return positions
+        
+        if not content_ids:
+            return {}
+        return self._safe_execute("get_chunk_positions", _get_positions_operation)
+    
+    def get_previous_chunk_embeddings(self, content_ids: List[str], org_id: str) -> Dict[str, tuple]:
+        """
+        Embedded chunks of the previous content of the same URL, for contents of a new crawl.
+        
+        Returns:
+            {content_id: (previous_content_id, {chunk_id: embedding})} for the
+            contents whose URL has an earlier content with chunks
+        """
+        def _get_previous_operation():
+            urls = dict(self.session.query(Content.id, Content.url).filter(
+                Content.org_id == org_id,
+                Content.id.in_(content_ids)
+            ).all())
+            if not urls:
+                return {}
+            
+            has_chunks = self.session.query(ContentChunk.id).filter(
+                ContentChunk.org_id == org_id,
+                ContentChunk.content_id == Content.id
+            ).exists()
+            candidates = self.session.query(Content.id, Content.url).filter(
+                Content.org_id == org_id,
+                Content.url.in_(set(urls.values())),
+                Content.id.notin_(content_ids),
+                has_chunks
+            ).order_by(desc(Content.extracted_at)).all()
+            
+            # Latest earlier content per URL
+            previous_by_url: Dict[str, str] = {}
+            for previous_id, url in candidates:
+                previous_by_url.setdefault(url, previous_id)
+            if not previous_by_url:
+                return {}
+            
+            embeddings: Dict[str, Dict[str, Any]] = {}
+            rows = self.session.query(ContentChunk.content_id, ContentChunk.id, ContentChunk.embedding).filter(
+                ContentChunk.org_id == org_id,
+                ContentChunk.content_id.in_(list(previous_by_url.values())),
+                ContentChunk.embedding.isnot(None)
+            ).all()
+            for previous_id, chunk_id, embedding in rows:
+                embeddings.setdefault(previous_id, {})[chunk_id] = embedding
+            
+            return {
+                content_id: (previous_by_url[url], embeddings.get(previous_by_url[url], {}))
+                for content_id, url in urls.items() if url in previous_by_url
+            }
+        
+        if not content_ids:
+            return {}
+        return self._safe_execute("get_previous_chunk_embeddings", _get_previous_operation)
+    
+    def update_chunk_positions(self, chunks: List[Dict[str, Any]], org_id: str):
+        """Move stored chunks to their new index and offsets (text and embedding unchanged)."""
+        def _update_positions_operation():
+            for chunk in chunks:
+                self.session.query(ContentChunk).filter(
+                    ContentChunk.org_id == org_id,
+                    ContentChunk.id == chunk["id"]
+                ).update({
+                    ContentChunk.chunk_index: chunk["chunk_index"],
+                    ContentChunk.start_char: chunk["start_char"],
+                    ContentChunk.end_char: chunk["end_char"]
+                }, synchronize_session=False)
+            self.session.commit()
+            return True
+        
+        if not chunks:
+            return True
+        return self._safe_execute("update_chunk_positions", _update_positions_operation)
+    
+    def delete_chunks(self, chunk_ids: List[str], org_id: str):
+        """Delete chunks by ID."""
+        def _delete_chunks_operation():
+            deleted = self.session.query(ContentChunk).filter(
+                ContentChunk.org_id == org_id,
+                ContentChunk.id.in_(chunk_ids)
+            ).delete(synchronize_session=False)
+            self.session.commit()
+            return deleted
+        
+        if not chunk_ids:
+            return 0
+        return self._safe_execute("delete_chunks", _delete_chunks_operation)
+    
     def search_chunks_by_vector(
         self,
         query_embedding: List[float],
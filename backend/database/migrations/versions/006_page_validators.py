@@ -0,0 +1,36 @@
+"""Add page validators for incremental re-crawls
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('page_validators',
+        sa.Column('org_id', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('text_hash', sa.String(), nullable=True),
+        sa.Column('links', JSONB(), nullable=True),
+        sa.Column('content_id', sa.String(), nullable=True),
+        sa.Column('last_crawled_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('org_id', 'url')
+    )
+    
+    op.create_index('ix_page_validators_org_id_domain', 'page_validators', ['org_id', 'domain'])
+
+def downgrade():
+    op.drop_index('ix_page_validators_org_id_domain', table_name='page_validators')
+    op.drop_table('page_validators')
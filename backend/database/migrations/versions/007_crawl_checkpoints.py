@@ -0,0 +1,33 @@
+"""Add crawl checkpoints for resuming interrupted crawls
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('crawl_checkpoints',
+        sa.Column('crawl_id', sa.String(), nullable=False),
+        sa.Column('org_id', sa.String(), nullable=False),
+        sa.Column('state', JSONB(), nullable=False),
+        sa.Column('pages_done', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['crawl_id'], ['crawls.id']),
+        sa.PrimaryKeyConstraint('crawl_id')
+    )
+    
+    op.create_index('ix_crawl_checkpoints_org_id', 'crawl_checkpoints', ['org_id'])
+
+def downgrade():
+    op.drop_index('ix_crawl_checkpoints_org_id', table_name='crawl_checkpoints')
+    op.drop_table('crawl_checkpoints')
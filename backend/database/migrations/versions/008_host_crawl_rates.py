@@ -0,0 +1,27 @@
+"""Add learned per-host crawl rates
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('host_crawl_rates',
+        sa.Column('org_id', sa.String(), nullable=False),
+        sa.Column('host', sa.String(), nullable=False),
+        sa.Column('rate', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('org_id', 'host')
+    )
+
+def downgrade():
+    op.drop_table('host_crawl_rates')
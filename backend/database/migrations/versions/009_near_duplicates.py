@@ -0,0 +1,37 @@
+"""Add content fingerprints and near-duplicate links
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('contents', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    
+    op.create_table('content_duplicates',
+        sa.Column('org_id', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('duplicate_of', sa.String(), nullable=False),
+        sa.Column('crawl_id', sa.String(), nullable=False),
+        sa.Column('distance', sa.Integer(), nullable=False),
+        sa.Column('detected_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('org_id', 'url')
+    )
+    
+    op.create_index('ix_content_duplicates_duplicate_of', 'content_duplicates', ['duplicate_of'])
+    op.create_index('ix_content_duplicates_crawl_id', 'content_duplicates', ['crawl_id'])
+
+def downgrade():
+    op.drop_index('ix_content_duplicates_crawl_id', table_name='content_duplicates')
+    op.drop_index('ix_content_duplicates_duplicate_of', table_name='content_duplicates')
+    op.drop_table('content_duplicates')
+    op.drop_column('contents', 'simhash')
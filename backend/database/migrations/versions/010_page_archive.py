@@ -0,0 +1,21 @@
+"""Add archive keys to contents
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('contents', sa.Column('archive_key', sa.String(), nullable=True))
+
+def downgrade():
+    op.drop_column('contents', 'archive_key')
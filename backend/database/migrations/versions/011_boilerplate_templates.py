@@ -0,0 +1,29 @@
+"""Add learned per-domain boilerplate templates
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('boilerplate_templates',
+        sa.Column('org_id', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('counts', JSONB(), nullable=False),
+        sa.Column('pages_seen', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('org_id', 'domain')
+    )
+
+def downgrade():
+    op.drop_table('boilerplate_templates')
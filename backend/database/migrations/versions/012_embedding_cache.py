@@ -0,0 +1,27 @@
+"""Add the content-addressed embedding cache
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('embedding_cache',
+        sa.Column('model_id', sa.String(), nullable=False),
+        sa.Column('text_hash', sa.String(), nullable=False),
+        sa.Column('embedding', sa.ARRAY(sa.Float()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('model_id', 'text_hash')
+    )
+
+def downgrade():
+    op.drop_table('embedding_cache')
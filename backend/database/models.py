@@ -324,6 +324,12 @@ class Content(Base):
     entities = Column(MutableList.as_mutable(JSONB), default=[])
     embedding = Column(Vector, nullable=True)
     
+    # SimHash of the extracted text (signed 64-bit), for near-duplicate suppression
+    simhash = Column(sa.BigInteger, nullable=True)
+    
+    # Key of the raw page in the page archive, for re-extraction without re-crawling
+    archive_key = Column(String, nullable=True)
+    
     # Relationships
     crawl = relationship("Crawl", back_populates="contents")
     chunks = relationship("ContentChunk", back_populates="content")
@@ -367,6 +373,82 @@ class ContentChunk(Base):
         Index('ix_content_chunks_org_id_content_id', 'org_id', 'content_id'),
     )
 
+class PageValidator(Base):
+    """Per-URL validators used to skip unchanged pages on incremental re-crawls."""
+    __tablename__ = "page_validators"
+    
+    org_id = Column(String, primary_key=True)  # Multi-tenant organization ID
+    url = Column(String, primary_key=True)
+    domain = Column(String, nullable=False)  # Crawl seed domain the URL was found under
+    
+    # HTTP validators (raw header values, echoed back in conditional requests)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    
+    # Hash of the normalized extracted text
+    text_hash = Column(String, nullable=True)
+    
+    # Outgoing links, so a 304 response can still extend the frontier
+    links = Column(MutableList.as_mutable(JSONB), default=[])
+    
+    content_id = Column(String, nullable=True)
+    last_crawled_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_page_validators_org_id_domain', 'org_id', 'domain'),
+    )
+
+class ContentDuplicate(Base):
+    """A page not stored because it is a near-duplicate of already stored content."""
+    __tablename__ = "content_duplicates"
+    
+    org_id = Column(String, primary_key=True)  # Multi-tenant organization ID
+    url = Column(String, primary_key=True)
+    duplicate_of = Column(String, nullable=False, index=True)  # Content ID of the original page
+    crawl_id = Column(String, nullable=False, index=True)
+    distance = Column(Integer, nullable=False)  # Hamming distance between SimHash fingerprints
+    detected_at = Column(DateTime, nullable=False)
+
+class HostCrawlRate(Base):
+    """Request rate a host settled on during the last crawl, used to start the next one."""
+    __tablename__ = "host_crawl_rates"
+    
+    org_id = Column(String, primary_key=True)  # Multi-tenant organization ID
+    host = Column(String, primary_key=True)
+    rate = Column(Float, nullable=False)  # Requests per second
+    updated_at = Column(DateTime, nullable=False)
+
+class BoilerplateTemplate(Base):
+    """Text blocks counted across a domain's pages, used to strip repeated boilerplate on later crawls."""
+    __tablename__ = "boilerplate_templates"
+    
+    org_id = Column(String, primary_key=True)  # Multi-tenant organization ID
+    domain = Column(String, primary_key=True)  # Host, e.g. docs.example.com
+    counts = Column(JSONB, nullable=False)  # [[block hash, pages it appeared on], ...]
+    pages_seen = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+class CachedEmbedding(Base):
+    """Embedding of a text by a model, keyed by a hash of the normalized text (shared by all organizations)."""
+    __tablename__ = "embedding_cache"
+    
+    model_id = Column(String, primary_key=True)  # Embedding model name and dimension
+    text_hash = Column(String, primary_key=True)  # blake2b hex digest of the normalized text
+    embedding = Column(Vector, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+class CrawlCheckpoint(Base):
+    """Saved frontier, visited set and counters of a running crawl, for resuming it."""
+    __tablename__ = "crawl_checkpoints"
+    
+    crawl_id = Column(String, ForeignKey("crawls.id"), primary_key=True)
+    org_id = Column(String, nullable=False, index=True)  # Multi-tenant organization ID
+    
+    # Crawler state (frontier entries, visited/failed URLs, counters)
+    state = Column(JSONB, nullable=False)
+    pages_done = Column(Integer, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
 class MarketingTemplate(Base):
     """Database model for predefined marketing response templates."""
     __tablename__ = "marketing_templates"
@@ -22,6 +22,7 @@ from database.session import get_db_session
 from database.models import Content, ContentChunk
 from database.db import Database
 from processor.chunker import ContentChunker
+from processor.embedding_cache import embed_texts, get_embedding_cache
 from processor.service import ProcessorService
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
@@ -51,7 +52,7 @@ class OptimizedContentProcessor:
             chunk_size: Target chunk size in tokens
             chunk_overlap: Overlap between chunks in tokens
             batch_size: Batch size for embedding generation
-            max_workers: Maximum number of worker threads
+            max_workers: Maximum number of chunking worker processes
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
@@ -242,7 +243,39 @@ class OptimizedContentProcessor:
         
         return chunk_size, chunk_overlap
     
-    def process_content_item(self, content: Content, org_id: str, force_rechunk: bool = False) -> Dict[str, Any]:
+    def _content_data(self, content: Content) -> Dict[str, Any]:
+        """Chunker input for a content item, with its optimized chunk size and overlap."""
+        chunk_size, chunk_overlap = self.optimize_chunking_strategy(
+            content.content_type or 'default',
+            len(content.text)
+        )
+        
+        return {
+            "content_id": content.id,
+            "url": content.url,
+            "domain": content.domain,
+            "text": content.text,
+            "metadata": {
+                "title": content.title,
+                "content_type": content.content_type,
+                "author": content.author,
+                "publication_date": content.publication_date,
+                "last_modified": content.last_modified,
+                "categories": content.categories or [],
+                "tags": content.tags or [],
+                "language": content.language
+            },
+            "crawl_id": content.crawl_id,
+            "extracted_at": content.extracted_at,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap
+        }
+    
+    def process_content_item(self,
+                             content: Content,
+                             org_id: str,
+                             force_rechunk: bool = False,
+                             chunks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Process a single content item with optimized chunking and error handling.
         
@@ -250,6 +283,7 @@ class OptimizedContentProcessor:
             content: Content object to process
             org_id: Organization ID
             force_rechunk: Force re-chunking even if chunks exist
+            chunks: Chunks already generated for the content (e.g. by chunk_many)
             
         Returns:
             Processing results dictionary
@@ -291,41 +325,19 @@ class OptimizedContentProcessor:
                 self.session.commit()
                 logger.info(f"Deleted {existing_chunks} existing chunks for content {content.id}")
             
-            # Optimize chunking strategy
-            chunk_size, chunk_overlap = self.optimize_chunking_strategy(
-                content.content_type or 'default',
-                len(content.text)
-            )
-            
-            # Create optimized chunker for this content
-            content_chunker = ContentChunker(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                respect_sentences=True
-            )
-            
-            # Prepare content for chunking
-            content_data = {
-                "content_id": content.id,
-                "url": content.url,
-                "domain": content.domain,
-                "text": content.text,
-                "metadata": {
-                    "title": content.title,
-                    "content_type": content.content_type,
-                    "author": content.author,
-                    "publication_date": content.publication_date,
-                    "last_modified": content.last_modified,
-                    "categories": content.categories or [],
-                    "tags": content.tags or [],
-                    "language": content.language
-                },
-                "crawl_id": content.crawl_id,
-                "extracted_at": content.extracted_at
-            }
-            
-            # Generate chunks
-            chunks = content_chunker.process_content(content_data)
+            if chunks is None:
+                # Prepare content for chunking (with the optimized chunking strategy)
+                content_data = self._content_data(content)
+                
+                # Create optimized chunker for this content
+                content_chunker = ContentChunker(
+                    chunk_size=content_data["chunk_size"],
+                    chunk_overlap=content_data["chunk_overlap"],
+                    respect_sentences=True
+                )
+                
+                # Generate chunks
+                chunks = content_chunker.process_content(content_data)
             
             if not chunks:
                 result['error'] = "No chunks generated"
@@ -342,8 +354,8 @@ class OptimizedContentProcessor:
                     # Extract text for embedding generation
                     texts = [chunk["text"] for chunk in batch]
                     
-                    # Generate embeddings
-                    embeddings = embedding_model.encode(texts, show_progress_bar=False)
+                    # Generate embeddings (cached texts are not encoded again)
+                    embeddings = embed_texts(embedding_model, texts, show_progress_bar=False)
                     
                     # Add embeddings to chunks
                     for j, embedding in enumerate(embeddings):
@@ -429,10 +441,17 @@ class OptimizedContentProcessor:
             
             start_time = time.time()
             
-            for i, content in enumerate(unprocessed_content):
+            # Chunk all items across worker processes, streamed back in order
+            chunked = self.chunker.chunk_many(
+                (self._content_data(content) for content in unprocessed_content),
+                workers=self.max_workers
+            )
+            
+            for i, (content, (_, chunks)) in enumerate(zip(unprocessed_content, chunked)):
                 logger.info(f"Processing {i+1}/{len(unprocessed_content)}: {content.title[:50] if content.title else content.url}")
                 
-                result = self.process_content_item(content, org_id)
+                # Items that failed to chunk in a worker are chunked again here, reporting the error
+                result = self.process_content_item(content, org_id, chunks=chunks)
                 results.append(result)
                 
                 if result['success']:
@@ -444,9 +463,6 @@ class OptimizedContentProcessor:
                         'url': content.url,
                         'error': result['error']
                     })
-                
-                # Brief pause to avoid overwhelming the system
-                time.sleep(0.1)
             
             processing_time = time.time() - start_time
             
@@ -529,8 +545,8 @@ class OptimizedContentProcessor:
                     # Extract texts
                     texts = [chunk.text for chunk in batch]
                     
-                    # Generate embeddings
-                    embeddings = embedding_model.encode(texts, show_progress_bar=False)
+                    # Generate embeddings (cached texts are not encoded again)
+                    embeddings = embed_texts(embedding_model, texts, show_progress_bar=False)
                     
                     # Update chunks
                     for j, embedding in enumerate(embeddings):
@@ -554,11 +570,16 @@ class OptimizedContentProcessor:
             self.stats['embeddings_generated'] += embeddings_generated
             self.stats['errors'] += len(errors)
             
+            cache = get_embedding_cache(embedding_model)
+            if cache:
+                logger.info(f"Embedding cache: {cache.summary()}")
+            
             return {
                 'success': len(errors) == 0,
                 'embeddings_generated': embeddings_generated,
                 'errors': errors,
-                'processing_time': processing_time
+                'processing_time': processing_time,
+                'embedding_cache': cache.summary() if cache else None
             }
             
         except Exception as e:
@@ -0,0 +1,152 @@
+"""
+Parallel chunking for bulk ingestion.
+
+Backfills chunk thousands of pages; chunking (sentence splitting and token
+counting) is CPU-bound, so a loop over the pages uses one core. chunk_many
+chunks a stream of content records in worker processes instead and yields
+each content's chunks as soon as they are ready, in input order.
+
+Records are read from the input lazily and at most max_in_flight batches are
+being chunked at any time, so memory stays flat however many pages the input
+yields. Records are reduced to the fields the chunkers use before they are
+sent to a worker (see chunk_input).
+
+Where worker processes cannot be started (e.g. inside a daemonic Celery
+prefork worker), or with a single worker, records are chunked inline.
+"""
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per worker process, set by _init_worker
+_chunkers: Optional["_Chunkers"] = None
+
+def chunk_input(content_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields the chunkers use, with metadata as a plain dict."""
+    metadata = content_data.get("metadata") or {}
+    if not isinstance(metadata, dict):
+        metadata = metadata.dict()
+    content_type = metadata.get("content_type")
+    record = {
+        "content_id": content_data["content_id"],
+        "url": content_data.get("url"),
+        "domain": content_data.get("domain"),
+        "text": content_data.get("text") or "",
+        "extracted_at": content_data.get("extracted_at"),
+        "metadata": {
+            "title": metadata.get("title"),
+            "content_type": getattr(content_type, "value", content_type),
+            "author": metadata.get("author"),
+            "categories": metadata.get("categories") or [],
+            "tags": metadata.get("tags") or [],
+            "language": metadata.get("language")
+        }
+    }
+    # Per-content chunking parameters (see _Chunkers)
+    for key in ("chunk_size", "chunk_overlap"):
+        if content_data.get(key):
+            record[key] = content_data[key]
+    return record
+
+class _Chunkers:
+    """Chunkers by (chunk_size, chunk_overlap), created once per pair."""
+    
+    def __init__(self, chunker_class, chunker_kwargs: Dict[str, Any], default=None):
+        self.chunker_class = chunker_class
+        self.chunker_kwargs = chunker_kwargs
+        self.chunkers = {(None, None): default} if default is not None else {}
+    
+    def for_record(self, record: Dict[str, Any]):
+        key = (record.get("chunk_size"), record.get("chunk_overlap"))
+        if key not in self.chunkers:
+            kwargs = dict(self.chunker_kwargs)
+            if key[0]:
+                kwargs["chunk_size"] = key[0]
+            if key[1]:
+                kwargs["chunk_overlap"] = key[1]
+            self.chunkers[key] = self.chunker_class(**kwargs)
+        return self.chunkers[key]
+
+def _init_worker(chunker_class, chunker_kwargs: Dict[str, Any]):
+    global _chunkers
+    _chunkers = _Chunkers(chunker_class, chunker_kwargs)
+
+def _chunk_records(chunkers: _Chunkers, records: List[Dict[str, Any]]) -> List[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+    """Chunk records: [(content_id, chunks or None if chunking failed)]."""
+    results = []
+    for record in records:
+        try:
+            chunks = chunkers.for_record(record).process_content(record)
+        except Exception as e:
+            logger.warning(f"Failed to chunk {record.get('url') or record['content_id']}: {str(e)}")
+            chunks = None
+        results.append((record["content_id"], chunks))
+    return results
+
+def _chunk_batch(records: List[Dict[str, Any]]) -> List[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+    """Chunk a batch of records in a worker process."""
+    return _chunk_records(_chunkers, records)
+
+def chunk_many(chunker,
+               contents: Iterable[Dict[str, Any]],
+               workers: Optional[int] = None,
+               batch_size: int = 8,
+               max_in_flight: Optional[int] = None) -> Iterator[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+    """
+    Chunk content records across a process pool.
+    
+    Args:
+        chunker: Chunker whose settings the workers' chunkers are created with
+            (its chunker_kwargs() and process_content are used)
+        contents: Content records (as for process_content; may set chunk_size and
+            chunk_overlap per record), read lazily
+        workers: Chunking processes (defaults to CHUNK_WORKERS or the CPU count)
+        batch_size: Records per worker task
+        max_in_flight: Batches submitted but not yet yielded (defaults to twice the workers)
+    
+    Yields:
+        (content_id, chunks) per record in input order; chunks is None if the
+        record could not be chunked
+    """
+    workers = workers or int(os.getenv("CHUNK_WORKERS", "0")) or os.cpu_count() or 1
+    records = (chunk_input(content_data) for content_data in contents)
+    batches = iter(lambda: list(islice(records, batch_size)), [])
+    
+    executor = None
+    if workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(type(chunker), chunker.chunker_kwargs()))
+            # Processes are spawned on the first submit, so failures show up here
+            executor.submit(int).result(timeout=60)
+        except Exception as e:
+            logger.warning(f"⚠️ Chunking pool unavailable, chunking inline: {str(e)}")
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = None
+    
+    if executor is None:
+        chunkers = _Chunkers(type(chunker), chunker.chunker_kwargs(), default=chunker)
+        for batch in batches:
+            yield from _chunk_records(chunkers, batch)
+        return
+    
+    max_in_flight = max_in_flight or workers * 2
+    pending = deque()
+    try:
+        for batch in batches:
+            pending.append(executor.submit(_chunk_batch, batch))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # Also reached when the caller stops iterating early
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
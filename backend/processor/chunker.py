@@ -3,10 +3,15 @@ Content chunking module for RAG system.
 """
 import re
 import uuid
+import bisect
+import hashlib
 import logging
-from typing import List, Dict, Any, Tuple, Union
+from typing import List, Dict, Any, Tuple, Union, Optional, Iterable, Iterator
 from datetime import datetime
 
+from processor import chunk_pool
+from processor.token_counter import TokenCounter, get_token_counter
+
 logger = logging.getLogger(__name__)
 
 # For Python 3.13 compatibility, we'll use a more basic sentence splitting approach
@@ -17,6 +22,31 @@ def simple_sentence_tokenize(text: str) -> List[str]:
     sentences = re.split(r'(?<=[.!?])\s+', text)
     return [s.strip() for s in sentences if s.strip()]
 
+# Content-defined boundaries: a rolling hash over the last few sentences
+BOUNDARY_WINDOW = 3
+BOUNDARY_HASH_BITS = 16
+_MASK64 = (1 << 64) - 1
+
+def _rotl64(value: int, bits: int) -> int:
+    bits %= 64
+    return ((value << bits) | (value >> (64 - bits))) & _MASK64
+
+def _fingerprint(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+
+def chunk_id(content_id: Optional[str], text: str, occurrence: int = 0) -> str:
+    """
+    Stable chunk ID: a hash of the content ID and the chunk text.
+    
+    Re-chunking unchanged text yields the same IDs, so stored chunks (and their
+    embeddings) can be kept. occurrence tells apart identical chunks of one content.
+    A new crawl saves a page under a new content ID; its chunks are matched
+    against the previous content of the URL by recomputing this ID with the
+    previous content ID.
+    """
+    key = f"{content_id}\0{occurrence}\0{text}".encode("utf-8", "surrogatepass")
+    return str(uuid.UUID(bytes=hashlib.blake2b(key, digest_size=16).digest()))
+
 class ContentChunker:
     """
     Manages chunking of content for efficient retrieval in the RAG system.
@@ -27,22 +57,33 @@ class ContentChunker:
         self, 
         chunk_size: int = 500, 
         chunk_overlap: int = 100,
-        respect_sentences: bool = True
+        respect_sentences: bool = True,
+        token_counter: Optional[TokenCounter] = None,
+        content_defined: bool = False
     ):
         """
         Initialize the content chunker.
         
         Args:
-            chunk_size: Target size of each chunk in tokens
+            chunk_size: Target size of each chunk in tokens (capped at the embedding model's window)
             chunk_overlap: Overlap between consecutive chunks in tokens
             respect_sentences: Try to maintain sentence boundaries
+            token_counter: Counter for chunk sizes (default: the shared embedding tokenizer counter)
+            content_defined: Place chunk boundaries by content (a rolling hash over sentences)
+                instead of by position, so an edit only changes the chunks around it
         """
+        # Count with the embedding model's tokenizer, so no chunk is truncated when embedded
+        self.token_counter = token_counter or get_token_counter("embedding")
+        if self.token_counter.max_tokens and chunk_size > self.token_counter.max_tokens:
+            logger.debug(f"Chunk size {chunk_size} capped at the embedding window ({self.token_counter.max_tokens} tokens)")
+            chunk_size = self.token_counter.max_tokens
+        
         self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+        self.chunk_overlap = min(chunk_overlap, chunk_size // 2)
         self.respect_sentences = respect_sentences
+        self.content_defined = content_defined
         
-        # Simple whitespace tokenizer for counting tokens
-        # In a production environment, consider using a proper tokenizer
+        # Whitespace tokenizer for splitting text into words
         self.tokenize = lambda text: text.split()
         
         # Try to import NLTK, but have a fallback
@@ -62,8 +103,34 @@ class ContentChunker:
             self.sent_tokenize = simple_sentence_tokenize
     
     def _estimate_token_count(self, text: str) -> int:
-        """Estimate the number of tokens in a text."""
-        return len(self.tokenize(text))
+        """Number of tokens in a text."""
+        return self.token_counter.count(text)
+    
+    def _token_windows(self, sizes: List[int]) -> List[Tuple[int, int]]:
+        """
+        Overlapping (start, end) index windows over items (words) of the given token sizes.
+        
+        Each window holds at most chunk_size tokens (at least one new item), and
+        the next one starts with the trailing items within chunk_overlap tokens.
+        """
+        prefix = [0]
+        for size in sizes:
+            prefix.append(prefix[-1] + size)
+        
+        windows = []
+        start = 0
+        previous_end = 0
+        while start < len(sizes):
+            end = bisect.bisect_right(prefix, prefix[start] + self.chunk_size, lo=start + 1) - 1
+            end = max(end, start + 1, previous_end + 1)
+            windows.append((start, end))
+            if end >= len(sizes):
+                break
+            # Shorten the overlap if the next item would not fit next to it
+            start = max(bisect.bisect_left(prefix, prefix[end] - self.chunk_overlap, lo=start + 1, hi=end),
+                        bisect.bisect_left(prefix, prefix[end + 1] - self.chunk_size, lo=start + 1, hi=end))
+            previous_end = end
+        return windows
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
@@ -75,6 +142,112 @@ class ContentChunker:
             # Fallback to a simpler method
             return simple_sentence_tokenize(text)
     
+    @staticmethod
+    def _sentence_positions(text: str, sentences: List[str]) -> List[Tuple[int, int]]:
+        """Start and end character positions of each sentence in text."""
+        char_index = 0
+        sentence_positions = []
+        for sentence in sentences:
+            sentence_start = text.find(sentence, char_index)
+            if sentence_start == -1:
+                # If the exact sentence isn't found, just use the current index
+                sentence_start = char_index
+            
+            sentence_end = sentence_start + len(sentence)
+            sentence_positions.append((sentence_start, sentence_end))
+            char_index = sentence_end
+        return sentence_positions
+    
+    def _chunk_units(self, text: str, budget: int) -> List[Tuple[str, int, int, int]]:
+        """
+        Sentences of text as (text, start_char, end_char, tokens); sentences
+        over budget tokens are split into word runs of at most budget tokens.
+        """
+        sentences = self._split_into_sentences(text)
+        positions = self._sentence_positions(text, sentences)
+        sizes = self.token_counter.count_batch(sentences)
+        
+        units = []
+        for sentence, (start_pos, end_pos), size in zip(sentences, positions, sizes):
+            if size <= budget:
+                units.append((sentence, start_pos, end_pos, size))
+                continue
+            
+            words = self.tokenize(sentence)
+            word_sizes = self.token_counter.count_batch(words)
+            run_start, run_size = 0, 0
+            for j, word_size in enumerate(word_sizes + [None]):
+                if word_size is None or (run_size + word_size > budget and j > run_start):
+                    # Calculate approximate character positions
+                    units.append((" ".join(words[run_start:j]),
+                                  start_pos + run_start * len(sentence) // len(words),
+                                  start_pos + j * len(sentence) // len(words),
+                                  run_size))
+                    run_start, run_size = j, 0
+                if word_size is not None:
+                    run_size += word_size
+        return units
+    
+    def _content_defined_chunks(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Split text into chunks at content-defined sentence boundaries.
+        
+        A chunk ends after a sentence when a rolling (Buzhash) hash over the
+        last BOUNDARY_WINDOW sentences hits a target, with a probability
+        proportional to the sentence's tokens, once the chunk holds two thirds
+        of the tokens left after the overlap (or when the next sentence would
+        not fit). Boundaries depend only on the nearby sentences: an edit moves
+        at most the boundaries right after it and the chunks elsewhere keep
+        their text. Each chunk starts with the previous chunk's trailing
+        sentences within chunk_overlap tokens.
+        """
+        budget = max(self.chunk_size - self.chunk_overlap, 1)
+        min_size = budget * 2 // 3
+        target = max(budget // 4, 1)
+        hash_range = 1 << BOUNDARY_HASH_BITS
+        
+        units = self._chunk_units(text, budget)
+        fingerprints = [_fingerprint(unit[0]) for unit in units]
+        
+        chunks = []
+        first = 0       # first unit of the chunk, overlap included
+        own_start = 0   # first unit after the overlap
+        chunk_tokens = 0
+        own_tokens = 0
+        rolling = 0
+        for i, (_, _, _, size) in enumerate(units):
+            rolling = _rotl64(rolling, 1) ^ fingerprints[i]
+            if i >= BOUNDARY_WINDOW:
+                rolling ^= _rotl64(fingerprints[i - BOUNDARY_WINDOW], BOUNDARY_WINDOW)
+            chunk_tokens += size
+            own_tokens += size
+            
+            last = i + 1 == len(units)
+            full = not last and chunk_tokens + units[i + 1][3] > self.chunk_size
+            boundary = own_tokens >= min_size and (rolling % hash_range) * target < hash_range * size
+            if not (last or full or boundary):
+                continue
+            
+            chunks.append({
+                "text": " ".join(unit[0] for unit in units[first:i + 1]),
+                "start_char": units[first][1],
+                "end_char": units[i][2],
+                "chunk_index": len(chunks)
+            })
+            
+            # The next chunk starts with this chunk's trailing units within the overlap budget
+            next_start = i + 1
+            first = next_start
+            chunk_tokens = 0
+            while first > own_start and chunk_tokens + units[first - 1][3] <= self.chunk_overlap:
+                first -= 1
+                chunk_tokens += units[first][3]
+            own_start = next_start
+            own_tokens = 0
+        
+        logger.info(f"Successfully chunked text into {len(chunks)} content-defined chunks")
+        return chunks
+    
     def chunk_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Split text into overlapping chunks.
@@ -90,6 +263,9 @@ class ContentChunker:
             return []
         
         try:
+            if self.content_defined:
+                return self._content_defined_chunks(text)
+            
             chunks = []
             
             if self.respect_sentences:
@@ -100,27 +276,19 @@ class ContentChunker:
                 current_start_char = 0
                 
                 # Track the character positions
-                char_index = 0
-                sentence_positions = []
-                
-                # Calculate the start and end positions of each sentence
-                for sentence in sentences:
-                    sentence_start = text.find(sentence, char_index)
-                    if sentence_start == -1:
-                        # If the exact sentence isn't found, just use the current index
-                        sentence_start = char_index
-                    
-                    sentence_end = sentence_start + len(sentence)
-                    sentence_positions.append((sentence_start, sentence_end))
-                    char_index = sentence_end
+                sentence_positions = self._sentence_positions(text, sentences)
                 
                 # Now create chunks
                 current_sentences = []
+                current_sizes = []
                 current_start = 0
                 current_end = 0
                 
+                # Count all sentences in one tokenizer batch
+                sentence_sizes = self.token_counter.count_batch(sentences)
+                
                 for i, sentence in enumerate(sentences):
-                    sentence_size = self._estimate_token_count(sentence)
+                    sentence_size = sentence_sizes[i]
                     start_pos, end_pos = sentence_positions[i]
                     
                     # Handle case where a single sentence exceeds chunk size
@@ -135,18 +303,20 @@ class ContentChunker:
                                 "chunk_index": len(chunks)
                             })
                             current_sentences = []
+                            current_sizes = []
+                            current_size = 0
                         
                         # Split the long sentence without respecting boundaries
                         words = self.tokenize(sentence)
-                        word_start = 0
+                        word_sizes = self.token_counter.count_batch(words)
                         
-                        for j in range(0, len(words), self.chunk_size - self.chunk_overlap):
-                            chunk_words = words[j:j + self.chunk_size]
+                        for j, j_end in self._token_windows(word_sizes):
+                            chunk_words = words[j:j_end]
                             chunk_text = " ".join(chunk_words)
                             
                             # Calculate approximate character positions
                             chunk_start = start_pos + j * len(sentence) // len(words)
-                            chunk_end = start_pos + (j + len(chunk_words)) * len(sentence) // len(words)
+                            chunk_end = start_pos + j_end * len(sentence) // len(words)
                             
                             chunks.append({
                                 "text": chunk_text,
@@ -167,19 +337,21 @@ class ContentChunker:
                             })
                             
                             # Handle overlap - keep some sentences for continuity
-                            overlap_sentences = []
+                            overlap_count = 0
                             overlap_size = 0
                             
-                            # Add sentences from the end until we reach desired overlap
-                            for sent in reversed(current_sentences):
-                                sent_size = self._estimate_token_count(sent)
-                                if overlap_size + sent_size <= self.chunk_overlap:
-                                    overlap_sentences.insert(0, sent)
+                            # Add sentences from the end until we reach desired overlap,
+                            # leaving room for the current sentence
+                            overlap_limit = min(self.chunk_overlap, self.chunk_size - sentence_size)
+                            for sent_size in reversed(current_sizes):
+                                if overlap_size + sent_size <= overlap_limit:
+                                    overlap_count += 1
                                     overlap_size += sent_size
                                 else:
                                     break
                             
-                            current_sentences = overlap_sentences
+                            current_sentences = current_sentences[len(current_sentences) - overlap_count:]
+                            current_sizes = current_sizes[len(current_sizes) - overlap_count:]
                             current_size = overlap_size
                             
                             # Recalculate the start position for the new chunk
@@ -195,6 +367,7 @@ class ContentChunker:
                         
                         # Add the current sentence
                         current_sentences.append(sentence)
+                        current_sizes.append(sentence_size)
                         current_size += sentence_size
                         current_end = end_pos
                         
@@ -214,13 +387,14 @@ class ContentChunker:
             else:
                 # Simple chunking without respecting sentence boundaries
                 words = self.tokenize(text)
-                for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-                    chunk_words = words[i:i + self.chunk_size]
+                word_sizes = self.token_counter.count_batch(words)
+                for i, i_end in self._token_windows(word_sizes):
+                    chunk_words = words[i:i_end]
                     chunk_text = " ".join(chunk_words)
                     
                     # Calculate approximate character positions
                     chunk_start = i * len(text) // len(words)
-                    chunk_end = min((i + len(chunk_words)) * len(text) // len(words), len(text))
+                    chunk_end = min(i_end * len(text) // len(words), len(text))
                     
                     chunks.append({
                         "text": chunk_text,
@@ -259,14 +433,23 @@ class ContentChunker:
         # Generate chunks
         basic_chunks = self.chunk_text(text)
         
+        if self.content_defined:
+            chunking_method = "content_defined"
+        else:
+            chunking_method = "sentence_aware" if self.respect_sentences else "fixed_size"
+        
         # Enrich chunks with metadata
         enriched_chunks = []
+        occurrences: Dict[str, int] = {}
         for chunk in basic_chunks:
-            chunk_id = str(uuid.uuid4())
+            # Stable ID from the chunk text, so unchanged chunks keep their ID when re-chunked
+            occurrence = occurrences.get(chunk["text"], 0)
+            occurrences[chunk["text"]] = occurrence + 1
             
             # Add content ID and chunk ID
-            chunk["id"] = chunk_id
+            chunk["id"] = chunk_id(content_id, chunk["text"], occurrence)
             chunk["content_id"] = content_id
+            chunk["occurrence"] = occurrence
             
             # Add metadata from content
             chunk["chunk_metadata"] = {
@@ -274,7 +457,7 @@ class ContentChunker:
                 "content_type": metadata.get("content_type"),
                 "domain": content.get("domain"),
                 "url": content.get("url"),
-                "chunking_method": "sentence_aware" if self.respect_sentences else "fixed_size",
+                "chunking_method": chunking_method,
                 "chunk_size": self.chunk_size,
                 "chunk_overlap": self.chunk_overlap,
                 "created_at": datetime.utcnow().isoformat()
@@ -283,3 +466,31 @@ class ContentChunker:
             enriched_chunks.append(chunk)
         
         return enriched_chunks
+    
+    def chunker_kwargs(self) -> Dict[str, Any]:
+        """Constructor arguments that recreate this chunker (in chunk_many's worker processes)."""
+        return {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "respect_sentences": self.respect_sentences,
+            "content_defined": self.content_defined
+        }
+    
+    def chunk_many(self,
+                   contents: Iterable[Dict[str, Any]],
+                   workers: Optional[int] = None,
+                   batch_size: int = 8) -> Iterator[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+        """
+        Chunk many content records across a process pool (see processor.chunk_pool).
+        
+        Args:
+            contents: Content records as for process_content, read lazily; a record
+                may set chunk_size and chunk_overlap to override this chunker's
+            workers: Chunking processes (defaults to CHUNK_WORKERS or the CPU count)
+            batch_size: Records per worker task
+        
+        Yields:
+            (content_id, chunks) per record in input order; chunks is None if the
+            record could not be chunked
+        """
+        return chunk_pool.chunk_many(self, contents, workers=workers, batch_size=batch_size)
@@ -0,0 +1,301 @@
+"""
+Content-addressed embedding cache.
+
+The same text is embedded over and over: footers and boilerplate shared by
+many pages, pages re-crawled unchanged, chunks re-processed by backfills and
+repeated queries. EmbeddingCache keys embeddings by (model ID, hash of the
+normalized text), so a text is embedded once per model:
+
+- an in-memory LRU tier, per process
+- a persistent tier shared by processes and restarts: the embedding_cache
+  table in Postgres, or a local SQLite file
+
+Lookups are batched (one query to the persistent tier per batch) and only
+the misses are sent to the model, in one call. Texts are normalized
+(Unicode NFC, whitespace collapsed) before hashing, so copies that differ
+only in whitespace share an entry. Models that cannot be identified (no
+name) are not cached.
+
+If the persistent tier fails (e.g. the table has not been migrated yet),
+the cache logs it once and continues in memory only.
+
+Configuration (environment):
+    EMBEDDING_CACHE          Persistent tier: "postgres" (default), "file", "memory" (LRU only) or "off"
+    EMBEDDING_CACHE_PATH     SQLite file for the "file" tier (default ~/.cache/voice-forge/embeddings.sqlite3)
+    EMBEDDING_CACHE_SIZE     Embeddings kept in memory (default 20000)
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+_caches: Dict[tuple, "EmbeddingCache"] = {}
+_stores: Dict[tuple, object] = {}
+_caches_lock = threading.Lock()
+
+def normalize_text(text: str) -> str:
+    """Text as it is hashed: Unicode NFC with whitespace collapsed."""
+    return WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def text_hash(text: str) -> str:
+    """Cache key of a text."""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+def model_id(model) -> Optional[str]:
+    """Cache namespace of an embedding model (name and dimension), or None if it cannot be identified."""
+    name = getattr(model, "model_id", None)
+    if not name:
+        # sentence-transformers: the base model of the model card, or the tokenizer's name
+        name = getattr(getattr(model, "model_card_data", None), "base_model", None)
+    if not name:
+        name = getattr(getattr(model, "tokenizer", None), "name_or_path", None)
+    if not name:
+        return None
+    
+    get_dimension = getattr(model, "get_sentence_embedding_dimension", None)
+    dimension = get_dimension() if callable(get_dimension) else None
+    return f"{name}:{dimension}" if dimension else str(name)
+
+class SQLiteEmbeddingStore:
+    """Persistent tier in a local SQLite file (float32 blobs)."""
+    
+    # Stay below SQLite's bound parameter limit
+    QUERY_BATCH = 500
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model_id TEXT NOT NULL, text_hash TEXT NOT NULL, embedding BLOB NOT NULL, "
+                "PRIMARY KEY (model_id, text_hash))"
+            )
+            self._connection.commit()
+    
+    def get_many(self, model_id: str, text_hashes: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(text_hashes), self.QUERY_BATCH):
+                batch = text_hashes[i:i + self.QUERY_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model_id = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model_id] + batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, model_id: str, embeddings: Dict[str, np.ndarray]) -> bool:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO embeddings (model_id, text_hash, embedding) VALUES (?, ?, ?)",
+                [(model_id, key, np.asarray(embedding, dtype=np.float32).tobytes())
+                 for key, embedding in embeddings.items()]
+            )
+            self._connection.commit()
+        return True
+
+class DatabaseEmbeddingStore:
+    """Persistent tier in the embedding_cache table, through short-lived sessions."""
+    
+    def __init__(self, session_factory: Optional[Callable] = None):
+        if session_factory is None:
+            from database.session import get_db_session
+            session_factory = get_db_session
+        self.session_factory = session_factory
+    
+    def _call(self, operation: str, *args):
+        from database.db import Database
+        session = self.session_factory()
+        try:
+            return getattr(Database(session), operation)(*args)
+        finally:
+            session.close()
+    
+    def get_many(self, model_id: str, text_hashes: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        rows = self._call("get_cached_embeddings", model_id, text_hashes)
+        if rows is None:
+            return None
+        return {key: np.asarray(embedding, dtype=np.float32) for key, embedding in rows.items()}
+    
+    def put_many(self, model_id: str, embeddings: Dict[str, np.ndarray]) -> bool:
+        return bool(self._call("store_cached_embeddings", model_id, {
+            key: np.asarray(embedding, dtype=np.float32).tolist() for key, embedding in embeddings.items()
+        }))
+
+class EmbeddingCache:
+    """Embeddings of one model by text hash, in memory and in a persistent store."""
+    
+    def __init__(self, model_id: str, store=None, memory_size: int = 20000):
+        """
+        Initialize the cache.
+        
+        Args:
+            model_id: Model namespace of the cached embeddings
+            store: Persistent tier (get_many/put_many by text hash), or None for memory only
+            memory_size: Embeddings kept in the in-memory LRU tier
+        """
+        self.model_id = model_id
+        self.store = store
+        self.memory_size = memory_size
+        
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+    
+    def _disable_store(self, error: str):
+        logger.warning(f"⚠️ Persistent embedding cache unavailable ({error}), caching in memory only")
+        self.store = None
+    
+    def _remember(self, embeddings: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, embedding in embeddings.items():
+                self._memory[key] = embedding
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+    
+    def lookup(self, keys: List[str], persistent: bool = True) -> Dict[str, np.ndarray]:
+        """Cached embeddings of the given text hashes (memory first, then one store query unless not persistent)."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._memory.get(key)
+                if embedding is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = embedding
+            self.memory_hits += len(found)
+        
+        missing = [key for key in keys if key not in found]
+        stored = {}
+        if missing and persistent and self.store is not None:
+            try:
+                stored = self.store.get_many(self.model_id, missing)
+                if stored is None:
+                    raise RuntimeError("lookup failed")
+            except Exception as e:
+                stored = {}
+                self._disable_store(str(e))
+            self._remember(stored)
+            found.update(stored)
+        
+        with self._lock:
+            self.store_hits += len(stored)
+            self.misses += len(keys) - len(found)
+        return found
+    
+    def add(self, embeddings: Dict[str, np.ndarray], persistent: bool = True):
+        """Cache embeddings by text hash, in memory and (if persistent) in the store."""
+        self._remember(embeddings)
+        if embeddings and persistent and self.store is not None:
+            try:
+                if not self.store.put_many(self.model_id, embeddings):
+                    self._disable_store("write failed")
+            except Exception as e:
+                self._disable_store(str(e))
+    
+    def encode(self, model, texts: List[str], persistent: bool = True, **encode_kwargs) -> List[np.ndarray]:
+        """
+        Embeddings of texts; only texts not in the cache are encoded, in one model call.
+        
+        With persistent=False only the in-memory tier is used, so latency-bound
+        callers never wait on the store.
+        """
+        keys = [text_hash(text) for text in texts]
+        found = self.lookup(list(dict.fromkeys(keys)), persistent=persistent)
+        
+        # One model call for the distinct misses
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            encoded = model.encode(list(missing.values()), **encode_kwargs)
+            new_embeddings = {key: np.asarray(embedding) for key, embedding in zip(missing, encoded)}
+            self.add(new_embeddings, persistent=persistent)
+            found.update(new_embeddings)
+        
+        return [found[key] for key in keys]
+    
+    def summary(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "cached": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.store_hits) / lookups, 3) if lookups else 0.0
+        }
+
+def _persistent_store(kind: str):
+    """Shared persistent tier of a kind (per process: SQLite connections do not survive a fork)."""
+    key = (kind, os.getpid())
+    if key not in _stores:
+        if kind == "postgres":
+            _stores[key] = DatabaseEmbeddingStore()
+        elif kind == "file":
+            path = os.environ.get("EMBEDDING_CACHE_PATH",
+                                  os.path.join(os.path.expanduser("~"), ".cache", "voice-forge", "embeddings.sqlite3"))
+            _stores[key] = SQLiteEmbeddingStore(path)
+        else:
+            _stores[key] = None
+    return _stores[key]
+
+def get_embedding_cache(model) -> Optional[EmbeddingCache]:
+    """Shared cache for an embedding model, or None if caching is off or the model has no ID."""
+    kind = os.environ.get("EMBEDDING_CACHE", "postgres").lower()
+    namespace = model_id(model)
+    if kind == "off" or namespace is None:
+        return None
+    
+    # Per process, like the persistent stores
+    key = (namespace, os.getpid())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            try:
+                store = _persistent_store(kind)
+            except Exception as e:
+                logger.warning(f"⚠️ Persistent embedding cache ({kind}) unavailable: {str(e)}")
+                store = None
+            cache = EmbeddingCache(namespace, store=store,
+                                   memory_size=int(os.environ.get("EMBEDDING_CACHE_SIZE", "20000")))
+            _caches[key] = cache
+        return cache
+
+def embed_texts(model, texts: List[str], persistent: bool = True, **encode_kwargs) -> List[np.ndarray]:
+    """
+    Embeddings of texts, through the model's embedding cache if it has one.
+    
+    Args:
+        model: Embedding model
+        texts: Texts to embed
+        persistent: Use the persistent tier as well as the in-memory one
+        **encode_kwargs: Passed to model.encode for the cache misses
+    """
+    if not texts:
+        return []
+    cache = get_embedding_cache(model)
+    if cache is None:
+        return list(model.encode(texts, **encode_kwargs))
+    return cache.encode(model, texts, persistent=persistent, **encode_kwargs)
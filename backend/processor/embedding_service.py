@@ -0,0 +1,144 @@
+"""
+Micro-batched query embedding.
+
+Query-time code used to call embedding_model.encode() once per string:
+once per reformulated query in HybridRetriever and again for rescoring in
+RAGSystem, and separately for every concurrent API request. Each call is a
+forward pass of its own, so under load the CPU runs many batches of one.
+
+EmbeddingService queues encode requests from all callers in the process. A
+worker thread takes the first waiting request, collects whatever else
+arrives within a short window (or until the batch is full), and encodes the
+batch in one model call. Each caller waits on a future for its own vector.
+A single caller adds at most the window to its latency; concurrent callers
+share forward passes, which raises throughput and keeps tail latency down.
+Repeated queries are served from the in-memory tier of the embedding cache
+only: a round trip to the persistent tier would add to every batch.
+
+Configuration (environment):
+    EMBEDDING_MAX_BATCH      Texts per model call (default 64)
+    EMBEDDING_BATCH_WAIT_MS  How long a batch waits for more requests (default 5)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from processor.embedding_cache import embed_texts
+
+logger = logging.getLogger(__name__)
+
+_services: Dict[int, "EmbeddingService"] = {}
+_services_lock = threading.Lock()
+
+class EmbeddingService:
+    """Encodes texts from concurrent callers in shared micro-batches."""
+    
+    def __init__(self, model, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        """
+        Initialize the service.
+        
+        Args:
+            model: Embedding model (anything with encode(texts) -> 2D array)
+            max_batch_size: Texts per model call
+            max_wait_ms: How long the first request of a batch waits for more
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        
+        self.requests = 0
+        self.batches = 0
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+                self._thread.start()
+    
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding; the future resolves to its vector."""
+        self._start()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+    
+    def encode(self, text: str) -> np.ndarray:
+        """Embedding of one text."""
+        return self.submit(text).result()
+    
+    def encode_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embeddings of several texts (queued together, so they share a batch)."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+    
+    def _next_batch(self) -> list:
+        """Block for a request, then collect more until the batch is full or the window ends."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # Skip requests whose caller gave up
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            
+            try:
+                # Repeated queries are served from the in-memory cache tier
+                embeddings = embed_texts(self.model, [text for text, _ in batch], persistent=False,
+                                         batch_size=len(batch))
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding batch of {len(batch)} failed: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(np.asarray(embedding))
+            self.requests += len(batch)
+            self.batches += 1
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0
+        }
+
+def get_embedding_service(model) -> EmbeddingService:
+    """
+    Shared service for an embedding model, started on first use.
+    
+    Callers that share the model share the batches; a service created before
+    a fork (e.g. in a Celery prefork parent) is replaced in the child, since
+    its worker thread did not survive the fork.
+    """
+    with _services_lock:
+        service = _services.get(id(model))
+        if service is None or service.model is not model or service._pid != os.getpid():
+            service = EmbeddingService(
+                model,
+                max_batch_size=int(os.environ.get("EMBEDDING_MAX_BATCH", "64")),
+                max_wait_ms=float(os.environ.get("EMBEDDING_BATCH_WAIT_MS", "5"))
+            )
+            _services[id(model)] = service
+        return service
@@ -5,14 +5,22 @@ Improved text splitting strategies with content-type awareness
 """
 import re
 import uuid
+import bisect
 import logging
-from typing import List, Dict, Any, Tuple, Union, Optional
+from typing import List, Dict, Any, Tuple, Union, Optional, Iterable, Iterator
 from datetime import datetime
 import html
 import json
 
+from processor import chunk_pool
+from processor.token_counter import TokenCounter, get_token_counter
+
 logger = logging.getLogger(__name__)
 
+# Fallback sentence boundary and token patterns (offsets come from match positions)
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+WORD_RE = re.compile(r'\S+')
+
 class EnhancedContentChunker:
     """
     Enhanced content chunker with intelligent text splitting strategies
@@ -37,7 +45,8 @@ class EnhancedContentChunker:
                  chunk_overlap: int = 80,
                  respect_sentences: bool = True,
                  min_chunk_size: int = 50,
-                 max_chunk_size: int = 1000):
+                 max_chunk_size: int = 1000,
+                 token_counter: Optional[TokenCounter] = None):
         """
         Initialize the enhanced content chunker.
         
@@ -46,17 +55,20 @@ class EnhancedContentChunker:
             chunk_overlap: Overlap between consecutive chunks in tokens
             respect_sentences: Try to maintain sentence boundaries
             min_chunk_size: Minimum chunk size in tokens
-            max_chunk_size: Maximum chunk size in tokens
+            max_chunk_size: Maximum chunk size in tokens (capped at the embedding model's window)
+            token_counter: Counter for chunk sizes (default: the shared embedding tokenizer counter)
         """
+        # Count with the embedding model's tokenizer, so no chunk is truncated when embedded
+        self.token_counter = token_counter or get_token_counter("embedding")
+        if self.token_counter.max_tokens:
+            max_chunk_size = min(max_chunk_size, self.token_counter.max_tokens)
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.respect_sentences = respect_sentences
         self.min_chunk_size = min_chunk_size
         self.max_chunk_size = max_chunk_size
         
-        # Simple whitespace tokenizer for counting tokens
-        self.tokenize = lambda text: text.split()
-        
         # Initialize sentence tokenizer
         self._init_sentence_tokenizer()
         
@@ -112,12 +124,12 @@ class EnhancedContentChunker:
             'feature_lists': re.compile(r'(?:Features?|Benefits?|Advantages?|Highlights?)[\s:]*\n((?:[-*•]\s+.+\n?)+)', re.IGNORECASE),
             
             # Testimonials/quotes
-            'quotes': re.compile(r'"[^"]+"|\'[^\']+\'|"[^"]+"|'[^']+''|<blockquote[\s\S]*?</blockquote>', re.IGNORECASE)
+            'quotes': re.compile(r'"[^"]+"|\'[^\']+\'|“[^”]+”|‘[^’]+’|<blockquote[\s\S]*?</blockquote>', re.IGNORECASE)
         }
     
     def _estimate_token_count(self, text: str) -> int:
-        """Estimate the number of tokens in a text."""
-        return len(self.tokenize(text))
+        """Number of tokens in a text."""
+        return self.token_counter.count(text)
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text for better chunking."""
@@ -137,13 +149,19 @@ class EnhancedContentChunker:
         text = re.sub(r'[.]{3,}', '...', text)
         
         # Clean up quotes
-        text = re.sub(r'["""]', '"', text)
-        text = re.sub(r'[''']', "'", text)
+        text = re.sub(r'[“”„]', '"', text)
+        text = re.sub(r'[‘’‚]', "'", text)
         
         return text.strip()
     
-    def _detect_content_structure(self, text: str) -> Dict[str, Any]:
-        """Detect the structure and characteristics of the content."""
+    def _detect_content_structure(self, text: str, sentence_tokens: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Detect the structure and characteristics of the content.
+        
+        Args:
+            text: Text to analyze
+            sentence_tokens: Token counts of the text's sentences, if already tokenized
+        """
         structure = {
             'has_headings': bool(self.patterns['headings'].search(text)),
             'has_code_blocks': bool(self.patterns['code_blocks'].search(text)),
@@ -155,19 +173,23 @@ class EnhancedContentChunker:
             'estimated_reading_level': 'medium'
         }
         
+        if sentence_tokens is None:
+            sentence_tokens = self.token_counter.count_batch(self.sent_tokenize(text))
+        self._set_reading_level(structure, sentence_tokens)
+        
+        return structure
+    
+    def _set_reading_level(self, structure: Dict[str, Any], sentence_tokens: List[int]):
+        """Set the average sentence length and reading level from sentence token counts."""
         # Calculate average sentence length
-        sentences = self.sent_tokenize(text)
-        if sentences:
-            total_tokens = sum(self._estimate_token_count(sent) for sent in sentences)
-            structure['avg_sentence_length'] = total_tokens / len(sentences)
+        structure['avg_sentence_length'] = sum(sentence_tokens) / len(sentence_tokens) if sentence_tokens else 0
         
         # Estimate reading level based on sentence length
+        structure['estimated_reading_level'] = 'medium'
         if structure['avg_sentence_length'] < 15:
             structure['estimated_reading_level'] = 'simple'
         elif structure['avg_sentence_length'] > 25:
             structure['estimated_reading_level'] = 'complex'
-        
-        return structure
     
     def _get_optimal_config(self, content_type: str, content_structure: Dict[str, Any], text_length: int) -> Dict[str, Any]:
         """Get optimal chunking configuration based on content analysis."""
@@ -193,147 +215,147 @@ class EnhancedContentChunker:
         
         return config
     
-    def _split_on_structure(self, text: str, content_type: str, structure: Dict[str, Any]) -> List[str]:
-        """Split text based on detected structural elements."""
-        segments = []
-        
+    @staticmethod
+    def _spans_between(text: str, boundaries: List[int], start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Whitespace-trimmed, non-empty (start, end) spans of text[start:end] between boundary offsets."""
+        spans = []
+        edges = [start] + boundaries + [len(text) if end is None else end]
+        for span_start, span_end in zip(edges, edges[1:]):
+            while span_start < span_end and text[span_start].isspace():
+                span_start += 1
+            while span_end > span_start and text[span_end - 1].isspace():
+                span_end -= 1
+            if span_start < span_end:
+                spans.append((span_start, span_end))
+        return spans
+    
+    def _split_on_structure(self, text: str, content_type: str, structure: Dict[str, Any]) -> List[Tuple[int, int]]:
+        """Split text into segment spans based on detected structural elements."""
         # Try to split on major structural elements first
         if structure['has_headings'] and content_type in ['documentation', 'api_docs']:
-            # Split on headings for documentation
-            heading_splits = self.patterns['headings'].split(text)
-            current_segment = ""
-            
-            for i, segment in enumerate(heading_splits):
-                if self.patterns['headings'].match(segment.strip()):
-                    if current_segment:
-                        segments.append(current_segment.strip())
-                    current_segment = segment + "\n"
-                else:
-                    current_segment += segment
-            
-            if current_segment:
-                segments.append(current_segment.strip())
+            # Each heading starts a new segment for documentation
+            segments = self._spans_between(text, [m.start() for m in self.patterns['headings'].finditer(text)])
         
         elif structure['has_qa_pairs']:
-            # Split on Q&A pairs
-            qa_splits = self.patterns['qa_pairs'].split(text)
-            current_qa = ""
-            
-            for segment in qa_splits:
-                if self.patterns['qa_pairs'].match(segment):
-                    if current_qa:
-                        segments.append(current_qa.strip())
-                    current_qa = segment
-                else:
-                    current_qa += segment
-            
-            if current_qa:
-                segments.append(current_qa.strip())
+            # Each question or answer marker starts a new segment
+            segments = self._spans_between(text, [m.start() for m in self.patterns['qa_pairs'].finditer(text)])
         
         elif structure['paragraph_count'] > 3:
             # Split on paragraphs for content with clear paragraph structure
-            segments = [p.strip() for p in self.patterns['paragraphs'].split(text) if p.strip()]
+            boundaries = []
+            for m in self.patterns['paragraphs'].finditer(text):
+                boundaries.extend((m.start(), m.end()))
+            segments = self._spans_between(text, boundaries)
         
         else:
             # Fallback to sentence-based splitting
-            segments = [text]
+            segments = self._spans_between(text, [])
         
         # Filter out very small segments
-        segments = [seg for seg in segments if self._estimate_token_count(seg) >= self.min_chunk_size]
+        sizes = self.token_counter.count_batch([text[start:end] for start, end in segments])
+        segments = [segment for segment, size in zip(segments, sizes) if size >= self.min_chunk_size]
         
-        return segments if segments else [text]
+        return segments if segments else self._spans_between(text, [])
     
-    def _create_overlapping_chunks(self, segments: List[str], chunk_size: int, overlap: int) -> List[Dict[str, Any]]:
-        """Create overlapping chunks from text segments."""
-        chunks = []
-        current_chunk = ""
-        current_size = 0
-        segment_buffer = []
+    def _sentence_spans(self, text: str, segments: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """
+        Tokenize every segment into sentences, once.
         
-        for segment in segments:
-            segment_size = self._estimate_token_count(segment)
-            
-            # If single segment is too large, split it further
-            if segment_size > chunk_size * 1.5:
-                # Split large segment into sentences
-                sentences = self.sent_tokenize(segment)
-                for sentence in sentences:
-                    sentence_size = self._estimate_token_count(sentence)
-                    
-                    if current_size + sentence_size > chunk_size and current_chunk:
-                        # Create chunk from current content
-                        chunks.append({
-                            'text': current_chunk.strip(),
-                            'size': current_size,
-                            'segments': segment_buffer.copy()
-                        })
-                        
-                        # Handle overlap
-                        overlap_text = self._create_overlap(current_chunk, overlap)
-                        current_chunk = overlap_text + " " + sentence
-                        current_size = self._estimate_token_count(current_chunk)
-                        segment_buffer = [sentence]
-                    else:
-                        current_chunk += " " + sentence if current_chunk else sentence
-                        current_size += sentence_size
-                        segment_buffer.append(sentence)
-            else:
-                # Normal segment processing
-                if current_size + segment_size > chunk_size and current_chunk:
-                    # Create chunk from current content
-                    chunks.append({
-                        'text': current_chunk.strip(),
-                        'size': current_size,
-                        'segments': segment_buffer.copy()
-                    })
-                    
-                    # Handle overlap
-                    overlap_text = self._create_overlap(current_chunk, overlap)
-                    current_chunk = overlap_text + " " + segment if overlap_text else segment
-                    current_size = self._estimate_token_count(current_chunk)
-                    segment_buffer = [segment]
-                else:
-                    current_chunk += " " + segment if current_chunk else segment
-                    current_size += segment_size
-                    segment_buffer.append(segment)
-        
-        # Add final chunk
-        if current_chunk and current_size >= self.min_chunk_size:
-            chunks.append({
-                'text': current_chunk.strip(),
-                'size': current_size,
-                'segments': segment_buffer
-            })
+        Returns:
+            Tuple of (sentence (start, end) offsets into text, token count of each sentence)
+        """
+        spans = [span for seg_start, seg_end in segments
+                 for span in self._segment_sentences(text, seg_start, seg_end)]
         
-        return chunks
+        # Count all sentences in one tokenizer batch
+        counts = self.token_counter.count_batch([text[start:end] for start, end in spans])
+        kept = [(span, count) for span, count in zip(spans, counts) if count]
+        return [span for span, _ in kept], [count for _, count in kept]
     
-    def _create_overlap(self, text: str, overlap_tokens: int) -> str:
-        """Create overlap text from the end of the previous chunk."""
-        if not text or overlap_tokens <= 0:
-            return ""
-        
-        # Try to use complete sentences for overlap
-        sentences = self.sent_tokenize(text)
-        if not sentences:
-            # Fallback to word-based overlap
-            words = self.tokenize(text)
-            if len(words) <= overlap_tokens:
-                return text
-            return " ".join(words[-overlap_tokens:])
-        
-        # Use last few sentences that fit within overlap size
-        overlap_text = ""
-        remaining_tokens = overlap_tokens
-        
-        for sentence in reversed(sentences):
-            sentence_tokens = self._estimate_token_count(sentence)
-            if sentence_tokens <= remaining_tokens:
-                overlap_text = sentence + " " + overlap_text if overlap_text else sentence
-                remaining_tokens -= sentence_tokens
+    def _segment_sentences(self, text: str, seg_start: int, seg_end: int) -> List[Tuple[int, int]]:
+        """Sentence spans of one segment."""
+        if self.nltk_available:
+            segment = text[seg_start:seg_end]
+            spans = []
+            cursor = 0
+            for sentence in self.sent_tokenize(segment):
+                start = segment.find(sentence, cursor)
+                if start == -1:
+                    # The tokenizer changed the text; use regex boundaries for this segment
+                    break
+                cursor = start + len(sentence)
+                spans.append((seg_start + start, seg_start + cursor))
             else:
+                return spans
+        
+        boundaries = [m.start() for m in SENTENCE_BREAK_RE.finditer(text, seg_start, seg_end)]
+        return self._spans_between(text, boundaries, seg_start, seg_end)
+    
+    def _split_long_sentences(self, text: str, spans: List[Tuple[int, int]], tokens: List[int],
+                              chunk_size: int) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """Split sentences longer than a chunk into word windows of chunk_size tokens."""
+        if all(count <= chunk_size for count in tokens):
+            return spans, tokens
+        
+        split_spans = []
+        split_tokens = []
+        for (start, end), count in zip(spans, tokens):
+            if count <= chunk_size:
+                split_spans.append((start, end))
+                split_tokens.append(count)
+                continue
+            words = [m.span() for m in WORD_RE.finditer(text, start, end)]
+            word_tokens = self.token_counter.count_batch([text[s:e] for s, e in words])
+            
+            # Greedy word windows of at most chunk_size tokens
+            window_start = 0
+            window_tokens = 0
+            for i, count in enumerate(word_tokens):
+                if window_tokens and window_tokens + count > chunk_size:
+                    split_spans.append((words[window_start][0], words[i - 1][1]))
+                    split_tokens.append(window_tokens)
+                    window_start, window_tokens = i, 0
+                window_tokens += count
+            split_spans.append((words[window_start][0], words[-1][1]))
+            split_tokens.append(window_tokens)
+        return split_spans, split_tokens
+    
+    def _create_overlapping_chunks(self, tokens: List[int], chunk_size: int, overlap: int) -> List[Tuple[int, int, int]]:
+        """
+        Group sentences into overlapping chunks with index arithmetic on prefix sums.
+        
+        Each chunk takes as many sentences as fit in chunk_size (at least one
+        new sentence), and the next chunk starts with the trailing sentences
+        of the previous one that fit in the overlap.
+        
+        Returns:
+            List of (first sentence, end sentence (exclusive), token count)
+        """
+        prefix = [0]
+        for count in tokens:
+            prefix.append(prefix[-1] + count)
+        
+        chunks = []
+        start = 0
+        previous_end = 0
+        while start < len(tokens):
+            end = bisect.bisect_right(prefix, prefix[start] + chunk_size, lo=start + 1) - 1
+            end = max(end, start + 1, previous_end + 1)
+            chunks.append((start, end, prefix[end] - prefix[start]))
+            if end >= len(tokens):
                 break
+            
+            # Handle overlap: the longest suffix of the chunk within the overlap size,
+            # shortened if the next sentence would not fit next to it
+            start = max(bisect.bisect_left(prefix, prefix[end] - overlap, lo=start + 1, hi=end),
+                        bisect.bisect_left(prefix, prefix[end + 1] - chunk_size, lo=start + 1, hi=end))
+            previous_end = end
         
-        return overlap_text.strip()
+        # Drop a too small final chunk
+        if chunks and chunks[-1][2] < self.min_chunk_size:
+            chunks.pop()
+        
+        return chunks
     
     def chunk_content(self, 
                      content: str, 
@@ -344,13 +366,18 @@ class EnhancedContentChunker:
         """
         Chunk content using enhanced strategies.
         
+        Sentences are tokenized once into offset and token count arrays;
+        chunks and overlaps are index ranges over them, so start_char and
+        end_char are exact offsets into content and the work is linear in
+        the text length.
+        
         Args:
             content: Text content to chunk
             content_type: Type of content (blog, api_docs, etc.)
             chunk_size: Override default chunk size
             overlap: Override default overlap
             metadata: Additional metadata to include
-            
+        
         Returns:
             List of chunk dictionaries
         """
@@ -359,55 +386,46 @@ class EnhancedContentChunker:
             return []
         
         try:
-            # Clean and normalize text
-            clean_text = self._clean_text(content)
+            # Detect content structure (the reading level is set once sentences are known)
+            structure = self._detect_content_structure(content, sentence_tokens=[])
             
-            # Detect content structure
-            structure = self._detect_content_structure(clean_text)
+            # Split content based on structure, then into sentences
+            segments = self._split_on_structure(content, content_type, structure)
+            spans, tokens = self._sentence_spans(content, segments)
+            self._set_reading_level(structure, tokens)
             
             # Get optimal configuration
-            config = self._get_optimal_config(content_type, structure, len(clean_text))
+            config = self._get_optimal_config(content_type, structure, len(content))
             
             # Use provided parameters or defaults from config
-            final_chunk_size = chunk_size or config['chunk_size']
-            final_overlap = overlap or config['overlap']
+            final_chunk_size = min(chunk_size or config['chunk_size'], self.max_chunk_size)
+            final_overlap = min(overlap or config['overlap'], final_chunk_size // 2)
             
             logger.debug(f"Chunking with size={final_chunk_size}, overlap={final_overlap}, type={content_type}")
             
-            # Split content based on structure
-            segments = self._split_on_structure(clean_text, content_type, structure)
-            
             # Create overlapping chunks
-            raw_chunks = self._create_overlapping_chunks(segments, final_chunk_size, final_overlap)
+            spans, tokens = self._split_long_sentences(content, spans, tokens, final_chunk_size)
+            raw_chunks = self._create_overlapping_chunks(tokens, final_chunk_size, final_overlap)
             
             # Post-process chunks
             final_chunks = []
-            char_offset = 0
-            
-            for i, chunk_data in enumerate(raw_chunks):
-                chunk_text = chunk_data['text']
-                
-                # Find the actual position in original text
-                start_pos = content.find(chunk_text[:100])  # Use first 100 chars to find position
-                if start_pos == -1:
-                    start_pos = char_offset
-                
-                end_pos = start_pos + len(chunk_text)
-                char_offset = end_pos
+            for i, (first, end, size) in enumerate(raw_chunks):
+                start_pos = spans[first][0]
+                end_pos = spans[end - 1][1]
                 
                 chunk = {
-                    'text': chunk_text,
+                    'text': self._clean_text(content[start_pos:end_pos]),
                     'start_char': start_pos,
-                    'end_char': min(end_pos, len(content)),
+                    'end_char': end_pos,
                     'chunk_index': i,
-                    'size_tokens': chunk_data['size'],
+                    'size_tokens': size,
                     'chunk_metadata': {
                         'content_type': content_type,
                         'chunking_strategy': 'enhanced_structural',
                         'chunk_size_config': final_chunk_size,
                         'overlap_config': final_overlap,
                         'structure_detected': structure,
-                        'segments_count': len(chunk_data['segments']),
+                        'segments_count': end - first,
                         'created_at': datetime.utcnow().isoformat()
                     }
                 }
@@ -420,27 +438,27 @@ class EnhancedContentChunker:
             
             logger.info(f"Enhanced chunking created {len(final_chunks)} chunks for {content_type} content")
             return final_chunks
-            
+        
         except Exception as e:
             logger.error(f"Error during enhanced chunking: {str(e)}")
             # Fallback to simple chunking
             return self._fallback_chunking(content, chunk_size or self.chunk_size, overlap or self.chunk_overlap)
     
     def _fallback_chunking(self, text: str, chunk_size: int, overlap: int) -> List[Dict[str, Any]]:
-        """Simple fallback chunking strategy."""
-        words = self.tokenize(text)
+        """Simple fallback chunking strategy: fixed word windows with exact offsets."""
+        words = [m.span() for m in WORD_RE.finditer(text)]
         chunks = []
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_words = words[i:i + chunk_size]
-            chunk_text = " ".join(chunk_words)
+        for i in range(0, len(words), max(chunk_size - overlap, 1)):
+            window = words[i:i + chunk_size]
+            start_pos, end_pos = window[0][0], window[-1][1]
             
             chunks.append({
-                'text': chunk_text,
-                'start_char': i * len(text) // len(words) if words else 0,
-                'end_char': min((i + len(chunk_words)) * len(text) // len(words), len(text)) if words else len(text),
+                'text': " ".join(text[start:end] for start, end in window),
+                'start_char': start_pos,
+                'end_char': end_pos,
                 'chunk_index': len(chunks),
-                'size_tokens': len(chunk_words),
+                'size_tokens': len(window),
                 'chunk_metadata': {
                     'chunking_strategy': 'fallback_simple',
                     'created_at': datetime.utcnow().isoformat()
@@ -455,7 +473,7 @@ class EnhancedContentChunker:
         
         Args:
             content_data: Content dictionary with text and metadata
-            
+        
         Returns:
             List of enriched chunk dictionaries
         """
@@ -502,7 +520,8 @@ class EnhancedContentChunker:
                     "content_domain": content_data.get("domain"),
                     "content_language": metadata.get("language"),
                     "extraction_date": content_data.get("extracted_at"),
-                    "chunk_quality_score": self._calculate_chunk_quality(chunk["text"]),
+                    "chunk_quality_score": self._calculate_chunk_quality(
+                        chunk["text"], chunk["chunk_metadata"].get("segments_count")),
                     "contains_code": bool(self.patterns['code_blocks'].search(chunk["text"])),
                     "contains_list": bool(self.patterns['lists'].search(chunk["text"])),
                     "contains_heading": bool(self.patterns['headings'].search(chunk["text"])),
@@ -513,13 +532,43 @@ class EnhancedContentChunker:
         
         return enriched_chunks
     
-    def _calculate_chunk_quality(self, text: str) -> float:
+    def chunker_kwargs(self) -> Dict[str, Any]:
+        """Constructor arguments that recreate this chunker (in chunk_many's worker processes)."""
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'respect_sentences': self.respect_sentences,
+            'min_chunk_size': self.min_chunk_size,
+            'max_chunk_size': self.max_chunk_size
+        }
+    
+    def chunk_many(self,
+                   contents: Iterable[Dict[str, Any]],
+                   workers: Optional[int] = None,
+                   batch_size: int = 8) -> Iterator[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+        """
+        Chunk many content records across a process pool (see processor.chunk_pool).
+        
+        Args:
+            contents: Content records as for process_content, read lazily; a record
+                may set chunk_size and chunk_overlap to override this chunker's
+            workers: Chunking processes (defaults to CHUNK_WORKERS or the CPU count)
+            batch_size: Records per worker task
+        
+        Yields:
+            (content_id, chunks) per record in input order; chunks is None if the
+            record could not be chunked
+        """
+        return chunk_pool.chunk_many(self, contents, workers=workers, batch_size=batch_size)
+    
+    def _calculate_chunk_quality(self, text: str, sentence_count: Optional[int] = None) -> float:
         """
         Calculate a quality score for a chunk based on various factors.
         
         Args:
             text: Chunk text
-            
+            sentence_count: Sentences in the chunk, if already known
+        
         Returns:
             Quality score between 0.0 and 1.0
         """
@@ -545,8 +594,9 @@ class EnhancedContentChunker:
             score += 0.05
         
         # Readability factors
-        sentences = self.sent_tokenize(text)
-        if sentences and len(sentences) > 1:
+        if sentence_count is None:
+            sentence_count = len(self.sent_tokenize(text))
+        if sentence_count > 1:
             score += 0.05
         
         # Avoid very fragmented text
@@ -566,6 +616,13 @@ class ContentChunker(EnhancedContentChunker):
             respect_sentences=respect_sentences
         )
     
+    def chunker_kwargs(self) -> Dict[str, Any]:
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'respect_sentences': self.respect_sentences
+        }
+    
     def chunk_text(self, text: str) -> List[Dict[str, Any]]:
         """Backwards compatible chunk_text method."""
         return self.chunk_content(text, 'default')
@@ -1,10 +1,17 @@
 """
 Content extractor for web pages.
+
+Pages are parsed with BeautifulSoup (html.parser) or, when lxml is installed,
+with the much faster lxml backend in processor/extractor_lxml.py, which
+produces the same text, title, metadata and content type. The backend is
+chosen with the EXTRACTOR_BACKEND environment variable (auto, lxml or bs4).
 """
+import hashlib
 import logging
+import os
 import re
 import uuid
-from typing import Dict, Optional, List, Tuple
+from typing import AbstractSet, Dict, Optional, List, Tuple
 from datetime import datetime
 from bs4 import BeautifulSoup, Comment
 from urllib.parse import urlparse
@@ -13,14 +20,85 @@ from api.models import ContentType, ContentMetadata
 
 logger = logging.getLogger(__name__)
 
+def content_type_from_url(url: str) -> Optional[ContentType]:
+    """Content type implied by the URL path, if any."""
+    path = urlparse(url).path
+    
+    if re.search(r'/blog/|/post/|/article/', path):
+        return ContentType.BLOG_POST
+    elif re.search(r'/product/|/shop/|/item/', path):
+        return ContentType.PRODUCT_DESCRIPTION
+    elif re.search(r'/about/', path):
+        return ContentType.ABOUT_PAGE
+    elif re.search(r'/news/|/press/', path):
+        return ContentType.NEWS
+    elif re.search(r'/faq/|/help/', path):
+        return ContentType.FAQ
+    elif re.search(r'/docs/|/documentation/', path):
+        return ContentType.DOCUMENTATION
+    elif path == '/' or path == '':
+        return ContentType.LANDING_PAGE
+    return None
+
+def content_type_from_text(page_text: str) -> ContentType:
+    """Content type suggested by the words on the page."""
+    page_text = page_text.lower()
+    
+    # Check for typical about page content
+    about_terms = ["about us", "our story", "our mission", "our team", "who we are"]
+    if any(term in page_text for term in about_terms):
+        return ContentType.ABOUT_PAGE
+    
+    # Check for blog indicators
+    blog_indicators = ["posted on", "published on", "comments", "author", "categories", "tags"]
+    if any(indicator in page_text for indicator in blog_indicators):
+        return ContentType.BLOG_POST
+    
+    # Default to other
+    return ContentType.OTHER
+
+def block_hash(tag: str, text: str) -> int:
+    """Signed 64-bit hash of a text block, for learning a domain's boilerplate blocks."""
+    normalized = " ".join(text.lower().split())
+    digest = hashlib.blake2b(f"{tag}:{normalized}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def clean_main_text(content: str, url: str) -> Optional[str]:
+    """Collapse whitespace in the joined paragraphs; None if too short to keep."""
+    content = re.sub(r'\s+', ' ', content)
+    content = re.sub(r'\n\s*\n', '\n\n', content)
+    
+    # Remove very short content
+    if len(content) < 100:
+        logger.info(f"Content too short on {url}: {len(content)} characters")
+        return None
+    
+    return content.strip()
+
 class ContentExtractor:
     """Extract meaningful content from web pages."""
     
-    def __init__(self):
-        """Initialize the content extractor."""
-        pass
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Initialize the content extractor.
+        
+        Args:
+            backend: "lxml", "bs4" or "auto" (lxml when installed); defaults to EXTRACTOR_BACKEND
+        """
+        backend = (backend or os.getenv("EXTRACTOR_BACKEND", "auto")).lower()
+        self.lxml_extractor = None
+        
+        if backend in ("auto", "lxml"):
+            from processor.extractor_lxml import LXML_AVAILABLE, LxmlExtractor
+            if LXML_AVAILABLE:
+                self.lxml_extractor = LxmlExtractor()
+            elif backend == "lxml":
+                logger.warning("lxml is not installed, extracting with BeautifulSoup")
+        
+        self.backend = "lxml" if self.lxml_extractor else "bs4"
     
-    def extract(self, url: str, html: str, domain: str) -> Optional[Dict]:
+    def extract(self, url: str, html: str, domain: str,
+                boilerplate: Optional[AbstractSet[int]] = None) -> Optional[Dict]:
         """
         Extract content from HTML.
         
@@ -28,47 +106,87 @@ class ContentExtractor:
             url: The URL of the page
             html: The HTML content
             domain: The domain of the website
+            boilerplate: Hashes of the domain's boilerplate blocks to strip. When
+                given (even empty), the result carries the hashes of all the
+                page's blocks as "block_hashes" so the template can be learned,
+                and the page text before stripping as "unstripped_text" when
+                any block was stripped.
             
         Returns:
             Dict containing extracted content or None if no content was found
         """
         try:
-            # Parse HTML
-            soup = BeautifulSoup(html, 'html.parser')
+            if self.lxml_extractor:
+                blocks, metadata, cleaned_html = self.lxml_extractor.extract(url, html)
+            else:
+                blocks, metadata, cleaned_html = self._extract_soup(url, html)
             
-            # Remove unwanted elements
-            self._clean_html(soup)
+            block_hashes = None
+            unstripped_blocks = None
+            if blocks and boilerplate is not None:
+                block_hashes = [block_hash(tag, text) for tag, text in blocks]
+                kept = [block for block, hashed in zip(blocks, block_hashes) if hashed not in boilerplate]
+                if len(kept) < len(blocks):
+                    unstripped_blocks = blocks
+                blocks = kept
             
-            # Extract title
-            title = self._extract_title(soup)
+            main_content = None
+            if blocks is not None:
+                # Join paragraphs into single text
+                main_content = clean_main_text("\n\n".join(text for _, text in blocks), url)
             
-            # Extract main content
-            main_content, content_type = self._extract_main_content(soup, url)
             if not main_content:
                 logger.info(f"No main content found on {url}")
                 return None
             
-            # Extract metadata
-            metadata = self._extract_metadata(soup, url, content_type)
-            
             # Generate a unique ID for this content
             content_id = str(uuid.uuid4())
             
-            return {
+            content_data = {
                 "content_id": content_id,
                 "url": url,
                 "domain": domain,
                 "text": main_content,
-                "html": str(soup),
+                "html": cleaned_html,
                 "metadata": metadata,
                 "crawl_id": None,  # Will be set by the crawler
                 "extracted_at": None  # Will be set by the crawler
             }
+            if block_hashes is not None:
+                content_data["block_hashes"] = block_hashes
+            if unstripped_blocks is not None:
+                # Incremental crawls hash this, so a template change is not a content change
+                content_data["unstripped_text"] = clean_main_text("\n\n".join(text for _, text in unstripped_blocks), url)
+            return content_data
             
         except Exception as e:
             logger.error(f"Failed to extract content from {url}: {str(e)}")
             return None
     
+    def _extract_soup(self, url: str, html: str) -> Tuple[Optional[List[Tuple[str, str]]], Optional[ContentMetadata], Optional[str]]:
+        """
+        Extract with BeautifulSoup.
+        
+        Returns:
+            Tuple of (blocks, metadata, cleaned_html); blocks are the (tag, text) paragraphs
+            of the main content, None if no content container was found
+        """
+        # Parse HTML
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove unwanted elements
+        self._clean_html(soup)
+        
+        # Extract main content
+        blocks, content_type = self._extract_main_content(soup, url)
+        if not blocks:
+            return blocks, None, None
+        
+        # Extract metadata
+        metadata = self._extract_metadata(soup, url, content_type)
+        
+        return blocks, metadata, str(soup)
+    
     def _clean_html(self, soup: BeautifulSoup):
         """Remove unwanted elements from HTML."""
         # Remove comments
@@ -106,12 +224,12 @@ class ContentExtractor:
         
         return None
     
-    def _extract_main_content(self, soup: BeautifulSoup, url: str) -> Tuple[Optional[str], ContentType]:
+    def _extract_main_content(self, soup: BeautifulSoup, url: str) -> Tuple[Optional[List[Tuple[str, str]]], ContentType]:
         """
         Extract the main content from the page.
         
         Returns:
-            Tuple of (content_text, content_type)
+            Tuple of ((tag, text) blocks, content_type); blocks is None without a content container
         """
         content_type = self._identify_content_type(soup, url)
         
@@ -151,45 +269,20 @@ class ContentExtractor:
             return None, content_type
         
         # Extract text content
-        paragraphs = []
+        blocks = []
         for p in main_container.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "li"]):
             text = p.get_text().strip()
             if text:
-                paragraphs.append(text)
-        
-        # Join paragraphs into single text
-        content = "\n\n".join(paragraphs)
-        
-        # Clean up whitespace
-        content = re.sub(r'\s+', ' ', content)
-        content = re.sub(r'\n\s*\n', '\n\n', content)
-        
-        # Remove very short content
-        if len(content) < 100:
-            logger.info(f"Content too short on {url}: {len(content)} characters")
-            return None, content_type
+                blocks.append((p.name, text))
         
-        return content.strip(), content_type
+        return blocks, content_type
     
     def _identify_content_type(self, soup: BeautifulSoup, url: str) -> ContentType:
         """Identify the type of content based on URL and HTML structure."""
-        path = urlparse(url).path
-        
         # Check URL path for clues
-        if re.search(r'/blog/|/post/|/article/', path):
-            return ContentType.BLOG_POST
-        elif re.search(r'/product/|/shop/|/item/', path):
-            return ContentType.PRODUCT_DESCRIPTION
-        elif re.search(r'/about/', path):
-            return ContentType.ABOUT_PAGE
-        elif re.search(r'/news/|/press/', path):
-            return ContentType.NEWS
-        elif re.search(r'/faq/|/help/', path):
-            return ContentType.FAQ
-        elif re.search(r'/docs/|/documentation/', path):
-            return ContentType.DOCUMENTATION
-        elif path == '/' or path == '':
-            return ContentType.LANDING_PAGE
+        url_type = content_type_from_url(url)
+        if url_type:
+            return url_type
         
         # Check for schema.org types
         for item_type in soup.find_all(attrs={"itemtype": True}):
@@ -201,19 +294,7 @@ class ContentExtractor:
             elif "newsarticle" in item_type_value:
                 return ContentType.NEWS
         
-        # Check for typical about page content
-        about_terms = ["about us", "our story", "our mission", "our team", "who we are"]
-        page_text = soup.get_text().lower()
-        if any(term in page_text for term in about_terms):
-            return ContentType.ABOUT_PAGE
-        
-        # Check for blog indicators
-        blog_indicators = ["posted on", "published on", "comments", "author", "categories", "tags"]
-        if any(indicator in page_text for indicator in blog_indicators):
-            return ContentType.BLOG_POST
-        
-        # Default to other
-        return ContentType.OTHER
+        return content_type_from_text(soup.get_text())
     
     def _extract_metadata(self, soup: BeautifulSoup, url: str, content_type: ContentType) -> ContentMetadata:
         """Extract metadata from the page."""
@@ -0,0 +1,302 @@
+"""
+lxml extraction backend for ContentExtractor.
+
+Mirrors ContentExtractor's BeautifulSoup rules (same removed elements, main
+content container lookup, paragraph selection and metadata sources) on an
+lxml tree. libxml2 parses the page in C and the cleaning rules run in a
+single pass over the tree instead of one find_all walk per rule, which makes
+extraction several times faster.
+
+Trees only differ on malformed markup, where libxml2 closes elements that
+html.parser leaves open (e.g. a <div> inside a <p>, or unclosed <p> tags);
+scripts/benchmarks/benchmark_extraction.py checks parity on a test corpus.
+"""
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from api.models import ContentType, ContentMetadata
+from processor.extractor import content_type_from_url, content_type_from_text
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+REMOVED_TAGS = {"script", "style", "iframe", "noscript", "header", "footer", "nav"}
+SOCIAL_CLASSES = ("social", "share", "twitter", "facebook", "linkedin")
+NAV_IDS = ("nav", "menu", "header", "footer")
+TEXT_TAGS = ("p", "h1", "h2", "h3", "h4", "h5", "h6", "li")
+CONTENT_IDS = ("content", "main-content", "post", "article", "entry-content", "post-content")
+CONTENT_CLASSES = ("content", "post", "article", "entry", "blog-post", "post-content", "entry-content")
+PUBLISHED_PROPERTIES = ("article:published_time", "og:published_time")
+MODIFIED_PROPERTIES = ("article:modified_time", "og:updated_time")
+
+# html.parser only has a body when the page contains a <body> tag; libxml2 always adds one
+BODY_TAG_RE = re.compile(r"<body[\s/>]", re.IGNORECASE)
+
+class PageIndex:
+    """The elements extraction looks up, collected in one pass over the cleaned tree."""
+    
+    def __init__(self, root):
+        self.first = {}          # tag -> first element (article, main, body, title, time)
+        self.ids = {}            # candidate content id -> first element
+        self.classes = {}        # candidate content class -> first element
+        self.headings = []
+        self.itemtypes = []
+        self.metas = []
+        self.author_itemprop = None
+        self.byline = None
+        self.category_elements = []
+        self.tag_elements = []
+        
+        for element in root.iter(etree.Element):
+            tag = element.tag
+            if tag in ("article", "main", "body", "title", "time"):
+                self.first.setdefault(tag, element)
+            elif tag in ("h1", "h2"):
+                self.headings.append(element)
+            elif tag == "meta":
+                self.metas.append(element)
+            
+            attrib = element.attrib
+            if not attrib:
+                continue
+            
+            element_id = attrib.get("id")
+            if element_id in CONTENT_IDS:
+                self.ids.setdefault(element_id, element)
+            
+            if "itemtype" in attrib:
+                self.itemtypes.append(element)
+            if self.author_itemprop is None and attrib.get("itemprop") == "author":
+                self.author_itemprop = element
+            
+            classes = attrib.get("class")
+            if classes:
+                for class_value in classes.split():
+                    if class_value in CONTENT_CLASSES:
+                        self.classes.setdefault(class_value, element)
+                lowered = classes.lower()
+                if self.byline is None and ("byline" in lowered or "author" in lowered):
+                    self.byline = element
+                if "category" in lowered:
+                    self.category_elements.append(element)
+                if "tag" in lowered:
+                    self.tag_elements.append(element)
+
+class LxmlExtractor:
+    """Extracts page content like ContentExtractor, on an lxml tree."""
+    
+    def __init__(self):
+        # lxml parsers must not be shared between threads
+        self._local = threading.local()
+    
+    @property
+    def parser(self):
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+            self._local.parser = parser
+        return parser
+    
+    def extract(self, url: str, html: str) -> Tuple[Optional[List[Tuple[str, str]]], Optional[ContentMetadata], Optional[str]]:
+        """
+        Extract the main content blocks and metadata of a page.
+        
+        Returns:
+            Tuple of (blocks, metadata, cleaned_html); blocks are the (tag, text) paragraphs
+            of the main content, None if no content container was found
+        """
+        try:
+            root = lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=self.parser)
+        except (etree.ParserError, ValueError):
+            # Empty document
+            return None, None, None
+        
+        if not self._clean(root):
+            return None, None, None
+        
+        index = PageIndex(root)
+        content_type = self._identify_content_type(root, index, url)
+        
+        blocks = self._extract_main_content(index, has_body=bool(BODY_TAG_RE.search(html)))
+        if not blocks:
+            return blocks, None, None
+        
+        metadata = self._extract_metadata(root, index, content_type)
+        return blocks, metadata, lxml.html.tostring(root, encoding="unicode")
+    
+    def _clean(self, root) -> bool:
+        """
+        Remove unwanted elements (comments are dropped by the parser).
+        
+        Returns:
+            False if the root element itself is removed, leaving nothing to extract
+        """
+        doomed = []
+        for element in root.iter(etree.Element):
+            if element.tag in REMOVED_TAGS:
+                doomed.append(element)
+                continue
+            
+            attrib = element.attrib
+            if not attrib:
+                continue
+            
+            style = attrib.get("style")
+            classes = attrib.get("class")
+            element_id = attrib.get("id")
+            if ((style and "display:none" in style) or
+                    (classes and any(social in classes.lower() for social in SOCIAL_CLASSES)) or
+                    (element_id and any(nav in element_id.lower() for nav in NAV_IDS))):
+                doomed.append(element)
+        
+        for element in doomed:
+            if element is root:
+                return False
+            # Keeps the text that follows the element
+            element.drop_tree()
+        return True
+    
+    @staticmethod
+    def _text(element) -> str:
+        return element.text_content()
+    
+    def _extract_title(self, index: PageIndex) -> Optional[str]:
+        title_tag = index.first.get("title")
+        if title_tag is not None:
+            return self._text(title_tag).strip()
+        
+        for heading in index.headings:
+            text = self._text(heading).strip()
+            if text:
+                return text
+        return None
+    
+    def _extract_main_content(self, index: PageIndex, has_body: bool) -> Optional[List[Tuple[str, str]]]:
+        main_container = index.first.get("article")
+        if main_container is None:
+            main_container = index.first.get("main")
+        
+        if main_container is None:
+            for id_value in CONTENT_IDS:
+                if id_value in index.ids:
+                    main_container = index.ids[id_value]
+                    break
+            
+            # A matching class takes precedence over a matching id, as in ContentExtractor
+            for class_value in CONTENT_CLASSES:
+                if class_value in index.classes:
+                    main_container = index.classes[class_value]
+                    break
+        
+        if main_container is None and has_body:
+            main_container = index.first.get("body")
+        
+        if main_container is None:
+            return None
+        
+        blocks = []
+        for element in main_container.iterdescendants(*TEXT_TAGS):
+            text = self._text(element).strip()
+            if text:
+                blocks.append((element.tag, text))
+        return blocks
+    
+    def _identify_content_type(self, root, index: PageIndex, url: str) -> ContentType:
+        url_type = content_type_from_url(url)
+        if url_type:
+            return url_type
+        
+        # Check for schema.org types
+        for element in index.itemtypes:
+            item_type_value = element.get("itemtype", "").lower()
+            if "product" in item_type_value:
+                return ContentType.PRODUCT_DESCRIPTION
+            elif "article" in item_type_value:
+                return ContentType.ARTICLE
+        
+        return content_type_from_text(self._text(root))
+    
+    @staticmethod
+    def _parse_date(date_str: str) -> datetime:
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    
+    def _extract_metadata(self, root, index: PageIndex, content_type: ContentType) -> ContentMetadata:
+        metadata = ContentMetadata(content_type=content_type)
+        metadata.title = self._extract_title(index)
+        
+        # Author: meta tag, then schema.org itemprop, then a byline element
+        for meta_tag in index.metas:
+            if meta_tag.get("name") == "author":
+                metadata.author = meta_tag.get("content")
+                break
+        if not metadata.author and index.author_itemprop is not None:
+            metadata.author = self._text(index.author_itemprop).strip()
+        if not metadata.author and index.byline is not None:
+            metadata.author = self._text(index.byline).strip()
+        
+        # Publication and modification dates (the last matching meta tag wins)
+        for meta_tag in index.metas:
+            property_value = meta_tag.get("property", "").lower()
+            name_value = meta_tag.get("name", "").lower()
+            date_str = meta_tag.get("content")
+            if not date_str:
+                continue
+            
+            if property_value in PUBLISHED_PROPERTIES or name_value == "pubdate":
+                try:
+                    metadata.publication_date = self._parse_date(date_str)
+                except ValueError:
+                    pass
+            if property_value in MODIFIED_PROPERTIES or name_value == "lastmod":
+                try:
+                    metadata.last_modified = self._parse_date(date_str)
+                except ValueError:
+                    pass
+        
+        time_tag = index.first.get("time")
+        if not metadata.publication_date and time_tag is not None and "datetime" in time_tag.attrib:
+            try:
+                metadata.publication_date = self._parse_date(time_tag.get("datetime"))
+            except ValueError:
+                pass
+        
+        # Language
+        if root.tag == "html":
+            lang_attr = root.get("lang")
+            if lang_attr:
+                metadata.language = lang_attr.split("-")[0]
+        
+        # Categories: article:section meta tags, then links in category elements
+        for meta_tag in index.metas:
+            if meta_tag.get("property") == "article:section":
+                category = meta_tag.get("content")
+                if category and category not in metadata.categories:
+                    metadata.categories.append(category)
+        for element in index.category_elements:
+            for link in element.iterdescendants("a"):
+                text = self._text(link).strip()
+                if text and text not in metadata.categories:
+                    metadata.categories.append(text)
+        
+        # Tags: article:tag meta tags, then links in tag elements
+        for meta_tag in index.metas:
+            if meta_tag.get("property") == "article:tag":
+                tag = meta_tag.get("content")
+                if tag and tag not in metadata.tags:
+                    metadata.tags.append(tag)
+        for element in index.tag_elements:
+            for link in element.iterdescendants("a"):
+                text = self._text(link).strip()
+                if text and text not in metadata.tags and text not in metadata.categories:
+                    metadata.tags.append(text)
+        
+        return metadata
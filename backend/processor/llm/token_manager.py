@@ -5,6 +5,8 @@ import logging
 import re
 from typing import List, Dict, Any, Optional, Union, Tuple
 
+from processor.token_counter import TokenCounter, get_token_counter
+
 logger = logging.getLogger(__name__)
 
 class TokenManager:
@@ -68,9 +70,11 @@ class TokenManager:
         # Sort chunks by relevance
         chunks = sorted(chunks, key=lambda x: x.get("similarity", 0), reverse=True)
         
-        for chunk in chunks:
+        # Count all chunks in one tokenizer batch
+        chunk_token_counts = self.token_estimator.estimate_tokens_batch([chunk["text"] for chunk in chunks])
+        
+        for chunk, chunk_tokens in zip(chunks, chunk_token_counts):
             chunk_text = chunk["text"]
-            chunk_tokens = self.token_estimator.estimate_tokens(chunk_text)
             
             if total_tokens + chunk_tokens <= max_tokens:
                 # Add complete chunk
@@ -91,88 +95,32 @@ class TokenManager:
         return "\n\n".join(included_chunks)
 
 class TokenEstimator:
-    """Estimates token counts for text."""
+    """Counts tokens for text and message lists with the shared LLM token counter."""
     
-    def __init__(self):
-        # Try to import tiktoken if available
-        self.tiktoken_available = False
-        self.tiktoken_model = None
-        
-        try:
-            import tiktoken
-            self.tiktoken_available = True
-            logger.info("Using tiktoken for token estimation")
-            # Default to cl100k_base which is used by OpenAI chat models
-            self.tiktoken_model = tiktoken.get_encoding("cl100k_base")
-        except ImportError:
-            logger.warning("tiktoken not available, using word-based token estimation")
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or get_token_counter("llm")
+        # Kept for callers checking whether counts are exact
+        self.tiktoken_available = self.token_counter.exact
     
     def estimate_tokens(self, text):
-        """Estimate the number of tokens in text."""
-        if self.tiktoken_available:
-            return self._estimate_tokens_tiktoken(text)
-        else:
-            return self._estimate_tokens_words(text)
-    
-    def _estimate_tokens_tiktoken(self, text):
-        """Estimate tokens using tiktoken."""
+        """Number of tokens in text (or in a list of chat messages)."""
         if isinstance(text, list):
             # Handle message lists
-            token_count = 0
-            for msg in text:
-                # Simplified message token counting
-                token_count += len(self.tiktoken_model.encode(msg.get("content", "")))
-                token_count += 4  # Approx overhead for role
-            return token_count + 2  # Final overhead
-        else:
-            # Simple string
-            return len(self.tiktoken_model.encode(text))
+            counts = self.token_counter.count_batch([msg.get("content", "") for msg in text])
+            return sum(counts) + len(text) * 4 + 2  # Approx overhead for roles and reply priming
+        return self.token_counter.count(text)
     
-    def _estimate_tokens_words(self, text):
-        """Estimate tokens based on word count."""
-        if isinstance(text, list):
-            # Handle message lists
-            return sum(self._estimate_tokens_words(msg.get("content", "")) for msg in text) + len(text) * 4
-        
-        # Simple estimation: ~1.3 tokens per word
-        words = len(re.findall(r'\b\w+\b', text))
-        return int(words * 1.3) + 10  # Add small constant for safety
+    def estimate_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Number of tokens in each text, tokenized in one batch."""
+        return self.token_counter.count_batch(texts)
     
     def truncate_to_tokens(self, text, max_tokens):
         """Truncate text to fit within token limit."""
-        if self.tiktoken_available:
-            return self._truncate_to_tokens_tiktoken(text, max_tokens)
-        else:
-            return self._truncate_to_tokens_words(text, max_tokens)
-    
-    def _truncate_to_tokens_tiktoken(self, text, max_tokens):
-        """Truncate using tiktoken."""
-        tokens = self.tiktoken_model.encode(text)
-        
-        if len(tokens) <= max_tokens:
-            return text
-        
-        # Truncate tokens and decode
-        truncated_tokens = tokens[:max_tokens-1]  # Leave room for ellipsis
-        truncated_text = self.tiktoken_model.decode(truncated_tokens)
-        
-        # Try to end at punctuation
-        match = re.search(r'.*[.!?]', truncated_text)
-        if match:
-            truncated_text = match.group(0)
-        
-        return truncated_text + "..."
-    
-    def _truncate_to_tokens_words(self, text, max_tokens):
-        """Truncate based on words."""
-        if self._estimate_tokens_words(text) <= max_tokens:
+        if self.token_counter.count(text) <= max_tokens:
             return text
         
-        # Simple truncation by words
-        words = text.split()
-        words_limit = int(max_tokens / 1.3)  # Approximation
-        
-        truncated_text = " ".join(words[:words_limit])
+        # Leave room for the ellipsis
+        truncated_text = self.token_counter.truncate(text, max_tokens - 1)
         
         # Try to end at punctuation
         match = re.search(r'.*[.!?]', truncated_text)
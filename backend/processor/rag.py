@@ -12,7 +12,10 @@ import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 import time
 
-from processor.chunker import ContentChunker
+from processor.chunker import ContentChunker, chunk_id
+from processor.chunk_pool import chunk_input
+from processor.embedding_cache import embed_texts, get_embedding_cache
+from processor.embedding_service import get_embedding_service
 from processor.pinecone_rag import PineconeRAGStore
 from processor.retrieval.relevance_scoring import RelevanceScorer
 from processor.retrieval.context_filter import ContextFilter
@@ -27,6 +30,10 @@ class RAGSystem:
     Retrieves relevant content chunks and generates brand-consistent responses.
     """
     
+    # Loaded once per process and shared by all instances, so concurrent
+    # requests share query embedding batches (see processor.embedding_service)
+    _shared_embedding_model = None
+    
     def __init__(self, db, embedding_model=None):
         """
         Initialize the RAG system.
@@ -37,7 +44,9 @@ class RAGSystem:
         """
         self.db = db
         self.embedding_model = embedding_model
-        self.chunker = ContentChunker(chunk_size=500, chunk_overlap=100)
+        # Content-defined boundaries and stable chunk IDs, so re-processing a
+        # changed page only embeds the chunks that changed
+        self.chunker = ContentChunker(chunk_size=500, chunk_overlap=100, content_defined=True)
         
         # Initialize vector store
         self.use_pinecone = os.environ.get('VECTOR_DB_PROVIDER', '').lower() == 'pinecone'
@@ -58,6 +67,9 @@ class RAGSystem:
     
     def get_embedding_model(self):
         """Lazy-load the embedding model with fallbacks."""
+        if self.embedding_model is None and RAGSystem._shared_embedding_model is not None:
+            self.embedding_model = RAGSystem._shared_embedding_model
+        
         if self.embedding_model is None:
             # Try to get embedding model from processor service
             try:
@@ -94,6 +106,10 @@ class RAGSystem:
                                 return np.random.rand(len(texts), 768).astype(np.float32)
                     
                     self.embedding_model = RandomEmbedder()
+            
+            # Share the model (not the random last resort) with later instances
+            if type(self.embedding_model).__name__ != "RandomEmbedder":
+                RAGSystem._shared_embedding_model = self.embedding_model
                     
             # Initialize hybrid retriever now that embedding model is available
             if self.hybrid_retriever is None:
@@ -105,6 +121,11 @@ class RAGSystem:
         """
         Process content into chunks for RAG.
         
+        Chunks already stored for the content are kept if their text is
+        unchanged, and chunks the previous crawl's content of the same URL
+        already embedded reuse its embedding; only new chunks are embedded,
+        and chunks no longer in the content are deleted.
+        
         Args:
             content_id: ID of the content to process
             org_id: Organization ID for multi-tenant isolation
@@ -120,34 +141,12 @@ class RAGSystem:
                 return False
             
             # Split content into chunks
-            chunks = self.chunker.process_content(content)
+            chunks = self.chunker.process_content(chunk_input(content))
             logger.info(f"Generated {len(chunks)} chunks for content {content_id}")
             
-            # Generate embeddings for chunks
-            model = self.get_embedding_model()
-            
-            # Process chunks in batches to avoid memory issues
-            batch_size = 32
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i+batch_size]
-                texts = [chunk["text"] for chunk in batch]
-                
-                # Generate embeddings
-                embeddings = model.encode(texts)
-                
-                # Update chunks with embeddings
-                for j, embedding in enumerate(embeddings):
-                    batch[j]["embedding"] = embedding.tolist()
-                
-                # Store chunks in vector database or regular database
-                if self.use_pinecone and self.vector_store:
-                    success = self.vector_store.store_chunks(batch)
-                    if not success:
-                        logger.warning(f"Failed to store chunks in Pinecone, falling back to database")
-                        self.db.store_content_chunks(batch)
-                else:
-                    # Store chunks in database
-                    self.db.store_content_chunks(batch)
+            new_chunks, stale_ids = self._reconcile_chunks(chunks, [content_id], org_id)
+            self._embed_and_store(new_chunks, org_id)
+            self.db.delete_chunks(stale_ids, org_id)
             
             logger.info(f"Successfully processed content {content_id} for RAG")
             return True
@@ -156,6 +155,163 @@ class RAGSystem:
             logger.error(f"Failed to process content {content_id} for RAG: {str(e)}")
             return False
     
+    def process_contents_for_rag(self,
+                                 content_ids: List[str],
+                                 org_id: Optional[str] = None,
+                                 workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Process many contents into chunks for RAG (bulk ingestion and backfills).
+        
+        Contents are loaded lazily and chunked across a process pool
+        (ContentChunker.chunk_many); chunks of several contents are embedded
+        per model call as they arrive, so memory stays flat. As in
+        process_content_for_rag, only new or changed chunks are embedded.
+        
+        Args:
+            content_ids: IDs of the contents to process
+            org_id: Organization ID for multi-tenant isolation
+            workers: Chunking processes (defaults to CHUNK_WORKERS or the CPU count)
+            
+        Returns:
+            Summary with the processed and failed content IDs, the chunk count
+            and the number of chunks embedded
+        """
+        summary = {"processed": [], "failed": [], "chunks": 0, "embedded": 0}
+        
+        def contents():
+            for content_id in content_ids:
+                content = self.db.get_content(content_id, org_id)
+                if content:
+                    yield content
+                else:
+                    logger.warning(f"Content {content_id} not found")
+                    summary["failed"].append(content_id)
+        
+        batch_size = 32
+        pending_ids: List[str] = []
+        pending_chunks: List[Dict[str, Any]] = []
+        
+        def flush():
+            try:
+                new_chunks, stale_ids = self._reconcile_chunks(pending_chunks, pending_ids, org_id)
+                embedded = sum(1 for chunk in new_chunks if chunk.get("embedding") is None)
+                self._embed_and_store(new_chunks, org_id)
+                self.db.delete_chunks(stale_ids, org_id)
+                summary["processed"].extend(pending_ids)
+                summary["chunks"] += len(pending_chunks)
+                summary["embedded"] += embedded
+            except Exception as e:
+                logger.error(f"Failed to process {len(pending_ids)} contents for RAG: {str(e)}")
+                summary["failed"].extend(pending_ids)
+            pending_ids.clear()
+            pending_chunks.clear()
+        
+        for content_id, chunks in self.chunker.chunk_many(contents(), workers=workers):
+            if chunks is None:
+                summary["failed"].append(content_id)
+                continue
+            pending_ids.append(content_id)
+            pending_chunks.extend(chunks)
+            if len(pending_chunks) >= batch_size:
+                flush()
+        if pending_ids:
+            flush()
+        
+        logger.info(f"Processed {len(summary['processed'])}/{len(content_ids)} contents for RAG "
+                    f"({summary['chunks']} chunks, {summary['embedded']} embedded, {len(summary['failed'])} failed)")
+        cache = get_embedding_cache(self.get_embedding_model())
+        if cache:
+            summary["embedding_cache"] = cache.summary()
+            logger.info(f"📦 Embedding cache: {summary['embedding_cache']}")
+        return summary
+    
+    def _reconcile_chunks(self,
+                          chunks: List[Dict[str, Any]],
+                          content_ids: List[str],
+                          org_id: Optional[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Compare fresh chunks of contents with the stored ones by chunk ID.
+        
+        Stored chunks that are still present are kept (moved to their new
+        position if needed) and need no embedding. Contents without stored
+        chunks (pages saved by a new crawl) are compared with the previous
+        content of their URL: chunks found there get its embedding.
+        
+        Returns:
+            (chunks to store, embedding those without one; IDs of stored chunks to delete)
+        """
+        if self.use_pinecone and self.vector_store:
+            # Stored chunk IDs are not listed from Pinecone; upserts under the stable IDs replace them
+            return chunks, []
+        
+        stored = self.db.get_chunk_positions(content_ids, org_id) or {}
+        self._reuse_previous_embeddings(chunks, [content_id for content_id in content_ids if content_id not in stored],
+                                        org_id)
+        if not stored:
+            return chunks, []
+        
+        new_chunks, moved = [], []
+        kept = set()
+        for chunk in chunks:
+            position = stored.get(chunk["content_id"], {}).get(chunk["id"])
+            if position is None:
+                new_chunks.append(chunk)
+                continue
+            kept.add(chunk["id"])
+            if position != (chunk["chunk_index"], chunk["start_char"], chunk["end_char"]):
+                moved.append(chunk)
+        
+        self.db.update_chunk_positions(moved, org_id)
+        stale_ids = [chunk_id for positions in stored.values() for chunk_id in positions if chunk_id not in kept]
+        logger.info(f"♻️ Reusing {len(kept)}/{len(chunks)} chunks ({len(new_chunks)} to embed, {len(stale_ids)} stale)")
+        return new_chunks, stale_ids
+    
+    def _reuse_previous_embeddings(self, chunks: List[Dict[str, Any]], content_ids: List[str], org_id: Optional[str]):
+        """Copy embeddings of unchanged chunks from the previous content of the same URL."""
+        if not content_ids:
+            return
+        previous = self.db.get_previous_chunk_embeddings(content_ids, org_id) or {}
+        if not previous:
+            return
+        
+        reused = 0
+        for chunk in chunks:
+            if chunk["content_id"] not in previous:
+                continue
+            previous_id, embeddings = previous[chunk["content_id"]]
+            embedding = embeddings.get(chunk_id(previous_id, chunk["text"], chunk.get("occurrence", 0)))
+            if embedding is not None:
+                chunk["embedding"] = [float(value) for value in embedding]
+                reused += 1
+        logger.info(f"♻️ Reusing {reused} embeddings from previous crawls of {len(previous)} pages")
+    
+    def _embed_and_store(self, chunks: List[Dict[str, Any]], org_id: Optional[str]):
+        """Generate embeddings for chunks that have none and store the chunks."""
+        model = self.get_embedding_model()
+        
+        # Process chunks in batches to avoid memory issues
+        batch_size = 32
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i+batch_size]
+            to_embed = [chunk for chunk in batch if chunk.get("embedding") is None]
+            
+            # Generate embeddings (cached texts are not encoded again)
+            embeddings = embed_texts(model, [chunk["text"] for chunk in to_embed])
+            
+            # Update chunks with embeddings
+            for chunk, embedding in zip(to_embed, embeddings):
+                chunk["embedding"] = embedding.tolist()
+            
+            # Store chunks in vector database or regular database
+            if self.use_pinecone and self.vector_store:
+                success = self.vector_store.store_chunks(batch)
+                if not success:
+                    logger.warning(f"Failed to store chunks in Pinecone, falling back to database")
+                    self.db.store_content_chunks(batch, org_id)
+            else:
+                # Store chunks in database
+                self.db.store_content_chunks(batch, org_id)
+    
     def retrieve_relevant_chunks(
         self, 
         query: str, 
@@ -189,6 +345,9 @@ class RAGSystem:
         reformulated_queries = self.query_reformulator.reformulate(query)
         logger.debug(f"Reformulated queries: {reformulated_queries}")
         
+        # Encode the query and its reformulations in one micro-batch
+        query_embeddings = self._encode_queries([query] + list(reformulated_queries))
+        
         # Step 2: Retrieve chunks for each reformulation
         all_chunks = []
         for reformulated_query in reformulated_queries:
@@ -198,7 +357,8 @@ class RAGSystem:
                 top_k=top_k,  # Get top_k for each reformulation
                 domain=domain,
                 content_type=content_type,
-                org_id=org_id  # Pass org_id for multi-tenant isolation
+                org_id=org_id,  # Pass org_id for multi-tenant isolation
+                query_embedding=query_embeddings.get(reformulated_query)
             )
             all_chunks.extend(chunks)
         
@@ -213,8 +373,9 @@ class RAGSystem:
         chunks = list(unique_chunks.values())
         
         # Step 4: Apply enhanced scoring
-        model = self.get_embedding_model()
-        query_embedding = model.encode(query).tolist()
+        query_embedding = query_embeddings.get(query)
+        if query_embedding is None:
+            query_embedding = get_embedding_service(self.get_embedding_model()).encode(query).tolist()
         
         enhanced_chunks = []
         for chunk in chunks:
@@ -244,6 +405,17 @@ class RAGSystem:
         
         return result_chunks
     
+    def _encode_queries(self, queries: List[str]) -> Dict[str, List[float]]:
+        """Embeddings of queries by text, encoded through the shared embedding service."""
+        unique_queries = list(dict.fromkeys(queries))
+        try:
+            service = get_embedding_service(self.get_embedding_model())
+            embeddings = service.encode_many(unique_queries)
+        except Exception as e:
+            logger.warning(f"Error generating query embeddings: {str(e)}")
+            return {}
+        return {text: embedding.tolist() for text, embedding in zip(unique_queries, embeddings)}
+    
     def generate_ai_response(
         self, 
         query: str, 
@@ -119,6 +119,14 @@ class RAGService:
             logger.error(f"Failed to process content for RAG: {e}")
             return False
     
+    def process_contents_for_rag(self, content_ids: List[str], org_id: str) -> Dict[str, Any]:
+        """Process many contents into chunks for RAG, chunking them in parallel"""
+        try:
+            return self.rag_system.process_contents_for_rag(content_ids, org_id)
+        except Exception as e:
+            logger.error(f"Failed to process contents for RAG: {e}")
+            return {"processed": [], "failed": list(content_ids), "chunks": 0}
+    
     def generate_content(
         self,
         query: str,
@@ -0,0 +1,213 @@
+"""
+Streaming crawl-to-RAG pipeline.
+
+Instead of chunking and embedding a crawl's content in one pass after the
+crawl ends, the crawler's ContentSink hands every batch of saved pages to a
+RAGStreamPipeline. Pages flow through two stages connected by bounded
+queues:
+
+    ContentSink writer -> [chunk queue] -> chunker -> [embed queue] -> embedder
+
+The chunk stage splits page text into chunks; the embed stage encodes the
+chunks of several pages per model call, stores them and marks the pages
+processed. When the embedder falls behind, the queues fill and the sink's
+writer blocks, which in turn blocks the crawler (the sink's own queue is
+bounded), so memory stays flat while content becomes searchable minutes
+after the crawl starts.
+
+Pages the pipeline could not index stay unprocessed and are picked up by
+the post-crawl RAG optimization as before.
+
+The embed stage loads the embedding model into the crawl worker, so the
+pipeline only runs for crawls that set stream_to_rag, on workers sized for
+the model.
+"""
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from api.models import CrawlConfig
+from database.db import Database
+from database.session import get_db_session
+from processor.chunker import ContentChunker
+from processor.chunk_pool import chunk_input
+from processor.embedding_cache import embed_texts
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class RAGStreamPipeline:
+    """Chunks and embeds saved pages while the crawl is still running."""
+    
+    def __init__(self,
+                 org_id: str,
+                 queue_size: int = 64,
+                 embed_batch_size: int = 32,
+                 chunk_workers: int = 1,
+                 session_factory: Callable = get_db_session,
+                 embedding_model=None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            org_id: Organization ID for multi-tenant isolation
+            queue_size: Pages each stage queue holds before blocking the stage in front
+            embed_batch_size: Chunks per embedding model call
+            chunk_workers: Chunking threads
+            session_factory: Creates the embed stage's own database session
+            embedding_model: Pre-loaded embedding model (loaded on the embed thread if None)
+        """
+        self.org_id = org_id
+        self.embed_batch_size = embed_batch_size
+        self.chunk_workers = chunk_workers
+        self.session_factory = session_factory
+        self.embedding_model = embedding_model
+        
+        # Same chunking as RAGSystem, so streamed and batch-processed pages match
+        self.chunker = ContentChunker(chunk_size=500, chunk_overlap=100, content_defined=True)
+        
+        self._chunk_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._embed_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._chunk_threads: List[threading.Thread] = []
+        self._embed_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.failed = False
+        
+        self.contents_submitted = 0
+        self.contents_indexed = 0
+        self.contents_failed = 0
+        self.chunks_embedded = 0
+    
+    @classmethod
+    def from_config(cls, config: CrawlConfig, org_id: str) -> Optional["RAGStreamPipeline"]:
+        """Pipeline for a crawl, or None if streaming to RAG is disabled."""
+        if not config.stream_to_rag:
+            return None
+        return cls(
+            org_id,
+            queue_size=config.rag_stream_queue_size,
+            embed_batch_size=config.rag_embed_batch_size
+        )
+    
+    def _start(self):
+        with self._lock:
+            if self._embed_thread is not None:
+                return
+            self._embed_thread = threading.Thread(target=self._run_embedder, name="rag-embed", daemon=True)
+            self._embed_thread.start()
+            for i in range(self.chunk_workers):
+                thread = threading.Thread(target=self._run_chunker, name=f"rag-chunk-{i}", daemon=True)
+                thread.start()
+                self._chunk_threads.append(thread)
+    
+    def submit(self, contents: List[Dict[str, Any]]):
+        """
+        Queue saved pages for chunking and embedding.
+        
+        Blocks while the chunk queue is full (backpressure on the caller).
+        """
+        if self.failed:
+            return
+        self._start()
+        for content_data in contents:
+            self._chunk_queue.put(chunk_input(content_data))
+            self.contents_submitted += 1
+    
+    def close(self):
+        """Index everything submitted so far and stop the stage threads."""
+        if self._embed_thread is None:
+            return
+        for _ in self._chunk_threads:
+            self._chunk_queue.put(_STOP)
+        for thread in self._chunk_threads:
+            thread.join()
+        self._embed_queue.put(_STOP)
+        self._embed_thread.join()
+        logger.info(f"🧠 RAG stream closed: {self.contents_indexed}/{self.contents_submitted} pages indexed "
+                    f"({self.chunks_embedded} chunks), {self.contents_failed} failed")
+    
+    def _run_chunker(self):
+        while True:
+            content = self._chunk_queue.get()
+            if content is _STOP:
+                return
+            if self.failed:
+                continue
+            try:
+                chunks = self.chunker.process_content(content)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to chunk {content['url']}: {str(e)}")
+                self.contents_failed += 1
+                continue
+            self._embed_queue.put((content["content_id"], chunks))
+    
+    def _run_embedder(self):
+        session = self.session_factory()
+        db = Database(session)
+        try:
+            from processor.rag import RAGSystem
+            rag_system = RAGSystem(db, embedding_model=self.embedding_model)
+            model = rag_system.get_embedding_model()
+        except Exception as e:
+            # Pages stay unprocessed for the post-crawl RAG optimization
+            logger.error(f"❌ RAG stream disabled, embedding model unavailable: {str(e)}")
+            self.failed = True
+            self._discard_embed_queue()
+            session.close()
+            return
+        
+        try:
+            pending: List[tuple] = []
+            pending_chunks = 0
+            while True:
+                try:
+                    # Wait briefly for more pages so model calls stay full
+                    item = self._embed_queue.get(timeout=0.5 if pending else None)
+                except queue.Empty:
+                    item = None
+                
+                if item is not None and item is not _STOP:
+                    pending.append(item)
+                    pending_chunks += len(item[1])
+                
+                if pending and (item is None or item is _STOP or pending_chunks >= self.embed_batch_size):
+                    self._embed(db, rag_system, model, pending)
+                    pending = []
+                    pending_chunks = 0
+                
+                if item is _STOP:
+                    return
+        finally:
+            session.close()
+    
+    def _discard_embed_queue(self):
+        """Consume the embed queue until stopped so chunk threads never block."""
+        while self._embed_queue.get() is not _STOP:
+            pass
+    
+    def _embed(self, db: Database, rag_system, model, pending: List[tuple]):
+        """Embed and store the chunks of several pages, then mark the pages processed."""
+        chunks = [chunk for _, content_chunks in pending for chunk in content_chunks]
+        content_ids = [content_id for content_id, _ in pending]
+        try:
+            if chunks:
+                # Unchanged chunks of pages seen on an earlier crawl keep their embeddings
+                chunks, _ = rag_system._reconcile_chunks(chunks, content_ids, self.org_id)
+                to_embed = [chunk for chunk in chunks if chunk.get("embedding") is None]
+                embeddings = embed_texts(model, [chunk["text"] for chunk in to_embed], batch_size=self.embed_batch_size)
+                for chunk, embedding in zip(to_embed, embeddings):
+                    chunk["embedding"] = embedding.tolist()
+                
+                stored = (rag_system.use_pinecone and rag_system.vector_store and
+                          rag_system.vector_store.store_chunks(chunks))
+                if not stored and not db.store_content_chunks(chunks, self.org_id):
+                    raise RuntimeError("chunk insert failed")
+            
+            db.mark_contents_processed(content_ids, self.org_id)
+            self.contents_indexed += len(content_ids)
+            self.chunks_embedded += len(chunks)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to index {len(content_ids)} pages: {str(e)}")
+            self.contents_failed += len(content_ids)
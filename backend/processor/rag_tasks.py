@@ -58,6 +58,59 @@ def chunk_content_task(self, content_id: str, org_id: str):
             "content_id": content_id
         }
 
+@celery_app.task(bind=True)
+def batch_process_content_for_rag_task(self, content_ids: List[str], org_id: str):
+    """
+    Celery task to chunk and embed many content items for RAG.
+    
+    Contents are chunked across a process pool (ContentChunker.chunk_many)
+    instead of one at a time; inside a prefork worker, whose processes
+    cannot start children, they are chunked inline.
+    
+    Args:
+        content_ids: Content IDs to process
+        org_id: Organization ID for multi-tenant isolation
+    
+    Returns:
+        Batch processing results
+    """
+    try:
+        logger.info(f"✂️ Starting batch RAG processing for {len(content_ids)} items")
+        
+        # Get database session
+        db_session = get_db_session()
+        
+        try:
+            # Initialize RAG service
+            from database.db import Database
+            from processor.rag_service import RAGService
+            rag_service = RAGService(Database(db_session))
+            
+            result = rag_service.process_contents_for_rag(content_ids=content_ids, org_id=org_id)
+            summary = {
+                "total": len(content_ids),
+                "successful": len(result["processed"]),
+                "failed": len(result["failed"]),
+                "chunks": result["chunks"],
+                "failed_content_ids": result["failed"]
+            }
+            
+            logger.info(f"✅ Batch RAG processing completed: {summary['successful']}/{summary['total']} successful")
+            return summary
+            
+        finally:
+            db_session.close()
+            
+    except Exception as exc:
+        error_msg = str(exc)
+        logger.error(f"❌ Batch RAG processing failed: {error_msg}", exc_info=True)
+        
+        return {
+            "status": "failed",
+            "error": error_msg,
+            "total": len(content_ids)
+        }
+
 @celery_app.task(bind=True)
 def generate_chunk_embeddings_task(self, content_id: str, org_id: str):
     """
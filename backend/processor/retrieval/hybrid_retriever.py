@@ -5,6 +5,8 @@ import logging
 from typing import Dict, List, Any, Optional, Union
 import time
 
+from processor.embedding_service import get_embedding_service
+
 logger = logging.getLogger(__name__)
 
 class HybridRetriever:
@@ -16,7 +18,7 @@ class HybridRetriever:
         self.vector_weight = 0.7  # Weight for vector search results
         self.keyword_weight = 0.3  # Weight for keyword search results
     
-    def retrieve(self, query, top_k=5, domain=None, content_type=None, org_id=None):
+    def retrieve(self, query, top_k=5, domain=None, content_type=None, org_id=None, query_embedding=None):
         """
         Perform hybrid retrieval.
         
@@ -26,17 +28,17 @@ class HybridRetriever:
             domain: Optional domain filter
             content_type: Optional content type filter
             org_id: Organization ID for multi-tenant isolation
+            query_embedding: Embedding of the query, if already encoded
             
         Returns:
             Combined search results
         """
         start_time = time.time()
         
-        # Step 1: Get query embedding
-        query_embedding = None
-        if self.embedding_model:
+        # Step 1: Get query embedding (micro-batched with concurrent queries)
+        if query_embedding is None and self.embedding_model:
             try:
-                query_embedding = self.embedding_model.encode(query).tolist()
+                query_embedding = get_embedding_service(self.embedding_model).encode(query).tolist()
                 logger.debug(f"Generated query embedding for: {query[:30]}...")
             except Exception as e:
                 logger.warning(f"Error generating query embedding: {str(e)}")
@@ -8,6 +8,7 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sentence_transformers import SentenceTransformer
 
 from api.models import ContentType, ContentResponse
+from processor.embedding_cache import embed_texts, get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -69,9 +70,9 @@ class ProcessorService:
                     "end": ent.end_char
                 })
             
-            # Generate vector embedding
+            # Generate vector embedding (unchanged re-crawled pages come from the embedding cache)
             model = self.get_embedding_model()
-            embedding = model.encode(content["text"]).tolist()
+            embedding = embed_texts(model, [content["text"]])[0].tolist()
             
             # Update content with processed data
             self.db.update_content_processing(
@@ -85,6 +86,58 @@ class ProcessorService:
         except Exception as e:
             logger.error(f"Failed to process content {content_id}: {str(e)}")
     
+    def generate_embeddings_batch(self, content_ids: List[str], org_id: str, task_callback=None) -> Dict[str, Any]:
+        """
+        Generate content embeddings for several contents.
+        
+        Texts already in the embedding cache are not encoded again; the rest
+        are encoded in batches.
+        
+        Args:
+            content_ids: IDs of the contents to embed
+            org_id: Organization ID for multi-tenant isolation
+            task_callback: Optional callable(done, total) for progress reporting
+            
+        Returns:
+            Results with the number of contents embedded and the cache hit rate
+        """
+        model = self.get_embedding_model()
+        batch_size = 32
+        embedded = 0
+        failed = []
+        
+        for i in range(0, len(content_ids), batch_size):
+            batch_ids = content_ids[i:i + batch_size]
+            contents = []
+            for content_id in batch_ids:
+                content = self.db.get_content(content_id, org_id)
+                if content and content.get("text"):
+                    contents.append(content)
+                else:
+                    failed.append(content_id)
+            
+            try:
+                embeddings = embed_texts(model, [content["text"] for content in contents])
+                embedded += self.db.update_content_embeddings({
+                    content["content_id"]: embedding.tolist()
+                    for content, embedding in zip(contents, embeddings)
+                }, org_id) or 0
+            except Exception as e:
+                logger.error(f"Failed to embed {len(contents)} contents: {str(e)}")
+                failed.extend(content["content_id"] for content in contents)
+            
+            if task_callback:
+                task_callback(min(i + batch_size, len(content_ids)), len(content_ids))
+        
+        cache = get_embedding_cache(model)
+        return {
+            "status": "completed",
+            "total": len(content_ids),
+            "embedded": embedded,
+            "failed": failed,
+            "embedding_cache": cache.summary() if cache else None
+        }
+    
     def get_content(self, content_id: str, org_id: str) -> Optional[ContentResponse]:
         """Get content by ID."""
         content = self.db.get_content(content_id, org_id)
@@ -118,7 +171,8 @@ class ProcessorService:
         try:
             # Get embedding for query
             model = self.get_embedding_model()
-            query_embedding = model.encode(query).tolist()
+            # Queries stay in the in-memory cache tier, like EmbeddingService's
+            query_embedding = embed_texts(model, [query], persistent=False)[0].tolist()
             
             # Search database with vector similarity
             results = self.db.search_content_by_vector(
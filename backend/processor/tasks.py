@@ -182,8 +182,9 @@ def generate_embeddings_task(self, content_ids: List[str], org_id: str):
         
         try:
             # Initialize processor service
+            from database.db import Database
             from processor.service import ProcessorService
-            processor_service = ProcessorService(db_session)
+            processor_service = ProcessorService(Database(db_session))
             
             # Generate embeddings
             result = processor_service.generate_embeddings_batch(
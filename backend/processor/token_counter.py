@@ -0,0 +1,225 @@
+"""
+Shared token counting for chunking and LLM prompts.
+
+Chunk sizes and prompt budgets used to be word-count heuristics, so chunks
+overshot the embedding model's window (and were silently truncated when
+embedded) while prompts were sized with a wide safety margin. TokenCounter
+counts with the real tokenizers instead:
+
+- "embedding": the embedding model's WordPiece tokenizer (transformers),
+  with max_tokens set to the model's window
+- "llm": the LLM's BPE encoding (tiktoken)
+
+Both load from local files only, never from the network: the tokenizer is
+taken from the local Hugging Face cache (or EMBEDDING_TOKENIZER may be a
+local directory), and the tiktoken encoding from its cache (TIKTOKEN_CACHE_DIR).
+Pre-fetch them where the workers are built. If a tokenizer is not available
+locally, counts fall back to a heuristic estimate.
+
+Counts are memoized in a bounded LRU cache keyed by a hash of the text, so
+sentences repeated across pages, chunk overlaps and re-chunked content are
+tokenized once. count_batch tokenizes all cache misses in one call.
+
+Configuration (environment):
+    EMBEDDING_TOKENIZER      Tokenizer name or path (default sentence-transformers/all-MiniLM-L6-v2)
+    EMBEDDING_MAX_TOKENS     Embedding model window, special tokens included (default 256)
+    LLM_TOKENIZER_ENCODING   tiktoken encoding (default cl100k_base)
+    TOKEN_CACHE_SIZE         Cached counts per counter (default 50000)
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_TOKENIZER = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_LLM_ENCODING = "cl100k_base"
+
+WORDPIECE_RE = re.compile(r"\w+|[^\w\s]")
+WORD_RE = re.compile(r"\b\w+\b")
+
+_counters: Dict[str, "TokenCounter"] = {}
+_counters_lock = threading.Lock()
+
+class TokenCounter:
+    """Memoized token counts from one tokenizer."""
+    
+    def __init__(self,
+                 name: str,
+                 count_texts: Callable[[List[str]], List[int]],
+                 max_tokens: Optional[int] = None,
+                 exact: bool = True,
+                 cache_size: int = 50000):
+        """
+        Initialize the counter.
+        
+        Args:
+            name: Tokenizer name (for logs)
+            count_texts: Token counts of a batch of texts
+            max_tokens: Tokens a text may have before the model truncates it (None if unbounded)
+            exact: False if count_texts is a heuristic estimate
+            cache_size: Counts kept in the LRU cache
+        """
+        self.name = name
+        self.count_texts = count_texts
+        self.max_tokens = max_tokens
+        self.exact = exact
+        self.cache_size = cache_size
+        
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        return self.count_batch([text])[0]
+    
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Number of tokens in each text; uncached texts are tokenized in one batch."""
+        keys = [self._key(text) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    counts[i] = cached
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        
+        if missing:
+            batch = [texts[positions[0]] for positions in missing.values()]
+            batch_counts = self.count_texts(batch)
+            with self._lock:
+                for (key, positions), count in zip(missing.items(), batch_counts):
+                    for i in positions:
+                        counts[i] = count
+                    self._cache[key] = count
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return counts
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text, cut at a word boundary, with at most max_tokens tokens."""
+        if self.count(text) <= max_tokens:
+            return text
+        
+        # Binary search over word ends: O(log n) tokenizations, not cached (the prefixes do not recur)
+        ends = [m.end() for m in re.finditer(r"\S+", text)]
+        low, high = 0, len(ends)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_texts([text[:ends[middle - 1]]])[0] <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:ends[low - 1]] if low else ""
+    
+    def summary(self) -> Dict[str, int]:
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def estimate_wordpiece_tokens(texts: List[str]) -> List[int]:
+    """Heuristic WordPiece counts: words and punctuation, long words as several pieces."""
+    return [sum(1 + len(piece) // 10 for piece in WORDPIECE_RE.findall(text)) for text in texts]
+
+def estimate_llm_tokens(texts: List[str]) -> List[int]:
+    """Heuristic BPE counts: ~1.3 tokens per word, plus a small constant for safety."""
+    return [int(len(WORD_RE.findall(text)) * 1.3) + 10 for text in texts]
+
+def _load_embedding_counter(cache_size: int) -> TokenCounter:
+    name = os.environ.get("EMBEDDING_TOKENIZER", DEFAULT_EMBEDDING_TOKENIZER)
+    window = int(os.environ.get("EMBEDDING_MAX_TOKENS", "256"))
+    
+    tokenizer = None
+    try:
+        from transformers import AutoTokenizer
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(name, local_files_only=True)
+        except Exception as e:
+            logger.warning(f"Embedding tokenizer {name} not available locally ({str(e)}), estimating token counts")
+    except ImportError:
+        logger.warning("transformers not available, estimating embedding token counts")
+    
+    if tokenizer is None:
+        return TokenCounter(f"{name} (estimate)", estimate_wordpiece_tokens,
+                            max_tokens=window - 2, exact=False, cache_size=cache_size)
+    
+    def count_texts(texts: List[str]) -> List[int]:
+        encoded = tokenizer(texts, add_special_tokens=False, truncation=False, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    # The window includes the special tokens added when embedding ([CLS], [SEP])
+    special_tokens = tokenizer.num_special_tokens_to_add()
+    logger.info(f"Counting embedding tokens with {name} ({window} token window)")
+    return TokenCounter(name, count_texts, max_tokens=window - special_tokens, cache_size=cache_size)
+
+def _get_local_encoding(name: str):
+    """tiktoken encoding from tiktoken's cache only (get_encoding would download a missing one)."""
+    import tiktoken
+    import tiktoken.load
+    
+    read_file = tiktoken.load.read_file
+    
+    def read_local_file(blobpath: str) -> bytes:
+        if blobpath.startswith(("http://", "https://")):
+            raise FileNotFoundError(f"{blobpath} is not in the tiktoken cache")
+        return read_file(blobpath)
+    
+    # Only called under _counters_lock
+    tiktoken.load.read_file = read_local_file
+    try:
+        return tiktoken.get_encoding(name)
+    finally:
+        tiktoken.load.read_file = read_file
+
+def _load_llm_counter(cache_size: int) -> TokenCounter:
+    name = os.environ.get("LLM_TOKENIZER_ENCODING", DEFAULT_LLM_ENCODING)
+    try:
+        encoding = _get_local_encoding(name)
+    except ImportError:
+        logger.warning("tiktoken not available, using word-based token estimation")
+        return TokenCounter(f"{name} (estimate)", estimate_llm_tokens, exact=False, cache_size=cache_size)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding {name} not available ({str(e)}), using word-based token estimation")
+        return TokenCounter(f"{name} (estimate)", estimate_llm_tokens, exact=False, cache_size=cache_size)
+    
+    def count_texts(texts: List[str]) -> List[int]:
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+    
+    logger.info(f"Counting LLM tokens with tiktoken {name}")
+    return TokenCounter(name, count_texts, cache_size=cache_size)
+
+def get_token_counter(kind: str = "embedding") -> TokenCounter:
+    """
+    Shared counter for a tokenizer, loaded on first use.
+    
+    Args:
+        kind: "embedding" (embedding model tokenizer) or "llm" (LLM BPE encoding)
+    """
+    loaders = {"embedding": _load_embedding_counter, "llm": _load_llm_counter}
+    if kind not in loaders:
+        raise ValueError(f"Unknown token counter: {kind}")
+    
+    with _counters_lock:
+        if kind not in _counters:
+            _counters[kind] = loaders[kind](int(os.environ.get("TOKEN_CACHE_SIZE", "50000")))
+        return _counters[kind]
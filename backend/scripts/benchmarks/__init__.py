@@ -0,0 +1,3 @@
+"""
+Benchmarks for VoiceForge crawling and processing throughput.
+"""
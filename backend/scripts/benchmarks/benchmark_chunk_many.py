@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure bulk chunking throughput with ContentChunker.chunk_many.
+
+Streams generated pages through chunk_many inline (one process) and across
+a process pool, checks both produce the same chunks (exit code 1 on any
+difference), and reports pages per second and the peak memory of the
+parent process, which should not grow with the number of pages.
+
+Usage:
+    python scripts/benchmarks/benchmark_chunk_many.py --pages 2000 --workers 4
+"""
+import argparse
+import logging
+import os
+import resource
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.chunker import ContentChunker
+from scripts.benchmarks.benchmark_chunking import generate_document
+
+logging.basicConfig(level=logging.ERROR)
+
+def pages(count: int, size: int):
+    """Generated content records, created lazily like rows read from the database."""
+    for i in range(count):
+        yield {
+            "content_id": f"content-{i}",
+            "url": f"https://example.com/blog/page-{i}",
+            "domain": "example.com",
+            "text": generate_document(size, "blog", seed=i % 50),
+            "metadata": {"title": f"Page {i}", "content_type": "blog"}
+        }
+
+def run(chunker: ContentChunker, count: int, size: int, workers: int) -> tuple:
+    """(pages/s, chunk count, (content_id, chunk texts) sample of the first pages)."""
+    chunks = 0
+    sample = []
+    start = time.perf_counter()
+    for content_id, content_chunks in chunker.chunk_many(pages(count, size), workers=workers):
+        chunks += len(content_chunks or [])
+        if len(sample) < 20:
+            sample.append((content_id, [chunk["text"] for chunk in content_chunks or []]))
+    elapsed = time.perf_counter() - start
+    return count / elapsed, chunks, sample
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="generated pages")
+    parser.add_argument("--size", type=int, default=20000, help="page text size in bytes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="chunking processes")
+    args = parser.parse_args()
+    
+    chunker = ContentChunker(chunk_size=500, chunk_overlap=100)
+    
+    print(f"⏱️ Bulk chunking ({args.pages} pages of ~{args.size // 1024} KB)")
+    print("=" * 60)
+    inline_rate, inline_chunks, inline_sample = run(chunker, args.pages, args.size, workers=1)
+    print(f"  inline          {inline_rate:8.1f} pages/s  {inline_chunks} chunks")
+    pool_rate, pool_chunks, pool_sample = run(chunker, args.pages, args.size, workers=args.workers)
+    print(f"  {args.workers} processes    {pool_rate:8.1f} pages/s  {pool_chunks} chunks  ({pool_rate / inline_rate:.1f}x)")
+    
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"  parent peak RSS {peak_mb:.0f} MB")
+    
+    if (inline_chunks, inline_sample) != (pool_chunks, pool_sample):
+        print("  ❌ pooled chunks differ from inline chunks")
+        return 1
+    print("  ✅ pooled chunks match inline chunks")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
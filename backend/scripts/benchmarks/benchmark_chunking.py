@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure EnhancedContentChunker throughput on large documents.
+
+First checks every chunk against the source text: its text must be the
+cleaned content[start_char:end_char], chunks must be in order, and together
+they must cover the whole document (exit code 1 on any violation). Then
+chunks generated documentation pages of growing size; time per MB should
+stay flat as documents grow, since chunking is a single pass.
+
+Usage:
+    python scripts/benchmarks/benchmark_chunking.py --sizes 0.1 0.5 1 2
+    python scripts/benchmarks/benchmark_chunking.py --check-only
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.enhanced_chunker import EnhancedContentChunker, WORD_RE
+
+logging.basicConfig(level=logging.ERROR)
+
+WORDS = (
+    "content teams publish consistent material across every channel while the platform "
+    "tracks voice tone terminology and audience for each brand guide update release"
+).split()
+
+def generate_document(size_bytes: int, content_type: str, seed: int = 7) -> str:
+    """A documentation-like page of about size_bytes: headings, paragraphs, lists and Q&A."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    section = 0
+    while length < size_bytes:
+        if content_type == "faq":
+            block = f"Q: How does feature {section} work?\nA: {_sentences(rng, 3)}"
+        elif section % 4 == 0:
+            block = f"## Section {section}\n\n{_sentences(rng, 4)}"
+        elif section % 4 == 1:
+            block = "\n".join(f"- {_sentences(rng, 1)}" for _ in range(rng.randint(2, 5)))
+        else:
+            block = _sentences(rng, rng.randint(3, 8))
+        parts.append(block)
+        length += len(block) + 2
+        section += 1
+    return "\n\n".join(parts)
+
+def _sentences(rng: random.Random, count: int) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + rng.choice(".!?")
+        for _ in range(count)
+    )
+
+def check_offsets(chunker: EnhancedContentChunker, content: str, content_type: str, chunks) -> list:
+    """Offset violations of a chunking result (empty if the offsets are exact)."""
+    # Segments too small to chunk are skipped by design; only the kept segments must be covered
+    structure = chunker._detect_content_structure(content)
+    segments = chunker._split_on_structure(content, content_type, structure)
+    
+    def uncovered(start: int, end: int) -> bool:
+        return any(content[max(start, s):min(end, e)].strip() for s, e in segments)
+    
+    errors = []
+    previous_start = previous_end = 0
+    for chunk in chunks:
+        start, end = chunk["start_char"], chunk["end_char"]
+        if chunk["text"] != chunker._clean_text(content[start:end]):
+            errors.append(f"chunk {chunk['chunk_index']}: text does not match content[{start}:{end}]")
+        if start < previous_start or end <= previous_end:
+            errors.append(f"chunk {chunk['chunk_index']}: out of order ({start}, {end})")
+        if start > previous_end and uncovered(previous_end, start):
+            errors.append(f"chunk {chunk['chunk_index']}: text between {previous_end} and {start} is not covered")
+        previous_start, previous_end = start, end
+    
+    # The last chunk may be dropped when it is too small; everything before it is covered
+    tail = " ".join(content[max(previous_end, s):e] for s, e in segments if e > previous_end)
+    if len(WORD_RE.findall(tail)) >= chunker.min_chunk_size:
+        errors.append(f"text after {previous_end} is not covered")
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.1, 0.25, 0.5, 1.0], help="document sizes in MB")
+    parser.add_argument("--rounds", type=int, default=2, help="benchmark rounds per size")
+    parser.add_argument("--check-only", action="store_true", help="only run the offset check")
+    args = parser.parse_args()
+    
+    chunker = EnhancedContentChunker()
+    
+    print("🧪 Chunk offsets")
+    print("=" * 60)
+    failures = 0
+    for content_type in ["documentation", "faq", "blog", "default"]:
+        for size in [2000, 20000, 200000]:
+            content = generate_document(size, content_type, seed=size)
+            chunks = chunker.chunk_content(content, content_type=content_type)
+            errors = check_offsets(chunker, content, content_type, chunks)
+            status = "❌" if errors else "✅"
+            print(f"  {status} {content_type:<14} {len(content):>7} chars  {len(chunks):>4} chunks")
+            for error in errors[:5]:
+                print(f"     {error}")
+            failures += bool(errors)
+    
+    if not args.check_only:
+        print()
+        print(f"⏱️ Chunking throughput (documentation pages, {args.rounds} rounds)")
+        print("=" * 60)
+        for size_mb in args.sizes:
+            content = generate_document(int(size_mb * 1024 * 1024), "documentation")
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                chunks = chunker.chunk_content(content, content_type="documentation")
+            elapsed = (time.perf_counter() - start) / args.rounds
+            mb = len(content) / 1024 / 1024
+            print(f"  {mb:6.2f} MB  {len(chunks):>6} chunks  {mb / elapsed:6.2f} MB/s  "
+                  f"{len(chunks) / elapsed:8.0f} chunks/s  {elapsed / mb:6.3f} s/MB")
+    
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs concurrent Playwright crawling.
+
+Crawls a generated local test site once with concurrency=1 (the sync
+crawl loop) and once per requested concurrency level (the async mode),
+then reports pages per second for each run.
+
+Usage:
+    python scripts/benchmarks/benchmark_crawl_concurrency.py --pages 40 --latency 0.3
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.models import CrawlConfig
+from crawler.engine import PlaywrightCrawler
+from scripts.benchmarks.local_site import LocalTestSite, NullDatabase
+
+logging.basicConfig(level=logging.ERROR)
+
+def run_crawl(site_url: str, pages: int, concurrency: int, per_host: int, delay: float) -> dict:
+    """Run one crawl against the local site and return its timings."""
+    config = CrawlConfig(
+        max_pages=pages,
+        max_depth=10,
+        delay=delay,
+        concurrency=concurrency,
+        per_host_concurrency=per_host,
+    )
+    db = NullDatabase()
+    crawler = PlaywrightCrawler(
+        domain=site_url,
+        config=config,
+        db=db,
+        crawl_id="benchmark",
+        org_id="benchmark",
+    )
+    
+    start = time.perf_counter()
+    crawler.crawl()
+    elapsed = time.perf_counter() - start
+    
+    progress = crawler.get_progress()
+    return {
+        "concurrency": concurrency,
+        "pages": progress.pages_crawled,
+        "saved": db.saved,
+        "seconds": elapsed,
+        "pages_per_second": progress.pages_crawled / elapsed if elapsed else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40, help="max_pages for each crawl")
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated server latency in seconds")
+    parser.add_argument("--delay", type=float, default=0.5, help="CrawlConfig.delay for each crawl")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8], help="concurrency levels to compare")
+    parser.add_argument("--per-host", type=int, default=8, help="per_host_concurrency for concurrent runs")
+    args = parser.parse_args()
+    
+    print("🕷️ Crawl concurrency benchmark")
+    print("=" * 60)
+    
+    results = []
+    with LocalTestSite(num_pages=args.pages * 2, latency=args.latency) as site:
+        print(f"Serving local test site at {site.url} ({args.latency}s latency)")
+        for level in [1] + args.concurrency:
+            result = run_crawl(site.url, args.pages, level, args.per_host, args.delay)
+            results.append(result)
+            print(f"  concurrency={level:<3} {result['pages']:>4} pages in {result['seconds']:6.1f}s "
+                  f"→ {result['pages_per_second']:.2f} pages/s")
+    
+    baseline = results[0]["pages_per_second"]
+    print("-" * 60)
+    for result in results[1:]:
+        speedup = result["pages_per_second"] / baseline if baseline else 0.0
+        print(f"  concurrency={result['concurrency']:<3} speedup vs sequential: {speedup:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measure how many texts the embedding cache keeps away from the model.
+
+Chunks generated pages that share a footer (like the pages of one site),
+embeds the chunks through the embedding cache, then simulates a re-crawl in
+a new process (a fresh in-memory tier, same persistent SQLite file) with a
+fraction of the pages edited. Reports the texts sent to the model, the hit
+rates of both passes and the time per chunk, and checks that cached
+embeddings equal freshly computed ones.
+
+Uses the synthetic CPU model from benchmark_embedding_service unless the
+sentence-transformers model can be loaded.
+
+Usage:
+    python scripts/benchmarks/benchmark_embedding_cache.py --pages 50 --changed 0.1
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor import embedding_cache
+from processor.chunker import ContentChunker
+from scripts.benchmarks.benchmark_chunking import generate_document
+from scripts.benchmarks.benchmark_embedding_service import load_model
+
+logging.basicConfig(level=logging.ERROR)
+
+FOOTER = ("Subscribe to our newsletter for product updates. Follow us on social media. "
+          "Copyright 2026 Example Inc. All rights reserved. Privacy policy and terms of service apply.")
+
+class CountingModel:
+    """Wraps a model and counts the texts it encodes."""
+    
+    def __init__(self, model, model_id: str):
+        self.model = model
+        self.model_id = model_id
+        self.encoded = 0
+    
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        return self.model.encode(texts, **kwargs)
+
+def embed_pages(model, chunker, pages) -> tuple:
+    """(chunks, seconds) for chunking and embedding pages through the cache."""
+    chunks = 0
+    elapsed = 0.0
+    for text in pages:
+        texts = [chunk["text"] for chunk in chunker.chunk_text(text)] + [FOOTER]
+        start = time.perf_counter()
+        embedding_cache.embed_texts(model, texts, batch_size=32)
+        elapsed += time.perf_counter() - start
+        chunks += len(texts)
+    return chunks, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50, help="generated pages")
+    parser.add_argument("--size", type=int, default=8000, help="page size in bytes")
+    parser.add_argument("--changed", type=float, default=0.1, help="fraction of pages edited before the re-crawl")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    args = parser.parse_args()
+    
+    model, model_name = load_model(args.model)
+    directory = tempfile.mkdtemp(prefix="embedding-cache-")
+    os.environ["EMBEDDING_CACHE"] = "file"
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(directory, "embeddings.sqlite3")
+    
+    chunker = ContentChunker(chunk_size=500, chunk_overlap=100, content_defined=True)
+    pages = [generate_document(args.size, "blog", seed=i) for i in range(args.pages)]
+    rng = random.Random(0)
+    recrawled = [page + " This page was updated with a new paragraph." if rng.random() < args.changed else page
+                 for page in pages]
+    
+    print(f"📦 Embedding cache ({args.pages} pages, {args.changed:.0%} changed on re-crawl, model {model_name})")
+    print("=" * 60)
+    
+    for name, texts in (("first crawl", pages), ("re-crawl", recrawled)):
+        # A new process: empty memory tier, same SQLite file
+        embedding_cache._caches.clear()
+        embedding_cache._stores.clear()
+        counting = CountingModel(model, model_name)
+        chunks, elapsed = embed_pages(counting, chunker, texts)
+        summary = embedding_cache.get_embedding_cache(counting).summary()
+        print(f"  {name:<12} {chunks:>6} texts  {counting.encoded:>6} encoded  "
+              f"hit rate {summary['hit_rate']:.1%} (memory {summary['memory_hits']}, store {summary['store_hits']})  "
+              f"{elapsed / chunks * 1000:6.2f} ms/text")
+    
+    sample = [chunk["text"] for chunk in chunker.chunk_text(pages[0])][:8]
+    cached = np.stack(embedding_cache.embed_texts(CountingModel(model, model_name), sample))
+    fresh = np.asarray(model.encode(sample))
+    if not np.allclose(cached, fresh, atol=1e-4):
+        print("❌ Cached embeddings differ from fresh ones")
+        sys.exit(1)
+    print("✅ Cached embeddings match fresh ones")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Measure query embedding throughput and latency with and without micro-batching.
+
+Concurrent client threads each encode a series of queries, either calling
+model.encode() directly (one forward pass per query, as before) or through
+the shared EmbeddingService. Reports queries per second, p50/p95/p99
+latency and the service's mean batch size, and checks that the service
+returns the same vectors as direct calls.
+
+Uses the sentence-transformers model if it can be loaded, otherwise a
+synthetic CPU model whose cost per call is a fixed overhead plus a matrix
+product per text (like a small transformer's forward pass).
+
+Usage:
+    python scripts/benchmarks/benchmark_embedding_service.py --clients 16 --queries 50
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.embedding_service import EmbeddingService
+
+logging.basicConfig(level=logging.ERROR)
+
+class SyntheticModel:
+    """Deterministic CPU-bound stand-in for a sentence embedding model."""
+    
+    def __init__(self, dimension: int = 384, hidden: int = 384, layers: int = 6):
+        rng = np.random.default_rng(0)
+        self.dimension = dimension
+        self.weights = [rng.standard_normal((hidden, hidden)).astype(np.float32) / np.sqrt(hidden)
+                        for _ in range(layers)]
+        self.projection = rng.standard_normal((hidden, dimension)).astype(np.float32)
+        self.hidden = hidden
+        self.overhead = rng.standard_normal((384, 384)).astype(np.float32)
+    
+    def _input(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+        # 16 "tokens" per text
+        return np.random.default_rng(seed).standard_normal((16, self.hidden)).astype(np.float32)
+    
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = np.stack([self._input(text) for text in ([texts] if single else texts)])
+        # Per-call overhead (tokenization, framework dispatch), CPU-bound
+        overhead = self.overhead
+        for _ in range(20):
+            overhead = np.tanh(overhead @ self.overhead)
+        for weights in self.weights:
+            batch = np.tanh(batch @ weights)
+        embeddings = batch.mean(axis=1) @ self.projection
+        return embeddings[0] if single else embeddings
+
+def load_model(name: str):
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name), name
+    except Exception as e:
+        print(f"⚠️ {name} not available ({str(e)[:60]}), using the synthetic model")
+        return SyntheticModel(), "synthetic"
+
+def run_clients(encode, clients: int, queries: int) -> tuple:
+    """(seconds, per-query latencies) for clients threads encoding queries each."""
+    latencies = [[] for _ in range(clients)]
+    
+    def client(i):
+        for q in range(queries):
+            start = time.perf_counter()
+            encode(f"client {i} asks question number {q} about the product")
+            latencies[i].append(time.perf_counter() - start)
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.array([l for client_latencies in latencies for l in client_latencies])
+
+def report(name: str, seconds: float, latencies: np.ndarray):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"  {name:<10} {len(latencies) / seconds:8.1f} queries/s   "
+          f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--queries", type=int, default=50, help="queries per client")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    parser.add_argument("--wait-ms", type=float, default=5.0, help="micro-batch window")
+    args = parser.parse_args()
+    
+    model, model_name = load_model(args.model)
+    print(f"⏱️ Query embedding ({args.clients} clients x {args.queries} queries, model {model_name})")
+    print("=" * 60)
+    
+    seconds, latencies = run_clients(model.encode, args.clients, args.queries)
+    report("direct", seconds, latencies)
+    
+    service = EmbeddingService(model, max_wait_ms=args.wait_ms)
+    seconds, latencies = run_clients(service.encode, args.clients, args.queries)
+    report("batched", seconds, latencies)
+    print(f"  service: {service.summary()}")
+    
+    texts = [f"consistency check {i}" for i in range(8)]
+    direct = np.asarray(model.encode(texts))
+    batched = np.stack(service.encode_many(texts))
+    if not np.allclose(direct, batched, atol=1e-4):
+        print("❌ Batched embeddings differ from direct ones")
+        sys.exit(1)
+    print("✅ Batched embeddings match direct ones")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare the BeautifulSoup and lxml content extractor backends.
+
+First checks that both backends produce the same text, title, metadata and
+content type on every page of the parity corpus (exit code 1 on any
+difference), then measures pages per second for each backend on generated
+realistic pages.
+
+Usage:
+    python scripts/benchmarks/benchmark_extraction.py --pages 200
+    python scripts/benchmarks/benchmark_extraction.py --parity-only
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.extractor import ContentExtractor
+from scripts.benchmarks.extraction_corpus import PARITY_CASES, generate_page
+
+logging.basicConfig(level=logging.ERROR)
+
+def comparable(result):
+    """The fields both backends must agree on."""
+    if result is None:
+        return None
+    return {"text": result["text"], "metadata": result["metadata"].dict()}
+
+def check_parity(bs4_extractor: ContentExtractor, lxml_extractor: ContentExtractor, pages) -> int:
+    """Print every page where the backends disagree; returns the number of differences."""
+    differences = 0
+    for name, url, html in pages:
+        expected = comparable(bs4_extractor.extract(url=url, html=html, domain="https://example.com"))
+        actual = comparable(lxml_extractor.extract(url=url, html=html, domain="https://example.com"))
+        if expected == actual:
+            continue
+        
+        differences += 1
+        print(f"  ❌ {name} ({url})")
+        if expected is None or actual is None:
+            print(f"     bs4: {'no content' if expected is None else 'content'}, "
+                  f"lxml: {'no content' if actual is None else 'content'}")
+            continue
+        if expected["text"] != actual["text"]:
+            print(f"     text bs4:  {expected['text'][:200]!r}")
+            print(f"     text lxml: {actual['text'][:200]!r}")
+        for field, value in expected["metadata"].items():
+            if actual["metadata"][field] != value:
+                print(f"     {field}: bs4={value!r} lxml={actual['metadata'][field]!r}")
+    return differences
+
+def measure(extractor: ContentExtractor, pages, rounds: int) -> float:
+    """Pages per second over the generated pages."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, html in pages:
+            extractor.extract(url=url, html=html, domain="https://example.com")
+    elapsed = time.perf_counter() - start
+    return rounds * len(pages) / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100, help="generated pages per benchmark round")
+    parser.add_argument("--rounds", type=int, default=3, help="benchmark rounds per backend")
+    parser.add_argument("--parity-only", action="store_true", help="only run the parity check")
+    args = parser.parse_args()
+    
+    bs4_extractor = ContentExtractor(backend="bs4")
+    lxml_extractor = ContentExtractor(backend="lxml")
+    if lxml_extractor.backend != "lxml":
+        print("❌ lxml is not installed (pip install lxml)")
+        return 1
+    
+    generated = [generate_page(i) for i in range(args.pages)]
+    
+    print("🧪 Extractor parity")
+    print("=" * 60)
+    differences = check_parity(bs4_extractor, lxml_extractor, PARITY_CASES)
+    differences += check_parity(bs4_extractor, lxml_extractor,
+                                [(f"generated {i}", url, html) for i, (url, html) in enumerate(generated[:20])])
+    print(f"  {len(PARITY_CASES) + min(20, len(generated)) - differences} identical, {differences} different")
+    
+    if not args.parity_only:
+        size_kb = sum(len(html) for _, html in generated) / len(generated) / 1024
+        print()
+        print(f"⏱️ Extraction throughput ({args.pages} pages of ~{size_kb:.0f} KB, {args.rounds} rounds)")
+        print("=" * 60)
+        bs4_rate = measure(bs4_extractor, generated, args.rounds)
+        print(f"  bs4 (html.parser) {bs4_rate:8.1f} pages/s")
+        lxml_rate = measure(lxml_extractor, generated, args.rounds)
+        print(f"  lxml              {lxml_rate:8.1f} pages/s  ({lxml_rate / bs4_rate:.1f}x)")
+    
+    return 1 if differences else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
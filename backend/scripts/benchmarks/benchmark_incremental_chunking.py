@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Measure how many chunks re-processing an edited page has to re-embed.
+
+Chunks generated documents, applies small edits (a sentence replaced,
+inserted or deleted at a random position) and re-chunks them. Chunks whose
+stable ID is already stored are kept, so the chunks with new IDs are the
+ones RAGSystem embeds again. Compares content-defined chunking with the
+sentence-aware and fixed-size modes, and checks that no content-defined
+chunk exceeds the chunk size.
+
+Usage:
+    python scripts/benchmarks/benchmark_incremental_chunking.py --documents 10 --edits 10
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.chunker import ContentChunker
+from scripts.benchmarks.benchmark_chunking import generate_document
+
+logging.basicConfig(level=logging.ERROR)
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+NEW_SENTENCE = "This sentence was added in the latest revision of the page."
+
+def edit_document(document: str, rng: random.Random) -> str:
+    """The document with one sentence replaced, inserted or deleted."""
+    ends = [m.end() for m in SENTENCE_END_RE.finditer(document)]
+    if len(ends) < 2:
+        return document + " " + NEW_SENTENCE
+    i = rng.randrange(len(ends) - 1)
+    start, end = ends[i], ends[i + 1]
+    operation = rng.choice(["replace", "insert", "delete"])
+    if operation == "replace":
+        return document[:start] + NEW_SENTENCE + " " + document[end:]
+    if operation == "insert":
+        return document[:start] + NEW_SENTENCE + " " + document[start:]
+    return document[:start] + document[end:]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10, help="generated documents")
+    parser.add_argument("--size", type=int, default=50000, help="document size in bytes")
+    parser.add_argument("--edits", type=int, default=10, help="edits per document")
+    args = parser.parse_args()
+    
+    documents = [generate_document(args.size, "article", seed=i) for i in range(args.documents)]
+    modes = {
+        "content-defined": ContentChunker(chunk_size=500, chunk_overlap=100, content_defined=True),
+        "sentence-aware": ContentChunker(chunk_size=500, chunk_overlap=100),
+        "fixed-size": ContentChunker(chunk_size=500, chunk_overlap=100, respect_sentences=False)
+    }
+    
+    print(f"♻️ Incremental re-chunking ({args.documents} documents of ~{args.size // 1024} KB, "
+          f"{args.edits} edits each)")
+    print("=" * 60)
+    
+    failed = False
+    for name, chunker in modes.items():
+        chunks_total = 0
+        reembedded = 0
+        for d, document in enumerate(documents):
+            record = {"content_id": f"doc-{d}", "text": document, "metadata": {}}
+            stored = {chunk["id"] for chunk in chunker.process_content(record)}
+            chunks_total += len(stored)
+            
+            rng = random.Random(d)
+            for _ in range(args.edits):
+                edited = dict(record, text=edit_document(document, rng))
+                fresh = chunker.process_content(edited)
+                reembedded += sum(chunk["id"] not in stored for chunk in fresh)
+                
+                if name == "content-defined":
+                    sizes = chunker.token_counter.count_batch([chunk["text"] for chunk in fresh])
+                    if max(sizes, default=0) > chunker.chunk_size:
+                        print(f"  ❌ {name}: chunk of {max(sizes)} tokens exceeds {chunker.chunk_size}")
+                        failed = True
+        
+        edits = args.documents * args.edits
+        print(f"  {name:<16} {chunks_total / args.documents:7.1f} chunks/doc  "
+              f"{reembedded / edits:6.2f} chunks re-embedded per edit")
+    
+    if failed:
+        sys.exit(1)
+    print("✅ Done")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measure the overhead of tokenizer-backed token counting in the chunker.
+
+Chunks generated documents with the shared embedding token counter and
+reports the counting time per chunk: cold (every sentence tokenized, in
+batches), warm (counts served from the LRU cache) and against the old
+whitespace word count. Also reports how many chunks built with word counts
+would exceed the embedding model's window, and the LLM counter's batch
+throughput.
+
+Usage:
+    python scripts/benchmarks/benchmark_token_counting.py --documents 20
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from processor.chunker import ContentChunker
+from processor.token_counter import TokenCounter, get_token_counter
+from scripts.benchmarks.benchmark_chunking import generate_document
+
+logging.basicConfig(level=logging.ERROR)
+
+def word_counter() -> TokenCounter:
+    """The previous heuristic: one token per whitespace-separated word, uncached."""
+    return TokenCounter("words", lambda texts: [len(text.split()) for text in texts], cache_size=0)
+
+def chunk_all(chunker: ContentChunker, documents) -> tuple:
+    """(chunks, seconds) for chunking every document."""
+    start = time.perf_counter()
+    chunks = [chunk for document in documents for chunk in chunker.chunk_text(document)]
+    return chunks, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20, help="generated documents")
+    parser.add_argument("--size", type=int, default=50000, help="document size in bytes")
+    args = parser.parse_args()
+    
+    documents = [generate_document(args.size, "blog", seed=i) for i in range(args.documents)]
+    counter = get_token_counter("embedding")
+    exact = "exact" if counter.exact else "tokenizer not available"
+    
+    print(f"⏱️ Token counting overhead ({args.documents} documents of ~{args.size // 1024} KB)")
+    print(f"   embedding counter: {counter.name} ({exact}), window {counter.max_tokens} tokens")
+    print("=" * 60)
+    
+    baseline = ContentChunker(chunk_size=500, chunk_overlap=100, token_counter=word_counter())
+    baseline_chunks, baseline_time = chunk_all(baseline, documents)
+    
+    chunker = ContentChunker(chunk_size=500, chunk_overlap=100, token_counter=counter)
+    cold_chunks, cold_time = chunk_all(chunker, documents)
+    _, warm_time = chunk_all(chunker, documents)
+    
+    per_chunk = lambda seconds, chunks: seconds / max(len(chunks), 1) * 1e6
+    print(f"  word counts      {len(baseline_chunks):>6} chunks  {per_chunk(baseline_time, baseline_chunks):8.1f} µs/chunk")
+    print(f"  tokenizer, cold  {len(cold_chunks):>6} chunks  {per_chunk(cold_time, cold_chunks):8.1f} µs/chunk")
+    print(f"  tokenizer, warm  {len(cold_chunks):>6} chunks  {per_chunk(warm_time, cold_chunks):8.1f} µs/chunk")
+    print(f"  cache: {counter.summary()}")
+    
+    # Chunks sized by word count that the embedding model would truncate
+    sizes = counter.count_batch([chunk["text"] for chunk in baseline_chunks])
+    over = sum(size > counter.max_tokens for size in sizes)
+    print(f"  word-count chunks over the window: {over}/{len(baseline_chunks)}, "
+          f"tokenizer chunks over the window: "
+          f"{sum(size > counter.max_tokens for size in counter.count_batch([c['text'] for c in cold_chunks]))}")
+    
+    llm_counter = get_token_counter("llm")
+    texts = [chunk["text"] for chunk in cold_chunks]
+    start = time.perf_counter()
+    llm_counter.count_batch(texts)
+    elapsed = time.perf_counter() - start
+    print(f"  llm counter ({llm_counter.name}): {per_chunk(elapsed, texts):8.1f} µs/chunk cold")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
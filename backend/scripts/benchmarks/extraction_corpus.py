@@ -0,0 +1,191 @@
+"""
+Test corpus for the content extractor backends.
+
+PARITY_CASES are small pages, each exercising one extraction rule (removed
+elements, content container lookup, metadata sources, content type hints).
+generate_page builds larger, realistic pages for throughput benchmarks.
+"""
+import random
+from typing import List, Tuple
+
+SENTENCE = (
+    "Our platform helps teams publish consistent, on-brand content across every channel "
+    "without rewriting the same material for each audience. "
+)
+
+def _paragraphs(count: int, prefix: str = "") -> str:
+    return "\n".join(f"<p>{prefix}{SENTENCE * 2} Paragraph {i}.</p>" for i in range(count))
+
+def _page(body: str, head: str = "<title>Test page</title>", html_attrs: str = ' lang="en"') -> str:
+    return f"""<!DOCTYPE html>
+<html{html_attrs}>
+<head>
+<meta charset="utf-8">
+{head}
+</head>
+<body>
+{body}
+</body>
+</html>"""
+
+# (name, url, html)
+PARITY_CASES: List[Tuple[str, str, str]] = [
+    ("article container", "https://example.com/guides/start",
+     _page(f"<div><p>Outside the article, ignored.</p></div><article><h1>Getting started</h1>{_paragraphs(3)}</article>")),
+    
+    ("main container", "https://example.com/guides/main",
+     _page(f"<div class='intro'><p>Teaser</p></div><main><h2>Main heading</h2>{_paragraphs(3)}</main>")),
+    
+    ("content id", "https://example.com/page",
+     _page(f"<div id='sidebar'><p>Sidebar text</p></div><div id='main-content'>{_paragraphs(3)}</div>")),
+    
+    ("content class overrides id", "https://example.com/page",
+     _page(f"<div id='content'><p>From the id container.</p></div><section class='wide entry'>{_paragraphs(3)}</section>")),
+    
+    ("body fallback", "https://example.com/plain",
+     _page(f"<div>{_paragraphs(4)}</div><ul><li>First item in the list</li><li>Second item</li></ul>")),
+    
+    ("no body tag", "https://example.com/fragment",
+     f"<html><head><title>Fragment</title></head>{_paragraphs(3)}</html>"),
+    
+    ("removed elements", "https://example.com/cleaned",
+     _page(f"""<header><p>Header text</p></header><nav><li>Home</li></nav>
+<script>var p = "<p>not text</p>";</script><style>p {{ color: red; }}</style>
+<noscript><p>Enable JavaScript</p></noscript><iframe src="/ad"></iframe>
+<main>{_paragraphs(3)}<footer><p>Footer text</p></footer></main>""")),
+
+    ("hidden, social and nav-id elements", "https://example.com/widgets",
+     _page(f"""<main>{_paragraphs(2)}
+<p style="display:none">Hidden paragraph</p>
+<p style="color: blue; display: none">Spaced style is kept</p>
+<div class="post-Share-buttons"><p>Share this</p></div>
+<div class="LinkedIn widget"><p>Follow us</p></div>
+<ul id="topMenu"><li>Menu entry</li></ul>
+<div id="page-footer-links"><p>Footer links</p></div>
+{_paragraphs(1, "Last: ")}</main>""")),
+
+    ("comments and tails", "https://example.com/comments",
+     _page(f"<main><p>Before <!-- a comment --> after the comment.</p>"
+           f"<p>Text <span style='display:none'>gone</span> continues here.</p>{_paragraphs(2)}</main>")),
+    
+    ("nested list and paragraphs", "https://example.com/nested",
+     _page(f"<main><ul><li><p>Item paragraph one is long enough to matter.</p></li>"
+           f"<li>Item two <ul><li>Nested item</li></ul></li></ul>{_paragraphs(2)}</main>")),
+    
+    ("headings", "https://example.com/headings",
+     _page(f"<main><h1>Title</h1><h3>Sub</h3><h6>Tiny</h6>{_paragraphs(2)}<h4>   </h4></main>")),
+    
+    ("entities and whitespace", "https://example.com/entities",
+     _page(f"<main><p>Fish &amp; chips&nbsp;&mdash; caf&eacute;   spaced\n\n\tout &lt;tags&gt;</p>"
+           f"<p>  Leading and trailing  </p>{_paragraphs(2)}</main>")),
+    
+    ("inline formatting", "https://example.com/inline",
+     _page(f"<main><p><b>Bold</b> <i>italic</i> <a href='/x'>link</a>text<code>code()</code></p>{_paragraphs(2)}</main>")),
+    
+    ("too short", "https://example.com/short",
+     _page("<main><p>Too short.</p></main>")),
+    
+    ("empty document", "https://example.com/empty", ""),
+    
+    ("root removed", "https://example.com/share-root",
+     f"<html class='share-enabled'><body>{_paragraphs(3)}</body></html>"),
+    
+    ("title from heading", "https://example.com/no-title",
+     _page(f"<main><h2></h2><h2>Second level title</h2>{_paragraphs(2)}</main>", head="")),
+    
+    ("empty title tag", "https://example.com/empty-title",
+     _page(f"<main><h1>Heading</h1>{_paragraphs(2)}</main>", head="<title>  </title>")),
+    
+    ("author meta", "https://example.com/blog/author-meta",
+     _page(f"<article>{_paragraphs(3)}</article>",
+           head='<title>Post</title><meta name="author" content="Jane Writer">')),
+    
+    ("author itemprop and byline", "https://example.com/blog/byline",
+     _page(f"<article><span itemprop='author'> Sam Itemprop </span>{_paragraphs(3)}</article>")),
+    
+    ("author byline class", "https://example.com/blog/byline-class",
+     _page(f"<article><div class='post-Byline'>By Alex Byline</div>{_paragraphs(3)}</article>")),
+    
+    ("dates", "https://example.com/blog/dates",
+     _page(f"<article><time datetime='2023-01-02'>Jan 2</time>{_paragraphs(3)}</article>",
+           head="""<title>Dates</title>
+<meta property="article:published_time" content="2024-03-05T10:00:00Z">
+<meta property="OG:Published_Time" content="2024-03-06T11:00:00+02:00">
+<meta property="article:modified_time" content="not a date">
+<meta name="lastmod" content="2024-04-01">""")),
+
+    ("time tag date", "https://example.com/blog/time",
+     _page(f"<article><time>no attribute</time><time datetime='2022-12-24T08:30:00Z'>Dec</time>{_paragraphs(3)}</article>")),
+    
+    ("language", "https://example.com/lang",
+     _page(f"<main>{_paragraphs(2)}</main>", html_attrs=' lang="pt-BR"')),
+    
+    ("categories and tags", "https://example.com/blog/taxonomy",
+     _page(f"""<article>{_paragraphs(3)}
+<div class="post-categories"><a href="/c/eng">Engineering</a><a href="/c/ai">AI</a></div>
+<ul class="tag-list"><li><a href="/t/ai">AI</a></li><li><a href="/t/rag">RAG</a></li><li><a href="/t/rag">RAG</a></li></ul>
+<div class="vintage-stage"><a href="/x">Vintage</a></div></article>""",
+           head="""<title>Taxonomy</title>
+<meta property="article:section" content="Product">
+<meta property="article:tag" content="launch">
+<meta property="article:tag" content="launch">""")),
+
+    ("schema.org itemtype", "https://example.com/widget-x",
+     _page(f"<div itemtype='https://schema.org/Thing'></div><div itemtype='https://schema.org/Product'>{_paragraphs(3)}</div>")),
+    
+    ("about text", "https://example.com/company",
+     _page(f"<main><h2>Who we are</h2>{_paragraphs(2)}</main>")),
+    
+    ("blog text", "https://example.com/updates/one",
+     _page(f"<main><p>Posted on Monday by the team.</p>{_paragraphs(2)}</main>")),
+    
+    ("other type", "https://example.com/plain/other",
+     _page(f"<main>{_paragraphs(3)}</main>")),
+    
+    ("url types", "https://example.com/docs/api/reference",
+     _page(f"<main>{_paragraphs(3)}</main>")),
+    
+    ("inline svg title", "https://example.com/svg",
+     _page(f"<main><svg><title>Icon</title><path d='M0'/></svg>{_paragraphs(3)}</main>", head="")),
+    
+    ("xml declaration", "https://example.com/xhtml",
+     '<?xml version="1.0" encoding="utf-8"?>\n' + _page(f"<main>{_paragraphs(3)}</main>")),
+]
+
+def generate_page(index: int, seed: int = 7) -> Tuple[str, str]:
+    """A realistic ~30-60 KB blog or docs page for throughput benchmarks."""
+    rng = random.Random(seed + index)
+    section = rng.choice(["blog", "docs", "product", "news"])
+    url = f"https://example.com/{section}/page-{index}"
+    
+    nav = "".join(f'<li><a href="/{section}/page-{i}">Page {i}</a></li>' for i in rng.sample(range(500), 40))
+    sections = []
+    for s in range(rng.randint(6, 12)):
+        items = "".join(f"<li>Point {i}: {SENTENCE}</li>" for i in range(rng.randint(2, 6)))
+        sections.append(
+            f'<section id="s{s}"><h2>Section {s}</h2>'
+            f'{_paragraphs(rng.randint(2, 5))}<ul>{items}</ul>'
+            f'<div class="share-bar"><a href="#">Share</a><a href="#">Tweet</a></div></section>'
+        )
+    
+    head = f"""<title>{section.title()} page {index}</title>
+<meta name="author" content="Author {index % 13}">
+<meta property="article:published_time" content="2024-0{index % 9 + 1}-1{index % 9}T09:00:00Z">
+<meta property="article:section" content="{section.title()}">
+<meta property="article:tag" content="tag-{index % 5}">
+<style>{"body { margin: 0; } " * 50}</style>
+<script>{"window.dataLayer = window.dataLayer || []; " * 80}</script>"""
+    body = f"""<header id="site-header"><nav><ul>{nav}</ul></nav></header>
+<div class="layout">
+<aside id="sidebar"><ul>{nav}</ul></aside>
+<article class="post-content">
+<h1>{section.title()} page {index}</h1>
+<div class="byline">By Author {index % 13}</div>
+{"".join(sections)}
+<div class="post-tags"><a href="/t/a">Alpha</a><a href="/t/b">Beta</a></div>
+<!-- end of article -->
+</article>
+</div>
+<footer id="site-footer"><p>Footer</p><ul>{nav}</ul></footer>
+<script>{"console.log('tracking'); " * 40}</script>"""
+    return url, _page(body, head=head)
@@ -0,0 +1,114 @@
+"""
+Local test site for crawler benchmarks.
+
+Serves a generated site of linked documentation/blog pages from a
+background thread, with an optional per-request latency to mimic a real
+origin server.
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+PARAGRAPH = (
+    "VoiceForge turns your website into a searchable knowledge base. "
+    "This paragraph exists so the content extractor has enough text to keep. "
+)
+
+def render_page(index: int, num_pages: int, links_per_page: int = 5, seed: int = 42) -> str:
+    """Render one generated page that links to a few other pages."""
+    rng = random.Random(seed + index)
+    section = "docs" if index % 2 == 0 else "blog"
+    targets = rng.sample(range(num_pages), min(links_per_page, num_pages))
+    links = "\n".join(
+        f'<li><a href="/{"docs" if t % 2 == 0 else "blog"}/page-{t}">Page {t}</a></li>'
+        for t in targets
+    )
+    body = "\n".join(f"<p>{PARAGRAPH * 3} ({index}.{i})</p>" for i in range(6))
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><title>{section.title()} page {index}</title></head>
+<body>
+<nav><ul>{links}</ul></nav>
+<main>
+<h1>{section.title()} page {index}</h1>
+{body}
+<ul>{links}</ul>
+</main>
+<footer>Generated test site</footer>
+</body>
+</html>"""
+
+class LocalTestSite:
+    """Context manager that serves a generated site on 127.0.0.1."""
+    
+    def __init__(self, num_pages: int = 50, latency: float = 0.2, port: int = 0):
+        self.num_pages = num_pages
+        self.latency = latency
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._port = port
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def _make_handler(self):
+        site = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site._lock:
+                    site.requests_served += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                
+                path = self.path.split('?')[0].rstrip('/')
+                if path == '':
+                    index = 0
+                else:
+                    try:
+                        index = int(path.rsplit('-', 1)[1])
+                    except (IndexError, ValueError):
+                        index = -1
+                
+                if not 0 <= index < site.num_pages:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                
+                payload = render_page(index, site.num_pages).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+        
+        return Handler
+    
+    def __enter__(self) -> "LocalTestSite":
+        self._server = ThreadingHTTPServer(('127.0.0.1', self._port), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+class NullDatabase:
+    """Stand-in for Database that counts saved content without persisting it."""
+    
+    def __init__(self):
+        self.saved = 0
+    
+    def save_content(self, content_data, org_id):
+        self.saved += 1
+        return True
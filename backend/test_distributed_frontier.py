@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the Redis lease scripts of the sharded crawl frontier.
+
+Runs against fakeredis (with Lua support: pip install "fakeredis[lua]"), or
+a local Redis when TEST_REDIS_URL is set.
+"""
+import os
+import sys
+import time
+import uuid
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from crawler.distributed import RedisFrontier, ShardCoordinator
+
+def redis_client():
+    if os.environ.get("TEST_REDIS_URL"):
+        import redis
+        return redis.Redis.from_url(os.environ["TEST_REDIS_URL"], decode_responses=True)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+def make_frontiers(count: int, **kwargs):
+    coordinator = ShardCoordinator(f"test-{uuid.uuid4()}", client=redis_client())
+    coordinator.start(count)
+    coordinator.mark_seeded()
+    return coordinator, [RedisFrontier(coordinator, idle_wait=0.01, **kwargs) for _ in range(count)]
+
+def test_lease_and_complete():
+    coordinator, (frontier,) = make_frontiers(1, batch_size=2, max_pages=10)
+    frontier.push_many(["https://example.com/a", "https://example.com/b", "https://example.com/c"], 0)
+    
+    assert frontier.has_work()
+    first, _ = frontier.pop()
+    assert coordinator.redis.zcard(frontier.leased_key) == 2
+    assert int(coordinator.redis.get(frontier.reserved_key)) == 2
+    
+    frontier.pop()
+    assert not coordinator.redis.zscore(frontier.leased_key, f"0 {first}")
+    
+    frontier.pop()
+    assert not frontier.has_work()
+    assert coordinator.redis.zcard(frontier.leased_key) == 0
+    assert int(coordinator.redis.get(frontier.reserved_key)) == 3
+
+def test_expired_leases_are_requeued_with_their_budget():
+    coordinator, (dead, live) = make_frontiers(2, batch_size=2, lease_timeout=0.05, max_pages=2)
+    dead.push_many(["https://example.com/a", "https://example.com/b"], 0)
+    
+    # The first shard leases the whole budget, then stops renewing
+    assert dead.has_work()
+    assert int(coordinator.redis.get(dead.reserved_key)) == 2
+    time.sleep(0.1)
+    
+    crawled = []
+    while live.has_work():
+        crawled.append(live.pop()[0])
+    
+    assert sorted(crawled) == ["https://example.com/a", "https://example.com/b"]
+    assert int(coordinator.redis.get(live.reserved_key)) == 2
+
+def test_lost_leases_are_dropped():
+    coordinator, (slow, other) = make_frontiers(2, batch_size=2, lease_timeout=0.05)
+    slow.push_many(["https://example.com/a", "https://example.com/b"], 0)
+    
+    assert slow.has_work()
+    slow.pop()
+    time.sleep(0.1)
+    # Another shard requeues and leases the expired URLs
+    assert other.has_work()
+    leases = dict(coordinator.redis.zrange(other.leased_key, 0, -1, withscores=True))
+    assert len(leases) == 2
+    
+    # The slow shard neither renews nor completes the other shard's leases
+    slow._complete_current()
+    slow._renew_leases()
+    assert slow._batch == []
+    assert dict(coordinator.redis.zrange(other.leased_key, 0, -1, withscores=True)) == leases
+    
+    while other.has_work():
+        other.pop()
+    with pytest.raises(IndexError):
+        slow.pop()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))